@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# Benchmark of the text_manipulation operations of create_column: the original
+# astype(str)/apply implementation against the vectorized one in utils/text_ops.py
+#
+# Usage: python benchmark_text_manipulation.py [rows]
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from utils.text_ops import apply_text_manipulation
+
+def legacy_text_manipulation(df, text_params):
+    """
+    Original implementation, kept here as the baseline.
+    """
+    manipulation_type = text_params.get("type")
+
+    if manipulation_type == "extract_substring":
+        start = text_params.get("start", 0)
+        length = text_params.get("length")
+        return df[text_params["column"]].astype(str).apply(
+            lambda x: x[start:start+length] if len(x) > start else ""
+        )
+
+    elif manipulation_type == "concatenate":
+        if text_params.get("concat_with") == "column":
+            separator = text_params.get("separator", "")
+            return df[text_params["column1"]].astype(str) + separator + df[text_params["column2"]].astype(str)
+        return df[text_params["column"]].astype(str) + text_params.get("text", "")
+
+    elif manipulation_type == "replace":
+        return df[text_params["column"]].astype(str).str.replace(text_params["find"], text_params["replace"])
+
+    elif manipulation_type == "change_case":
+        values = df[text_params["column"]].astype(str)
+        if text_params["case"] == "upper":
+            return values.str.upper()
+        elif text_params["case"] == "lower":
+            return values.str.lower()
+        return values.str.title()
+
+def build_frame(rows):
+    rng = np.random.default_rng(0)
+    names = np.array(["alpha", "bravo", "charlie", "delta", "echo", "foxtrot"])
+    codes = rng.integers(0, 100000, rows)
+    text = pd.Series(names[rng.integers(0, len(names), rows)], dtype=object) + "-" + pd.Series(codes).astype(str)
+    text[rng.random(rows) < 0.01] = None
+    return pd.DataFrame({"text": text, "code": codes})
+
+CASES = [
+    ("extract_substring", {"type": "extract_substring", "column": "text", "start": 0, "length": 5}),
+    ("concatenate columns", {"type": "concatenate", "concat_with": "column", "column1": "text", "column2": "code", "separator": "/"}),
+    ("concatenate text", {"type": "concatenate", "concat_with": "text", "column": "text", "text": "_x", "position": "after"}),
+    ("replace", {"type": "replace", "column": "text", "find": "-", "replace": ":"}),
+    ("change_case upper", {"type": "change_case", "column": "text", "case": "upper"}),
+    ("change_case title", {"type": "change_case", "column": "text", "case": "title_case"}),
+]
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    df = build_frame(rows)
+
+    # Object strings as read from files, and Arrow strings as stored by compacted sources
+    inputs = {
+        "object": df,
+        "arrow": df.assign(text=df["text"].astype(pd.StringDtype("pyarrow")))
+    }
+
+    for label, frame in inputs.items():
+        print(f"\n{rows} rows, {label} text column")
+        print(f"{'operation':<22}{'legacy (s)':>12}{'vectorized (s)':>16}{'speedup':>10}  same result")
+        for name, text_params in CASES:
+            expected, legacy_time = timed(legacy_text_manipulation, frame, text_params)
+            result, new_time = timed(apply_text_manipulation, frame, text_params)
+            same = expected.tolist() == result.tolist()
+            print(f"{name:<22}{legacy_time:>12.3f}{new_time:>16.3f}{legacy_time / new_time:>9.1f}x  {same}")
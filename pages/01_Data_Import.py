@@ -10,8 +10,18 @@ import sys
 
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.data_connectors import connect_to_api, connect_to_database, test_connection
+from utils.data_connectors import (
+    connect_to_api, connect_to_database, test_connection, read_database_table,
+    invalidate_query_cache, query_cache_stats,
+    DATABASE_TYPES, STREAM_FETCH_SIZE, QUERY_CACHE_TTL, ARROW_AVAILABLE
+)
 from utils.data_processing import preview_dataframe, get_data_summary
+from utils.indexing import build_source_index
+from utils.dtypes import compact_dataframe, DEFAULT_CATEGORY_RATIO
+from utils.arrow_store import to_arrow_table, is_arrow_source
+from utils.profiling import profile_file, resolve_server_path, DEFAULT_PROFILE_CHUNK_ROWS, SERVER_DATA_DIR
+from utils.background import BackgroundImport
+from utils.sql_pushdown import import_live_sample, LIVE_SAMPLE_ROWS
 
 st.set_page_config(
     page_title="Data Import | PM Data Tool",
@@ -22,6 +32,134 @@ st.set_page_config(
 st.title("Data Import")
 st.markdown("Connect to various data sources and import data for your dashboards.")
 
+# Options applied whenever a data source is saved
+st.sidebar.header("Import Options")
+build_index = st.sidebar.checkbox(
+    "Index low-cardinality columns",
+    value=False,
+    help="Speeds up equality and list filters on dashboards at the cost of some memory"
+)
+compact_types = st.sidebar.checkbox(
+    "Compact column types",
+    value=False,
+    help="Downcasts floats that keep their values and stores text as Arrow strings to reduce memory"
+)
+categorical_text = st.sidebar.checkbox(
+    "Store repetitive text as categories",
+    value=False,
+    disabled=not compact_types,
+    help="Saves more memory on text columns with few distinct values"
+)
+arrow_storage = st.sidebar.checkbox(
+    "Store data as Arrow tables",
+    value=False,
+    help="Keeps sources as Arrow tables so previews, column selections and filters avoid copying the full data"
+)
+
+# Connection settings of database sources, kept for this session only so
+# sources can be refreshed; never stored with the data source itself
+if "db_credentials" not in st.session_state:
+    st.session_state.db_credentials = {}
+
+def format_megabytes(size):
+    """
+    Format a size in bytes the way data summaries report memory usage.
+    """
+    return str(round(size / (1024 * 1024), 2)) + " MB"
+
+def save_data_source(name, df, **metadata):
+    """
+    Save a dataframe to session state as a data source.
+    
+    Parameters:
+    -----------
+    name : str
+        Name of the data source
+    df : DataFrame
+        Pandas DataFrame with the imported data
+    **metadata
+        Additional fields stored with the data source (source_type, etc.)
+    """
+    if compact_types:
+        df, compaction = compact_dataframe(df, category_ratio=DEFAULT_CATEGORY_RATIO if categorical_text else None)
+        st.caption(
+            f"Compacted column types: {format_megabytes(compaction['before_bytes'])} → "
+            f"{format_megabytes(compaction['after_bytes'])}"
+        )
+    else:
+        compaction = None
+    
+    table = to_arrow_table(df) if arrow_storage else None
+    if arrow_storage and table is None:
+        st.caption("Kept as a pandas DataFrame: the data cannot be stored as an Arrow table")
+    
+    source = {"table": table} if table is not None else {"data": df}
+    source.update(metadata)
+    source["imported_at"] = datetime.now()
+    source["columns"] = list(df.columns)
+    source["rows"] = len(df)
+    source["compaction"] = compaction
+    
+    # Saving always replaces the entry, so any index is rebuilt from the new data;
+    # Arrow sources are filtered with Arrow compute kernels instead
+    if build_index and table is None:
+        source["index"] = build_source_index(df)
+    
+    st.session_state.data_sources[name] = source
+
+def save_streamed_source(name, table, **metadata):
+    """
+    Save an Arrow table read from a database as a data source.
+    
+    With Arrow storage on (and no type compaction) the table is stored as
+    it is, without a round trip through pandas.
+    """
+    if not (arrow_storage and not compact_types):
+        save_data_source(name, table.to_pandas(), **metadata)
+        return
+    
+    source = {"table": table}
+    source.update(metadata)
+    source["imported_at"] = datetime.now()
+    source["columns"] = table.column_names
+    source["rows"] = table.num_rows
+    source["compaction"] = None
+    st.session_state.data_sources[name] = source
+
+@st.fragment(run_every=1)
+def show_streaming_import():
+    """
+    Display the progress of a streaming database import, with a cancel
+    button, and save the result once the read finishes. Refreshes by itself.
+    """
+    entry = st.session_state.streaming_import
+    run = entry["run"]
+    
+    if not run.done():
+        st.info(f"Loading '{entry['name']}': {run.rows_loaded:,} rows so far ({run.elapsed():.0f}s)")
+        if st.button("Cancel Import", key="cancel_streaming_import"):
+            run.cancel()
+            st.caption("Cancelling after the current batch...")
+        return
+    
+    if run.cancelled():
+        st.warning(f"Import of '{entry['name']}' cancelled after {run.rows_loaded:,} rows")
+        return
+    if run.error() is not None:
+        st.error(f"Import error: {str(run.error())}")
+        return
+    
+    table = run.result()
+    if not entry["saved"]:
+        save_streamed_source(entry["name"], table, **entry["metadata"])
+        entry["saved"] = True
+    
+    st.success(f"Data source '{entry['name']}' imported successfully! {table.num_rows:,} rows in {run.elapsed():.1f}s")
+    
+    # Preview the imported rows
+    st.subheader("Data Preview")
+    preview_dataframe(table.slice(0, 1000).to_pandas())
+
 # Tabs for different import methods
 data_import_tabs = st.tabs(["File Upload", "Database Connection", "API Connection", "Sample Data", "Manage Data Sources"])
 
@@ -32,6 +170,51 @@ with data_import_tabs[0]:
     uploaded_file = st.file_uploader("Choose a file", type=["csv", "xlsx", "json"])
     file_name = st.text_input("Data Source Name", "New Data Source")
     
+    # Profile files too large to import by streaming them in chunks
+    with st.expander("Profile Large File Without Importing"):
+        st.markdown("Stream a CSV or JSON Lines file in chunks to inspect it before importing. Only one chunk is held in memory at a time, so statistics such as distinct counts and medians are approximate.")
+        
+        profile_path = ""
+        if SERVER_DATA_DIR:
+            profile_path = st.text_input(
+                "File Path in Server Data Directory",
+                "",
+                help="Path relative to the server data directory. Leave empty to profile the uploaded file"
+            )
+        profile_chunk_rows = st.number_input(
+            "Rows per Chunk",
+            min_value=1000,
+            value=DEFAULT_PROFILE_CHUNK_ROWS,
+            step=10000
+        )
+        
+        if st.button("Profile File"):
+            profile_source = profile_path.strip() or uploaded_file
+            profile_name = profile_path.strip() or (uploaded_file.name if uploaded_file is not None else "")
+            
+            if not profile_name:
+                st.error("Upload a file or enter a file path to profile." if SERVER_DATA_DIR else "Upload a file to profile.")
+            elif not profile_name.endswith(('.csv', '.json', '.jsonl')):
+                st.error("Only CSV and JSON Lines files can be profiled in chunks.")
+            else:
+                try:
+                    if uploaded_file is not None and profile_source is uploaded_file:
+                        uploaded_file.seek(0)
+                    else:
+                        profile_source = resolve_server_path(profile_source)
+                    
+                    with st.spinner("Profiling file..."):
+                        profile = profile_file(
+                            profile_source,
+                            file_type="csv" if profile_name.endswith('.csv') else "json",
+                            chunksize=int(profile_chunk_rows)
+                        )
+                    
+                    st.success(f"Profiled {profile['rows']} rows in {profile['chunks']} chunks")
+                    st.json(profile)
+                except Exception as e:
+                    st.error(f"Error profiling file: {str(e)}")
+    
     if uploaded_file is not None:
         try:
             if uploaded_file.name.endswith('.csv'):
@@ -49,14 +232,12 @@ with data_import_tabs[0]:
                         st.stop()
                 
                 # Save to session state
-                st.session_state.data_sources[file_name] = {
-                    "data": df,
-                    "source_type": "file",
-                    "original_file": uploaded_file.name,
-                    "imported_at": datetime.now(),
-                    "columns": list(df.columns),
-                    "rows": len(df)
-                }
+                save_data_source(
+                    file_name,
+                    df,
+                    source_type="file",
+                    original_file=uploaded_file.name
+                )
                 
                 st.success(f"Data source '{file_name}' saved successfully!")
             
@@ -76,7 +257,7 @@ with data_import_tabs[0]:
 with data_import_tabs[1]:
     st.header("Connect to Database")
     
-    db_type = st.selectbox("Database Type", ["PostgreSQL", "MySQL", "SQL Server", "SQLite"])
+    db_type = st.selectbox("Database Type", DATABASE_TYPES)
     db_name = st.text_input("Data Source Name (Database)", f"New {db_type} Connection")
     
     with st.form("database_connection_form"):
@@ -86,6 +267,26 @@ with data_import_tabs[1]:
         db_password = st.text_input("Password", type="password")
         db_database = st.text_input("Database Name")
         db_query = st.text_area("SQL Query", "SELECT * FROM table LIMIT 100")
+        db_stream = st.checkbox(
+            "Stream results in batches",
+            value=False,
+            disabled=not ARROW_AVAILABLE,
+            help="Reads the result through a server-side cursor into an Arrow table, with progress and cancellation"
+        )
+        db_live = st.checkbox(
+            "Live query mode",
+            value=False,
+            help=f"Stores only the first {LIVE_SAMPLE_ROWS:,} rows; dashboard filters, selected columns, "
+                 "group-bys and metric aggregates are computed by the database (Median on PostgreSQL only)"
+        )
+        db_fetch_size = st.number_input("Fetch Size (rows per batch)", min_value=100, value=STREAM_FETCH_SIZE, step=1000)
+        db_cache_ttl = st.number_input(
+            "Cache Results For (seconds)",
+            min_value=0,
+            value=QUERY_CACHE_TTL,
+            step=60,
+            help="Running the same query again within this time reuses the result; 0 always queries the database"
+        )
         
         test_conn_button = st.form_submit_button("Test Connection")
         if test_conn_button:
@@ -102,22 +303,53 @@ with data_import_tabs[1]:
         
         import_button = st.form_submit_button("Import Data")
         if import_button:
+            st.session_state.db_credentials[db_name] = {
+                "db_type": db_type,
+                "host": db_host,
+                "port": db_port,
+                "user": db_user,
+                "password": db_password,
+                "database": db_database,
+                "stream": db_stream and not db_live,
+                "fetch_size": int(db_fetch_size)
+            }
+        
+        if import_button and db_stream and not db_live:
+            previous = st.session_state.get("streaming_import")
+            if previous is not None and not previous["run"].done():
+                st.warning(f"Import of '{previous['name']}' is still running. Cancel it or wait for it to finish.")
+            else:
+                st.session_state.streaming_import = {
+                    "name": db_name,
+                    "run": BackgroundImport(
+                        read_database_table,
+                        db_type, db_host, db_port, db_user, db_password, db_database, db_query,
+                        fetch_size=int(db_fetch_size),
+                        cache_ttl=int(db_cache_ttl)
+                    ),
+                    "metadata": {"source_type": "database", "db_type": db_type, "query": db_query, "cache_ttl": int(db_cache_ttl)},
+                    "saved": False
+                }
+        elif import_button:
             try:
-                df = connect_to_database(
-                    db_type, db_host, db_port, db_user, db_password, db_database, db_query
+                # Live sources keep a sample; components query the database
+                read_function = import_live_sample if db_live else connect_to_database
+                df = read_function(
+                    db_type, db_host, db_port, db_user, db_password, db_database, db_query,
+                    cache_ttl=int(db_cache_ttl)
                 )
                 
                 if df is not None:
                     # Save to session state
-                    st.session_state.data_sources[db_name] = {
-                        "data": df,
-                        "source_type": "database",
-                        "db_type": db_type,
-                        "imported_at": datetime.now(),
-                        "columns": list(df.columns),
-                        "rows": len(df),
-                        "query": db_query
-                    }
+                    save_data_source(
+                        db_name,
+                        df,
+                        source_type="database",
+                        db_type=db_type,
+                        query=db_query,
+                        cache_ttl=int(db_cache_ttl),
+                        live=db_live
+                    )
                     
                     st.success(f"Data source '{db_name}' imported successfully!")
                     
@@ -131,6 +363,10 @@ with data_import_tabs[1]:
                     st.json(summary)
             except Exception as e:
                 st.error(f"Import error: {str(e)}")
+    
+    # Progress of a streaming import, outside the form so it can refresh
+    if st.session_state.get("streaming_import") is not None:
+        show_streaming_import()
 
 # API Connection Tab
 with data_import_tabs[2]:
@@ -209,14 +445,12 @@ with data_import_tabs[2]:
                 
                 if df is not None:
                     # Save to session state
-                    st.session_state.data_sources[api_name] = {
-                        "data": df,
-                        "source_type": "api",
-                        "api_url": api_url,
-                        "imported_at": datetime.now(),
-                        "columns": list(df.columns),
-                        "rows": len(df)
-                    }
+                    save_data_source(
+                        api_name,
+                        df,
+                        source_type="api",
+                        api_url=api_url
+                    )
                     
                     st.success(f"Data source '{api_name}' imported successfully!")
                     
@@ -332,14 +566,12 @@ with data_import_tabs[3]:
             df = pd.DataFrame(data)
         
         # Save to session state
-        st.session_state.data_sources[sample_name] = {
-            "data": df,
-            "source_type": "sample",
-            "sample_type": sample_data_type,
-            "imported_at": datetime.now(),
-            "columns": list(df.columns),
-            "rows": len(df)
-        }
+        save_data_source(
+            sample_name,
+            df,
+            source_type="sample",
+            sample_type=sample_data_type
+        )
         
         st.success(f"Sample data '{sample_name}' created successfully!")
         
@@ -368,16 +600,83 @@ with data_import_tabs[4]:
         st.write(f"**Imported At:** {source['imported_at'].strftime('%Y-%m-%d %H:%M:%S')}")
         st.write(f"**Rows:** {source['rows']}")
         st.write(f"**Columns:** {', '.join(source['columns'])}")
+        st.write(f"**Storage:** {'Arrow table' if is_arrow_source(source) else 'pandas DataFrame'}")
+        if source.get("index") is not None:
+            st.write(f"**Indexed Columns:** {', '.join(source['index'].postings) or 'None'}")
+        
+        compaction = source.get("compaction")
+        if compaction:
+            st.write(
+                f"**Memory Usage:** {format_megabytes(compaction['after_bytes'])} "
+                f"(saved {format_megabytes(compaction['saved_bytes'])} of "
+                f"{format_megabytes(compaction['before_bytes'])} by compacting column types)"
+            )
         
         col1, col2 = st.columns(2)
         
         with col1:
             if st.button("View Data", use_container_width=True):
                 st.subheader(f"Data for '{selected_source}'")
-                preview_dataframe(source["data"])
+                preview_dataframe(source["table"] if is_arrow_source(source) else source["data"])
         
         with col2:
             if st.button("Delete Data Source", use_container_width=True):
                 del st.session_state.data_sources[selected_source]
+                st.session_state.db_credentials.pop(selected_source, None)
                 st.success(f"Data source '{selected_source}' deleted successfully!")
                 st.rerun()
+        
+        # Database sources can be re-queried, bypassing the query cache
+        credentials = st.session_state.db_credentials.get(selected_source)
+        if source["source_type"] == "database":
+            st.write(f"**Cache Time to Live:** {source.get('cache_ttl', QUERY_CACHE_TTL)} seconds")
+            if source.get("live"):
+                st.write(f"**Live Query:** dashboard components query the database; the {source['rows']} rows above are a sample")
+            if credentials is None:
+                st.caption("Connection settings of this source are not available in this session; import it again to refresh it")
+            elif st.button("Force Refresh", help="Run the query against the database again and replace the cached result"):
+                try:
+                    connection = [credentials[field] for field in ("db_type", "host", "port", "user", "password", "database")]
+                    metadata = {
+                        "source_type": "database",
+                        "db_type": credentials["db_type"],
+                        "query": source["query"],
+                        "cache_ttl": source.get("cache_ttl", QUERY_CACHE_TTL),
+                        "live": source.get("live", False)
+                    }
+                    if metadata["live"]:
+                        # Component results of the database are cached as well
+                        invalidate_query_cache(*connection)
+                        df = import_live_sample(*connection, source["query"], cache_ttl=metadata["cache_ttl"], force_refresh=True)
+                        save_data_source(selected_source, df, **metadata)
+                    elif credentials["stream"]:
+                        table = read_database_table(
+                            *connection, source["query"],
+                            fetch_size=credentials["fetch_size"],
+                            cache_ttl=metadata["cache_ttl"],
+                            force_refresh=True
+                        )
+                        save_streamed_source(selected_source, table, **metadata)
+                    else:
+                        df = connect_to_database(*connection, source["query"], cache_ttl=metadata["cache_ttl"], force_refresh=True)
+                        save_data_source(selected_source, df, **metadata)
+                    st.success(f"Data source '{selected_source}' refreshed from the database")
+                except Exception as e:
+                    st.error(f"Refresh error: {str(e)}")
+    
+    # Query cache counters, to tune the time to live of database sources
+    st.subheader("Query Cache")
+    cache_stats = query_cache_stats()
+    cache_col1, cache_col2, cache_col3, cache_col4 = st.columns(4)
+    cache_col1.metric("Hits", cache_stats["memory_hits"] + cache_stats["disk_hits"])
+    cache_col2.metric("Misses", cache_stats["misses"])
+    cache_col3.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+    cache_col4.metric("Expired", cache_stats["expired"])
+    st.caption(
+        f"{cache_stats['memory_entries']} results in memory ({format_megabytes(cache_stats['memory_bytes'])}), "
+        f"{cache_stats['disk_entries']} on disk ({format_megabytes(cache_stats['disk_bytes'])}); "
+        f"{cache_stats['disk_hits']} hits read from disk, {cache_stats['evicted']} results evicted"
+    )
+    if st.button("Clear Query Cache"):
+        dropped = invalidate_query_cache()
+        st.success(f"Dropped {dropped} cached query results")
@@ -11,8 +11,13 @@ import sys
 
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.visualization import create_chart, get_chart_types, CHART_DESCRIPTIONS
-from utils.data_processing import filter_dataframe
+from utils.visualization import create_chart, get_chart_types, chart_columns, metric_columns, CHART_DESCRIPTIONS
+from utils.arrow_store import get_source_data, filter_source
+from utils.datetimes import to_datetime_cached, previous_period
+from utils.sql_pushdown import (
+    is_live_source, live_metric_types, live_metric_value, live_previous_metric_value,
+    live_chart_data, live_table_data, live_filter_data, UnsupportedPushdown
+)
 
 st.set_page_config(
     page_title="Dashboard Builder | PM Data Tool",
@@ -37,6 +42,9 @@ if "edit_mode" not in st.session_state:
 if "component_counter" not in st.session_state:
     st.session_state.component_counter = 1
 
+# Connection settings of live database sources (see Data Import)
+db_credentials = st.session_state.get("db_credentials", {})
+
 # Function to generate a unique component ID
 def generate_component_id():
     return f"component_{str(uuid.uuid4())[:8]}"
@@ -135,11 +143,11 @@ with st.sidebar:
             )
             
             # Get the data
-            df = st.session_state.data_sources[data_source]["data"]
+            df = get_source_data(st.session_state.data_sources[data_source])
             
             # Get columns based on data types
             numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-            categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+            categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
             date_cols = df.select_dtypes(include=['datetime', 'datetime64']).columns.tolist()
             
             # Add date columns that might be stored as strings
@@ -147,7 +155,7 @@ with st.sidebar:
                 if col not in date_cols and col not in numeric_cols and col not in categorical_cols:
                     if "date" in col.lower() or "time" in col.lower() or "day" in col.lower():
                         try:
-                            pd.to_datetime(df[col])
+                            to_datetime_cached(df[col])
                             date_cols.append(col)
                         except:
                             pass
@@ -273,16 +281,21 @@ with st.sidebar:
             )
             
             # Get the data
-            df = st.session_state.data_sources[data_source]["data"]
+            df = get_source_data(st.session_state.data_sources[data_source])
             
             # Get columns based on data types
             numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
             
             metric_column = st.selectbox("Metric Column", numeric_cols)
             
+            # Live sources only offer the metrics their database computes
             metric_type = st.selectbox(
                 "Metric Type",
-                ["Sum", "Average", "Minimum", "Maximum", "Count", "Median"]
+                live_metric_types(
+                    st.session_state.data_sources[data_source],
+                    db_credentials.get(data_source),
+                    ["Sum", "Average", "Minimum", "Maximum", "Count", "Median"]
+                )
             )
             
             # Optional filter
@@ -293,8 +306,13 @@ with st.sidebar:
             if add_filter:
                 filter_column = st.selectbox("Filter Column", df.columns.tolist())
                 
-                # Get unique values from the filter column
-                unique_values = df[filter_column].unique().tolist()
+                # Get unique values from the filter column, from the database for live sources
+                live_values = live_filter_data(
+                    st.session_state.data_sources[data_source],
+                    {"filter_column": filter_column, "filter_type": "Select Box"},
+                    db_credentials.get(data_source)
+                )
+                unique_values = (live_values if live_values is not None else df)[filter_column].unique().tolist()
                 filter_value = st.selectbox("Filter Value", unique_values)
             
             # Metric formatting options
@@ -332,7 +350,7 @@ with st.sidebar:
                     if col not in date_cols:
                         if "date" in col.lower() or "time" in col.lower() or "day" in col.lower():
                             try:
-                                pd.to_datetime(df[col])
+                                to_datetime_cached(df[col])
                                 date_cols.append(col)
                             except:
                                 pass
@@ -377,7 +395,7 @@ with st.sidebar:
             )
             
             # Get the data
-            df = st.session_state.data_sources[data_source]["data"]
+            df = get_source_data(st.session_state.data_sources[data_source])
             
             # Select columns to display
             all_columns = df.columns.tolist()
@@ -438,7 +456,7 @@ with st.sidebar:
             )
             
             # Get the data
-            df = st.session_state.data_sources[data_source]["data"]
+            df = get_source_data(st.session_state.data_sources[data_source])
             
             filter_type = st.selectbox(
                 "Filter Type",
@@ -448,7 +466,7 @@ with st.sidebar:
             filter_column = None
             
             if filter_type in ["Select Box", "Multi-Select"]:
-                categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+                categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
                 filter_column = st.selectbox("Filter Column", categorical_cols)
             
             elif filter_type == "Slider":
@@ -463,7 +481,7 @@ with st.sidebar:
                     if col not in date_cols:
                         if "date" in col.lower() or "time" in col.lower() or "day" in col.lower():
                             try:
-                                pd.to_datetime(df[col])
+                                to_datetime_cached(df[col])
                                 date_cols.append(col)
                             except:
                                 pass
@@ -544,7 +562,13 @@ else:
                 if component["type"] == "chart" and "data_source" in component:
                     try:
                         data_source = component["data_source"]
-                        df = st.session_state.data_sources[data_source]["data"]
+                        source = st.session_state.data_sources[data_source]
+                        columns = chart_columns(component["chart_config"])
+                        
+                        # Live sources return only the aggregated rows the chart draws
+                        df = live_chart_data(source, component["chart_config"], columns, db_credentials.get(data_source))
+                        if df is None:
+                            df = get_source_data(source, columns=columns)
                         
                         chart_fig = create_chart(df, component["chart_config"])
                         st.plotly_chart(chart_fig, use_container_width=True)
@@ -554,36 +578,53 @@ else:
                 elif component["type"] == "metric" and "data_source" in component:
                     try:
                         data_source = component["data_source"]
-                        df = st.session_state.data_sources[data_source]["data"]
-                        
-                        # Apply filter if specified
-                        if component.get("filter"):
-                            filter_col = component["filter"]["column"]
-                            filter_val = component["filter"]["value"]
-                            if filter_col and filter_val is not None:
-                                df = df[df[filter_col] == filter_val]
-                        
-                        # Calculate metric value
+                        source = st.session_state.data_sources[data_source]
+                        credentials = db_credentials.get(data_source)
                         metric_col = component["metric_column"]
                         metric_type = component["metric_type"]
                         
-                        if metric_type == "Sum":
-                            value = df[metric_col].sum()
-                        elif metric_type == "Average":
-                            value = df[metric_col].mean()
-                        elif metric_type == "Minimum":
-                            value = df[metric_col].min()
-                        elif metric_type == "Maximum":
-                            value = df[metric_col].max()
-                        elif metric_type == "Count":
-                            value = df[metric_col].count()
-                        elif metric_type == "Median":
-                            value = df[metric_col].median()
+                        # Live sources only hold a sample locally, so their
+                        # metrics are computed by the database or not at all
+                        live = is_live_source(source, credentials)
+                        value = None
+                        if live:
+                            try:
+                                value = live_metric_value(source, component, credentials)
+                            except UnsupportedPushdown:
+                                pass
+                        else:
+                            df = get_source_data(source, columns=metric_columns(component))
+                            
+                            # Apply filter if specified
+                            if component.get("filter"):
+                                filter_col = component["filter"]["column"]
+                                filter_val = component["filter"]["value"]
+                                if filter_col and filter_val is not None:
+                                    df = filter_source(source, [{
+                                        "column": filter_col,
+                                        "operation": "equals",
+                                        "value": filter_val
+                                    }], columns=metric_columns(component))
+                            
+                            if metric_type == "Sum":
+                                value = df[metric_col].sum()
+                            elif metric_type == "Average":
+                                value = df[metric_col].mean()
+                            elif metric_type == "Minimum":
+                                value = df[metric_col].min()
+                            elif metric_type == "Maximum":
+                                value = df[metric_col].max()
+                            elif metric_type == "Count":
+                                value = df[metric_col].count()
+                            elif metric_type == "Median":
+                                value = df[metric_col].median()
                         
                         # Format the value
                         format_config = component.get("format", {"type": "none"})
                         
-                        if format_config["type"] == "number":
+                        if value is None:
+                            formatted_value = "N/A"
+                        elif format_config["type"] == "number":
                             formatted_value = f"{value:.{format_config.get('decimals', 2)}f}"
                         elif format_config["type"] == "percentage":
                             formatted_value = f"{value:.{format_config.get('decimals', 2)}f}%"
@@ -605,54 +646,40 @@ else:
                         delta = None
                         delta_config = component.get("delta")
                         
-                        if delta_config and "date_column" in delta_config:
+                        if delta_config and "date_column" in delta_config and value is not None:
                             date_col = delta_config["date_column"]
-                            period = delta_config["period"].lower()
-                            
-                            # Convert to datetime if needed
-                            if df[date_col].dtype != 'datetime64[ns]':
-                                df[date_col] = pd.to_datetime(df[date_col])
-                            
-                            # Sort by date
-                            df = df.sort_values(date_col)
-                            
-                            # Get the latest date
-                            latest_date = df[date_col].max()
+                            prev_value = None
                             
-                            # Calculate previous period range
-                            if period == "day":
-                                prev_end = latest_date - pd.Timedelta(days=1)
-                                prev_start = prev_end - pd.Timedelta(days=1)
-                            elif period == "week":
-                                prev_end = latest_date - pd.Timedelta(weeks=1)
-                                prev_start = prev_end - pd.Timedelta(weeks=1)
-                            elif period == "month":
-                                prev_end = latest_date - pd.Timedelta(days=30)
-                                prev_start = prev_end - pd.Timedelta(days=30)
-                            else:  # year
-                                prev_end = latest_date - pd.Timedelta(days=365)
-                                prev_start = prev_end - pd.Timedelta(days=365)
-                            
-                            # Filter current and previous period data
-                            current_df = df[df[date_col] <= latest_date]
-                            prev_df = df[(df[date_col] >= prev_start) & (df[date_col] <= prev_end)]
-                            
-                            # Calculate metric for previous period
-                            if not prev_df.empty:
-                                if metric_type == "Sum":
-                                    prev_value = prev_df[metric_col].sum()
-                                elif metric_type == "Average":
-                                    prev_value = prev_df[metric_col].mean()
-                                elif metric_type == "Minimum":
-                                    prev_value = prev_df[metric_col].min()
-                                elif metric_type == "Maximum":
-                                    prev_value = prev_df[metric_col].max()
-                                elif metric_type == "Count":
-                                    prev_value = prev_df[metric_col].count()
-                                elif metric_type == "Median":
-                                    prev_value = prev_df[metric_col].median()
+                            if live:
+                                # Both periods come from the whole table, not the sample
+                                prev_value = live_previous_metric_value(source, component, credentials)
+                            else:
+                                # Convert to datetime if needed, without modifying the source data
+                                if df[date_col].dtype != 'datetime64[ns]':
+                                    df = df.assign(**{date_col: to_datetime_cached(df[date_col])})
                                 
-                                # Calculate delta percentage
+                                # Get the latest date and the previous period range
+                                latest_date = df[date_col].max()
+                                prev_start, prev_end = previous_period(latest_date, delta_config["period"])
+                                prev_df = df[(df[date_col] >= prev_start) & (df[date_col] <= prev_end)]
+                                
+                                # Calculate metric for previous period
+                                if not prev_df.empty:
+                                    if metric_type == "Sum":
+                                        prev_value = prev_df[metric_col].sum()
+                                    elif metric_type == "Average":
+                                        prev_value = prev_df[metric_col].mean()
+                                    elif metric_type == "Minimum":
+                                        prev_value = prev_df[metric_col].min()
+                                    elif metric_type == "Maximum":
+                                        prev_value = prev_df[metric_col].max()
+                                    elif metric_type == "Count":
+                                        prev_value = prev_df[metric_col].count()
+                                    elif metric_type == "Median":
+                                        prev_value = prev_df[metric_col].median()
+                            
+                            # Calculate delta percentage
+                            if prev_value is not None:
                                 if prev_value != 0:
                                     delta = ((value - prev_value) / prev_value) * 100
                                     delta = f"{delta:.1f}%"
@@ -671,7 +698,10 @@ else:
                 elif component["type"] == "table" and "data_source" in component:
                     try:
                         data_source = component["data_source"]
-                        df = st.session_state.data_sources[data_source]["data"]
+                        source = st.session_state.data_sources[data_source]
+                        df = live_table_data(source, component.get("columns"), db_credentials.get(data_source))
+                        if df is None:
+                            df = get_source_data(source, columns=component.get("columns"))
                         
                         # Filter columns
                         if component.get("columns"):
@@ -708,7 +738,10 @@ else:
                 elif component["type"] == "filter" and "data_source" in component:
                     try:
                         data_source = component["data_source"]
-                        df = st.session_state.data_sources[data_source]["data"]
+                        source = st.session_state.data_sources[data_source]
+                        df = live_filter_data(source, component, db_credentials.get(data_source))
+                        if df is None:
+                            df = get_source_data(source, columns=[component["filter_column"]])
                         
                         filter_type = component["filter_type"]
                         filter_column = component["filter_column"]
@@ -729,7 +762,7 @@ else:
                         elif filter_type == "Date Range":
                             # Convert to datetime if needed
                             if df[filter_column].dtype != 'datetime64[ns]':
-                                df[filter_column] = pd.to_datetime(df[filter_column])
+                                df[filter_column] = to_datetime_cached(df[filter_column])
                             
                             min_date = df[filter_column].min().date()
                             max_date = df[filter_column].max().date()
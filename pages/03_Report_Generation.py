@@ -11,9 +11,11 @@ import json
 
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.visualization import create_chart
+from utils.visualization import create_chart, chart_columns
 from utils.export import generate_pdf_report, generate_csv_report, generate_excel_report
 from utils.data_processing import preview_dataframe
+from utils.arrow_store import get_source_data
+from utils.sql_pushdown import is_live_source, live_metric_value, live_chart_data, UnsupportedPushdown
 
 st.set_page_config(
     page_title="Report Generation | PM Data Tool",
@@ -36,6 +38,9 @@ if "current_report" not in st.session_state:
 if "report_edit_mode" not in st.session_state:
     st.session_state.report_edit_mode = False
 
+# Connection settings of live database sources (see Data Import)
+db_credentials = st.session_state.get("db_credentials", {})
+
 # Function to load dashboard components into report
 def load_dashboard_components(dashboard_name):
     if dashboard_name in st.session_state.dashboards:
@@ -236,7 +241,13 @@ else:
                 try:
                     data_source = component["data_source"]
                     if data_source in st.session_state.data_sources:
-                        df = st.session_state.data_sources[data_source]["data"]
+                        source = st.session_state.data_sources[data_source]
+                        columns = chart_columns(component["chart_config"])
+                        
+                        # Live sources return only the aggregated rows the chart draws
+                        df = live_chart_data(source, component["chart_config"], columns, db_credentials.get(data_source))
+                        if df is None:
+                            df = get_source_data(source, columns=columns)
                         
                         chart_fig = create_chart(df, component["chart_config"])
                         st.plotly_chart(chart_fig, use_container_width=True)
@@ -249,36 +260,48 @@ else:
                 try:
                     data_source = component["data_source"]
                     if data_source in st.session_state.data_sources:
-                        df = st.session_state.data_sources[data_source]["data"]
-                        
-                        # Apply filter if specified
-                        if component.get("filter"):
-                            filter_col = component["filter"]["column"]
-                            filter_val = component["filter"]["value"]
-                            if filter_col and filter_val is not None:
-                                df = df[df[filter_col] == filter_val]
-                        
-                        # Calculate metric value
+                        source = st.session_state.data_sources[data_source]
+                        credentials = db_credentials.get(data_source)
                         metric_col = component["metric_column"]
                         metric_type = component["metric_type"]
                         
-                        if metric_type == "Sum":
-                            value = df[metric_col].sum()
-                        elif metric_type == "Average":
-                            value = df[metric_col].mean()
-                        elif metric_type == "Minimum":
-                            value = df[metric_col].min()
-                        elif metric_type == "Maximum":
-                            value = df[metric_col].max()
-                        elif metric_type == "Count":
-                            value = df[metric_col].count()
-                        elif metric_type == "Median":
-                            value = df[metric_col].median()
+                        # Live sources only hold a sample locally, so their
+                        # metrics are computed by the database or not at all
+                        value = None
+                        if is_live_source(source, credentials):
+                            try:
+                                value = live_metric_value(source, component, credentials)
+                            except UnsupportedPushdown:
+                                pass
+                        else:
+                            df = get_source_data(source)
+                            
+                            # Apply filter if specified
+                            if component.get("filter"):
+                                filter_col = component["filter"]["column"]
+                                filter_val = component["filter"]["value"]
+                                if filter_col and filter_val is not None:
+                                    df = df[df[filter_col] == filter_val]
+                            
+                            if metric_type == "Sum":
+                                value = df[metric_col].sum()
+                            elif metric_type == "Average":
+                                value = df[metric_col].mean()
+                            elif metric_type == "Minimum":
+                                value = df[metric_col].min()
+                            elif metric_type == "Maximum":
+                                value = df[metric_col].max()
+                            elif metric_type == "Count":
+                                value = df[metric_col].count()
+                            elif metric_type == "Median":
+                                value = df[metric_col].median()
                         
                         # Format the value
                         format_config = component.get("format", {"type": "none"})
                         
-                        if format_config["type"] == "number":
+                        if value is None:
+                            formatted_value = "N/A"
+                        elif format_config["type"] == "number":
                             formatted_value = f"{value:.{format_config.get('decimals', 2)}f}"
                         elif format_config["type"] == "percentage":
                             formatted_value = f"{value:.{format_config.get('decimals', 2)}f}%"
@@ -311,7 +334,7 @@ else:
                 try:
                     data_source = component["data_source"]
                     if data_source in st.session_state.data_sources:
-                        df = st.session_state.data_sources[data_source]["data"]
+                        df = get_source_data(st.session_state.data_sources[data_source])
                         
                         # Filter columns
                         if component.get("columns"):
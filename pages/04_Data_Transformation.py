@@ -1,14 +1,24 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from datetime import datetime, date
 import os
 import sys
 import json
 
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from utils.data_processing import preview_dataframe, get_data_summary, apply_transformation, save_transformation
+from utils.data_processing import preview_dataframe, get_data_summary, apply_transformation, save_transformation, join_source_data
+from utils.transformation_plan import execute_transformation, profile_transformation, profile_to_json, DEFAULT_WORKERS, PARALLEL_MIN_ROWS
+from utils.aggregation import AGGREGATE_FUNCTIONS
+from utils.joins import join_dataframes, JOIN_TYPES
+from utils.reshape import DEDUPLICATE_KEEP
+from utils.windows import WINDOW_FUNCTIONS, AGGREGATE_WINDOW_FUNCTIONS, OFFSET_WINDOW_FUNCTIONS, RANKING_WINDOW_FUNCTIONS
+from utils.expressions import function_execution_path
+from utils.arrow_store import get_source_data, source_column_names
+from utils.datetimes import to_datetime_cached
+from utils.transformation_cache import StepResultCache, DEFAULT_STEP_CACHE_BYTES, run_steps_cached, cache_step_result
+from utils.background import BackgroundRun, PREVIEW_SAMPLE_ROWS
 
 st.set_page_config(
     page_title="Data Transformation | PM Data Tool",
@@ -19,6 +29,272 @@ st.set_page_config(
 st.title("Data Transformation")
 st.markdown("Transform your data with various operations to prepare it for analysis.")
 
+# Cache of intermediate results so that editing a step only reruns the steps after it
+if "step_cache" not in st.session_state:
+    st.session_state.step_cache = StepResultCache()
+
+st.sidebar.header("Transformation Options")
+step_cache_mb = st.sidebar.number_input(
+    "Step Cache Budget (MB)",
+    min_value=0,
+    value=DEFAULT_STEP_CACHE_BYTES // (1024 * 1024),
+    step=64,
+    help="Memory used to keep intermediate results while editing transformation steps"
+)
+st.session_state.step_cache.max_bytes = step_cache_mb * 1024 * 1024
+st.session_state.step_cache.evict()
+
+worker_count = st.sidebar.number_input(
+    "Worker Processes",
+    min_value=1,
+    max_value=DEFAULT_WORKERS,
+    value=1,
+    help=f"Saved transformations on {PARALLEL_MIN_ROWS:,}+ rows run row-by-row steps (new columns, filters, type changes) across this many processes ({DEFAULT_WORKERS} cores available)"
+)
+
+sample_preview = st.sidebar.checkbox(
+    "Sample-First Preview",
+    value=True,
+    help="Show saved transformations on a sample right away while the full data runs in the background"
+)
+preview_rows = int(st.sidebar.number_input(
+    "Preview Sample Rows",
+    min_value=100,
+    value=PREVIEW_SAMPLE_ROWS,
+    step=1000
+))
+
+# Saved transformations being run, keyed by data source and transformation name
+if "background_runs" not in st.session_state:
+    st.session_state.background_runs = {}
+
+def record_step(operation, params, result_df):
+    """
+    Record an applied transformation step and its result.
+    
+    Parameters:
+    -----------
+    operation : str
+        Transformation operation that was applied
+    params : dict
+        Parameters of the transformation
+    result_df : DataFrame
+        Result of applying the step to the current dataframe
+    """
+    st.session_state.current_df = result_df
+    st.session_state.transformation_steps.append({
+        "operation": operation,
+        "params": params
+    })
+    cache_step_result(st.session_state.step_cache, original_df, st.session_state.transformation_steps, result_df)
+
+def replay_steps(steps):
+    """
+    Recompute the current dataframe for edited steps, reusing cached
+    results for the unchanged leading steps. The steps replace the recipe
+    only once they ran successfully.
+    """
+    result_df, steps_run = run_steps_cached(original_df, steps, st.session_state.step_cache)
+    st.session_state.transformation_steps[:] = steps
+    st.session_state.current_df = result_df
+    return steps_run
+
+def restore_param_types(edited, original):
+    """
+    Restore the Python types that a JSON round trip of step parameters
+    loses (dates and timestamps become strings, tuples become lists),
+    using the original parameters as a guide.
+    """
+    if isinstance(original, dict) and isinstance(edited, dict):
+        return {key: restore_param_types(value, original.get(key)) for key, value in edited.items()}
+    if isinstance(original, (list, tuple)) and isinstance(edited, list):
+        values = [
+            restore_param_types(value, original[position] if position < len(original) else None)
+            for position, value in enumerate(edited)
+        ]
+        return tuple(values) if isinstance(original, tuple) else values
+    if isinstance(edited, str) and not isinstance(original, str):
+        try:
+            if isinstance(original, pd.Timestamp):
+                return pd.Timestamp(edited)
+            if isinstance(original, datetime):
+                return datetime.fromisoformat(edited)
+            if isinstance(original, date):
+                return date.fromisoformat(edited)
+            if isinstance(original, np.generic):
+                return type(original)(edited)
+        except ValueError:
+            pass
+    return edited
+
+def show_profile(profile, recipe, file_name):
+    """
+    Display the per-step measurements and plan of a profiled recipe.
+    
+    Parameters:
+    -----------
+    profile : dict
+        Result of profile_transformation
+    recipe : list
+        Recipe steps that were profiled
+    file_name : str
+        Name of the downloadable JSON file
+    """
+    st.write(f"**Total Time:** {profile['total_seconds']:.3f} s")
+    
+    if profile["steps"]:
+        table = pd.DataFrame(profile["steps"])
+        table["peak_memory_mb"] = (table.pop("peak_memory_bytes") / (1024 * 1024)).round(2)
+        table["memory_delta_mb"] = (table.pop("memory_delta_bytes") / (1024 * 1024)).round(2)
+        table["seconds"] = table["seconds"].round(4)
+        st.dataframe(table, use_container_width=True, hide_index=True)
+    
+    plan = profile["plan"]
+    st.markdown("**Execution Plan**")
+    if plan["steps"]:
+        st.dataframe(pd.DataFrame(plan["steps"]), use_container_width=True, hide_index=True)
+    for note in plan["notes"]:
+        st.write(f"- {note}")
+    if not plan["notes"]:
+        st.caption("The optimizer runs the steps as recorded")
+    
+    st.download_button(
+        "Download Profile (JSON)",
+        profile_to_json(profile, recipe),
+        file_name=file_name,
+        mime="application/json"
+    )
+
+def save_transformed_source(name, df, data_source, transformation_name):
+    """
+    Save the result of a saved transformation as a new data source.
+    
+    Also called from the worker thread of a background run once the full
+    result is ready.
+    """
+    st.session_state.data_sources[name] = {
+        "data": df,
+        "source_type": "transformed",
+        "original_source": data_source,
+        "transformation": transformation_name,
+        "imported_at": datetime.now(),
+        "columns": list(df.columns),
+        "rows": len(df)
+    }
+
+@st.fragment(run_every=2)
+def show_background_run(run_key, data_source, transformation_name):
+    """
+    Display the sample preview of a saved transformation, replaced by the
+    full result once the background run finishes. Refreshes by itself.
+    """
+    run = st.session_state.background_runs[run_key]
+    df, is_full = run.current()
+    
+    if is_full:
+        st.subheader("Transformed Data Preview")
+        st.caption(f"Full result over {run.source_rows:,} rows, computed in {run.elapsed():.1f}s")
+    else:
+        st.subheader("Sample Preview")
+        st.caption(
+            f"Computed on {run.sample_rows:,} of {run.source_rows:,} rows in {run.preview_seconds:.2f}s. "
+            f"Full run in progress ({run.elapsed():.0f}s)..."
+        )
+    
+    if run.error() is not None:
+        st.error(f"Full run failed: {str(run.error())}")
+    
+    preview_dataframe(df)
+    
+    # Option to save as new data source, straight from the background run
+    new_source_name = st.text_input("New Data Source Name", f"{data_source}_transformed", key=f"{run_key}_name")
+    
+    if st.button("Save as New Data Source" if is_full else "Save Full Result When Done", key=f"{run_key}_save"):
+        if new_source_name in st.session_state.data_sources:
+            st.warning(f"Data source '{new_source_name}' already exists. Please choose a different name.")
+        else:
+            run.when_done(lambda result: save_transformed_source(new_source_name, result, data_source, transformation_name))
+            if is_full:
+                st.success(f"Transformed data saved as new data source: '{new_source_name}'")
+            else:
+                st.info(f"The full result will be saved as '{new_source_name}' when the run finishes")
+
+def condition_inputs(columns, key):
+    """
+    Show the inputs of one condition of a conditional column.
+    
+    Parameters:
+    -----------
+    columns : list
+        Columns of the current dataframe
+    key : str
+        Prefix for the widget keys, so several conditions can be shown
+    
+    Returns:
+    --------
+    dict
+        Condition parameters for the case_when method
+    """
+    condition_column = st.selectbox("Condition Column", columns, key=f"{key}_column")
+    
+    # Determine column data type
+    col_dtype = st.session_state.current_df[condition_column].dtype
+    
+    if np.issubdtype(col_dtype, np.number):
+        # Numeric column
+        condition_type = st.selectbox(
+            "Condition Type",
+            ["Greater Than", "Less Than", "Equal To", "Between"],
+            key=f"{key}_type"
+        )
+        
+        if condition_type == "Between":
+            min_val = float(st.session_state.current_df[condition_column].min())
+            max_val = float(st.session_state.current_df[condition_column].max())
+            
+            min_threshold = st.number_input("Minimum Threshold", value=min_val, key=f"{key}_min")
+            max_threshold = st.number_input("Maximum Threshold", value=max_val, key=f"{key}_max")
+            
+            return {
+                "type": "between",
+                "column": condition_column,
+                "min_threshold": min_threshold,
+                "max_threshold": max_threshold
+            }
+        
+        threshold = st.number_input("Threshold", key=f"{key}_threshold")
+        
+        return {
+            "type": condition_type.lower().replace(" ", "_"),
+            "column": condition_column,
+            "threshold": threshold
+        }
+    
+    # String/categorical column
+    condition_type = st.selectbox(
+        "Condition Type",
+        ["Equal To", "Contains", "In List"],
+        key=f"{key}_type"
+    )
+    
+    if condition_type == "In List":
+        unique_values = st.session_state.current_df[condition_column].unique().tolist()
+        values = st.multiselect("Values", unique_values, key=f"{key}_values")
+        
+        return {
+            "type": "in_list",
+            "column": condition_column,
+            "values": values
+        }
+    
+    value = st.text_input("Value", key=f"{key}_value_text")
+    
+    return {
+        "type": condition_type.lower().replace(" ", "_"),
+        "column": condition_column,
+        "value": value
+    }
+
 # Main layout
 data_source_col, transformation_col = st.columns([1, 2])
 
@@ -34,7 +310,7 @@ with data_source_col:
         )
         
         # Get the original data
-        original_df = st.session_state.data_sources[data_source]["data"]
+        original_df = get_source_data(st.session_state.data_sources[data_source])
         
         # Display the data source info
         st.subheader("Data Source Info")
@@ -70,37 +346,36 @@ with data_source_col:
                     st.write(f"**Created At:** {transformation_details['created_at'].strftime('%Y-%m-%d %H:%M:%S')}")
                     st.write(f"**Steps:** {len(transformation_details['steps'])}")
                     
+                    if st.button("Profile Saved Transformation"):
+                        # Time and measure each step of the plan
+                        profile = profile_transformation(original_df, transformation_details["steps"])
+                        show_profile(profile, transformation_details["steps"], f"{selected_transformation}_profile.json")
+                    
+                    stratify_column = "None"
+                    if sample_preview:
+                        stratify_column = st.selectbox(
+                            "Stratify Preview By",
+                            ["None"] + list(original_df.columns),
+                            help="Sample every value of this column proportionally, so rare groups show up in the preview"
+                        )
+                    
+                    run_key = f"{data_source}/{selected_transformation}"
+                    
                     if st.button("Apply Saved Transformation"):
-                        # Create a copy of the original DataFrame
-                        df = original_df.copy()
-                        
-                        # Apply each transformation step
-                        for step in transformation_details["steps"]:
-                            df = apply_transformation(df, step["operation"], step["params"])
-                        
-                        # Display the transformed data
-                        st.subheader("Transformed Data Preview")
-                        preview_dataframe(df)
-                        
-                        # Option to save as new data source
-                        new_source_name = st.text_input("New Data Source Name", f"{data_source}_transformed")
-                        
-                        if st.button("Save as New Data Source"):
-                            if new_source_name in st.session_state.data_sources:
-                                st.warning(f"Data source '{new_source_name}' already exists. Please choose a different name.")
-                            else:
-                                # Save the transformed data as a new data source
-                                st.session_state.data_sources[new_source_name] = {
-                                    "data": df,
-                                    "source_type": "transformed",
-                                    "original_source": data_source,
-                                    "transformation": selected_transformation,
-                                    "imported_at": datetime.now(),
-                                    "columns": list(df.columns),
-                                    "rows": len(df)
-                                }
-                                
-                                st.success(f"Transformed data saved as new data source: '{new_source_name}'")
+                        # Preview on a sample right away; the full run continues in the background
+                        try:
+                            st.session_state.background_runs[run_key] = BackgroundRun(
+                                original_df,
+                                transformation_details["steps"],
+                                sample_rows=preview_rows if sample_preview else len(original_df),
+                                stratify_by=None if stratify_column == "None" else stratify_column,
+                                workers=worker_count
+                            )
+                        except Exception as e:
+                            st.error(f"Error applying transformation: {str(e)}")
+                    
+                    if run_key in st.session_state.background_runs:
+                        show_background_run(run_key, data_source, selected_transformation)
             else:
                 st.info("No saved transformations for this data source.")
         else:
@@ -123,7 +398,8 @@ with transformation_col:
         # Transformation operations
         transformation_type = st.selectbox(
             "Transformation Type",
-            ["Filter Rows", "Select Columns", "Sort Data", "Aggregate Data", "Create New Column", 
+            ["Filter Rows", "Select Columns", "Sort Data", "Aggregate Data", "Pivot", "Unpivot", "Deduplicate Rows", "Join Data Sources", 
+             "Create New Column", "Window Functions", 
              "Rename Columns", "Handle Missing Values", "Change Data Types", "Apply Function"]
         )
         
@@ -252,14 +528,8 @@ with transformation_col:
                 try:
                     filtered_df = apply_transformation(st.session_state.current_df, operation, filter_params)
                     
-                    # Update the current dataframe
-                    st.session_state.current_df = filtered_df
-                    
-                    # Add step to transformation steps
-                    st.session_state.transformation_steps.append({
-                        "operation": operation,
-                        "params": filter_params
-                    })
+                    # Update the current dataframe and record the step
+                    record_step(operation, filter_params, filtered_df)
                     
                     st.success(f"Filter applied. Rows remaining: {len(filtered_df)}")
                     st.rerun()
@@ -285,14 +555,8 @@ with transformation_col:
                 try:
                     filtered_df = apply_transformation(st.session_state.current_df, operation, params)
                     
-                    # Update the current dataframe
-                    st.session_state.current_df = filtered_df
-                    
-                    # Add step to transformation steps
-                    st.session_state.transformation_steps.append({
-                        "operation": operation,
-                        "params": params
-                    })
+                    # Update the current dataframe and record the step
+                    record_step(operation, params, filtered_df)
                     
                     st.success(f"Selected {len(selected_columns)} columns")
                     st.rerun()
@@ -318,14 +582,8 @@ with transformation_col:
                 try:
                     sorted_df = apply_transformation(st.session_state.current_df, operation, params)
                     
-                    # Update the current dataframe
-                    st.session_state.current_df = sorted_df
-                    
-                    # Add step to transformation steps
-                    st.session_state.transformation_steps.append({
-                        "operation": operation,
-                        "params": params
-                    })
+                    # Update the current dataframe and record the step
+                    record_step(operation, params, sorted_df)
                     
                     st.success(f"Data sorted by '{sort_column}' in {sort_order.lower()} order")
                     st.rerun()
@@ -340,14 +598,14 @@ with transformation_col:
             
             # Get columns based on data types
             numeric_cols = st.session_state.current_df.select_dtypes(include=['number']).columns.tolist()
-            categorical_cols = st.session_state.current_df.select_dtypes(include=['object', 'category']).columns.tolist()
+            categorical_cols = st.session_state.current_df.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
             
             # Add date columns that might be stored as strings
             date_cols = []
             for col in st.session_state.current_df.columns:
                 if "date" in col.lower() or "time" in col.lower() or "day" in col.lower():
                     try:
-                        pd.to_datetime(st.session_state.current_df[col])
+                        to_datetime_cached(st.session_state.current_df[col])
                         date_cols.append(col)
                     except:
                         pass
@@ -388,8 +646,9 @@ with transformation_col:
                         with col2:
                             agg["function"] = st.selectbox(
                                 f"Function {i+1}",
-                                ["sum", "mean", "median", "min", "max", "count"],
-                                index=["sum", "mean", "median", "min", "max", "count"].index(agg["function"])
+                                AGGREGATE_FUNCTIONS,
+                                index=AGGREGATE_FUNCTIONS.index(agg["function"]) if agg["function"] in AGGREGATE_FUNCTIONS else 0,
+                                help="approx_ functions estimate from sketches and samples, which is faster on large groups"
                             )
                         
                         with col3:
@@ -418,14 +677,8 @@ with transformation_col:
                         try:
                             aggregated_df = apply_transformation(st.session_state.current_df, operation, params)
                             
-                            # Update the current dataframe
-                            st.session_state.current_df = aggregated_df
-                            
-                            # Add step to transformation steps
-                            st.session_state.transformation_steps.append({
-                                "operation": operation,
-                                "params": params
-                            })
+                            # Update the current dataframe and record the step
+                            record_step(operation, params, aggregated_df)
                             
                             st.success(f"Data aggregated by {', '.join(group_columns)}")
                             st.rerun()
@@ -434,6 +687,172 @@ with transformation_col:
             else:
                 st.warning("Please select at least one column to group by")
         
+        elif transformation_type == "Pivot":
+            st.subheader("Pivot")
+            
+            # Get columns from the current dataframe
+            columns = st.session_state.current_df.columns.tolist()
+            numeric_cols = st.session_state.current_df.select_dtypes(include=['number']).columns.tolist()
+            
+            pivot_index = st.multiselect("Row Columns", columns)
+            pivot_columns = st.selectbox("Column to Spread", [column for column in columns if column not in pivot_index])
+            pivot_values = st.multiselect("Value Columns", [column for column in numeric_cols if column != pivot_columns])
+            pivot_function = st.selectbox("Aggregate Function", AGGREGATE_FUNCTIONS, index=AGGREGATE_FUNCTIONS.index("mean"))
+            
+            if st.button("Apply Pivot"):
+                if not pivot_index or not pivot_values:
+                    st.warning("Please select at least one row column and one value column")
+                else:
+                    operation = "pivot"
+                    params = {
+                        "index": pivot_index,
+                        "columns": pivot_columns,
+                        "values": pivot_values,
+                        "aggfunc": pivot_function
+                    }
+                    
+                    try:
+                        pivoted_df = apply_transformation(st.session_state.current_df, operation, params)
+                        
+                        # Update the current dataframe and record the step
+                        record_step(operation, params, pivoted_df)
+                        
+                        st.success(f"Pivoted '{pivot_columns}' into {len(pivoted_df.columns) - len(pivot_index)} columns")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error pivoting data: {str(e)}")
+        
+        elif transformation_type == "Unpivot":
+            st.subheader("Unpivot")
+            
+            # Get columns from the current dataframe
+            columns = st.session_state.current_df.columns.tolist()
+            
+            id_columns = st.multiselect("Identifier Columns (kept on every row)", columns)
+            value_columns = st.multiselect(
+                "Columns to Unpivot",
+                [column for column in columns if column not in id_columns],
+                help="Leave empty to unpivot every other column"
+            )
+            variable_name = st.text_input("Name Column", "variable")
+            value_name = st.text_input("Value Column", "value")
+            
+            if st.button("Apply Unpivot"):
+                operation = "unpivot"
+                params = {
+                    "id_columns": id_columns,
+                    "value_columns": value_columns,
+                    "variable_name": variable_name,
+                    "value_name": value_name
+                }
+                
+                try:
+                    unpivoted_df = apply_transformation(st.session_state.current_df, operation, params)
+                    
+                    # Update the current dataframe and record the step
+                    record_step(operation, params, unpivoted_df)
+                    
+                    st.success(f"Unpivoted into {len(unpivoted_df)} rows")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error unpivoting data: {str(e)}")
+        
+        elif transformation_type == "Deduplicate Rows":
+            st.subheader("Deduplicate Rows")
+            
+            # Get columns from the current dataframe
+            columns = st.session_state.current_df.columns.tolist()
+            
+            subset = st.multiselect("Key Columns", columns, help="Leave empty to compare all columns")
+            keep = st.selectbox("Keep", DEDUPLICATE_KEEP, help="Which row of each duplicate group to keep")
+            
+            if st.button("Remove Duplicates"):
+                operation = "deduplicate"
+                params = {
+                    "subset": subset,
+                    "keep": keep
+                }
+                
+                try:
+                    deduplicated_df = apply_transformation(st.session_state.current_df, operation, params)
+                    removed = len(st.session_state.current_df) - len(deduplicated_df)
+                    
+                    # Update the current dataframe and record the step
+                    record_step(operation, params, deduplicated_df)
+                    
+                    st.success(f"Removed {removed} duplicate rows")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error removing duplicates: {str(e)}")
+        
+        elif transformation_type == "Join Data Sources":
+            st.subheader("Join Data Sources")
+            
+            # Get columns from the current dataframe
+            columns = st.session_state.current_df.columns.tolist()
+            
+            other_sources = [name for name in st.session_state.data_sources if name != data_source]
+            
+            if not other_sources:
+                st.info("Import another data source to join with.")
+            else:
+                join_source = st.selectbox("Source to Join", other_sources)
+                join_columns = source_column_names(st.session_state.data_sources[join_source])
+                
+                join_type = st.selectbox(
+                    "Join Type",
+                    JOIN_TYPES,
+                    help="inner keeps matching rows, left also keeps rows without a match, anti keeps only rows without a match"
+                )
+                
+                left_keys = st.multiselect("Key Columns (current data)", columns)
+                right_keys = st.multiselect(
+                    "Key Columns (source to join)",
+                    join_columns,
+                    default=[column for column in left_keys if column in join_columns]
+                )
+                
+                if st.button("Apply Join"):
+                    if not left_keys or len(left_keys) != len(right_keys):
+                        st.warning("Please select the same number of key columns on both sides")
+                    else:
+                        operation = "join_sources"
+                        params = {
+                            "source": join_source,
+                            "left_on": left_keys,
+                            "right_on": right_keys,
+                            "how": join_type
+                        }
+                        
+                        try:
+                            # Joined directly to report the strategy and timings
+                            joined_df, join_stats = join_dataframes(
+                                st.session_state.current_df,
+                                join_source_data(join_source),
+                                left_keys,
+                                right_keys,
+                                how=join_type
+                            )
+                            
+                            # Update the current dataframe and record the step
+                            record_step(operation, params, joined_df)
+                            st.session_state.last_join_stats = join_stats
+                            
+                            st.success(f"Joined '{join_source}' ({join_type} join)")
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Error joining data: {str(e)}")
+                
+                if st.session_state.get("last_join_stats"):
+                    join_stats = st.session_state.last_join_stats
+                    st.caption(
+                        f"Last join: {join_stats['strategy'].replace('_', ' ')} strategy, "
+                        f"{join_stats['left_rows']:,} x {join_stats['right_rows']:,} rows -> {join_stats['output_rows']:,} rows "
+                        f"in {join_stats['total_seconds']:.3f}s"
+                    )
+                    with st.expander("Join Timings", expanded=False):
+                        st.json(join_stats)
+        
         elif transformation_type == "Create New Column":
             st.subheader("Create New Column")
             
@@ -482,7 +901,9 @@ with transformation_col:
                             "value": value
                         }
                 else:
-                    formula = st.text_area("Custom Formula", help="Use column names in curly braces, e.g., {col1} * {col2} + 10")
+                    formula = st.text_area("Custom Formula", help="Use column names in curly braces, e.g., {col1} * {col2} + 10. Supports arithmetic, comparisons, "
+                             "and/or/not, 'a if condition else b' and abs, sqrt, log, log10, log2, exp, floor, ceil, "
+                             "round, clip, min, max and where")
                     formula_params = {
                         "type": "custom_formula",
                         "formula": formula
@@ -495,74 +916,27 @@ with transformation_col:
                 }
             
             elif creation_method == "Conditional":
-                # Conditional logic
-                condition_column = st.selectbox("Condition Column", columns)
-                
-                # Determine column data type
-                col_dtype = st.session_state.current_df[condition_column].dtype
+                # Ordered conditions, the first match gives the value (CASE WHEN)
+                condition_count = st.number_input("Number of Conditions", min_value=1, max_value=20, value=1)
                 
-                if np.issubdtype(col_dtype, np.number):
-                    # Numeric column
-                    condition_type = st.selectbox(
-                        "Condition Type",
-                        ["Greater Than", "Less Than", "Equal To", "Between"]
-                    )
+                cases = []
+                for i in range(int(condition_count)):
+                    st.markdown(f"**Condition {i+1}**")
+                    condition_params = condition_inputs(columns, key=f"case_{i}")
+                    case_value = st.text_input("Value if Condition is True", key=f"case_{i}_value")
                     
-                    if condition_type == "Between":
-                        min_val = float(st.session_state.current_df[condition_column].min())
-                        max_val = float(st.session_state.current_df[condition_column].max())
-                        
-                        min_threshold = st.number_input("Minimum Threshold", value=min_val)
-                        max_threshold = st.number_input("Maximum Threshold", value=max_val)
-                        
-                        condition_params = {
-                            "type": "between",
-                            "column": condition_column,
-                            "min_threshold": min_threshold,
-                            "max_threshold": max_threshold
-                        }
-                    else:
-                        threshold = st.number_input("Threshold")
-                        
-                        condition_params = {
-                            "type": condition_type.lower().replace(" ", "_"),
-                            "column": condition_column,
-                            "threshold": threshold
-                        }
-                else:
-                    # String/categorical column
-                    condition_type = st.selectbox(
-                        "Condition Type",
-                        ["Equal To", "Contains", "In List"]
-                    )
-                    
-                    if condition_type == "In List":
-                        unique_values = st.session_state.current_df[condition_column].unique().tolist()
-                        values = st.multiselect("Values", unique_values)
-                        
-                        condition_params = {
-                            "type": "in_list",
-                            "column": condition_column,
-                            "values": values
-                        }
-                    else:
-                        value = st.text_input("Value")
-                        
-                        condition_params = {
-                            "type": condition_type.lower().replace(" ", "_"),
-                            "column": condition_column,
-                            "value": value
-                        }
+                    cases.append({
+                        "condition_params": condition_params,
+                        "value": case_value
+                    })
                 
-                true_value = st.text_input("Value if Condition is True")
-                false_value = st.text_input("Value if Condition is False")
+                default_value = st.text_input("Value if No Condition is True")
                 
                 params = {
                     "new_column": new_column_name,
-                    "method": "conditional",
-                    "condition_params": condition_params,
-                    "true_value": true_value,
-                    "false_value": false_value
+                    "method": "case_when",
+                    "cases": cases,
+                    "default": default_value
                 }
             
             elif creation_method == "Text Manipulation":
@@ -571,7 +945,7 @@ with transformation_col:
                 
                 manipulation_type = st.selectbox(
                     "Manipulation Type",
-                    ["Extract Substring", "Concatenate", "Replace", "Change Case"]
+                    ["Extract Substring", "Concatenate", "Replace", "Change Case", "Trim", "Pad", "Split Part", "Regex Extract"]
                 )
                 
                 if manipulation_type == "Extract Substring":
@@ -631,6 +1005,52 @@ with transformation_col:
                         "case": case_type.lower().replace(" ", "_")
                     }
                 
+                elif manipulation_type == "Trim":
+                    side = st.selectbox("Trim From", ["Both", "Left", "Right"])
+                    characters = st.text_input("Characters to Remove", help="Leave empty to remove whitespace")
+                    
+                    text_params = {
+                        "type": "trim",
+                        "column": text_column,
+                        "side": side.lower(),
+                        "characters": characters
+                    }
+                
+                elif manipulation_type == "Pad":
+                    width = st.number_input("Width", min_value=1, value=10)
+                    side = st.selectbox("Pad On", ["Left", "Right", "Both"])
+                    fill_character = st.text_input("Fill Character", value=" ", max_chars=1)
+                    
+                    text_params = {
+                        "type": "pad",
+                        "column": text_column,
+                        "width": width,
+                        "side": side.lower(),
+                        "fill_character": fill_character
+                    }
+                
+                elif manipulation_type == "Split Part":
+                    delimiter = st.text_input("Delimiter", value=",")
+                    part = st.number_input("Part Number", min_value=1, value=1, help="1 is the text before the first delimiter")
+                    
+                    text_params = {
+                        "type": "split_part",
+                        "column": text_column,
+                        "delimiter": delimiter,
+                        "part": part
+                    }
+                
+                elif manipulation_type == "Regex Extract":
+                    pattern = st.text_input("Regular Expression", value=r"(\d+)")
+                    group = st.number_input("Capture Group", min_value=0, value=1, help="0 extracts the whole match")
+                    
+                    text_params = {
+                        "type": "regex_extract",
+                        "column": text_column,
+                        "pattern": pattern,
+                        "group": group
+                    }
+                
                 params = {
                     "new_column": new_column_name,
                     "method": "text_manipulation",
@@ -644,7 +1064,7 @@ with transformation_col:
                 # Try to convert to datetime if needed
                 if st.session_state.current_df[date_column].dtype != 'datetime64[ns]':
                     try:
-                        pd.to_datetime(st.session_state.current_df[date_column])
+                        to_datetime_cached(st.session_state.current_df[date_column])
                     except:
                         st.warning(f"Column '{date_column}' does not appear to contain valid dates")
                 
@@ -669,20 +1089,75 @@ with transformation_col:
                     try:
                         modified_df = apply_transformation(st.session_state.current_df, operation, params)
                         
-                        # Update the current dataframe
-                        st.session_state.current_df = modified_df
-                        
-                        # Add step to transformation steps
-                        st.session_state.transformation_steps.append({
-                            "operation": operation,
-                            "params": params
-                        })
+                        # Update the current dataframe and record the step
+                        record_step(operation, params, modified_df)
                         
                         st.success(f"Created new column: '{new_column_name}'")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Error creating column: {str(e)}")
         
+        elif transformation_type == "Window Functions":
+            st.subheader("Window Functions")
+            
+            # Get columns from the current dataframe
+            columns = st.session_state.current_df.columns.tolist()
+            
+            window_function = st.selectbox(
+                "Function",
+                WINDOW_FUNCTIONS,
+                help="sum, mean, min, max and count over a frame of rows; lag and lead read another row; row_number, rank and dense_rank number the rows"
+            )
+            
+            window_params = {"function": window_function}
+            
+            if window_function not in RANKING_WINDOW_FUNCTIONS:
+                window_params["column"] = st.selectbox("Value Column", columns)
+            
+            window_params["partition_by"] = st.multiselect("Partition By", columns)
+            window_params["order_by"] = st.multiselect("Order By", columns)
+            window_params["ascending"] = st.selectbox("Sort Order", ["Ascending", "Descending"]) == "Ascending"
+            
+            if window_function in AGGREGATE_WINDOW_FUNCTIONS:
+                frame_col1, frame_col2 = st.columns(2)
+                
+                with frame_col1:
+                    unbounded_preceding = st.checkbox("From Partition Start", value=True)
+                    preceding = None
+                    if not unbounded_preceding:
+                        preceding = int(st.number_input("Rows Before", min_value=0, value=6))
+                
+                with frame_col2:
+                    unbounded_following = st.checkbox("To Partition End", value=False)
+                    following = None
+                    if not unbounded_following:
+                        following = int(st.number_input("Rows After", min_value=0, value=0))
+                
+                window_params["frame"] = {"preceding": preceding, "following": following}
+            
+            elif window_function in OFFSET_WINDOW_FUNCTIONS:
+                window_params["offset"] = int(st.number_input("Offset (rows)", min_value=1, value=1))
+            
+            default_name = f"{window_params.get('column', 'row')}_{window_function}"
+            window_params["new_column"] = st.text_input("New Column Name", default_name)
+            
+            if st.button("Apply Window Function"):
+                if window_function in ("rank", "dense_rank") and not window_params["order_by"]:
+                    st.warning("Please select at least one column to order by")
+                else:
+                    operation = "window"
+                    
+                    try:
+                        windowed_df = apply_transformation(st.session_state.current_df, operation, window_params)
+                        
+                        # Update the current dataframe and record the step
+                        record_step(operation, window_params, windowed_df)
+                        
+                        st.success(f"Created column '{window_params['new_column']}'")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error applying window function: {str(e)}")
+        
         elif transformation_type == "Rename Columns":
             st.subheader("Rename Columns")
             
@@ -706,14 +1181,8 @@ with transformation_col:
                     try:
                         renamed_df = apply_transformation(st.session_state.current_df, operation, params)
                         
-                        # Update the current dataframe
-                        st.session_state.current_df = renamed_df
-                        
-                        # Add step to transformation steps
-                        st.session_state.transformation_steps.append({
-                            "operation": operation,
-                            "params": params
-                        })
+                        # Update the current dataframe and record the step
+                        record_step(operation, params, renamed_df)
                         
                         st.success(f"Renamed {len(rename_map)} columns")
                         st.rerun()
@@ -793,14 +1262,8 @@ with transformation_col:
                         try:
                             cleaned_df = apply_transformation(st.session_state.current_df, operation, params)
                             
-                            # Update the current dataframe
-                            st.session_state.current_df = cleaned_df
-                            
-                            # Add step to transformation steps
-                            st.session_state.transformation_steps.append({
-                                "operation": operation,
-                                "params": params
-                            })
+                            # Update the current dataframe and record the step
+                            record_step(operation, params, cleaned_df)
                             
                             st.success("Missing values handled successfully")
                             st.rerun()
@@ -842,14 +1305,8 @@ with transformation_col:
                 try:
                     modified_df = apply_transformation(st.session_state.current_df, operation, params)
                     
-                    # Update the current dataframe
-                    st.session_state.current_df = modified_df
-                    
-                    # Add step to transformation steps
-                    st.session_state.transformation_steps.append({
-                        "operation": operation,
-                        "params": params
-                    })
+                    # Update the current dataframe and record the step
+                    record_step(operation, params, modified_df)
                     
                     st.success(f"Changed data type of '{target_column}' to {new_type}")
                     st.rerun()
@@ -887,6 +1344,12 @@ with transformation_col:
                     help="Use 'x' to represent the column value, e.g., 'x * 2' or 'x.lower()'"
                 )
                 
+                # Tell the user whether the function runs vectorized or row by row
+                if function_execution_path(function_expr) == "vectorized":
+                    st.caption("Execution: vectorized (runs on the whole column at once)")
+                else:
+                    st.caption("Execution: Python fallback (applied row by row, slower on large data)")
+                
                 params = {
                     "column": target_column,
                     "function_type": "custom",
@@ -899,16 +1362,14 @@ with transformation_col:
                 try:
                     transformed_df = apply_transformation(st.session_state.current_df, operation, params)
                     
-                    # Update the current dataframe
-                    st.session_state.current_df = transformed_df
-                    
-                    # Add step to transformation steps
-                    st.session_state.transformation_steps.append({
-                        "operation": operation,
-                        "params": params
-                    })
+                    # Update the current dataframe and record the step
+                    record_step(operation, params, transformed_df)
                     
-                    st.success(f"Applied function to column '{target_column}'")
+                    if params["function_type"] == "custom":
+                        path = function_execution_path(params["function"])
+                        st.success(f"Applied function to column '{target_column}' ({path} path)")
+                    else:
+                        st.success(f"Applied function to column '{target_column}'")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error applying function: {str(e)}")
@@ -919,6 +1380,48 @@ with transformation_col:
         if st.session_state.transformation_steps:
             st.write(f"Applied {len(st.session_state.transformation_steps)} transformation steps")
             
+            # Edit or remove individual steps
+            with st.expander("Edit Steps", expanded=False):
+                for i, step in enumerate(st.session_state.transformation_steps):
+                    st.markdown(f"**Step {i+1}:** {step['operation']}")
+                    current_json = json.dumps(step["params"], indent=2, default=str)
+                    params_json = st.text_area(
+                        "Parameters (JSON)",
+                        current_json,
+                        key=f"step_params_{i}_{hash(current_json)}"
+                    )
+                    
+                    edit_col1, edit_col2 = st.columns(2)
+                    
+                    with edit_col1:
+                        if st.button("Update Step", key=f"update_step_{i}"):
+                            try:
+                                edited_steps = list(st.session_state.transformation_steps)
+                                edited_steps[i] = dict(step, params=restore_param_types(json.loads(params_json), step["params"]))
+                                steps_run = replay_steps(edited_steps)
+                                st.success(f"Step {i+1} updated. Reran {steps_run} of {len(st.session_state.transformation_steps)} steps")
+                            except Exception as e:
+                                st.error(f"Error updating step: {str(e)}")
+                    
+                    with edit_col2:
+                        if st.button("Remove Step", key=f"remove_step_{i}"):
+                            try:
+                                steps = st.session_state.transformation_steps
+                                replay_steps(steps[:i] + steps[i + 1:])
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Error removing step: {str(e)}")
+                
+                if st.button("Profile Steps"):
+                    profile = profile_transformation(original_df, st.session_state.transformation_steps)
+                    show_profile(profile, st.session_state.transformation_steps, f"{data_source}_profile.json")
+                
+                cache = st.session_state.step_cache
+                st.caption(
+                    f"Step cache: {len(cache)} results, {cache.current_bytes / (1024 * 1024):.1f} MB used, "
+                    f"{cache.hits} hits, {cache.misses} misses"
+                )
+            
             # Show the transformed data
             preview_dataframe(st.session_state.current_df)
             
@@ -10,6 +10,7 @@ import json
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from utils.export import generate_pdf_report, generate_csv_report, generate_excel_report
+from utils.arrow_store import get_source_data
 
 st.set_page_config(
     page_title="Export Options | PM Data Tool",
@@ -233,7 +234,7 @@ elif export_type == "Raw Data":
         )
         
         # Get the data
-        df = st.session_state.data_sources[data_source]["data"]
+        df = get_source_data(st.session_state.data_sources[data_source])
         
         # Apply filters if needed
         with st.expander("Filter Data Before Export"):
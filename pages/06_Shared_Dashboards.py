@@ -13,7 +13,9 @@ import string
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from utils.sharing import generate_share_link, get_dashboard_by_share_id, validate_share_token
-from utils.visualization import create_chart
+from utils.visualization import create_chart, chart_columns, metric_columns
+from utils.arrow_store import get_source_data, filter_source
+from utils.sql_pushdown import is_live_source, live_metric_value, live_chart_data, live_table_data, UnsupportedPushdown
 
 st.set_page_config(
     page_title="Shared Dashboards | PM Data Tool",
@@ -51,6 +53,9 @@ def render_dashboard(dashboard, data_sources):
     if "description" in dashboard and dashboard["description"]:
         st.markdown(dashboard["description"])
     
+    # Live database sources are queried with this session's connection settings
+    db_credentials = st.session_state.get("db_credentials", {})
+    
     # Determine layout
     layout = dashboard.get("layout", "2 Columns")
     
@@ -76,7 +81,12 @@ def render_dashboard(dashboard, data_sources):
                 try:
                     data_source = component["data_source"]
                     if data_source in data_sources:
-                        df = data_sources[data_source]["data"]
+                        columns = chart_columns(component["chart_config"])
+                        
+                        # Live sources return only the aggregated rows the chart draws
+                        df = live_chart_data(data_sources[data_source], component["chart_config"], columns, db_credentials.get(data_source))
+                        if df is None:
+                            df = get_source_data(data_sources[data_source], columns=columns)
                         
                         chart_fig = create_chart(df, component["chart_config"])
                         st.subheader(component.get("title", "Chart"))
@@ -90,36 +100,52 @@ def render_dashboard(dashboard, data_sources):
                 try:
                     data_source = component["data_source"]
                     if data_source in data_sources:
-                        df = data_sources[data_source]["data"]
-                        
-                        # Apply filter if specified
-                        if component.get("filter"):
-                            filter_col = component["filter"]["column"]
-                            filter_val = component["filter"]["value"]
-                            if filter_col and filter_val is not None:
-                                df = df[df[filter_col] == filter_val]
-                        
-                        # Calculate metric value
+                        source = data_sources[data_source]
+                        credentials = db_credentials.get(data_source)
                         metric_col = component["metric_column"]
                         metric_type = component["metric_type"]
                         
-                        if metric_type == "Sum":
-                            value = df[metric_col].sum()
-                        elif metric_type == "Average":
-                            value = df[metric_col].mean()
-                        elif metric_type == "Minimum":
-                            value = df[metric_col].min()
-                        elif metric_type == "Maximum":
-                            value = df[metric_col].max()
-                        elif metric_type == "Count":
-                            value = df[metric_col].count()
-                        elif metric_type == "Median":
-                            value = df[metric_col].median()
+                        # Live sources only hold a sample locally, so their
+                        # metrics are computed by the database or not at all
+                        value = None
+                        if is_live_source(source, credentials):
+                            try:
+                                value = live_metric_value(source, component, credentials)
+                            except UnsupportedPushdown:
+                                pass
+                        else:
+                            df = get_source_data(source, columns=metric_columns(component))
+                            
+                            # Apply filter if specified
+                            if component.get("filter"):
+                                filter_col = component["filter"]["column"]
+                                filter_val = component["filter"]["value"]
+                                if filter_col and filter_val is not None:
+                                    df = filter_source(source, [{
+                                        "column": filter_col,
+                                        "operation": "equals",
+                                        "value": filter_val
+                                    }], columns=metric_columns(component))
+                            
+                            if metric_type == "Sum":
+                                value = df[metric_col].sum()
+                            elif metric_type == "Average":
+                                value = df[metric_col].mean()
+                            elif metric_type == "Minimum":
+                                value = df[metric_col].min()
+                            elif metric_type == "Maximum":
+                                value = df[metric_col].max()
+                            elif metric_type == "Count":
+                                value = df[metric_col].count()
+                            elif metric_type == "Median":
+                                value = df[metric_col].median()
                         
                         # Format the value
                         format_config = component.get("format", {"type": "none"})
                         
-                        if format_config["type"] == "number":
+                        if value is None:
+                            formatted_value = "N/A"
+                        elif format_config["type"] == "number":
                             formatted_value = f"{value:.{format_config.get('decimals', 2)}f}"
                         elif format_config["type"] == "percentage":
                             formatted_value = f"{value:.{format_config.get('decimals', 2)}f}%"
@@ -157,7 +183,9 @@ def render_dashboard(dashboard, data_sources):
                 try:
                     data_source = component["data_source"]
                     if data_source in data_sources:
-                        df = data_sources[data_source]["data"]
+                        df = live_table_data(data_sources[data_source], component.get("columns"), db_credentials.get(data_source))
+                        if df is None:
+                            df = get_source_data(data_sources[data_source], columns=component.get("columns"))
                         
                         # Filter columns
                         if component.get("columns"):
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.aggregation import aggregate_dataframe
+
+EXACT_FUNCTIONS = ["sum", "mean", "median", "min", "max", "count", "std", "var", "nunique"]
+
+def make_frame(rows=2000, seed=6):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "region": rng.choice(["North", "South", "East", None], rows),
+        "year": rng.integers(2020, 2024, rows),
+        "shop": pd.Categorical(rng.choice(["a", "b", "c"], rows)),
+        "units": rng.integers(-50, 50, rows),
+        "price": np.where(rng.random(rows) < 0.1, np.nan, rng.normal(20, 8, rows)),
+        "stock": pd.array(np.where(rng.random(rows) < 0.2, None, rng.integers(0, 9, rows)), dtype="Int64"),
+        "name": rng.choice(["x", "y", "z", None], rows)
+    })
+    # A group whose values are all missing
+    df.loc[df["region"] == "East", "price"] = np.nan
+    return df
+
+def pandas_aggregate(df, group_columns, aggregations):
+    named = {}
+    for column, funcs in aggregations.items():
+        for func in funcs:
+            if func == "p90":
+                named[f"{column}_{func}"] = (column, lambda values: values.quantile(0.9))
+            else:
+                named[f"{column}_{func}"] = (column, func)
+    return df.groupby(group_columns, observed=True).agg(**named).reset_index()
+
+def assert_same(result, expected):
+    assert list(result.columns) == list(expected.columns)
+    for column in expected.columns:
+        left, right = result[column], expected[column]
+        if pd.api.types.is_numeric_dtype(right) and not pd.api.types.is_bool_dtype(right):
+            np.testing.assert_allclose(left.to_numpy(dtype=float, na_value=np.nan), right.to_numpy(dtype=float, na_value=np.nan), rtol=1e-9, atol=1e-9)
+        else:
+            assert left.astype(object).where(left.notna(), None).tolist() == right.astype(object).where(right.notna(), None).tolist()
+
+@pytest.mark.parametrize("group_columns", [["region"], ["year"], ["region", "year"], ["shop"], ["year", "shop"]])
+def test_numeric_aggregates_match_pandas(group_columns):
+    df = make_frame()
+    aggregations = {"units": EXACT_FUNCTIONS + ["p90"], "price": EXACT_FUNCTIONS + ["p90"], "stock": ["sum", "mean", "min", "max", "count"]}
+    assert_same(aggregate_dataframe(df, group_columns, aggregations, use_cache=False), pandas_aggregate(df, group_columns, aggregations))
+
+def test_text_aggregates_match_pandas():
+    df = make_frame()
+    aggregations = {"name": ["count", "nunique"]}
+    assert_same(aggregate_dataframe(df, ["year"], aggregations, use_cache=False), pandas_aggregate(df, ["year"], aggregations))
+
+    # pandas cannot order None against strings, so min and max use filled text
+    df["name"] = df["name"].fillna("")
+    aggregations = {"name": ["min", "max"]}
+    assert_same(aggregate_dataframe(df, ["year"], aggregations, use_cache=False), pandas_aggregate(df, ["year"], aggregations))
+
+def test_sorted_input_matches_pandas():
+    df = make_frame().sort_values("year", kind="stable").reset_index(drop=True)
+    aggregations = {"units": ["sum", "mean", "max"], "price": ["median", "std"]}
+    assert_same(aggregate_dataframe(df, ["year"], aggregations, use_cache=False), pandas_aggregate(df, ["year"], aggregations))
+
+def test_cached_results_are_copies():
+    df = make_frame()
+    aggregations = {"units": ["sum"]}
+    first = aggregate_dataframe(df, ["year"], aggregations)
+    first.loc[0, "units_sum"] = -1
+    assert_same(aggregate_dataframe(df, ["year"], aggregations), pandas_aggregate(df, ["year"], aggregations))
+
+def test_approximate_aggregates_are_close():
+    df = make_frame(rows=50000, seed=7)
+    df["code"] = np.random.default_rng(8).integers(0, 5000, len(df))
+    result = aggregate_dataframe(df, ["year"], {"code": ["approx_nunique"], "price": ["approx_median", "approx_p90"]}, use_cache=False)
+    expected = pandas_aggregate(df, ["year"], {"code": ["nunique"], "price": ["median", "p90"]})
+    np.testing.assert_allclose(result["code_approx_nunique"], expected["code_nunique"], rtol=0.05)
+    np.testing.assert_allclose(result["price_approx_median"], expected["price_median"], atol=1.0)
+    np.testing.assert_allclose(result["price_approx_p90"], expected["price_p90"], atol=1.0)
+
+def test_empty_frame():
+    df = make_frame().iloc[:0]
+    result = aggregate_dataframe(df, ["region"], {"units": ["sum", "mean"]}, use_cache=False)
+    assert list(result.columns) == ["region", "units_sum", "units_mean"]
+    assert result.empty
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.arrow_store import to_arrow_table, filter_source, get_source_data
+from utils.data_processing import filter_dataframe
+
+def make_frame():
+    return pd.DataFrame({
+        "name": ["a.c", "abc", None, "x(y)", "A.C", "a+c", ""],
+        "value": [1.0, np.nan, 3.0, -4.0, 5.0, 6.0, 0.0],
+        "count": pd.Series([1, 2, None, 4, 5, None, 7], dtype="Int64"),
+        "day": pd.to_datetime(["2024-01-01", "2024-01-02", None, "2024-01-04", "2024-01-05", "2024-01-06", "2024-01-07"])
+    })
+
+FILTERS = [
+    {"column": "name", "operation": "contains", "value": "a.c"},
+    {"column": "name", "operation": "contains", "value": "b"},
+    {"column": "name", "operation": "contains", "value": "[xy]"},
+    {"column": "name", "operation": "starts_with", "value": "a"},
+    {"column": "name", "operation": "ends_with", "value": "c"},
+    {"column": "name", "operation": "equals", "value": "abc"},
+    {"column": "name", "operation": "not_equals", "value": "abc"},
+    {"column": "name", "operation": "in_list", "value": ["abc", "a+c"]},
+    {"column": "name", "operation": "not_in_list", "value": ["abc"]},
+    {"column": "value", "operation": "greater_than", "value": 0},
+    {"column": "value", "operation": "less_than", "value": 4},
+    {"column": "value", "operation": "between", "value": (0, 5)},
+    {"column": "value", "operation": "not_equals", "value": 1.0},
+    {"column": "count", "operation": "greater_than", "value": 2},
+    {"column": "count", "operation": "in_list", "value": [1, 7]},
+]
+
+def sources(df):
+    return {"data": df}, {"table": to_arrow_table(df)}
+
+@pytest.mark.parametrize("filter_dict", FILTERS, ids=lambda f: f"{f['column']}-{f['operation']}-{f['value']}")
+def test_arrow_filters_match_pandas(filter_dict):
+    pandas_source, arrow_source = sources(make_frame())
+    expected = filter_source(pandas_source, [filter_dict])
+    result = filter_source(arrow_source, [filter_dict])
+    assert result["name"].tolist() == expected["name"].tolist()
+    np.testing.assert_array_equal(result["value"].to_numpy(), expected["value"].to_numpy())
+
+def test_combined_filters_match_pandas():
+    df = make_frame()
+    filters = [FILTERS[0], FILTERS[9]]
+    _, arrow_source = sources(df)
+    expected = filter_dataframe(df, filters)
+    result = filter_source(arrow_source, filters, columns=["value"])
+    assert list(result.columns) == ["value"]
+    np.testing.assert_array_equal(result["value"].to_numpy(), expected["value"].to_numpy())
+
+def test_empty_source():
+    df = make_frame().iloc[:0]
+    _, arrow_source = sources(df)
+    result = filter_source(arrow_source, [FILTERS[0], FILTERS[9]])
+    assert result.empty
+    assert list(result.columns) == list(df.columns)
+
+def test_projection_matches_pandas():
+    df = make_frame()
+    _, arrow_source = sources(df)
+    result = get_source_data(arrow_source, columns=["value", "day", "missing"])
+    pd.testing.assert_frame_equal(result, df[["value", "day"]])
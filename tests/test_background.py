@@ -0,0 +1,60 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.background import BackgroundRun, BackgroundImport, sample_dataframe
+from utils.transformation_plan import execute_transformation
+
+STEPS = [
+    {"operation": "filter_rows", "params": {"column": "value", "type": "greater_than", "value": 10}},
+    {"operation": "sort_data", "params": {"column": "group", "ascending": True}}
+]
+
+def make_frame(rows):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        "value": rng.normal(10, 5, rows),
+        "group": rng.choice(["a", "b", "c", None], rows)
+    })
+
+def wait(run, timeout=30):
+    deadline = time.time() + timeout
+    while not run.done() and time.time() < deadline:
+        time.sleep(0.01)
+    assert run.done()
+
+def test_full_result_matches_direct_run():
+    df = make_frame(5000)
+    run = BackgroundRun(df, STEPS, sample_rows=100)
+    assert len(run.preview) <= 100
+    wait(run)
+    result, complete = run.current()
+    assert complete and run.error() is None
+    pd.testing.assert_frame_equal(result, execute_transformation(df, STEPS))
+
+def test_small_source_needs_no_worker():
+    df = make_frame(50)
+    run = BackgroundRun(df, STEPS, sample_rows=100)
+    assert run.future is None
+    pd.testing.assert_frame_equal(run.current()[0], execute_transformation(df, STEPS))
+
+def test_runs_do_not_reuse_threads():
+    threads = []
+
+    def read(progress_callback=None, cancel_event=None):
+        threads.append(threading.current_thread())
+        return len(threads)
+
+    first, second = BackgroundImport(read), BackgroundImport(read)
+    wait(first)
+    wait(second)
+    assert threads[0] is not threads[1]
+
+def test_stratified_sample_keeps_every_group():
+    df = make_frame(10000)
+    df.loc[:2, "group"] = "rare"
+    sample = sample_dataframe(df, rows=100, stratify_by="group")
+    assert set(sample["group"].dropna()) == set(df["group"].dropna())
+    assert sample.index.is_monotonic_increasing
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_processing import apply_transformation
+
+def make_frame():
+    return pd.DataFrame({
+        "units": [5, 15, 25, -1, 0, 40, 12],
+        "price": [1.0, np.nan, 30.0, 5.5, 20.0, np.nan, 12.5],
+        "stock": pd.array([1, None, 3, 4, None, 6, 7], dtype="Int64"),
+        "region": ["North", None, "South", "North East", "", "West", "south"],
+    })
+
+def pandas_mask(df, condition):
+    series = df[condition["column"]]
+    kind = condition["type"]
+    if kind == "greater_than":
+        mask = series > condition["threshold"]
+    elif kind == "less_than":
+        mask = series < condition["threshold"]
+    elif kind == "equal_to":
+        mask = series == condition["value"]
+    elif kind == "between":
+        mask = (series >= condition["min_threshold"]) & (series <= condition["max_threshold"])
+    elif kind == "in_list":
+        mask = series.isin(condition["values"])
+    elif series.dtype == object:
+        mask = series.str.contains(condition["value"], na=False)
+    else:
+        mask = pd.Series(False, index=series.index)
+    return mask.fillna(False).astype(bool)
+
+def pandas_case_when(df, cases, default):
+    """
+    Each row takes the value of the first matching case, row by row.
+    """
+    masks = [pandas_mask(df, case["condition_params"]) for case in cases]
+    values = []
+    for row in range(len(df)):
+        matched = [case["value"] for case, mask in zip(cases, masks) if mask.iloc[row]]
+        values.append(matched[0] if matched else default)
+    return values
+
+CASES = [
+    ([{"condition_params": {"type": "greater_than", "column": "units", "threshold": 20}, "value": "high"},
+      {"condition_params": {"type": "greater_than", "column": "units", "threshold": 10}, "value": "medium"}], "low"),
+    ([{"condition_params": {"type": "between", "column": "price", "min_threshold": 5, "max_threshold": 20}, "value": 1},
+      {"condition_params": {"type": "less_than", "column": "price", "threshold": 5}, "value": 2}], 0),
+    ([{"condition_params": {"type": "in_list", "column": "region", "values": ["North", "West"]}, "value": 1.5},
+      {"condition_params": {"type": "contains", "column": "region", "value": "th"}, "value": "text"}], None),
+    ([{"condition_params": {"type": "greater_than", "column": "stock", "threshold": 3}, "value": True}], False),
+    ([{"condition_params": {"type": "equal_to", "column": "region", "value": ""}, "value": "empty"},
+      {"condition_params": {"type": "contains", "column": "units", "value": "1"}, "value": "never"}], "other"),
+]
+
+@pytest.mark.parametrize("cases, default", CASES)
+def test_case_when_matches_first_matching_row(cases, default):
+    df = make_frame()
+    params = {"new_column": "label", "method": "case_when", "cases": cases, "default": default}
+    result = apply_transformation(df, "create_column", params)
+    assert result["label"].tolist() == pandas_case_when(df, cases, default)
+
+@pytest.mark.parametrize("cases, default", CASES)
+def test_conditional_matches_np_where(cases, default):
+    df = make_frame()
+    case = cases[0]
+    params = {
+        "new_column": "label",
+        "method": "conditional",
+        "condition_params": case["condition_params"],
+        "true_value": case["value"],
+        "false_value": default
+    }
+    result = apply_transformation(df, "create_column", params)
+    expected = np.where(pandas_mask(df, case["condition_params"]), case["value"], default)
+    assert result["label"].tolist() == expected.tolist()
+
+def test_empty_frame():
+    df = make_frame().iloc[:0]
+    cases, default = CASES[0]
+    result = apply_transformation(df, "create_column", {"new_column": "label", "method": "case_when", "cases": cases, "default": default})
+    assert "label" in result.columns and result.empty
@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_connectors import (
+    close_connection_pools,
+    connect_to_database,
+    get_connection_pool,
+    invalidate_query_cache,
+    read_database_table,
+    stream_database_query
+)
+
+SALES_ROWS = [
+    (1, "North", 10.5, "2024-01-05", 3),
+    (2, "South", None, "2024-01-06", 1),
+    (3, None, 7.25, None, 4),
+    (4, "North", 2.0, "2024-02-01", None),
+    (5, "East", None, "2024-02-10", 2),
+]
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    SQLite database with a sales table holding missing values in every
+    column but the key; yields the connection settings.
+    """
+    path = str(tmp_path / "sales.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sales (id INTEGER, region TEXT, amount REAL, day TEXT, units INTEGER)")
+    conn.executemany("INSERT INTO sales VALUES (?, ?, ?, ?, ?)", SALES_ROWS)
+    conn.commit()
+    conn.close()
+
+    yield ("SQLite", "", "", "", "", path)
+
+    invalidate_query_cache()
+    close_connection_pools()
+
+def pandas_read(database, query, params=None):
+    """
+    Reference read with pandas over a connection of its own.
+    """
+    conn = sqlite3.connect(database[-1])
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+@pytest.mark.parametrize("query,params", [
+    ("SELECT * FROM sales", None),
+    ("SELECT region, SUM(amount) AS total FROM sales GROUP BY region ORDER BY region", None),
+    ("SELECT * FROM sales WHERE units > ?", [1]),
+    ("SELECT * FROM sales WHERE region = ?", ["West"]),
+])
+@pytest.mark.parametrize("cache_ttl", [0, 600])
+def test_query_matches_read_sql(database, query, params, cache_ttl):
+    expected = pandas_read(database, query, params)
+    for _ in range(2):
+        result = connect_to_database(*database, query, cache_ttl=cache_ttl, params=params)
+        pd.testing.assert_frame_equal(result, expected)
+
+def test_cached_result_is_a_copy(database):
+    first = connect_to_database(*database, "SELECT * FROM sales")
+    first.loc[0, "amount"] = -1.0
+    second = connect_to_database(*database, "SELECT * FROM sales")
+    pd.testing.assert_frame_equal(second, pandas_read(database, "SELECT * FROM sales"))
+
+def test_force_refresh_sees_new_rows(database):
+    connect_to_database(*database, "SELECT * FROM sales")
+    conn = sqlite3.connect(database[-1])
+    conn.execute("INSERT INTO sales VALUES (6, 'West', 1.0, '2024-03-01', 5)")
+    conn.commit()
+    conn.close()
+
+    assert len(connect_to_database(*database, "SELECT * FROM sales")) == len(SALES_ROWS)
+    refreshed = connect_to_database(*database, "SELECT * FROM sales", force_refresh=True)
+    pd.testing.assert_frame_equal(refreshed, pandas_read(database, "SELECT * FROM sales"))
+
+def test_pooled_connection_is_reused(database):
+    for _ in range(3):
+        connect_to_database(*database, "SELECT COUNT(*) FROM sales", cache_ttl=0)
+    stats = get_connection_pool(*database).stats()
+    assert stats["open"] == 1
+    assert stats["in_use"] == 0
+
+def test_failed_query_returns_connection(database):
+    with pytest.raises(Exception):
+        connect_to_database(*database, "SELECT * FROM missing_table", cache_ttl=0)
+    assert get_connection_pool(*database).stats()["in_use"] == 0
+    result = connect_to_database(*database, "SELECT id FROM sales", cache_ttl=0)
+    np.testing.assert_array_equal(result["id"], [1, 2, 3, 4, 5])
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM sales",
+    "SELECT * FROM sales ORDER BY amount",
+    "SELECT region, COUNT(*) AS n, AVG(amount) AS average FROM sales GROUP BY region",
+])
+@pytest.mark.parametrize("fetch_size", [1, 2, 10000])
+def test_streamed_table_matches_read_sql(database, query, fetch_size):
+    result = read_database_table(*database, query, fetch_size=fetch_size, cache_ttl=0).to_pandas()
+    pd.testing.assert_frame_equal(result, pandas_read(database, query), check_dtype=False)
+
+def test_streamed_batches_hold_every_row(database):
+    batches = list(stream_database_query(*database, "SELECT * FROM sales", fetch_size=2))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    assert all(batch.schema.names == ["id", "region", "amount", "day", "units"] for batch in batches)
+
+def test_empty_result_keeps_columns(database):
+    query = "SELECT * FROM sales WHERE id < 0"
+    result = read_database_table(*database, query, cache_ttl=0)
+    expected = pandas_read(database, query)
+    assert result.num_rows == 0
+    assert result.column_names == list(expected.columns)
+
+def test_mixed_value_types_are_kept_as_text(database):
+    conn = sqlite3.connect(database[-1])
+    conn.execute("CREATE TABLE mixed (value)")
+    conn.executemany("INSERT INTO mixed VALUES (?)", [(1,), ("a",), (2.5,), (None,)])
+    conn.commit()
+    conn.close()
+
+    result = read_database_table(*database, "SELECT * FROM mixed", cache_ttl=0).to_pandas()
+    expected = pandas_read(database, "SELECT * FROM mixed")["value"]
+    assert result["value"].tolist() == [None if value is None else str(value) for value in expected]
+
+def test_cached_table_matches_read_sql(database):
+    query = "SELECT * FROM sales"
+    first = read_database_table(*database, query, fetch_size=2)
+    second = read_database_table(*database, query, fetch_size=2)
+    assert second is first
+    pd.testing.assert_frame_equal(second.to_pandas(), pandas_read(database, query), check_dtype=False)
+
+def test_progress_and_cancel(database):
+    progress = []
+    read_database_table(*database, "SELECT * FROM sales", fetch_size=2, progress_callback=progress.append, cache_ttl=0)
+    assert progress == [2, 4, 5]
+
+    cancel_event = threading.Event()
+    cancel_event.set()
+    assert read_database_table(*database, "SELECT * FROM sales", cancel_event=cancel_event, cache_ttl=0) is None
+    assert get_connection_pool(*database).stats()["in_use"] == 0
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.datetimes import parse_datetimes, to_datetime_cached
+
+def repeated_dates(rows=500):
+    days = ["2024-01-05", "2024-02-10", None, "2024-03-15", "2024-12-31"]
+    return pd.Series([days[i % len(days)] for i in range(rows)], name="Date", index=np.arange(rows) * 2)
+
+PARSERS = [parse_datetimes, to_datetime_cached]
+
+@pytest.mark.parametrize("parse", PARSERS)
+@pytest.mark.parametrize("series", [
+    repeated_dates(),
+    repeated_dates().astype("category"),
+    repeated_dates().astype("string"),
+    pd.Series(pd.date_range("2024-01-01", periods=300, freq="h").strftime("%Y-%m-%d %H:%M"), name="Stamp"),
+    pd.Series([None] * 20, dtype=object),
+    pd.Series([1_700_000_000_000_000_000, 1_700_000_100_000_000_000, None], dtype="float64"),
+])
+def test_matches_to_datetime(parse, series):
+    pd.testing.assert_series_equal(parse(series), pd.to_datetime(series))
+
+@pytest.mark.parametrize("parse", PARSERS)
+def test_coerce_matches_to_datetime(parse):
+    series = pd.Series(["2024-01-05", "not a date", None, "2024-01-05", "also bad"] * 50)
+    pd.testing.assert_series_equal(
+        parse(series, errors="coerce"),
+        pd.to_datetime(series, errors="coerce")
+    )
+
+@pytest.mark.parametrize("parse", PARSERS)
+def test_explicit_format_matches_to_datetime(parse):
+    series = pd.Series(["05/01/2024", "10/02/2024", None] * 40)
+    pd.testing.assert_series_equal(
+        parse(series, date_format="%d/%m/%Y"),
+        pd.to_datetime(series, format="%d/%m/%Y")
+    )
+
+@pytest.mark.filterwarnings("ignore:Parsing dates")
+@pytest.mark.parametrize("parse", PARSERS)
+def test_inferred_format_follows_first_value(parse):
+    # The first value decides between day-first and month-first, as in pandas
+    series = pd.Series(["13/01/2024", "02/03/2024", "02/03/2024", "13/01/2024"] * 30)
+    pd.testing.assert_series_equal(parse(series), pd.to_datetime(series))
+
+@pytest.mark.parametrize("parse", PARSERS)
+def test_errors_match_to_datetime(parse):
+    series = pd.Series(["2024-01-05", "not a date"] * 30)
+    with pytest.raises(ValueError):
+        pd.to_datetime(series)
+    with pytest.raises(ValueError):
+        parse(series)
+
+@pytest.mark.parametrize("parse", PARSERS)
+def test_empty_series(parse):
+    series = pd.Series([], dtype=object, name="Date")
+    result = parse(series)
+    assert result.empty
+    assert pd.api.types.is_datetime64_any_dtype(result)
+
+def test_datetime_columns_pass_through():
+    series = pd.Series(pd.date_range("2024-01-01", periods=5))
+    assert to_datetime_cached(series) is series
+
+def test_cached_result_follows_changes():
+    series = repeated_dates()
+    first = to_datetime_cached(series)
+    first.iloc[0] = pd.NaT
+    pd.testing.assert_series_equal(to_datetime_cached(series), pd.to_datetime(series))
+
+    changed = series.copy()
+    changed.iloc[0] = "2030-06-01"
+    pd.testing.assert_series_equal(to_datetime_cached(changed), pd.to_datetime(changed))
+
+def test_cached_errors_raise_again():
+    series = pd.Series(["2024-01-05", "not a date"] * 30)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            to_datetime_cached(series)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from utils.dtypes import compact_dataframe, DEFAULT_CATEGORY_RATIO
+from utils.data_processing import apply_transformation
+
+def make_frame():
+    return pd.DataFrame({
+        "qty": pd.Series([3, 7, 21, 0], dtype="int64"),
+        "price": pd.Series([1547, 663, 221, 5], dtype="int64"),
+        "score": [0.5, 1.25, np.nan, 2.0],
+        "region": ["North", "North", None, "North"],
+        "mixed": [1, "a", 2.5, None]
+    })
+
+def test_integer_arithmetic_matches_original():
+    df = make_frame()
+    compacted, _ = compact_dataframe(df)
+    pd.testing.assert_series_equal(compacted["qty"] * compacted["price"], df["qty"] * df["price"])
+
+def test_values_survive_compaction():
+    df = make_frame()
+    compacted, report = compact_dataframe(df)
+    for column in df.columns:
+        assert compacted[column].astype(object).where(compacted[column].notna(), None).tolist() == \
+            df[column].astype(object).where(df[column].notna(), None).tolist()
+    assert "qty" not in report["columns"]
+    assert "mixed" not in report["columns"]
+
+def test_text_is_not_categorical_by_default():
+    compacted, _ = compact_dataframe(make_frame())
+    assert not isinstance(compacted["region"].dtype, pd.CategoricalDtype)
+
+def test_fill_value_on_categorical_column():
+    df = make_frame()
+    compacted, _ = compact_dataframe(df, category_ratio=DEFAULT_CATEGORY_RATIO)
+    assert isinstance(compacted["region"].dtype, pd.CategoricalDtype)
+
+    params = {"method": "fill_value", "columns": ["region"], "value": "Unknown"}
+    result = apply_transformation(compacted, "handle_missing", params)
+    expected = apply_transformation(df, "handle_missing", params)
+    assert result["region"].astype(object).tolist() == expected["region"].tolist()
+
+def test_empty_frame():
+    df = make_frame().iloc[:0]
+    compacted, report = compact_dataframe(df)
+    assert list(compacted.columns) == list(df.columns)
+    assert len(compacted) == 0
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.expressions import (
+    apply_column_function,
+    evaluate_formula,
+    function_execution_path,
+    UnsupportedExpression
+)
+
+INTS = pd.Series([0, 1, 2, -3, 7, 10], dtype="int64")
+FLOATS = pd.Series([0.0, 1.5, np.nan, -2.25, 4.0], dtype="float64")
+TEXT = pd.Series(["Apple", "banana", "", "Cherry pie", "apple tart"], dtype=object)
+
+def python_apply(series, function):
+    return series.apply(eval(f"lambda x: {function}"))
+
+def assert_matches_python(series, function):
+    values, _ = apply_column_function(series, function)
+    expected = python_apply(series, function)
+    pd.testing.assert_series_equal(pd.Series(values, index=series.index), expected, check_dtype=False)
+
+@pytest.mark.parametrize("function", [
+    "x * 2 + 1",
+    "x - 3",
+    "x / 4",
+    "x // 3",
+    "x % 3",
+    "x ** 2",
+    "x ** -1",
+    "-x",
+    "abs(x)",
+    "max(x, 0)",
+    "min(x, 5)",
+    "x if x > 2 else 0",
+    "x > 1 and x < 8",
+    "x < 0 or x > 5",
+    "not x > 1",
+    "1 < x < 8",
+    "x or 10",
+    "x and 6",
+    "not x",
+])
+def test_int_functions_match_python(function):
+    assert_matches_python(INTS.replace(0, 5) if function == "x ** -1" else INTS, function)
+
+@pytest.mark.parametrize("function", [
+    "x * 2 + 1",
+    "x ** -1",
+    "abs(x)",
+    "x if x > 1 else -1",
+    "x > 1 and x < 3",
+    "x or 10",
+    "x and 6",
+    "not x",
+])
+def test_float_functions_match_python(function):
+    assert_matches_python(FLOATS.replace(0.0, 2.0) if function == "x ** -1" else FLOATS, function)
+
+@pytest.mark.parametrize("function", [
+    "x.lower()",
+    "x.upper()",
+    "x.strip()",
+    "x.startswith('a')",
+    "x.endswith('e')",
+    "'pie' in x",
+    "'pie' not in x",
+    "x.startswith('a') or x.endswith('e')",
+    "not x.startswith('a')",
+    "x or 'empty'",
+])
+def test_string_functions_match_python(function):
+    assert_matches_python(TEXT, function)
+
+@pytest.mark.parametrize("function", ["x or 10", "x and 6", "not x", "x.startswith('a') or x"])
+def test_truthiness_operators_use_python(function):
+    assert function_execution_path(function) == "python"
+
+@pytest.mark.parametrize("function", ["x > 1 and x < 8", "not x > 1", "'a' in x or x.endswith('b')"])
+def test_boolean_operators_are_vectorized(function):
+    assert function_execution_path(function) == "vectorized"
+
+@pytest.mark.parametrize("function", ["10 // x", "10 % x", "10 / x", "x ** -1"])
+@pytest.mark.parametrize("series", [INTS, INTS.astype(float)])
+def test_division_by_zero_raises_as_in_python(function, series):
+    with pytest.raises(ZeroDivisionError):
+        python_apply(series, function)
+    with pytest.raises(ZeroDivisionError):
+        apply_column_function(series, function)
+
+@pytest.mark.parametrize("function", ["10 // x if x != 0 else 0", "10 % x if x else -1", "1 / x if x > 0 else 0.0"])
+def test_guarded_division_by_zero_matches_python(function):
+    values, path = apply_column_function(INTS, function)
+    assert path == "python"
+    pd.testing.assert_series_equal(pd.Series(values, index=INTS.index), python_apply(INTS, function), check_dtype=False)
+
+def test_division_without_zero_stays_vectorized():
+    _, path = apply_column_function(INTS.replace(0, 5), "10 // x + 10 % x")
+    assert path == "vectorized"
+
+def test_empty_series():
+    values, path = apply_column_function(pd.Series([], dtype="int64"), "x * 2")
+    assert path == "vectorized"
+    assert len(values) == 0
+
+def test_nullable_integers_match_python_on_present_values():
+    series = pd.Series([1, None, 3], dtype="Int64")
+    values, _ = apply_column_function(series, "x * 2")
+    np.testing.assert_array_equal(values, [2.0, np.nan, 6.0])
+
+def test_formula_matches_pandas():
+    df = pd.DataFrame({"a": [1, 2, 3, 4], "b": [4.0, np.nan, 2.0, 0.5]})
+    result = evaluate_formula(df, "{a} * {b} + {a} ** -1")
+    expected = df["a"] * df["b"] + df["a"].astype(float) ** -1
+    np.testing.assert_allclose(result, expected.to_numpy())
+
+def test_formula_rejects_truthiness_operators():
+    df = pd.DataFrame({"a": [0, 1, 2]})
+    with pytest.raises(UnsupportedExpression):
+        evaluate_formula(df, "{a} or 10")
+
+def test_formula_with_boolean_operators():
+    df = pd.DataFrame({"a": [0, 1, 2], "b": [5, 0, 1]})
+    result = evaluate_formula(df, "{a} > 0 and {b} > 0")
+    np.testing.assert_array_equal(result, ((df["a"] > 0) & (df["b"] > 0)).to_numpy())
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_processing import filter_dataframe, filter_mask, compile_filters
+
+def pandas_filter(df, filters):
+    """
+    Filters applied one after another with plain pandas boolean indexing.
+    """
+    result = df
+    for filter_dict in filters:
+        column, operation, value = filter_dict.get("column"), filter_dict.get("operation"), filter_dict.get("value")
+        if column is None or operation is None or value is None:
+            continue
+        series = result[column]
+        if operation == "equals":
+            mask = series == value
+        elif operation == "not_equals":
+            mask = series != value
+        elif operation == "greater_than":
+            mask = series > value
+        elif operation == "less_than":
+            mask = series < value
+        elif operation in ("contains", "starts_with", "ends_with"):
+            if series.dtype != object:
+                continue
+            if operation == "contains":
+                mask = series.str.contains(value, na=False)
+            elif operation == "starts_with":
+                mask = series.str.startswith(value, na=False)
+            else:
+                mask = series.str.endswith(value, na=False)
+        elif operation == "in_list":
+            mask = series.isin(value)
+        elif operation == "not_in_list":
+            mask = ~series.isin(value)
+        elif operation == "between":
+            mask = (series >= value[0]) & (series <= value[1])
+        elif operation == "date_range":
+            dates = pd.to_datetime(series)
+            mask = (dates >= pd.Timestamp(value[0])) & (dates <= pd.Timestamp(value[1]))
+        result = result[mask.fillna(False).astype(bool)]
+    return result
+
+def make_frame():
+    rng = np.random.default_rng(2)
+    rows = 500
+    df = pd.DataFrame({
+        "region": rng.choice(["North", "South", "East", None], rows),
+        "units": rng.integers(-5, 50, rows),
+        "price": np.where(rng.random(rows) < 0.1, np.nan, rng.normal(20, 8, rows)),
+        "stock": pd.array(np.where(rng.random(rows) < 0.1, None, rng.integers(0, 10, rows)), dtype="Int64"),
+        "day": rng.choice(pd.date_range("2024-01-01", periods=60).strftime("%Y-%m-%d").tolist() + [None], rows),
+        "mixed": rng.choice([1, "1", 2.5, None, "two"], rows),
+        "flag": rng.random(rows) < 0.5
+    })
+    return df
+
+FILTERS = [
+    {"column": "region", "operation": "equals", "value": "North"},
+    {"column": "region", "operation": "not_equals", "value": "North"},
+    {"column": "region", "operation": "in_list", "value": ["South", "East"]},
+    {"column": "region", "operation": "not_in_list", "value": ["South"]},
+    {"column": "region", "operation": "contains", "value": "th"},
+    {"column": "region", "operation": "starts_with", "value": "So"},
+    {"column": "region", "operation": "ends_with", "value": "st"},
+    {"column": "units", "operation": "greater_than", "value": 10},
+    {"column": "units", "operation": "less_than", "value": 0},
+    {"column": "units", "operation": "between", "value": (5, 20)},
+    {"column": "units", "operation": "equals", "value": 7},
+    {"column": "units", "operation": "contains", "value": "7"},
+    {"column": "price", "operation": "greater_than", "value": 20.5},
+    {"column": "price", "operation": "between", "value": (10, 30)},
+    {"column": "price", "operation": "not_equals", "value": 20.0},
+    {"column": "stock", "operation": "greater_than", "value": 4},
+    {"column": "stock", "operation": "in_list", "value": [1, 2, 3]},
+    {"column": "day", "operation": "date_range", "value": ("2024-01-10", "2024-02-01")},
+    {"column": "mixed", "operation": "equals", "value": "1"},
+    {"column": "mixed", "operation": "in_list", "value": [1, 2.5]},
+    {"column": "flag", "operation": "equals", "value": True},
+]
+
+@pytest.mark.parametrize("filter_dict", FILTERS, ids=lambda f: f"{f['column']}-{f['operation']}")
+def test_single_filter_matches_pandas(filter_dict):
+    df = make_frame()
+    expected = pandas_filter(df, [filter_dict])
+    result = filter_dataframe(df, [filter_dict])
+    pd.testing.assert_index_equal(result.index, expected.index)
+
+@pytest.mark.parametrize("filters", [
+    [FILTERS[0], FILTERS[7]],
+    [FILTERS[2], FILTERS[12], FILTERS[17]],
+    [FILTERS[8], FILTERS[9]],
+    [FILTERS[1], {"column": "units", "operation": "equals", "value": None}, FILTERS[15]],
+])
+def test_combined_filters_match_pandas(filters):
+    df = make_frame()
+    pd.testing.assert_index_equal(filter_dataframe(df, filters).index, pandas_filter(df, filters).index)
+
+def test_repeated_range_filters_match_pandas():
+    # Repeated range queries switch from scans to a sorted index
+    df = make_frame()
+    for _ in range(3):
+        for filter_dict in (FILTERS[9], FILTERS[13], FILTERS[17]):
+            expected = pandas_filter(df, [filter_dict])
+            pd.testing.assert_index_equal(filter_dataframe(df, [filter_dict]).index, expected.index)
+
+def test_incomplete_filters_are_ignored():
+    df = make_frame()
+    filters = [{"column": "units", "operation": "greater_than", "value": None}, {"column": None, "operation": "equals", "value": 1}]
+    assert compile_filters(filters) == ()
+    assert filter_mask(df, filters) is None
+    assert filter_dataframe(df, filters) is df
+
+def test_empty_frame():
+    df = make_frame().iloc[:0]
+    for filter_dict in FILTERS:
+        result = filter_dataframe(df, [filter_dict])
+        assert result.empty
+        assert list(result.columns) == list(df.columns)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.aggregation import aggregate_dataframe
+from utils.data_processing import get_data_summary
+from utils.datetimes import to_datetime_cached
+from utils.fingerprint import dataframe_fingerprint, series_fingerprint
+from utils.transformation_cache import StepResultCache, run_steps_cached
+
+def make_frame(rows=100):
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        "a": rng.normal(10, 2, rows),
+        "b": rng.integers(0, 5, rows),
+        "c": rng.choice(["x", "y", None], rows)
+    })
+
+def test_equal_frames_share_fingerprint():
+    df = make_frame()
+    assert dataframe_fingerprint(df) == dataframe_fingerprint(df.copy())
+    assert dataframe_fingerprint(df) != dataframe_fingerprint(df.iloc[::-1])
+
+@pytest.mark.parametrize("mutate", [
+    lambda df: df.__setitem__("a", df["a"] * 2),
+    lambda df: df.__setitem__("d", 1),
+    lambda df: df.loc.__setitem__((0, "a"), -1.0),
+    lambda df: df.iloc.__setitem__((5, 2), "z"),
+    lambda df: df["b"].to_numpy().__setitem__(0, 99),
+])
+@pytest.mark.parametrize("columns", [None, ["a", "b", "c"]])
+def test_changes_in_place_change_fingerprint(mutate, columns):
+    df = make_frame()
+    before = dataframe_fingerprint(df, columns=columns)
+    mutate(df)
+    assert dataframe_fingerprint(df, columns=columns) != before
+
+def test_changes_in_place_change_series_fingerprint():
+    series = make_frame()["c"].copy()
+    before = series_fingerprint(series)
+    series.iloc[0] = "changed"
+    assert series_fingerprint(series) != before
+
+def test_summary_follows_changes_in_place():
+    df = make_frame()
+    get_data_summary(df)
+    df.loc[0, "b"] = np.nan
+    columns = {info["name"]: info for info in get_data_summary(df)["column_info"]}
+    assert columns["b"]["missing"] == df["b"].isna().sum() == 1
+
+def test_aggregation_follows_changes_in_place():
+    df = make_frame()
+    aggregate_dataframe(df, ["b"], {"a": ["sum"]})
+    df.loc[0, "a"] = 1000.0
+    expected = df.groupby("b")["a"].sum().reset_index(name="a_sum")
+    pd.testing.assert_frame_equal(aggregate_dataframe(df, ["b"], {"a": ["sum"]}), expected)
+
+def test_step_cache_follows_changes_in_place():
+    df = make_frame()
+    steps = [{"operation": "filter_rows", "params": {"column": "b", "type": "greater_than", "value": 2}}]
+    cache = StepResultCache()
+    run_steps_cached(df, steps, cache)
+    df["b"] = 4
+    result, steps_run = run_steps_cached(df, steps, cache)
+    assert steps_run == 1
+    assert len(result) == len(df)
+
+def test_parsed_dates_follow_changes_in_place():
+    series = pd.Series(["2024-01-05", "2024-02-10", None] * 50)
+    to_datetime_cached(series)
+    series.iloc[0] = "2030-06-01"
+    pd.testing.assert_series_equal(to_datetime_cached(series), pd.to_datetime(series))
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.expressions import EXPRESSION_FUNCTIONS, evaluate_formula
+
+def make_frame(rows=50):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "revenue": rng.normal(100, 30, rows).round(2),
+        "units": rng.integers(0, 10, rows),
+        "discount": pd.array(rng.integers(0, 5, rows), dtype="Int64"),
+        "active": rng.random(rows) < 0.5,
+        "name": rng.choice(["alpha", "Beta", "gamma"], rows),
+    })
+    df.loc[rng.random(rows) < 0.2, "revenue"] = np.nan
+    df.loc[rng.random(rows) < 0.2, "discount"] = pd.NA
+    return df
+
+def pandas_formula(df, formula):
+    """
+    Reference evaluation on whole pandas columns, as the formula path did
+    before it was compiled.
+    """
+    for column in df.columns:
+        formula = formula.replace(f"{{{column}}}", f"df[{column!r}]")
+    return eval(formula, dict(EXPRESSION_FUNCTIONS, df=df))
+
+def assert_matches_pandas(df, formula, chunk_size=7):
+    result = evaluate_formula(df, formula, chunk_size=chunk_size)
+    expected = pd.Series(pandas_formula(df, formula), index=df.index)
+    if pd.api.types.is_bool_dtype(expected):
+        np.testing.assert_array_equal(result, expected.to_numpy(dtype=bool))
+    else:
+        # Nullable integer columns compute in float, with NaN for <NA>
+        np.testing.assert_array_equal(
+            np.asarray(result, dtype=np.float64),
+            expected.to_numpy(dtype=np.float64, na_value=np.nan)
+        )
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("formula", [
+    "{revenue} / {units}",
+    "{revenue} * 1.2 - {units}",
+    "{units} * 2 + 1",
+    "{units} // 3 + {units} % 3",
+    "{revenue} // {units}",
+    "{units} // {units}",
+    "{units} % {units}",
+    "-{units} // {units}",
+    "{revenue} % {units}",
+    "{revenue} - {discount}",
+    "{discount} * {units}",
+    "{units} ** 2",
+    "abs({revenue} - 100)",
+    "sqrt(abs({revenue}))",
+    "round({revenue} / 3, 2)",
+    "clip({revenue}, 50, 150)",
+    "max({units}, 3)",
+    "where({active}, {revenue}, 0)",
+    "where({units} > 5, {units}, -1)",
+    "{active} & ({units} > 2)",
+    "({revenue} > 100) | ({units} == 0)",
+    "{units} + {active}",
+])
+def test_numeric_formulas_match_pandas(formula):
+    assert_matches_pandas(make_frame(), formula)
+
+@pytest.mark.parametrize("formula", ["{units} * 2", "{revenue} / {units}", "where({active}, {units}, 0)"])
+def test_empty_frame(formula):
+    df = make_frame(0)
+    assert len(evaluate_formula(df, formula)) == 0
+
+def test_text_comparison_matches_pandas():
+    df = make_frame()
+    result = evaluate_formula(df, "{name} == 'alpha'", chunk_size=7)
+    np.testing.assert_array_equal(result, (df["name"] == "alpha").to_numpy())
+
+def test_integer_division_by_zero_matches_pandas():
+    df = pd.DataFrame({"units": [0, 3, 0, -4], "x": [0, 1, 2, 0]})
+    result = evaluate_formula(df, "{units} // {x}")
+    np.testing.assert_array_equal(result, [np.nan, 3.0, 0.0, -np.inf])
+    np.testing.assert_array_equal(result, (df["units"] // df["x"]).to_numpy())
+    np.testing.assert_array_equal(evaluate_formula(df, "{units} % {x}"), (df["units"] % df["x"]).to_numpy())
+
+def test_chunk_size_does_not_change_result():
+    df = make_frame(200)
+    formula = "{revenue} * {units} - {discount}"
+    expected = evaluate_formula(df, formula, chunk_size=len(df))
+    for chunk_size in (1, 3, 64):
+        np.testing.assert_array_equal(evaluate_formula(df, formula, chunk_size=chunk_size), expected)
+
+def test_unknown_column():
+    with pytest.raises(ValueError):
+        evaluate_formula(make_frame(), "{revenue} + {missing}")
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.indexing import build_source_index, range_mask
+
+def make_frame():
+    rng = np.random.default_rng(3)
+    rows = 400
+    return pd.DataFrame({
+        "region": rng.choice(["North", "South", "East", None], rows),
+        "units": rng.integers(0, 20, rows),
+        "stock": pd.array(np.where(rng.random(rows) < 0.2, None, rng.integers(0, 5, rows)), dtype="Int64"),
+        "category": pd.Categorical(rng.choice(["a", "b", None], rows)),
+        "mixed": rng.choice([1, "1", 2.5, None], rows),
+        "flag": rng.random(rows) < 0.3,
+        "price": rng.normal(size=rows)
+    })
+
+def pandas_mask(series, operation, value):
+    if operation == "equals":
+        mask = series == value
+    elif operation == "not_equals":
+        mask = series != value
+    elif operation == "in_list":
+        mask = series.isin(value)
+    else:
+        mask = ~series.isin(value)
+    return mask.to_numpy(dtype=bool, na_value=operation == "not_equals")
+
+@pytest.mark.parametrize("column, operation, value", [
+    ("region", "equals", "North"),
+    ("region", "not_equals", "North"),
+    ("region", "in_list", ["South", "East", "West"]),
+    ("region", "not_in_list", ["South"]),
+    ("units", "equals", 3),
+    ("units", "equals", 3.0),
+    ("units", "equals", "3"),
+    ("units", "in_list", [1, 2, 19]),
+    ("stock", "equals", 2),
+    ("stock", "not_equals", 2),
+    ("stock", "not_in_list", [0, 1]),
+    ("category", "equals", "a"),
+    ("category", "not_in_list", ["b"]),
+    ("mixed", "equals", 1),
+    ("mixed", "equals", "1"),
+    ("mixed", "in_list", [2.5, "1"]),
+    ("flag", "equals", True),
+    ("flag", "not_equals", True),
+])
+def test_index_masks_match_pandas(column, operation, value):
+    df = make_frame()
+    index = build_source_index(df)
+    assert index.covers(column)
+    np.testing.assert_array_equal(index.mask(column, operation, value), pandas_mask(df[column], operation, value))
+
+def test_missing_values_are_left_to_scans():
+    index = build_source_index(make_frame())
+    assert index.mask("region", "equals", np.nan) is None
+    assert index.mask("region", "in_list", ["North", None]) is None
+
+def test_unindexed_columns():
+    df = make_frame()
+    index = build_source_index(df, max_cardinality=10)
+    assert not index.covers("price")
+    assert not index.covers("units")
+    assert index.mask("units", "equals", 3) is None
+
+def test_index_is_tied_to_its_frame():
+    df = make_frame()
+    index = build_source_index(df)
+    assert index.is_valid_for(df)
+    assert not index.is_valid_for(df.copy())
+
+def test_empty_frame():
+    df = make_frame().iloc[:0]
+    index = build_source_index(df)
+    mask = index.mask("region", "not_equals", "North")
+    assert mask.dtype == bool and len(mask) == 0
+
+def range_frame():
+    rng = np.random.default_rng(4)
+    rows = 300
+    return pd.DataFrame({
+        "units": rng.integers(-10, 10, rows),
+        "price": np.where(rng.random(rows) < 0.1, np.nan, rng.normal(0, 5, rows)),
+        "stock": pd.array(np.where(rng.random(rows) < 0.2, None, rng.integers(0, 5, rows)), dtype="Int64"),
+        "when": pd.to_datetime(np.where(rng.random(rows) < 0.1, None,
+                                        rng.choice(pd.date_range("2024-01-01", periods=90).astype(str), rows))),
+        "day": rng.choice(pd.date_range("2024-01-01", periods=90).strftime("%Y-%m-%d").tolist() + [None], rows)
+    })
+
+def pandas_range_mask(series, operation, value):
+    if operation == "between":
+        mask = (series >= value[0]) & (series <= value[1])
+    elif operation == "greater_than":
+        mask = series > value
+    elif operation == "less_than":
+        mask = series < value
+    else:
+        dates = pd.to_datetime(series)
+        mask = (dates >= pd.Timestamp(value[0])) & (dates <= pd.Timestamp(value[1]))
+    return mask.to_numpy(dtype=bool, na_value=False)
+
+@pytest.mark.parametrize("column, operation, value", [
+    ("units", "between", (-3, 4)),
+    ("units", "greater_than", 2),
+    ("units", "greater_than", 2.5),
+    ("units", "less_than", -9),
+    ("units", "between", (5, -5)),
+    ("price", "between", (-1.5, 2.0)),
+    ("price", "greater_than", 0),
+    ("price", "less_than", -100),
+    ("stock", "greater_than", 2),
+    ("stock", "between", (1, 3)),
+    ("when", "greater_than", pd.Timestamp("2024-02-01")),
+    ("when", "between", (pd.Timestamp("2024-01-15"), pd.Timestamp("2024-02-15"))),
+    ("when", "date_range", ("2024-01-15", "2024-02-15")),
+    ("day", "date_range", ("2024-01-15", "2024-02-15")),
+])
+def test_sorted_index_matches_pandas(column, operation, value):
+    df = range_frame()
+    expected = pandas_range_mask(df[column], operation, value)
+    # The first query scans, the following ones use the sorted index
+    results = [range_mask(df, column, operation, value) for _ in range(3)]
+    assert results[0] is None
+    for result in results[1:]:
+        np.testing.assert_array_equal(result, expected)
+
+def test_sorted_index_skips_unsupported_bounds():
+    df = range_frame()
+    for _ in range(3):
+        assert range_mask(df, "units", "greater_than", "2") is None
+        assert range_mask(df, "units", "equals", 2) is None
+
+def test_sorted_index_on_empty_frame():
+    df = range_frame().iloc[:0]
+    for _ in range(3):
+        result = range_mask(df, "price", "greater_than", 0)
+    assert result is not None and len(result) == 0
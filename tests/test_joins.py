@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.joins import join_dataframes
+
+STRATEGIES = ["broadcast_hash", "sort_merge"]
+
+def make_left():
+    return pd.DataFrame({
+        "id": [3, 1, 2, np.nan, 5, 1, 4],
+        "region": ["North", "South", None, "North", "East", "South", "West"],
+        "amount": [10.0, 20.5, np.nan, 4.0, 7.25, 1.0, 3.0]
+    })
+
+def make_right():
+    return pd.DataFrame({
+        "id": [1, 2, 2, np.nan, 6, 3],
+        "region": ["South", None, "North", "North", "East", "North"],
+        "amount": [100, 200, 300, 400, 500, 600],
+        "label": ["a", "b", None, "d", "e", "f"]
+    })
+
+def pandas_join(left, right, left_on, right_on, how, suffix="_right"):
+    """
+    Reference join with pd.merge: missing keys never match, rows follow the
+    left order and then the right order.
+    """
+    right_keys = right.dropna(subset=right_on)
+    if how == "anti":
+        matched = left[left_on].apply(tuple, axis=1).isin(set(right_keys[right_on].apply(tuple, axis=1)))
+        return left[~matched].reset_index(drop=True)
+
+    merged = pd.merge(
+        left.assign(_left_row=np.arange(len(left))),
+        right_keys.assign(_right_row=np.arange(len(right_keys))),
+        left_on=left_on,
+        right_on=right_on,
+        how=how,
+        suffixes=("", suffix)
+    )
+    merged = merged.sort_values(["_left_row", "_right_row"], kind="stable")
+    return merged.drop(columns=["_left_row", "_right_row"]).reset_index(drop=True)
+
+def assert_same(result, expected):
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("how", ["inner", "left", "anti"])
+def test_single_key_matches_pandas(strategy, how):
+    left, right = make_left(), make_right()
+    result, stats = join_dataframes(left, right, ["id"], how=how, strategy=strategy)
+    assert stats["strategy"] == strategy
+    assert_same(result, pandas_join(left, right, ["id"], ["id"], how))
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("how", ["inner", "left", "anti"])
+def test_multi_key_matches_pandas(strategy, how):
+    left, right = make_left(), make_right()
+    keys = ["id", "region"]
+    result, _ = join_dataframes(left, right, keys, how=how, strategy=strategy)
+    assert_same(result, pandas_join(left, right, keys, keys, how))
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_differently_named_keys_match_pandas(strategy, how):
+    left = make_left()
+    right = make_right().rename(columns={"id": "customer_id"})
+    result, _ = join_dataframes(left, right, ["id"], ["customer_id"], how=how, strategy=strategy)
+    assert_same(result, pandas_join(left, right, ["id"], ["customer_id"], how))
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("how", ["inner", "left", "anti"])
+def test_text_keys_match_pandas(strategy, how):
+    left, right = make_left(), make_right()
+    result, _ = join_dataframes(left, right, ["region"], how=how, strategy=strategy)
+    assert_same(result, pandas_join(left, right, ["region"], ["region"], how))
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_mixed_key_dtypes_match_pandas(strategy):
+    left = pd.DataFrame({"key": pd.Series([1, 2, 3, None], dtype="Int64"), "value": ["a", "b", "c", "d"]})
+    right = pd.DataFrame({"key": [2.0, 3.0, 3.0, 9.0], "other": [True, False, True, False]})
+    result, _ = join_dataframes(left, right, ["key"], how="left", strategy=strategy)
+    assert_same(result, pandas_join(left, right, ["key"], ["key"], "left"))
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("how", ["inner", "left", "anti"])
+@pytest.mark.parametrize("empty_side", ["left", "right", "both"])
+def test_empty_inputs_match_pandas(strategy, how, empty_side):
+    left, right = make_left(), make_right()
+    if empty_side in ("left", "both"):
+        left = left.iloc[:0]
+    if empty_side in ("right", "both"):
+        right = right.iloc[:0]
+    result, _ = join_dataframes(left, right, ["id"], how=how, strategy=strategy)
+    expected = pandas_join(left, right, ["id"], ["id"], how)
+    assert list(result.columns) == list(expected.columns)
+    assert len(result) == len(expected)
+    if len(expected):
+        assert_same(result, expected)
+
+def test_strategies_agree_on_larger_input():
+    rng = np.random.default_rng(0)
+    left = pd.DataFrame({"key": rng.integers(0, 500, 5000), "x": rng.normal(size=5000)})
+    right = pd.DataFrame({"key": rng.integers(0, 800, 2000), "y": rng.normal(size=2000)})
+    expected = pandas_join(left, right, ["key"], ["key"], "left")
+    for strategy in STRATEGIES:
+        result, _ = join_dataframes(left, right, ["key"], how="left", strategy=strategy)
+        assert_same(result, expected)
+
+def test_unsupported_join_type():
+    with pytest.raises(ValueError):
+        join_dataframes(make_left(), make_right(), ["id"], how="outer")
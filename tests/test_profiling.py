@@ -0,0 +1,107 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.profiling import profile_chunks, profile_file, resolve_server_path
+
+@pytest.fixture
+def data_dir(tmp_path):
+    root = tmp_path / "data"
+    (root / "nested").mkdir(parents=True)
+    (root / "nested" / "sales.csv").write_text("a,b\n1,2\n")
+    (tmp_path / "secret.csv").write_text("x\n1\n")
+    os.symlink(tmp_path / "secret.csv", root / "link.csv")
+    return str(root)
+
+def test_resolves_files_inside_the_data_directory(data_dir):
+    assert resolve_server_path("nested/sales.csv", data_dir) == os.path.join(os.path.realpath(data_dir), "nested", "sales.csv")
+    assert resolve_server_path("nested/../nested/sales.csv", data_dir).endswith("sales.csv")
+
+@pytest.mark.parametrize("path", ["../secret.csv", "/etc/passwd", "link.csv", "nested", "missing.csv"])
+def test_rejects_paths_outside_the_data_directory(data_dir, path):
+    with pytest.raises(ValueError):
+        resolve_server_path(path, data_dir)
+
+def test_disabled_without_a_data_directory():
+    with pytest.raises(ValueError):
+        resolve_server_path("sales.csv", None)
+
+def make_frame(rows=5000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "amount": rng.normal(50, 10, rows).round(3),
+        "units": rng.integers(0, 100, rows),
+        "region": rng.choice(["North", "South", "East", None], rows),
+        "day": pd.date_range("2024-01-01", periods=rows, freq="h").strftime("%Y-%m-%d %H:%M:%S")
+    })
+    df.loc[rng.random(rows) < 0.05, "amount"] = np.nan
+    df.loc[rng.random(rows) < 0.05, "day"] = None
+    return df
+
+def assert_profile_matches_pandas(summary, df):
+    assert summary["rows"] == len(df)
+    assert summary["missing_values"] == df.isna().sum().sum()
+    columns = {info["name"]: info for info in summary["column_info"]}
+    assert list(columns) == list(df.columns)
+
+    for name, info in columns.items():
+        column = df[name]
+        assert info["missing"] == column.isna().sum()
+        assert abs(info["unique_values"] - column.nunique()) <= max(0.03 * column.nunique(), 2)
+
+    for name in ("amount", "units"):
+        stats = columns[name]["stats"]
+        assert stats["min"] == df[name].min()
+        assert stats["max"] == df[name].max()
+        assert stats["mean"] == pytest.approx(df[name].mean())
+        assert stats["std"] == pytest.approx(df[name].std())
+        assert stats["median"] == pytest.approx(df[name].median(), rel=0.02)
+
+    dates = pd.to_datetime(df["day"])
+    assert columns["day"]["type"] == "datetime"
+    assert columns["day"]["stats"]["min_date"] == dates.min().strftime("%Y-%m-%d")
+    assert columns["day"]["stats"]["max_date"] == dates.max().strftime("%Y-%m-%d")
+
+@pytest.mark.parametrize("chunksize", [333, 100000])
+def test_csv_profile_matches_pandas(chunksize):
+    df = make_frame()
+    buffer = io.StringIO(df.to_csv(index=False))
+    summary = profile_file(buffer, "csv", chunksize=chunksize)
+    assert summary["chunks"] == -(-len(df) // chunksize)
+    assert_profile_matches_pandas(summary, pd.read_csv(io.StringIO(df.to_csv(index=False))))
+
+def test_json_lines_profile_matches_pandas():
+    df = make_frame(1000)
+    text = df.to_json(orient="records", lines=True)
+    summary = profile_file(io.StringIO(text), "json", chunksize=128)
+    assert_profile_matches_pandas(summary, pd.read_json(io.StringIO(text), lines=True))
+
+def test_mixed_chunk_dtypes():
+    chunks = [
+        pd.DataFrame({"value": [1, 2, 3], "label": ["a", "b", "c"]}),
+        pd.DataFrame({"value": [4.5, np.nan], "label": [1, None]}),
+    ]
+    summary = profile_chunks(chunks)
+    columns = {info["name"]: info for info in summary["column_info"]}
+    combined = pd.concat(chunks, ignore_index=True)
+
+    assert columns["value"]["type"] == "float64"
+    assert columns["value"]["stats"]["mean"] == pytest.approx(combined["value"].mean())
+    assert columns["label"]["type"] == "object"
+    assert columns["label"]["missing"] == combined["label"].isna().sum()
+    assert columns["label"]["unique_values"] == combined["label"].nunique()
+
+def test_columns_missing_from_some_chunks():
+    chunks = [pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [3], "b": ["x"]})]
+    summary = profile_chunks(chunks)
+    combined = pd.concat(chunks, ignore_index=True)
+    assert summary["missing_values"] == combined.isna().sum().sum()
+
+def test_header_only_file():
+    summary = profile_file(io.StringIO("a,b\n"), "csv")
+    assert summary["rows"] == 0
+    assert [info["name"] for info in summary["column_info"]] == ["a", "b"]
+    assert all(info["unique_values"] == 0 for info in summary["column_info"])
@@ -0,0 +1,120 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import utils.data_connectors as data_connectors
+from utils.data_connectors import QueryCache
+
+def make_frame(rows=1000, offset=0):
+    return pd.DataFrame({
+        "id": np.arange(offset, offset + rows),
+        "value": np.where(np.arange(rows) % 7 == 0, np.nan, np.arange(rows) * 0.5),
+        "name": [None if i % 11 == 0 else f"row {i}" for i in range(rows)]
+    })
+
+def key(name):
+    return ("connection", name, (), "pandas")
+
+def test_memory_hit_returns_a_copy(tmp_path):
+    cache = QueryCache(directory=str(tmp_path))
+    df = make_frame()
+    cache.put(key("a"), df, ttl=60)
+    result = cache.get(key("a"))
+    pd.testing.assert_frame_equal(result, df)
+    result.loc[0, "value"] = -1
+    pd.testing.assert_frame_equal(cache.get(key("a")), df)
+
+def test_spilled_results_match(tmp_path):
+    df = make_frame()
+    cache = QueryCache(memory_bytes=int(df.memory_usage(deep=True).sum() * 1.5), directory=str(tmp_path))
+    cache.put(key("a"), df, ttl=60)
+    cache.put(key("b"), make_frame(offset=5000), ttl=60)
+    assert cache.stats()["disk_entries"] == 1
+
+    pd.testing.assert_frame_equal(cache.get(key("a")), df)
+    assert cache.stats()["disk_hits"] == 1
+
+def test_arrow_results_spill_as_arrow(tmp_path):
+    table = pa.Table.from_pandas(make_frame(), preserve_index=False)
+    cache = QueryCache(memory_bytes=table.nbytes, directory=str(tmp_path))
+    cache.put(("connection", "a", (), "arrow"), table, ttl=60)
+    cache.put(("connection", "b", (), "arrow"), table, ttl=60)
+    assert cache.get(("connection", "a", (), "arrow")).equals(table)
+
+def test_empty_result(tmp_path):
+    df = make_frame().iloc[:0]
+    cache = QueryCache(memory_bytes=0, directory=str(tmp_path))
+    cache.put(key("empty"), df, ttl=60)
+    result = cache.get(key("empty"))
+    assert list(result.columns) == list(df.columns)
+    assert result.empty
+
+def test_expired_results_are_dropped(tmp_path):
+    cache = QueryCache(directory=str(tmp_path))
+    cache.put(key("a"), make_frame(), ttl=-1)
+    assert cache.get(key("a")) is None
+    assert cache.stats()["expired"] == 1
+
+def test_deleted_file_is_a_miss(tmp_path):
+    df = make_frame()
+    cache = QueryCache(memory_bytes=0, directory=str(tmp_path))
+    cache.put(key("a"), df, ttl=60)
+    for name in os.listdir(tmp_path):
+        os.remove(tmp_path / name)
+    assert cache.get(key("a")) is None
+    assert cache.stats()["disk_entries"] == 0
+
+def test_reads_are_not_blocked_by_a_spill(tmp_path, monkeypatch):
+    df = make_frame()
+    cache = QueryCache(memory_bytes=int(df.memory_usage(deep=True).sum() * 1.5), directory=str(tmp_path))
+    cache.put(key("a"), df, ttl=60)
+
+    writing = threading.Event()
+    release = threading.Event()
+    write_table = data_connectors.pq.write_table
+
+    def slow_write(*args, **kwargs):
+        writing.set()
+        release.wait(10)
+        return write_table(*args, **kwargs)
+
+    monkeypatch.setattr(data_connectors.pq, "write_table", slow_write)
+    spill = threading.Thread(target=cache.put, args=(key("b"), make_frame(offset=5000), 60))
+    spill.start()
+    assert writing.wait(10)
+
+    # The lock is free while the file is written, and the result is still served
+    pd.testing.assert_frame_equal(cache.get(key("a")), df)
+    assert cache.get(key("b")) is not None
+    release.set()
+    spill.join(10)
+    assert cache.stats()["disk_entries"] == 1
+
+def test_invalidation_during_a_spill_wins(tmp_path, monkeypatch):
+    df = make_frame()
+    cache = QueryCache(memory_bytes=int(df.memory_usage(deep=True).sum() * 1.5), directory=str(tmp_path))
+    cache.put(key("a"), df, ttl=60)
+
+    writing = threading.Event()
+    release = threading.Event()
+    write_table = data_connectors.pq.write_table
+
+    def slow_write(*args, **kwargs):
+        writing.set()
+        release.wait(10)
+        return write_table(*args, **kwargs)
+
+    monkeypatch.setattr(data_connectors.pq, "write_table", slow_write)
+    spill = threading.Thread(target=cache.put, args=(key("b"), make_frame(offset=5000), 60))
+    spill.start()
+    assert writing.wait(10)
+    assert cache.invalidate() == 2
+    release.set()
+    spill.join(10)
+
+    assert cache.get(key("a")) is None
+    assert cache.stats()["disk_entries"] == 0
+    assert os.listdir(tmp_path) == []
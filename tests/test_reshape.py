@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.reshape import deduplicate_dataframe, pivot_dataframe, unpivot_dataframe
+
+def make_frame(rows=200):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "region": rng.choice(["North", "South", "East", None], rows),
+        "year": rng.choice([2021, 2022, 2023], rows),
+        "product": rng.choice(["a", "b", "c", None], rows),
+        "sales": rng.normal(100, 20, rows).round(2),
+        "units": rng.integers(0, 20, rows),
+    })
+    df.loc[rng.random(rows) < 0.15, "sales"] = np.nan
+    return df
+
+def pandas_pivot(df, index, columns, values, aggfunc):
+    """
+    Reference pivot with pivot_table, flattened to the layout of
+    pivot_dataframe.
+    """
+    table = pd.pivot_table(df, index=index, columns=columns, values=values, aggfunc=aggfunc)
+    if isinstance(values, str):
+        table.columns = [str(label) for label in table.columns]
+    else:
+        table.columns = [f"{value}_{label}" for value, label in table.columns]
+    return table.reset_index()
+
+def assert_same_pivot(result, expected):
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+    # pivot_table drops value columns without any cell
+    extra = result.columns.difference(expected.columns)
+    assert result[extra].isna().all().all()
+
+@pytest.mark.parametrize("aggfunc", ["sum", "mean", "min", "max", "count"])
+@pytest.mark.parametrize("chunk_rows", [None, 7])
+def test_pivot_matches_pivot_table(aggfunc, chunk_rows):
+    df = make_frame()
+    result = pivot_dataframe(df, ["region"], "product", "sales", aggfunc, chunk_rows=chunk_rows)
+    assert_same_pivot(result, pandas_pivot(df, ["region"], "product", "sales", aggfunc))
+
+@pytest.mark.parametrize("aggfunc", ["sum", "mean", "count"])
+@pytest.mark.parametrize("chunk_rows", [None, 13])
+def test_pivot_several_values_and_keys(aggfunc, chunk_rows):
+    df = make_frame()
+    result = pivot_dataframe(df, ["region", "year"], "product", ["sales", "units"], aggfunc, chunk_rows=chunk_rows)
+    assert_same_pivot(result, pandas_pivot(df, ["region", "year"], "product", ["sales", "units"], aggfunc))
+
+def test_pivot_numeric_pivot_column():
+    df = make_frame()
+    result = pivot_dataframe(df, ["product"], "year", "units", "sum")
+    assert_same_pivot(result, pandas_pivot(df, ["product"], "year", "units", "sum"))
+
+def test_pivot_median_ignores_chunking():
+    df = make_frame()
+    result = pivot_dataframe(df, ["region"], "product", "sales", "median", chunk_rows=7)
+    assert_same_pivot(result, pandas_pivot(df, ["region"], "product", "sales", "median"))
+
+def test_pivot_empty_frame():
+    df = make_frame(0)
+    result = pivot_dataframe(df, ["region"], "product", "sales", "sum")
+    assert result.empty
+    assert list(result.columns) == ["region"]
+
+def test_pivot_rejects_pivot_column_in_index():
+    with pytest.raises(ValueError):
+        pivot_dataframe(make_frame(), ["region"], "region", "sales")
+
+@pytest.mark.parametrize("value_columns", [None, ["sales"], ["sales", "units"], ["units", "product"]])
+def test_unpivot_matches_melt(value_columns):
+    df = make_frame(50)
+    id_columns = ["region", "year"]
+    if value_columns is None:
+        expected = df.melt(id_vars=id_columns)
+    else:
+        expected = df.melt(id_vars=id_columns, value_vars=value_columns)
+    result = unpivot_dataframe(df, id_columns, value_columns)
+    result["variable"] = result["variable"].astype(object)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+def test_unpivot_keeps_value_dtypes():
+    df = make_frame(50)
+    result = unpivot_dataframe(df, ["region"], ["units"])
+    assert result["value"].dtype == df["units"].dtype
+
+def test_unpivot_empty_frame():
+    df = make_frame(0)
+    result = unpivot_dataframe(df, ["region"], ["sales", "units"])
+    expected = df.melt(id_vars=["region"], value_vars=["sales", "units"])
+    assert list(result.columns) == list(expected.columns)
+    assert result.empty
+
+@pytest.mark.parametrize("subset", [None, ["region"], ["region", "product"], "year"])
+@pytest.mark.parametrize("keep", ["first", "last"])
+def test_deduplicate_matches_drop_duplicates(subset, keep):
+    df = make_frame()
+    result = deduplicate_dataframe(df, subset, keep)
+    pd.testing.assert_frame_equal(result, df.drop_duplicates(subset=subset, keep=keep))
+
+def test_deduplicate_mixed_dtypes_and_missing():
+    df = pd.DataFrame({
+        "a": pd.Series([1, None, 1, None, 2], dtype="Int64"),
+        "b": [np.nan, np.nan, np.nan, np.nan, 1.5],
+        "c": ["x", None, "x", None, "y"]
+    })
+    result = deduplicate_dataframe(df)
+    pd.testing.assert_frame_equal(result, df.drop_duplicates())
+
+def test_deduplicate_empty_frame():
+    df = make_frame(0)
+    pd.testing.assert_frame_equal(deduplicate_dataframe(df, ["region"]), df.drop_duplicates(subset=["region"]))
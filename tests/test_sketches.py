@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_processing import get_data_summary, SUMMARY_APPROXIMATE_ROWS
+from utils.sketches import approx_distinct, grouped_approx_distinct, hash_values
+
+# HyperLogLog with 2**14 registers has a standard error of about 0.8%
+TOLERANCE = 0.03
+
+def assert_close_count(estimate, exact, tolerance=TOLERANCE):
+    assert abs(estimate - exact) <= max(tolerance * exact, 2)
+
+@pytest.mark.parametrize("series", [
+    pd.Series(np.arange(100_000)),
+    pd.Series(np.arange(50_000) % 1234, dtype="float64"),
+    pd.Series([f"id-{i % 20_000}" for i in range(60_000)]),
+    pd.Series([1, 2.5, "a", "b", None, 1, "a", np.nan] * 1000, dtype=object),
+    pd.Series(pd.array([1, None, 3, None, 3], dtype="Int64")),
+    pd.Series(pd.date_range("2024-01-01", periods=5000, freq="h")),
+])
+def test_approx_distinct_matches_nunique(series):
+    assert_close_count(approx_distinct(series), series.nunique())
+
+def test_small_counts_are_exact():
+    for count in (0, 1, 7, 100):
+        assert approx_distinct(pd.Series(np.arange(count).repeat(3))) == count
+
+def test_missing_values_are_not_counted():
+    assert approx_distinct(pd.Series([None, np.nan, None], dtype=object)) == 0
+    assert approx_distinct(pd.Series([], dtype="float64")) == 0
+
+@pytest.mark.parametrize("group_count", [10, 5000])
+def test_grouped_counts_match_groupby_nunique(group_count):
+    rng = np.random.default_rng(0)
+    rows = 200_000
+    df = pd.DataFrame({
+        "group": rng.integers(0, group_count, rows),
+        "value": rng.integers(0, 50_000, rows).astype(float)
+    })
+    df.loc[rng.random(rows) < 0.1, "value"] = np.nan
+
+    present = df.dropna(subset=["value"])
+    result = grouped_approx_distinct(present["group"].to_numpy(), hash_values(df["value"]), group_count)
+    expected = df.groupby("group")["value"].nunique().reindex(range(group_count), fill_value=0).to_numpy()
+    assert np.all(np.abs(result - expected) <= np.maximum(0.1 * expected, 2))
+
+def test_grouped_counts_of_no_values():
+    result = grouped_approx_distinct(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64), 3)
+    np.testing.assert_array_equal(result, [0, 0, 0])
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "amount": rng.normal(50, 10, rows),
+        "units": rng.integers(0, 1000, rows),
+        "code": rng.integers(0, 30_000, rows).astype(str),
+        "mixed": pd.Series(rng.choice([1, "a", 2.5, None], rows), dtype=object)
+    })
+    df.loc[rng.random(rows) < 0.05, "amount"] = np.nan
+    return df
+
+def test_exact_summary_matches_pandas():
+    df = make_frame(1000)
+    summary = get_data_summary(df)
+    assert "approximate" not in summary
+    for info in summary["column_info"]:
+        column = df[info["name"]]
+        assert info["missing"] == column.isna().sum()
+        assert info["unique_values"] == column.nunique()
+
+def test_approximate_summary_matches_pandas():
+    df = make_frame(SUMMARY_APPROXIMATE_ROWS + 1)
+    summary = get_data_summary(df)
+    assert summary["approximate"]
+    assert summary["missing_values"] == df.isna().sum().sum()
+
+    columns = {info["name"]: info for info in summary["column_info"]}
+    for name, info in columns.items():
+        assert info["missing"] == df[name].isna().sum()
+        assert_close_count(info["unique_values"], df[name].nunique())
+
+    stats = columns["amount"]["stats"]
+    assert stats["min"] == df["amount"].min()
+    assert stats["max"] == df["amount"].max()
+    assert stats["mean"] == pytest.approx(df["amount"].mean())
+    assert stats["median"] == pytest.approx(df["amount"].median(), rel=0.02)
+
+def test_empty_summary():
+    df = make_frame(0)
+    summary = get_data_summary(df)
+    assert summary["rows"] == 0
+    assert all(info["unique_values"] == 0 for info in summary["column_info"])
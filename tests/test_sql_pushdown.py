@@ -0,0 +1,254 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_connectors import close_connection_pools, invalidate_query_cache
+from utils.data_processing import filter_dataframe
+from utils.datetimes import previous_period
+from utils.sql_pushdown import (
+    compile_query,
+    live_chart_data,
+    live_filter_data,
+    live_metric_types,
+    live_metric_value,
+    live_previous_metric_value,
+    live_table_data,
+    UnsupportedPushdown
+)
+
+SALES_ROWS = [
+    (1, "North", 10.5, "2024-01-05", 3),
+    (2, "South", None, "2024-01-06", 1),
+    (3, None, 7.25, None, 4),
+    (4, "North", 2.0, "2024-02-01", None),
+    (5, "East", None, "2024-02-10", 2),
+    (6, "Northeast", 4.5, "2024-02-11", 7),
+    (7, "south", 9.0, "2024-03-01", 1),
+]
+
+SOURCE_QUERY = "SELECT * FROM sales"
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    SQLite database with a sales table holding missing values in every
+    column but the key; yields the connection settings.
+    """
+    path = str(tmp_path / "sales.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sales (id INTEGER, region TEXT, amount REAL, day TEXT, units INTEGER)")
+    conn.executemany("INSERT INTO sales VALUES (?, ?, ?, ?, ?)", SALES_ROWS)
+    conn.commit()
+    conn.close()
+
+    yield {"db_type": "SQLite", "host": "", "port": "", "user": "", "password": "", "database": path}
+
+    invalidate_query_cache()
+    close_connection_pools()
+
+def read_sql(credentials, query, params=None):
+    conn = sqlite3.connect(credentials["database"])
+    try:
+        return pd.read_sql_query(query, conn, params=params or None)
+    finally:
+        conn.close()
+
+def assert_same(result, expected):
+    """
+    Compare frames whose missing values may be None in one and NaN in the other.
+    """
+    pd.testing.assert_frame_equal(
+        result.astype(object).where(result.notna(), np.nan),
+        expected.astype(object).where(expected.notna(), np.nan),
+        check_dtype=False
+    )
+
+def live_source(credentials):
+    return {"live": True, "query": SOURCE_QUERY, "data": read_sql(credentials, SOURCE_QUERY), "cache_ttl": 0}
+
+@pytest.mark.parametrize("filters", [
+    [{"column": "region", "operation": "equals", "value": "North"}],
+    [{"column": "region", "operation": "not_equals", "value": "North"}],
+    [{"column": "amount", "operation": "greater_than", "value": 5}],
+    [{"column": "units", "operation": "less_than", "value": 3}],
+    [{"column": "region", "operation": "contains", "value": "orth"}],
+    [{"column": "region", "operation": "contains", "value": "north"}],
+    [{"column": "region", "operation": "starts_with", "value": "S"}],
+    [{"column": "region", "operation": "ends_with", "value": "th"}],
+    [{"column": "region", "operation": "in_list", "value": ["North", "East"]}],
+    [{"column": "region", "operation": "in_list", "value": ["North", None]}],
+    [{"column": "region", "operation": "not_in_list", "value": ["North"]}],
+    [{"column": "region", "operation": "not_in_list", "value": ["North", None]}],
+    [{"column": "units", "operation": "in_list", "value": [np.int64(1), 4]}],
+    [{"column": "amount", "operation": "between", "value": (2.0, 9.0)}],
+    [{"column": "day", "operation": "date_range", "value": (pd.Timestamp("2024-01-06"), pd.Timestamp("2024-02-10"))}],
+    [{"column": "region", "operation": "equals", "value": "West"}],
+    [{"column": "region", "operation": "starts_with", "value": "N"},
+     {"column": "units", "operation": "greater_than", "value": 3}],
+    [],
+])
+def test_filters_match_filter_dataframe(database, filters):
+    df = read_sql(database, SOURCE_QUERY)
+    sql, params = compile_query("SQLite", SOURCE_QUERY, filters=filters)
+    expected = filter_dataframe(df, filters).reset_index(drop=True)
+    assert_same(read_sql(database, sql, params), expected)
+
+@pytest.mark.parametrize("value", ["a.b", "x*", "(y)"])
+def test_pattern_filters_stay_in_pandas(value):
+    with pytest.raises(UnsupportedPushdown):
+        compile_query("SQLite", SOURCE_QUERY, filters=[{"column": "region", "operation": "contains", "value": value}])
+
+@pytest.mark.parametrize("db_type", ["MySQL", "SQL Server"])
+def test_case_sensitive_text_filters_stay_in_pandas(db_type):
+    with pytest.raises(UnsupportedPushdown):
+        compile_query(db_type, SOURCE_QUERY, filters=[{"column": "region", "operation": "starts_with", "value": "N"}])
+
+def test_grouped_aggregates_match_groupby(database):
+    df = read_sql(database, SOURCE_QUERY)
+    sql, params = compile_query(
+        "SQLite", SOURCE_QUERY, group_by=["region"],
+        aggregates=[("SUM", "amount", "total"), ("AVG", "units", "average"), ("COUNT", "amount", "filled"), ("COUNT", None, "rows")]
+    )
+    result = read_sql(database, sql, params).sort_values("region", na_position="first").reset_index(drop=True)
+
+    grouped = df.groupby("region", dropna=False)
+    expected = pd.DataFrame({
+        "total": grouped["amount"].sum(min_count=1),
+        "average": grouped["units"].mean(),
+        "filled": grouped["amount"].count(),
+        "rows": grouped.size()
+    }).reset_index().sort_values("region", na_position="first").reset_index(drop=True)
+    assert_same(result, expected)
+
+def test_limit_and_columns(database):
+    sql, params = compile_query("SQLite", SOURCE_QUERY, columns=["id", "region"], limit=3)
+    expected = read_sql(database, SOURCE_QUERY)[["id", "region"]].head(3)
+    pd.testing.assert_frame_equal(read_sql(database, sql, params), expected)
+
+@pytest.mark.parametrize("metric_type,reduce", [
+    ("Sum", lambda series: series.sum()),
+    ("Average", lambda series: series.mean()),
+    ("Minimum", lambda series: series.min()),
+    ("Maximum", lambda series: series.max()),
+    ("Count", lambda series: series.count()),
+])
+@pytest.mark.parametrize("filter_value", [None, "North", "West"])
+@pytest.mark.parametrize("column", ["amount", "units"])
+def test_live_metric_matches_pandas(database, metric_type, reduce, filter_value, column):
+    source = live_source(database)
+    component = {"metric_column": column, "metric_type": metric_type, "filter": {"column": "region", "value": filter_value}}
+    df = source["data"]
+    if filter_value is not None:
+        df = df[df["region"] == filter_value]
+
+    result = live_metric_value(source, component, database)
+    expected = reduce(df[column])
+    if pd.isna(expected):
+        assert pd.isna(result)
+    else:
+        assert result == pytest.approx(expected)
+
+def pandas_previous_value(df, component):
+    """
+    Reference previous-period metric, computed in pandas on the full table.
+    """
+    if component["filter"]["value"] is not None:
+        df = df[df["region"] == component["filter"]["value"]]
+    dates = pd.to_datetime(df["day"])
+    start, end = previous_period(dates.max(), component["delta"]["period"])
+    previous = df[(dates >= start) & (dates <= end)]
+    if previous.empty:
+        return None
+    reduce = {"Sum": "sum", "Average": "mean", "Minimum": "min", "Maximum": "max", "Count": "count"}
+    return getattr(previous[component["metric_column"]], reduce[component["metric_type"]])()
+
+@pytest.mark.parametrize("metric_type", ["Sum", "Average", "Count", "Maximum"])
+@pytest.mark.parametrize("period", ["Day", "Week", "Month", "Year"])
+@pytest.mark.parametrize("filter_value", [None, "North", "West"])
+def test_live_previous_period_matches_pandas(database, metric_type, period, filter_value):
+    source = live_source(database)
+    component = {
+        "metric_column": "amount", "metric_type": metric_type,
+        "filter": {"column": "region", "value": filter_value},
+        "delta": {"date_column": "day", "period": period}
+    }
+    result = live_previous_metric_value(source, component, database)
+    expected = pandas_previous_value(source["data"], component)
+    if expected is None:
+        assert result is None
+    elif pd.isna(expected):
+        assert pd.isna(result)
+    else:
+        assert result == pytest.approx(expected)
+
+def test_live_previous_period_uses_the_whole_table(database):
+    # The local sample ends in January; the latest date comes from the database
+    source = dict(live_source(database), data=read_sql(database, SOURCE_QUERY).head(2))
+    component = {"metric_column": "amount", "metric_type": "Sum", "filter": {}, "delta": {"date_column": "day", "period": "Month"}}
+    assert live_previous_metric_value(source, component, database) == pytest.approx(10.5)
+
+def test_median_is_pushed_down_on_postgresql():
+    sql, _ = compile_query("PostgreSQL", SOURCE_QUERY, aggregates=[("MEDIAN", "amount", "amount")])
+    assert 'PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY "amount") AS "amount"' in sql
+
+@pytest.mark.parametrize("db_type", ["MySQL", "SQL Server", "SQLite"])
+def test_median_is_not_pushed_down_elsewhere(db_type):
+    with pytest.raises(UnsupportedPushdown):
+        compile_query(db_type, SOURCE_QUERY, aggregates=[("MEDIAN", "amount", "amount")])
+
+def test_live_median_never_falls_back_to_the_sample(database):
+    # SQLite has no median; the sample must not stand in for the table
+    source = live_source(database)
+    component = {"metric_column": "amount", "metric_type": "Median", "filter": {}}
+    with pytest.raises(UnsupportedPushdown):
+        live_metric_value(source, component, database)
+
+def test_live_metric_types_hide_median_without_database_support(database):
+    metric_types = ["Sum", "Average", "Minimum", "Maximum", "Count", "Median"]
+    source = live_source(database)
+    assert live_metric_types(source, database, metric_types) == metric_types[:-1]
+    assert live_metric_types(source, dict(database, db_type="PostgreSQL"), metric_types) == metric_types
+    assert live_metric_types(dict(source, live=False), database, metric_types) == metric_types
+
+def test_live_helpers_skip_sources_without_credentials(database):
+    source = live_source(database)
+    assert live_metric_value(source, {"metric_column": "amount", "metric_type": "Sum"}, None) is None
+    assert live_table_data(source, ["id"], None) is None
+
+def test_live_bar_chart_matches_groupby_sum(database):
+    source = live_source(database)
+    chart_config = {"type": "bar", "x_axis": "region", "y_axis": "amount"}
+    result = live_chart_data(source, chart_config, ["region", "amount"], database)
+    result = result.sort_values("region", na_position="first").reset_index(drop=True)
+
+    expected = (
+        source["data"].groupby("region", dropna=False)["amount"].sum(min_count=1)
+        .reset_index().sort_values("region", na_position="first").reset_index(drop=True)
+    )
+    assert_same(result, expected)
+
+def test_live_line_chart_selects_rows(database):
+    source = live_source(database)
+    chart_config = {"type": "line", "x_axis": "day", "y_axis": "units"}
+    result = live_chart_data(source, chart_config, ["day", "units"], database)
+    pd.testing.assert_frame_equal(result, source["data"][["day", "units"]], check_dtype=False)
+
+def test_live_table_matches_source(database):
+    source = live_source(database)
+    pd.testing.assert_frame_equal(live_table_data(source, ["region", "amount"], database), source["data"][["region", "amount"]])
+    pd.testing.assert_frame_equal(live_table_data(source, [], database), source["data"])
+
+def test_live_select_box_options_match_unique(database):
+    source = live_source(database)
+    component = {"filter_column": "region", "filter_type": "Select Box"}
+    result = live_filter_data(source, component, database)
+    assert sorted(result["region"]) == sorted(source["data"]["region"].dropna().unique())
+
+@pytest.mark.parametrize("column", ["amount", "units"])
+def test_live_slider_bounds_match_min_max(database, column):
+    source = live_source(database)
+    component = {"filter_column": column, "filter_type": "Slider"}
+    result = live_filter_data(source, component, database)
+    assert result[column].tolist() == [source["data"][column].min(), source["data"][column].max()]
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.text_ops import apply_text_manipulation
+
+def make_frame():
+    return pd.DataFrame({
+        "text": pd.Series(["alpha-1", " Bravo-22 ", None, "", "charlie-333-x", "straße-4", "ÉCHO", "a,b,,c"], dtype=object),
+        "code": [1, 22, -3, 0, 4, 55, 6, 7],
+        "price": [1.5, np.nan, 3.0, -0.25, 1e6, 2.0, 0.1, 7.0],
+        "stock": pd.array([1, None, 3, 4, None, 6, 7, 8], dtype="Int64"),
+        "mixed": [1, "b", 2.5, None, True, "f", "g", "h"],
+        "category": pd.Categorical(["x", "y", None, "x", "y", "x", "z", "z"])
+    })
+
+def pandas_text_manipulation(df, text_params):
+    """
+    The astype(str) based pandas implementation of each manipulation.
+    """
+    kind = text_params["type"]
+    if kind == "concatenate" and text_params.get("concat_with") == "column":
+        return df[text_params["column1"]].astype(str) + text_params.get("separator", "") + df[text_params["column2"]].astype(str)
+
+    values = df[text_params["column"]].astype(str)
+    if kind == "extract_substring":
+        start, length = text_params.get("start", 0), text_params.get("length")
+        return values.apply(lambda x: x[start:start + length] if len(x) > start else "")
+    if kind == "concatenate":
+        text = text_params.get("text", "")
+        return text + values if text_params.get("position") == "before" else values + text
+    if kind == "replace":
+        return values.str.replace(text_params["find"], text_params["replace"], regex=False)
+    if kind == "change_case":
+        return getattr(values.str, {"upper": "upper", "lower": "lower", "title_case": "title"}[text_params["case"]])()
+    if kind == "trim":
+        method = {"left": "lstrip", "right": "rstrip"}.get(text_params.get("side", "both"), "strip")
+        return getattr(values.str, method)(text_params.get("characters"))
+    if kind == "pad":
+        return values.str.pad(text_params["width"], side=text_params["side"], fillchar=text_params.get("fill_character") or " ")
+    if kind == "split_part":
+        return values.str.split(text_params["delimiter"], regex=False).str[text_params["part"] - 1].fillna("")
+    if kind == "regex_extract":
+        pattern, group = text_params["pattern"], text_params["group"]
+        if group == 0:
+            return values.str.extract(f"({pattern})", expand=True)[0]
+        return values.str.extract(pattern, expand=True)[group - 1]
+
+def as_list(values):
+    return [None if pd.isna(value) else value for value in values.astype(object)]
+
+CASES = [
+    {"type": "extract_substring", "column": "text", "start": 0, "length": 5},
+    {"type": "extract_substring", "column": "code", "start": 1, "length": 2},
+    {"type": "extract_substring", "column": "price", "start": 0, "length": 3},
+    {"type": "concatenate", "concat_with": "column", "column1": "text", "column2": "code", "separator": "/"},
+    {"type": "concatenate", "concat_with": "column", "column1": "stock", "column2": "mixed", "separator": ""},
+    {"type": "concatenate", "concat_with": "column", "column1": "category", "column2": "price", "separator": "-"},
+    {"type": "concatenate", "concat_with": "text", "column": "text", "text": "_x", "position": "after"},
+    {"type": "concatenate", "concat_with": "text", "column": "stock", "text": "#", "position": "before"},
+    {"type": "replace", "column": "text", "find": "-", "replace": ":"},
+    {"type": "replace", "column": "text", "find": "", "replace": "."},
+    {"type": "replace", "column": "mixed", "find": "a", "replace": "A"},
+    {"type": "change_case", "column": "text", "case": "upper"},
+    {"type": "change_case", "column": "text", "case": "lower"},
+    {"type": "change_case", "column": "text", "case": "title_case"},
+    {"type": "change_case", "column": "category", "case": "upper"},
+    {"type": "trim", "column": "text", "side": "both"},
+    {"type": "trim", "column": "text", "side": "left", "characters": " a"},
+    {"type": "trim", "column": "text", "side": "right", "characters": "x-"},
+    {"type": "pad", "column": "code", "width": 5, "side": "left", "fill_character": "0"},
+    {"type": "pad", "column": "text", "width": 9, "side": "right", "fill_character": "*"},
+    {"type": "pad", "column": "text", "width": 10, "side": "both", "fill_character": "*"},
+    {"type": "split_part", "column": "text", "delimiter": "-", "part": 2},
+    {"type": "split_part", "column": "text", "delimiter": ",", "part": 3},
+    {"type": "split_part", "column": "price", "delimiter": ".", "part": 1},
+    {"type": "regex_extract", "column": "text", "pattern": r"([a-z]+)-(\d+)", "group": 2},
+    {"type": "regex_extract", "column": "text", "pattern": r"[a-z]+", "group": 0},
+    {"type": "regex_extract", "column": "text", "pattern": r"(\w+)(?=-)", "group": 1},
+    {"type": "regex_extract", "column": "code", "pattern": r"^(-?)(\d)", "group": 2},
+]
+
+@pytest.mark.parametrize("text_params", CASES, ids=lambda params: "-".join(str(value) for value in params.values()))
+def test_text_manipulation_matches_pandas(text_params):
+    df = make_frame()
+    assert as_list(apply_text_manipulation(df, text_params)) == as_list(pandas_text_manipulation(df, text_params))
+
+@pytest.mark.parametrize("text_params", CASES[:3] + CASES[6:9] + CASES[11:12], ids=lambda params: params["type"])
+def test_arrow_strings_match_pandas(text_params):
+    df = make_frame()
+    df["text"] = df["text"].astype(pd.StringDtype("pyarrow"))
+    assert as_list(apply_text_manipulation(df, text_params)) == as_list(pandas_text_manipulation(df, text_params))
+
+@pytest.mark.parametrize("text_params", CASES, ids=lambda params: "-".join(str(value) for value in params.values()))
+def test_empty_frame(text_params):
+    result = apply_text_manipulation(make_frame().iloc[:0], text_params)
+    assert len(result) == 0
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_processing import apply_transformation
+from utils.transformation_cache import StepResultCache, run_steps_cached
+
+def make_frame(rows=300):
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        "units": rng.integers(0, 20, rows),
+        "price": np.where(rng.random(rows) < 0.1, np.nan, rng.normal(20, 5, rows)),
+        "region": rng.choice(["North", "South", None], rows)
+    })
+
+def steps_with(threshold, fill="Unknown"):
+    return [
+        {"operation": "handle_missing", "params": {"method": "fill_value", "columns": ["region"], "value": fill}},
+        {"operation": "create_column", "params": {
+            "new_column": "revenue",
+            "method": "formula",
+            "formula_params": {"type": "custom_formula", "formula": "{units} * {price}"}
+        }},
+        {"operation": "filter_rows", "params": {"column": "revenue", "type": "greater_than", "value": threshold}},
+        {"operation": "apply_function", "params": {"column": "units", "function": "x * 10"}}
+    ]
+
+def apply_directly(df, steps):
+    for step in steps:
+        df = apply_transformation(df, step["operation"], step["params"])
+    return df
+
+def test_cached_runs_match_direct_application():
+    df = make_frame()
+    before = df.copy()
+    cache = StepResultCache()
+
+    first, steps_run = run_steps_cached(df, steps_with(100), cache)
+    assert steps_run == 4
+    pd.testing.assert_frame_equal(first, apply_directly(df, steps_with(100)))
+
+    # Editing the filter reruns it and the steps after it only
+    second, steps_run = run_steps_cached(df, steps_with(200), cache)
+    assert steps_run == 2
+    pd.testing.assert_frame_equal(second, apply_directly(df, steps_with(200)))
+
+    # Mutating steps never change cached frames or the source
+    third, steps_run = run_steps_cached(df, steps_with(100), cache)
+    assert steps_run == 0
+    pd.testing.assert_frame_equal(third, first)
+    pd.testing.assert_frame_equal(df, before)
+
+def test_different_sources_do_not_share_results():
+    cache = StepResultCache()
+    df = make_frame()
+    other = df.copy()
+    other.loc[5, "units"] = 1000
+    run_steps_cached(df, steps_with(100), cache)
+    result, steps_run = run_steps_cached(other, steps_with(100), cache)
+    assert steps_run == 4
+    pd.testing.assert_frame_equal(result, apply_directly(other, steps_with(100)))
+
+def test_budget_is_respected():
+    df = make_frame(5000)
+    cache = StepResultCache(max_bytes=int(df.memory_usage(deep=True).sum() * 1.5))
+    run_steps_cached(df, steps_with(100), cache)
+    assert cache.current_bytes <= cache.max_bytes
+    assert len(cache) >= 1
+
+def test_empty_frame():
+    df = make_frame(0)
+    result, _ = run_steps_cached(df, steps_with(100), StepResultCache())
+    assert result.empty
+    assert list(result.columns) == ["units", "price", "region", "revenue"]
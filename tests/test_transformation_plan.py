@@ -0,0 +1,187 @@
+import json
+import os
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.transformation_plan import (
+    _get_pool,
+    _start_tracing,
+    _stop_tracing,
+    execute_transformation,
+    explain_transformation,
+    optimize_steps,
+    profile_to_json,
+    profile_transformation,
+    run_partitioned,
+    PARALLEL_MIN_ROWS
+)
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Sales": rng.integers(0, 1000, rows).astype(float),
+        "Units": rng.integers(1, 50, rows),
+        "Region": rng.choice(["North", "South", None], rows)
+    })
+
+ROW_LOCAL_STEPS = [
+    {"operation": "create_column", "params": {
+        "new_column": "Price",
+        "method": "formula",
+        "formula_params": {"type": "custom_formula", "formula": "{Sales} / {Units}"}
+    }},
+    {"operation": "filter_rows", "params": {"column": "Sales", "type": "greater_than", "value": 500}}
+]
+
+def test_partitioned_matches_single_process():
+    df = make_frame(PARALLEL_MIN_ROWS)
+    expected = execute_transformation(df, ROW_LOCAL_STEPS, optimize=False)
+    result = run_partitioned(df, ROW_LOCAL_STEPS, workers=2)
+    pd.testing.assert_frame_equal(result, expected)
+
+def test_partitioned_leaves_source_untouched():
+    df = make_frame(PARALLEL_MIN_ROWS)
+    before = df.copy()
+    run_partitioned(df, ROW_LOCAL_STEPS, workers=2)
+    pd.testing.assert_frame_equal(df, before)
+
+def test_partitioned_keeps_every_column_type():
+    rows = PARALLEL_MIN_ROWS
+    rng = np.random.default_rng(1)
+    df = make_frame(rows).assign(
+        Day=pd.date_range("2024-01-01", periods=rows, freq="min"),
+        Zoned=pd.date_range("2024-01-01", periods=rows, freq="min", tz="UTC"),
+        Flag=rng.random(rows) < 0.5,
+        Code=pd.Categorical(rng.choice(["a", "b", "c"], rows)),
+        Discount=pd.array(rng.integers(0, 5, rows), dtype="Int64")
+    )
+    df.index = np.arange(rows)[::-1] * 3
+    expected = execute_transformation(df, ROW_LOCAL_STEPS, optimize=False)
+    pd.testing.assert_frame_equal(run_partitioned(df, ROW_LOCAL_STEPS, workers=2), expected)
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs /dev/shm to list shared memory")
+def test_partitioned_runs_share_one_pool():
+    df = make_frame(PARALLEL_MIN_ROWS)
+    before = set(os.listdir("/dev/shm"))
+    run_partitioned(df, ROW_LOCAL_STEPS, workers=2)
+    pool = _get_pool()
+    run_partitioned(df, ROW_LOCAL_STEPS, workers=2)
+    assert _get_pool() is pool
+    # The shared memory of each run is released with it
+    assert set(os.listdir("/dev/shm")) == before
+
+def test_partitioned_empty_frame():
+    df = make_frame(0)
+    result = run_partitioned(df, ROW_LOCAL_STEPS, workers=2)
+    assert list(result.columns) == ["Sales", "Units", "Region", "Price"]
+    assert result.empty
+
+def share_step(formula):
+    return {"operation": "create_column", "params": {
+        "new_column": "Share",
+        "method": "formula",
+        "formula_params": {"type": "custom_formula", "formula": formula}
+    }}
+
+SALES_FILTER = {"operation": "filter_rows", "params": {"column": "Sales", "type": "greater_than", "value": 500}}
+
+@pytest.mark.parametrize("steps", [
+    [share_step("{Sales} / {Sales}.sum()"), SALES_FILTER],
+    [share_step("{Sales} - {Sales}.mean()"), SALES_FILTER],
+    [{"operation": "apply_function", "params": {"column": "Units", "function": "x // 2"}}, SALES_FILTER],
+    [{"operation": "apply_function", "params": {"column": "Units", "function": "x if x else 1"}}, SALES_FILTER],
+    ROW_LOCAL_STEPS,
+    [{"operation": "sort_data", "params": {"column": "Units", "ascending": False}}, SALES_FILTER],
+    [{"operation": "handle_missing", "params": {"method": "fill_value", "columns": ["Region"], "value": "None"}},
+     {"operation": "filter_rows", "params": {"column": "Region", "type": "equal_to", "value": "None"}}],
+])
+def test_optimized_matches_unoptimized(steps):
+    df = make_frame(1000)
+    expected = execute_transformation(df, steps, optimize=False)
+    result = execute_transformation(df, steps, optimize=True)
+    pd.testing.assert_frame_equal(result[expected.columns], expected)
+
+def test_python_steps_are_pushdown_barriers():
+    steps = [share_step("{Sales} / {Sales}.sum()"), SALES_FILTER]
+    plan = optimize_steps(steps, ["Sales", "Units", "Region"])
+    assert [step["operation"] for step in plan["steps"]] == ["create_column", "filter_rows"]
+
+def test_optimized_empty_frame():
+    df = make_frame(0)
+    steps = [share_step("{Sales} * 2"), SALES_FILTER]
+    result = execute_transformation(df, steps)
+    assert result.empty
+    assert "Share" in result.columns
+
+PROFILED_STEPS = ROW_LOCAL_STEPS + [{"operation": "select_columns", "params": {"columns": ["Sales", "Price"]}}]
+
+def test_profile_records_every_step():
+    df = make_frame(1000)
+    profile = profile_transformation(df, PROFILED_STEPS)
+    pd.testing.assert_frame_equal(profile["result"], execute_transformation(df, PROFILED_STEPS))
+    assert profile["plan"] == explain_transformation(PROFILED_STEPS, list(df.columns))
+
+    load, *records = profile["steps"]
+    # Only Sales and Units are read, so Region is never loaded
+    assert load == {**load, "step": 0, "operation": "load_columns",
+                    "rows_in": 1000, "columns_in": 3, "rows_out": 1000, "columns_out": 2}
+
+    # The filter runs first but still points back at the second recipe step
+    kept = int((df["Sales"] > 500).sum())
+    assert [(record["step"], record["operation"], record["recipe_step"]) for record in records] == [
+        (1, "filter_rows", 2), (2, "create_column", 1), (3, "select_columns", 3)
+    ]
+    assert [(record["rows_in"], record["columns_in"], record["rows_out"], record["columns_out"]) for record in records] == [
+        (1000, 2, kept, 2), (kept, 2, kept, 3), (kept, 3, kept, 2)
+    ]
+    assert all(record["seconds"] >= 0 and record["peak_memory_bytes"] >= 0 for record in profile["steps"])
+
+def test_unoptimized_profile_follows_the_recipe():
+    df = make_frame(1000)
+    profile = profile_transformation(df, PROFILED_STEPS, optimize=False)
+    pd.testing.assert_frame_equal(profile["result"], execute_transformation(df, PROFILED_STEPS, optimize=False))
+    assert profile["plan"]["steps"] == []
+
+    kept = int((df["Sales"] > 500).sum())
+    assert [(record["recipe_step"], record["operation"]) for record in profile["steps"]] == [
+        (1, "create_column"), (2, "filter_rows"), (3, "select_columns")
+    ]
+    assert [(record["rows_in"], record["columns_in"], record["rows_out"], record["columns_out"]) for record in profile["steps"]] == [
+        (1000, 3, 1000, 4), (1000, 4, kept, 4), (kept, 4, kept, 2)
+    ]
+
+def test_profile_leaves_source_untouched():
+    df = make_frame(1000)
+    before = df.copy()
+    profile_transformation(df, PROFILED_STEPS)
+    pd.testing.assert_frame_equal(df, before)
+
+def test_profile_json_round_trip():
+    profile = profile_transformation(make_frame(100), PROFILED_STEPS)
+    document = json.loads(profile_to_json(profile, recipe=PROFILED_STEPS))
+    assert document["steps"] == profile["steps"]
+    assert document["plan"] == profile["plan"]
+    assert document["recipe"] == PROFILED_STEPS
+    assert document["total_seconds"] == profile["total_seconds"]
+    pd.Timestamp(document["profiled_at"])
+    assert "result" not in document
+
+def test_profile_keeps_tracing_started_elsewhere():
+    # Another profile (or the caller) still needs the trace when this one ends
+    _start_tracing()
+    try:
+        profile_transformation(make_frame(100), PROFILED_STEPS)
+        assert tracemalloc.is_tracing()
+    finally:
+        _stop_tracing()
+    assert not tracemalloc.is_tracing()
+
+    tracemalloc.start()
+    try:
+        profile_transformation(make_frame(100), PROFILED_STEPS)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
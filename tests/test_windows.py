@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.windows import apply_window
+
+def make_frame():
+    return pd.DataFrame({
+        "store": ["A", "B", "A", None, "B", "A", "B", None, "A", "C"],
+        "day": [3, 1, 1, 2, 2, 2, np.nan, 1, np.nan, 5],
+        "sales": [10.0, np.nan, 4.0, 7.0, 2.5, np.nan, 1.0, 3.0, 6.0, np.nan],
+        "units": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+        "note": ["x", None, "y", "z", "w", None, "v", "u", "t", "s"]
+    })
+
+def pandas_sorted_groups(df, partition_by, order_by, ascending=True):
+    """
+    Yield the partitions of df as frames sorted by the order-by columns,
+    missing values last, ties in row order.
+    """
+    groups = [df] if not partition_by else (
+        group for _, group in df.groupby(partition_by, dropna=False, sort=False)
+    )
+    for group in groups:
+        if order_by:
+            group = group.sort_values(order_by, ascending=ascending, na_position="last", kind="stable")
+        yield group
+
+def pandas_window(df, function, column, partition_by, order_by, ascending=True, preceding=None, following=0):
+    """
+    Reference window aggregate: each row's frame is reduced with the
+    matching pandas Series reduction.
+    """
+    result = pd.Series(np.nan, index=df.index, dtype=float)
+    for group in pandas_sorted_groups(df, partition_by, order_by, ascending):
+        values = group[column]
+        for position, label in enumerate(group.index):
+            lower = 0 if preceding is None else max(position - preceding, 0)
+            upper = len(group) if following is None else position + following + 1
+            frame = values.iloc[lower:upper]
+            if function == "sum":
+                result[label] = frame.sum(min_count=1)
+            else:
+                result[label] = getattr(frame, function)()
+    return result
+
+@pytest.mark.parametrize("function", ["sum", "mean", "min", "max", "count"])
+@pytest.mark.parametrize("frame", [
+    None,
+    {"preceding": None, "following": None},
+    {"preceding": 1, "following": 0},
+    {"preceding": 2, "following": 1},
+    {"preceding": 0, "following": None},
+    {"preceding": 0, "following": 2},
+])
+@pytest.mark.parametrize("column", ["sales", "units"])
+def test_aggregates_match_pandas(function, frame, column):
+    df = make_frame()
+    params = {"function": function, "column": column, "partition_by": ["store"], "order_by": ["day"]}
+    if frame is not None:
+        params["frame"] = frame
+    frame = frame or {}
+    result = apply_window(df, params)
+    expected = pandas_window(
+        df, function, column, ["store"], ["day"],
+        preceding=frame.get("preceding"), following=frame.get("following", 0)
+    )
+    pd.testing.assert_series_equal(result, expected, check_dtype=False)
+
+@pytest.mark.parametrize("function", ["sum", "min", "count"])
+def test_descending_order_without_partition(function):
+    df = make_frame()
+    params = {"function": function, "column": "sales", "order_by": ["day", "units"], "ascending": [False, True]}
+    result = apply_window(df, params)
+    expected = pandas_window(df, function, "sales", [], ["day", "units"], ascending=[False, True])
+    pd.testing.assert_series_equal(result, expected, check_dtype=False)
+
+def test_running_sum_matches_groupby_cumsum():
+    df = make_frame().dropna(subset=["store"])
+    result = apply_window(df, {"function": "sum", "column": "units", "partition_by": ["store"]})
+    expected = df.groupby("store")["units"].cumsum()
+    pd.testing.assert_series_equal(result, expected, check_dtype=False, check_names=False)
+
+def test_rolling_mean_matches_groupby_rolling():
+    df = make_frame()
+    params = {"function": "mean", "column": "sales", "partition_by": ["store"], "frame": {"preceding": 2, "following": 0}}
+    result = apply_window(df, params)
+    expected = (
+        df.groupby("store", dropna=False)["sales"]
+        .rolling(3, min_periods=1).mean()
+        .reset_index(level=0, drop=True)
+        .reindex(df.index)
+    )
+    pd.testing.assert_series_equal(result, expected, check_dtype=False, check_names=False)
+
+@pytest.mark.parametrize("function,offset", [("lag", 1), ("lag", 2), ("lead", 1), ("lead", 3)])
+@pytest.mark.parametrize("column", ["sales", "units", "note"])
+def test_offsets_match_groupby_shift(function, offset, column):
+    df = make_frame()
+    params = {"function": function, "column": column, "partition_by": ["store"], "order_by": ["day"], "offset": offset}
+    result = apply_window(df, params)
+    shift = offset if function == "lag" else -offset
+    ordered = df.sort_values("day", na_position="last", kind="stable")
+    expected = ordered.groupby("store", dropna=False)[column].shift(shift).reindex(df.index)
+    assert result.isna().equals(expected.isna())
+    pd.testing.assert_series_equal(result[expected.notna()], expected.dropna(), check_dtype=False, check_names=False)
+
+def test_offset_default_fills_partition_edges():
+    df = make_frame()
+    params = {"function": "lag", "column": "units", "partition_by": ["store"], "order_by": ["day"], "default": 0}
+    result = apply_window(df, params)
+    ordered = df.sort_values("day", na_position="last", kind="stable")
+    expected = ordered.groupby("store", dropna=False)["units"].shift(1, fill_value=0).reindex(df.index)
+    pd.testing.assert_series_equal(result, expected, check_dtype=False, check_names=False)
+
+@pytest.mark.parametrize("function,method", [("rank", "min"), ("dense_rank", "dense")])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_ranks_match_groupby_rank(function, method, ascending):
+    df = make_frame()
+    params = {"function": function, "partition_by": ["store"], "order_by": ["day"], "ascending": ascending}
+    result = apply_window(df, params)
+    expected = df.groupby("store", dropna=False)["day"].rank(method=method, ascending=ascending, na_option="bottom")
+    pd.testing.assert_series_equal(result, expected, check_dtype=False, check_names=False)
+
+def test_row_number_matches_groupby_cumcount():
+    df = make_frame()
+    result = apply_window(df, {"function": "row_number", "partition_by": ["store"], "order_by": ["day"]})
+    ordered = df.sort_values("day", na_position="last", kind="stable")
+    expected = (ordered.groupby("store", dropna=False).cumcount() + 1).reindex(df.index)
+    pd.testing.assert_series_equal(result, expected, check_dtype=False, check_names=False)
+
+@pytest.mark.parametrize("function", ["sum", "max", "lag", "row_number", "rank"])
+def test_empty_frame(function):
+    df = make_frame().iloc[:0]
+    params = {"function": function, "column": "sales", "partition_by": ["store"], "order_by": ["day"]}
+    result = apply_window(df, params)
+    assert len(result) == 0
+
+def test_unknown_function():
+    with pytest.raises(ValueError):
+        apply_window(make_frame(), {"function": "median", "column": "sales"})
@@ -0,0 +1,373 @@
+import pandas as pd
+import numpy as np
+import re
+from collections import OrderedDict
+from utils.fingerprint import dataframe_fingerprint
+from utils.sketches import hash_values, grouped_approx_distinct
+
+# Aggregate functions offered in the interface; pNN and approx_pNN give any percentile
+AGGREGATE_FUNCTIONS = [
+    "sum", "mean", "median", "min", "max", "count", "std", "var",
+    "nunique", "approx_nunique", "p90", "approx_p90", "approx_median"
+]
+
+# Values kept per group for approximate percentiles
+APPROX_PERCENTILE_SAMPLE = 5000
+
+# HyperLogLog precision of approximate distinct counts (about 1.6% error)
+APPROX_DISTINCT_PRECISION = 12
+
+# Aggregation results, keyed by (fingerprint, group columns, aggregations)
+_AGGREGATE_CACHE = OrderedDict()
+_AGGREGATE_CACHE_SIZE = 16
+
+_PERCENTILE_PATTERN = re.compile(r"(approx_)?p(\d+(?:\.\d+)?)$")
+
+def _parse_percentile(func):
+    """
+    Parse a percentile aggregate name (median, p90, approx_p95, ...).
+
+    Returns a (quantile, approximate) pair, or None for other functions.
+    """
+    if func in ("median", "approx_median"):
+        return 0.5, func == "approx_median"
+
+    match = _PERCENTILE_PATTERN.match(func)
+    if match is None or float(match.group(2)) > 100:
+        return None
+    return float(match.group(2)) / 100, match.group(1) is not None
+
+def factorize_keys(df, group_columns):
+    """
+    Number the groups of a dataframe in sorted key order.
+
+    A single key column that is already sorted is split at its value
+    changes without hashing. Otherwise each key column is factorized once
+    and the codes of several keys are combined pairwise.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to group
+    group_columns : list
+        Columns to group by
+
+    Returns:
+    --------
+    tuple
+        (int64 group number per row, -1 where a key is missing; number of
+        groups; whether the group numbers never decrease)
+    """
+    if len(group_columns) == 1:
+        key = df[group_columns[0]]
+        if (not isinstance(key.dtype, pd.api.extensions.ExtensionDtype)
+                and key.is_monotonic_increasing and not key.hasnans):
+            values = key.to_numpy()
+            if len(values) == 0:
+                return np.empty(0, dtype=np.int64), 0, True
+            codes = np.cumsum(np.r_[False, values[1:] != values[:-1]], dtype=np.int64)
+            return codes, int(codes[-1]) + 1, True
+
+    codes = None
+    group_count = 1
+    for column in group_columns:
+        column_codes, uniques = pd.factorize(df[column], sort=True)
+        column_codes = column_codes.astype(np.int64)
+
+        if codes is None:
+            codes, group_count = column_codes, len(uniques)
+            continue
+
+        # Codes sorted by the first key, then the second, and so on
+        missing = (codes < 0) | (column_codes < 0)
+        combined = np.where(missing, -1, codes * len(uniques) + column_codes)
+        combinations = group_count * len(uniques)
+
+        if combinations <= max(len(combined), 1 << 20):
+            # Few possible combinations: renumber the ones that occur directly
+            occurs = np.zeros(combinations + 1, dtype=bool)
+            occurs[combined + 1] = True
+            occurs[0] = False
+            renumber = np.cumsum(occurs) - 1
+            codes = np.where(missing, -1, renumber[combined + 1])
+            group_count = int(occurs.sum())
+        else:
+            codes, combined_uniques = pd.factorize(combined, sort=True, use_na_sentinel=False)
+            codes = codes.astype(np.int64)
+            group_count = len(combined_uniques)
+
+            # -1 sorts first; shift so missing keys stay at -1
+            if missing.any():
+                codes -= 1
+                group_count -= 1
+
+    is_sorted = len(codes) == 0 or (codes[0] >= 0 and bool(np.all(codes[1:] >= codes[:-1])))
+    return codes, group_count, is_sorted
+
+class _Groups:
+    """
+    Group numbers of the rows that have all keys, shared by all aggregates
+    of one call, along with per-column sums and counts computed so far.
+    """
+
+    def __init__(self, codes, group_count, is_sorted):
+        self.group_count = group_count
+        self.is_sorted = is_sorted
+
+        # Rows with a missing key are left out of every aggregate
+        self.rows = None if is_sorted or not (codes < 0).any() else np.flatnonzero(codes >= 0)
+        self.codes = codes if self.rows is None else codes[self.rows]
+        self.counts = np.bincount(self.codes, minlength=group_count)
+        self.moments = {}
+        self._first = None
+
+    def first_positions(self):
+        """
+        Position of the first row of each group among the grouped rows.
+        """
+        if self._first is None:
+            if self.is_sorted:
+                self._first = np.cumsum(self.counts) - self.counts
+            else:
+                self._first = np.full(self.group_count, len(self.codes), dtype=np.int64)
+                np.minimum.at(self._first, self.codes, np.arange(len(self.codes)))
+        return self._first
+
+    def first_rows(self):
+        """
+        Position of the first row of each group in the original frame.
+        """
+        first = self.first_positions()
+        return first if self.rows is None else self.rows[first]
+
+    def reduce(self, ufunc, values):
+        """
+        Reduce values per group with a ufunc (add, fmin, fmax).
+
+        Sorted input reduces contiguous segments; otherwise values are
+        scattered into their group by number.
+        """
+        if self.is_sorted:
+            if self.group_count == 0:
+                return np.empty(0, dtype=values.dtype)
+            return ufunc.reduceat(values, self.first_positions())
+
+        if ufunc is np.add and values.dtype.kind == "f":
+            return np.bincount(self.codes, weights=values, minlength=self.group_count)
+
+        result = np.zeros(self.group_count, dtype=values.dtype) if ufunc is np.add else values[self.first_positions()]
+        ufunc.at(result, self.codes, values)
+        return result
+
+    def grouper(self, codes=None):
+        """
+        Group numbers as a categorical, which pandas groups by without
+        factorizing them again.
+        """
+        codes = self.codes if codes is None else codes
+        return pd.Categorical.from_codes(codes, categories=pd.RangeIndex(self.group_count))
+
+    def take(self, values):
+        """
+        Select the values of the rows that belong to a group.
+        """
+        return values if self.rows is None else values[self.rows]
+
+def _moments(column, values, groups):
+    """
+    Count and sum of the non-missing values of a numeric column per group,
+    computed once per column and shared by sum, mean, std and var.
+    """
+    if column in groups.moments:
+        return groups.moments[column]
+
+    if values.dtype.kind == "f":
+        present = ~np.isnan(values)
+        counts = groups.reduce(np.add, present.astype(np.int64))
+        sums = groups.reduce(np.add, np.where(present, values, 0.0).astype(np.float64))
+    else:
+        # Integer sums stay exact in 64 bits
+        counts = groups.counts
+        sums = groups.reduce(np.add, values.astype(np.uint64 if values.dtype.kind == "u" else np.int64))
+
+    groups.moments[column] = (counts, sums)
+    return counts, sums
+
+def _numeric_aggregate(column, values, func, groups):
+    """
+    Compute one aggregate of a numeric column with reductions over the
+    group numbers.
+
+    Returns None for functions that are not handled here.
+    """
+    codes = groups.codes
+
+    if func in ("count", "sum", "mean", "std", "var"):
+        counts, sums = _moments(column, values, groups)
+        if func == "count":
+            return counts
+        if func == "sum":
+            return sums
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+            if func == "mean":
+                return means
+
+            deviations = values - means[codes]
+            if values.dtype.kind == "f":
+                deviations = np.where(np.isnan(deviations), 0.0, deviations)
+            variances = groups.reduce(np.add, deviations * deviations) / (counts - 1)
+        variances = np.where(counts > 1, variances, np.nan)
+        return variances if func == "var" else np.sqrt(variances)
+
+    if func in ("min", "max"):
+        # Start from any value of the group; fmin/fmax skip NaN unless a
+        # group has no other value
+        return groups.reduce(np.fmin if func == "min" else np.fmax, values)
+
+    return None
+
+def _percentile(series, quantile, approximate, groups, rng):
+    """
+    Linearly interpolated percentile of each group, like pandas quantile.
+
+    Approximate percentiles keep each value with probability sample size /
+    group size, so only about APPROX_PERCENTILE_SAMPLE values of a large
+    group are sorted.
+    """
+    values = groups.take(series.to_numpy())
+    codes = groups.codes
+
+    if approximate:
+        keep_rate = np.minimum(1.0, APPROX_PERCENTILE_SAMPLE / np.maximum(groups.counts, 1))
+        if (keep_rate < 1).any():
+            keep = rng.random(len(codes)) < keep_rate[codes]
+            values, codes = values[keep], codes[keep]
+
+    result = pd.Series(values, dtype=series.dtype).groupby(groups.grouper(codes), observed=False).quantile(quantile)
+    return result.to_numpy()
+
+def _distinct_count(series, approximate, groups):
+    """
+    Exact or approximate number of distinct non-missing values per group.
+    """
+    values = groups.take(series.to_numpy())
+    present = ~pd.isna(values)
+    codes = groups.codes[present]
+
+    if approximate:
+        hashes = hash_values(pd.Series(values[present], dtype=series.dtype))
+        return grouped_approx_distinct(codes, hashes, groups.group_count, APPROX_DISTINCT_PRECISION)
+
+    value_codes, uniques = pd.factorize(values[present])
+    width = max(len(uniques), 1)
+    pairs = pd.unique(codes * width + value_codes)
+    return np.bincount(pairs // width, minlength=groups.group_count)
+
+def _aggregate_column(column, series, func, groups, rng):
+    """
+    Compute one aggregate of a column for every group.
+    """
+    if func in ("nunique", "approx_nunique"):
+        return _distinct_count(series, func == "approx_nunique", groups)
+
+    percentile = _parse_percentile(func) if isinstance(func, str) else None
+    if percentile is not None:
+        return _percentile(series, percentile[0], percentile[1], groups, rng)
+
+    dtype = series.dtype
+    if not isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.kind in "iuf":
+        result = _numeric_aggregate(column, groups.take(series.to_numpy()), func, groups)
+        if result is not None:
+            return result
+
+    if func == "count":
+        present = groups.take(series.notna().to_numpy())
+        return np.bincount(groups.codes[present], minlength=groups.group_count)
+
+    # Other functions and dtypes use pandas on the same group numbers
+    values = pd.Series(groups.take(series.to_numpy()), dtype=series.dtype)
+    return values.groupby(groups.grouper(), observed=False).agg(func).to_numpy()
+
+def _cache_key(df, group_columns, aggregations):
+    """
+    Identify an aggregation of a dataframe, or None if it cannot be cached.
+    """
+    try:
+        frozen = tuple((column, tuple(funcs)) for column, funcs in aggregations.items())
+        hash(frozen)
+    except TypeError:
+        # Callable aggregates
+        return None
+    # Only the columns the aggregation reads need to match
+    used = list(dict.fromkeys(list(group_columns) + list(aggregations)))
+    return (dataframe_fingerprint(df, columns=used), tuple(group_columns), frozen)
+
+def aggregate_dataframe(df, group_columns, aggregations, use_cache=True):
+    """
+    Group a dataframe and compute aggregates of its columns.
+
+    Group keys are factorized once (or split at value changes when the
+    input is already sorted by a single key) and every aggregate is a
+    scatter reduction over the same group numbers. Sums and counts of a
+    column are computed once and shared by sum, mean, std and var.
+    Approximate distinct counts use per-group HyperLogLog sketches and
+    approximate percentiles per-group samples. Results are cached by
+    dataframe fingerprint, keys and aggregations, so repeated reruns of the
+    same aggregation are served from memory.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to aggregate
+    group_columns : list
+        Columns to group by; rows with a missing key are dropped
+    aggregations : dict
+        Dictionary of column -> list of functions (sum, mean, median, min,
+        max, count, std, var, nunique, approx_nunique, pNN, approx_pNN, or
+        any function pandas groupby accepts)
+    use_cache : bool
+        Whether to reuse and store results in the aggregation cache
+
+    Returns:
+    --------
+    DataFrame
+        One row per group, sorted by the keys, with the key columns followed
+        by one column per aggregate named column_function
+    """
+    if isinstance(group_columns, str):
+        group_columns = [group_columns]
+    group_columns = list(group_columns)
+    aggregations = {
+        column: [funcs] if isinstance(funcs, str) or callable(funcs) else list(funcs)
+        for column, funcs in aggregations.items()
+    }
+
+    key = _cache_key(df, group_columns, aggregations) if use_cache else None
+    if key is not None and key in _AGGREGATE_CACHE:
+        _AGGREGATE_CACHE.move_to_end(key)
+        return _AGGREGATE_CACHE[key].copy()
+
+    codes, group_count, is_sorted = factorize_keys(df, group_columns)
+    groups = _Groups(codes, group_count, is_sorted)
+    rng = np.random.default_rng(0)
+
+    result_df = df[group_columns].iloc[groups.first_rows()].reset_index(drop=True)
+
+    columns = {}
+    for column, funcs in aggregations.items():
+        for func in funcs:
+            name = getattr(func, "__name__", str(func))
+            columns[f"{column}_{name}"] = _aggregate_column(column, df[column], func, groups, rng)
+
+    if columns:
+        result_df = pd.concat([result_df, pd.DataFrame(columns, index=result_df.index)], axis=1)
+
+    if key is not None:
+        _AGGREGATE_CACHE[key] = result_df
+        while len(_AGGREGATE_CACHE) > _AGGREGATE_CACHE_SIZE:
+            _AGGREGATE_CACHE.popitem(last=False)
+        result_df = result_df.copy()
+
+    return result_df
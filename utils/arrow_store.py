@@ -0,0 +1,247 @@
+import pandas as pd
+import numpy as np
+import re
+import weakref
+from collections import OrderedDict
+from utils.data_processing import filter_dataframe, filter_mask
+from utils.indexing import get_source_index
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# Number of pandas conversions of Arrow sources kept at the same time
+MATERIALIZED_CACHE_SIZE = 4
+
+# Pandas conversions of Arrow tables, keyed by (id(table), columns)
+_MATERIALIZED = OrderedDict()
+
+# Characters with a special meaning in regular expressions; contains filters
+# using them go through pandas, whose regex syntax differs from Arrow's RE2
+_REGEX_METACHARACTERS = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+def to_arrow_table(df):
+    """
+    Convert a dataframe to an Arrow table for storage.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to convert
+
+    Returns:
+    --------
+    pyarrow.Table or None
+        Table with the same columns, or None if the dataframe cannot be
+        stored as Arrow (mixed-type columns, a meaningful index, etc.)
+    """
+    if not ARROW_AVAILABLE:
+        return None
+
+    # Row labels other than 0..n-1 would become extra table columns
+    index = df.index
+    if not (isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1):
+        return None
+    if not df.columns.is_unique:
+        return None
+
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+
+def is_arrow_source(source):
+    """
+    Check whether a data source is stored as an Arrow table.
+    """
+    return source.get("table") is not None
+
+def source_column_names(source):
+    """
+    Get the column names of a data source without converting it.
+    """
+    if is_arrow_source(source):
+        return source["table"].column_names
+    return list(source["data"].columns)
+
+def source_row_count(source):
+    """
+    Get the number of rows of a data source without converting it.
+    """
+    if is_arrow_source(source):
+        return source["table"].num_rows
+    return len(source["data"])
+
+def _materialize(table, columns):
+    """
+    Convert (a projection of) an Arrow table to pandas, reusing recent
+    conversions.
+    """
+    key = (id(table), tuple(columns) if columns is not None else None)
+    entry = _MATERIALIZED.get(key)
+    if entry is not None and entry[0]() is table:
+        _MATERIALIZED.move_to_end(key)
+        return entry[1]
+
+    projected = table.select(columns) if columns is not None else table
+    df = projected.to_pandas()
+
+    _MATERIALIZED[key] = (weakref.ref(table), df)
+    while len(_MATERIALIZED) > MATERIALIZED_CACHE_SIZE:
+        _MATERIALIZED.popitem(last=False)
+
+    return df
+
+def get_source_data(source, columns=None):
+    """
+    Get the data of a source as a pandas DataFrame.
+
+    Pandas sources are returned as they are. Arrow sources are converted on
+    demand, narrowed first to the requested columns (a zero-copy projection),
+    and the most recent conversions are cached. Callers must not modify the
+    returned frame in place.
+
+    Parameters:
+    -----------
+    source : dict
+        Data source entry from st.session_state.data_sources
+    columns : list
+        Columns needed by the caller, or None for all columns
+
+    Returns:
+    --------
+    DataFrame
+        Data of the source
+    """
+    if not is_arrow_source(source):
+        return source["data"]
+
+    table = source["table"]
+    if columns is not None:
+        columns = [column for column in dict.fromkeys(columns) if column in table.column_names]
+    return _materialize(table, columns)
+
+def get_source_preview(source, rows=10):
+    """
+    Get the first rows of a data source for display.
+
+    Arrow sources return a zero-copy slice of the table, which Streamlit
+    renders without converting it to pandas.
+
+    Parameters:
+    -----------
+    source : dict
+        Data source entry from st.session_state.data_sources
+    rows : int
+        Number of rows
+
+    Returns:
+    --------
+    DataFrame or pyarrow.Table
+        First rows of the source
+    """
+    if is_arrow_source(source):
+        return source["table"].slice(0, rows)
+    return source["data"].head(rows)
+
+def _arrow_predicate(table, column, operation, value):
+    """
+    Evaluate a filter with Arrow compute kernels.
+
+    Returns a boolean array without nulls, or None if the filter needs the
+    pandas implementation.
+    """
+    if column not in table.column_names:
+        return None
+
+    array = table[column]
+    try:
+        if operation == "equals":
+            matches = pc.equal(array, value)
+        elif operation == "not_equals":
+            return pc.fill_null(pc.not_equal(array, value), True)
+        elif operation == "greater_than":
+            matches = pc.greater(array, value)
+        elif operation == "less_than":
+            matches = pc.less(array, value)
+        elif operation == "between":
+            matches = pc.and_(pc.greater_equal(array, value[0]), pc.less_equal(array, value[1]))
+        elif operation in ("in_list", "not_in_list"):
+            matches = pc.is_in(array, value_set=pa.array(list(value)))
+            if operation == "not_in_list":
+                return pc.invert(pc.fill_null(matches, False))
+        elif operation in ("contains", "starts_with", "ends_with"):
+            if not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+                return None
+            if operation == "contains":
+                # pandas str.contains treats the value as a regular expression,
+                # which only matches like a plain substring without metacharacters
+                if not isinstance(value, str) or _REGEX_METACHARACTERS.search(value):
+                    return None
+                matches = pc.match_substring(array, value)
+            elif operation == "starts_with":
+                matches = pc.starts_with(array, value)
+            else:
+                matches = pc.ends_with(array, value)
+        else:
+            return None
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, TypeError):
+        return None
+
+    return pc.fill_null(matches, False)
+
+def filter_source(source, filters, columns=None):
+    """
+    Filter a data source and return the matching rows as a DataFrame.
+
+    Arrow sources evaluate filters with Arrow compute kernels (falling back
+    to pandas for a single column when a kernel does not apply) and only the
+    matching rows, narrowed to the requested columns, are converted to
+    pandas. Pandas sources are filtered with filter_dataframe and their index.
+
+    Parameters:
+    -----------
+    source : dict
+        Data source entry from st.session_state.data_sources
+    filters : list
+        List of filter dictionaries with column, operation, and value
+    columns : list
+        Columns needed by the caller, or None for all columns
+
+    Returns:
+    --------
+    DataFrame
+        Matching rows of the source
+    """
+    if not is_arrow_source(source):
+        return filter_dataframe(source["data"], filters, index=get_source_index(source))
+
+    table = source["table"]
+    mask = None
+
+    for filter_dict in filters:
+        column = filter_dict.get("column")
+        operation = filter_dict.get("operation")
+        value = filter_dict.get("value")
+
+        if column is None or operation is None or value is None:
+            continue
+
+        matches = _arrow_predicate(table, column, operation, value)
+        if matches is None:
+            column_mask = filter_mask(get_source_data(source, columns=[column]), [filter_dict])
+            if column_mask is None:
+                continue
+            matches = pa.array(column_mask)
+
+        mask = matches if mask is None else pc.and_(mask, matches)
+
+    if columns is not None:
+        table = table.select([column for column in dict.fromkeys(columns) if column in table.column_names])
+    if mask is not None:
+        table = table.filter(mask)
+
+    return table.to_pandas()
@@ -0,0 +1,257 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+import threading
+from concurrent.futures import Future
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from utils.transformation_plan import execute_transformation
+
+# Rows of the sample a recipe is previewed on
+PREVIEW_SAMPLE_ROWS = 10000
+
+# Full runs executed at the same time across sessions; later ones wait for a free slot
+BACKGROUND_THREADS = max(int(os.environ.get("PM_DATA_TOOL_BACKGROUND_THREADS", "2")), 1)
+
+_SLOTS = threading.BoundedSemaphore(BACKGROUND_THREADS)
+
+def _submit(function, *args, context=None):
+    """
+    Run a function in a new worker thread once one of the BACKGROUND_THREADS
+    slots is free.
+
+    Every run gets its own thread, so the Streamlit script context attached
+    to it ends with the run instead of staying behind on a pooled thread.
+    Done callbacks run in the worker thread, with the same context.
+
+    Returns a Future for the result, which can be cancelled while waiting.
+    """
+    future = Future()
+
+    def _worker():
+        with _SLOTS:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(function(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    thread = threading.Thread(target=_worker, name="background-run", daemon=True)
+    if context is not None:
+        add_script_run_ctx(thread, context)
+    thread.start()
+    return future
+
+def sample_dataframe(df, rows=PREVIEW_SAMPLE_ROWS, stratify_by=None, seed=0):
+    """
+    Draw a reproducible random sample of rows, kept in their original order.
+
+    Without strata every row has the same chance of being picked, as with
+    reservoir sampling. With strata each distinct value of the column gets
+    a share of the sample proportional to its rows, and at least one row,
+    so rare groups still show up in the preview.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to sample
+    rows : int
+        Number of rows to draw
+    stratify_by : str
+        Column whose values are sampled proportionally, or None
+    seed : int
+        Seed of the random generator
+
+    Returns:
+    --------
+    DataFrame
+        Sampled rows, or the dataframe itself if it has at most rows rows
+    """
+    row_count = len(df)
+    if row_count <= rows:
+        return df
+
+    rng = np.random.default_rng(seed)
+
+    if stratify_by is None:
+        positions = np.sort(rng.choice(row_count, size=rows, replace=False))
+        return df.take(positions)
+
+    codes, uniques = pd.factorize(df[stratify_by], use_na_sentinel=False)
+    counts = np.bincount(codes, minlength=len(uniques))
+    quotas = np.maximum(1, np.round(counts * (rows / row_count))).astype(np.int64)
+
+    # Shuffle rows within each stratum and keep the first quota of each
+    order = np.lexsort((rng.random(row_count), codes))
+    starts = np.cumsum(counts) - counts
+    sorted_codes = codes[order]
+    rank = np.arange(row_count) - starts[sorted_codes]
+    positions = np.sort(order[rank < quotas[sorted_codes]])
+    return df.take(positions)
+
+class BackgroundRun:
+    """
+    Transformation recipe previewed on a sample while the full run
+    continues in a worker thread.
+
+    The preview is computed when the run is created, so it is available
+    right away; the full result replaces it once the worker finishes.
+    Workers share the Streamlit session of the script that started them,
+    so steps that read st.session_state (joins) and completion callbacks
+    that save results behave as in the script itself.
+    """
+
+    def __init__(self, df, steps, sample_rows=PREVIEW_SAMPLE_ROWS, stratify_by=None, workers=1):
+        self.source_rows = len(df)
+        self.started_at = time.time()
+        self.finished_at = None
+
+        start = time.perf_counter()
+        sample = sample_dataframe(df, sample_rows, stratify_by)
+        self.sample_rows = len(sample)
+        self.preview = execute_transformation(sample, steps)
+        self.preview_seconds = time.perf_counter() - start
+
+        if self.sample_rows == self.source_rows:
+            # The sample is the whole source: the preview is the full result
+            self.future = None
+            self.finished_at = time.time()
+        else:
+            self.future = _submit(self._run, df, steps, workers, context=get_script_run_ctx())
+
+    def _run(self, df, steps, workers):
+        """
+        Worker task: run the recipe over the full source.
+        """
+        try:
+            return execute_transformation(df, steps, workers=workers)
+        finally:
+            self.finished_at = time.time()
+
+    def done(self):
+        """
+        Check whether the full result is available (or the run failed).
+        """
+        return self.future is None or self.future.done()
+
+    def error(self):
+        """
+        Get the exception of a failed full run, or None.
+        """
+        if self.future is None or not self.future.done() or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+    def current(self):
+        """
+        Get the best result available now.
+
+        Returns:
+        --------
+        tuple
+            (DataFrame, whether it is the full result rather than the preview)
+        """
+        if self.future is None:
+            return self.preview, True
+        if self.future.done() and not self.future.cancelled() and self.future.exception() is None:
+            return self.future.result(), True
+        return self.preview, False
+
+    def elapsed(self):
+        """
+        Seconds the full run has taken so far, or took.
+        """
+        return (self.finished_at or time.time()) - self.started_at
+
+    def when_done(self, callback):
+        """
+        Call callback with the full result once it is available; right
+        away if the run already finished. Nothing is called if it failed.
+        """
+        if self.future is None:
+            callback(self.preview)
+            return
+
+        def _finished(future):
+            if not future.cancelled() and future.exception() is None:
+                callback(future.result())
+
+        self.future.add_done_callback(_finished)
+
+    def cancel(self):
+        """
+        Cancel the full run if it has not started yet.
+        """
+        return self.future is not None and self.future.cancel()
+
+class BackgroundImport:
+    """
+    Streaming database read running in a worker thread.
+
+    The worker reads the query result batch by batch into an Arrow table
+    and records how many rows it has loaded, so the page can show progress
+    while the read runs and cancel it between batches.
+    """
+
+    def __init__(self, read_function, *args, **kwargs):
+        self.rows_loaded = 0
+        self.started_at = time.time()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = _submit(self._run, read_function, args, kwargs)
+
+    def _progress(self, rows_loaded):
+        self.rows_loaded = rows_loaded
+
+    def _run(self, read_function, args, kwargs):
+        """
+        Worker task: read the whole result, or stop once cancelled.
+        """
+        try:
+            return read_function(*args, progress_callback=self._progress, cancel_event=self.cancel_event, **kwargs)
+        finally:
+            self.finished_at = time.time()
+
+    def done(self):
+        """
+        Check whether the read finished, failed or was cancelled.
+        """
+        return self.future.done()
+
+    def cancelled(self):
+        """
+        Check whether the read was cancelled.
+        """
+        return self.cancel_event.is_set()
+
+    def error(self):
+        """
+        Get the exception of a failed read, or None.
+        """
+        if not self.future.done() or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+    def result(self):
+        """
+        Get the table read, or None while running, after a failure or
+        after a cancellation.
+        """
+        if not self.future.done() or self.future.cancelled() or self.future.exception() is not None:
+            return None
+        return self.future.result()
+
+    def elapsed(self):
+        """
+        Seconds the read has taken so far, or took.
+        """
+        return (self.finished_at or time.time()) - self.started_at
+
+    def cancel(self):
+        """
+        Stop the read before its next batch; rows read so far are dropped.
+        """
+        self.cancel_event.set()
+        if self.future.cancel():
+            self.finished_at = time.time()
@@ -4,12 +4,652 @@ import sqlite3
 import requests
 import json
 import os
+import re
+import time
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+import uuid
+from collections import deque, OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# Database types the connectors can open
+DATABASE_TYPES = ["PostgreSQL", "MySQL", "SQL Server", "SQLite"]
+
+# Idle connections each pool keeps open, and the most it opens at once
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 5
+
+# Seconds an idle connection (beyond the minimum) is kept before it is closed
+POOL_IDLE_TIMEOUT = 300
+
+# Connections idle for longer than this many seconds are checked before reuse
+POOL_HEALTH_CHECK_AFTER = 30
+
+# Seconds to wait for a free connection when a pool is at its maximum size
+POOL_ACQUIRE_TIMEOUT = 30
+
+# Rows fetched from the server per round trip when streaming a query
+STREAM_FETCH_SIZE = 10000
+
+# Seconds a cached query result is reused by default; 0 disables caching
+QUERY_CACHE_TTL = 600
+
+# Bytes of query results kept in memory, and spilled to disk beyond that
+QUERY_CACHE_MEMORY_BYTES = 256 * 1024 * 1024
+QUERY_CACHE_DISK_BYTES = 1024 * 1024 * 1024
+
+# Directory of spilled query results, private to this process
+QUERY_CACHE_DIR = os.path.join(tempfile.gettempdir(), f"pm_data_tool_query_cache_{os.getpid()}")
+
+# Pools shared by every session of the app process, by connection key
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+# String literals and quoted identifiers, words, or runs of whitespace and comments
+_SQL_TOKEN_PATTERN = re.compile(
+    r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])|([A-Za-z_]\w*)|(?:\s|--[^\n]*|/\*.*?\*/)+""",
+    re.S
+)
+
+# Keywords whose case does not matter in any supported database; other
+# words may be case-sensitive identifiers (MySQL table names) and are kept
+_SQL_KEYWORDS = {
+    "SELECT", "DISTINCT", "FROM", "WHERE", "AND", "OR", "NOT", "IN", "IS", "NULL", "LIKE", "BETWEEN",
+    "AS", "ON", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "OUTER", "CROSS", "USING", "GROUP", "BY",
+    "HAVING", "ORDER", "ASC", "DESC", "LIMIT", "OFFSET", "TOP", "UNION", "ALL", "EXCEPT", "INTERSECT",
+    "WITH", "CASE", "WHEN", "THEN", "ELSE", "END", "CAST", "COUNT", "SUM", "AVG", "MIN", "MAX", "TRUE", "FALSE"
+}
+
+def _open_connection(db_type, host, port, user, password, database):
+    """
+    Open a new connection with the driver of a database type.
+    """
+    if db_type == "PostgreSQL":
+        import psycopg2
+
+        return psycopg2.connect(
+            host=host,
+            port=port,
+            user=user,
+            password=password,
+            dbname=database
+        )
+
+    elif db_type == "MySQL":
+        import mysql.connector
+
+        return mysql.connector.connect(
+            host=host,
+            port=int(port),
+            user=user,
+            password=password,
+            database=database
+        )
+
+    elif db_type == "SQL Server":
+        import pyodbc
+
+        conn_str = (
+            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+            f"SERVER={host},{port};"
+            f"DATABASE={database};"
+            f"UID={user};"
+            f"PWD={password}"
+        )
+        return pyodbc.connect(conn_str)
+
+    elif db_type == "SQLite":
+        # Every Streamlit rerun runs in a new thread; the pool hands a
+        # connection to one thread at a time
+        return sqlite3.connect(database, check_same_thread=False)
+
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+def _close_quietly(conn):
+    """
+    Close a connection, ignoring errors from connections already broken.
+    """
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+def _is_healthy(conn):
+    """
+    Check that a connection still answers a trivial query.
+    """
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        return True
+    except Exception:
+        return False
+
+class ConnectionPool:
+    """
+    Reusable connections to one database with one set of credentials.
+
+    Connections are checked out by one caller at a time and returned with
+    their transaction rolled back, so a later query never sees an open or
+    aborted transaction. Connections that sat idle for a while are checked
+    with SELECT 1 before reuse, and broken ones are replaced.
+    """
+
+    def __init__(self, db_type, host, port, user, password, database,
+                 min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE, idle_timeout=POOL_IDLE_TIMEOUT):
+        self._connect_args = (db_type, host, port, user, password, database)
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.idle_timeout = idle_timeout
+
+        # Idle connections with the time they were returned, newest last
+        self._idle = deque()
+        self._open_count = 0
+        self._condition = threading.Condition()
+
+    def _checkout(self, timeout):
+        """
+        Take an idle connection, or reserve a slot for a new one (None).
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._open_count < self.max_size:
+                    self._open_count += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No free database connection after {timeout} seconds")
+                self._condition.wait(remaining)
+
+    def _discard(self, conn):
+        """
+        Close a connection and free its slot.
+        """
+        _close_quietly(conn)
+        with self._condition:
+            self._open_count -= 1
+            self._condition.notify()
+
+    def acquire(self, timeout=POOL_ACQUIRE_TIMEOUT):
+        """
+        Get a working connection for exclusive use until it is released.
+
+        Parameters:
+        -----------
+        timeout : float
+            Seconds to wait when all connections are in use
+
+        Returns:
+        --------
+        connection
+            DB-API connection
+        """
+        while True:
+            idle = self._checkout(timeout)
+            if idle is None:
+                try:
+                    return _open_connection(*self._connect_args)
+                except Exception:
+                    with self._condition:
+                        self._open_count -= 1
+                        self._condition.notify()
+                    raise
+
+            conn, returned_at = idle
+            if time.monotonic() - returned_at <= POOL_HEALTH_CHECK_AFTER or _is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn, broken=False):
+        """
+        Return a connection to the pool, or close it if it is broken.
+        """
+        if not broken:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+        if broken or self.max_size == 0:
+            self._discard(conn)
+            return
+
+        with self._condition:
+            self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, timeout=POOL_ACQUIRE_TIMEOUT):
+        """
+        Context manager that acquires a connection and releases it after use.
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            # A failed query usually leaves the connection usable; the
+            # rollback on release tells the two cases apart
+            self.release(conn)
+
+    def prune(self):
+        """
+        Close idle connections past the idle timeout, keeping min_size open.
+        """
+        now = time.monotonic()
+        expired = []
+        with self._condition:
+            # Oldest connections are at the left of the queue
+            while len(self._idle) > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+                expired.append(self._idle.popleft()[0])
+            self._open_count -= len(expired)
+            if expired:
+                self._condition.notify(len(expired))
+        for conn in expired:
+            _close_quietly(conn)
+
+    def close(self):
+        """
+        Close every idle connection; connections in use close when released.
+        """
+        with self._condition:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._open_count -= len(idle)
+            self.max_size = 0
+        for conn in idle:
+            _close_quietly(conn)
+
+    def stats(self):
+        """
+        Get the number of open, idle and in-use connections.
+        """
+        with self._condition:
+            return {
+                "open": self._open_count,
+                "idle": len(self._idle),
+                "in_use": self._open_count - len(self._idle),
+                "max_size": self.max_size
+            }
+
+def connection_key(db_type, host, port, user, password, database):
+    """
+    Identify a database and the credentials used to reach it.
+
+    The key holds (db_type, host, port, user, database) and a digest of
+    the password, never the password itself.
+    """
+    if db_type not in DATABASE_TYPES:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+    if db_type == "SQLite":
+        # Only the file identifies a SQLite database
+        return (db_type, None, None, None, os.path.abspath(database) if database != ":memory:" else database, None)
+
+    secret = hashlib.sha256((password or "").encode("utf-8")).hexdigest()
+    return (db_type, host, str(port), user, database, secret)
+
+def get_connection_pool(db_type, host, port, user, password, database):
+    """
+    Get the process-wide connection pool for a database, creating it on
+    first use.
+
+    Pools are keyed by (db_type, host, port, user, database) and a digest
+    of the password, so connections opened with one password are never
+    handed to a caller that supplied another. Idle connections of every
+    pool past the idle timeout are closed on each call.
+
+    Parameters:
+    -----------
+    db_type : str
+        Type of database (PostgreSQL, MySQL, SQL Server, SQLite)
+    host : str
+        Database host
+    port : str
+        Database port
+    user : str
+        Database username
+    password : str
+        Database password
+    database : str
+        Database name
+
+    Returns:
+    --------
+    ConnectionPool
+        Pool of connections to the database
+    """
+    key = connection_key(db_type, host, port, user, password, database)
+
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = ConnectionPool(db_type, host, port, user, password, database)
+
+    for idle_pool in pools:
+        idle_pool.prune()
+
+    return pool
+
+def close_connection_pools():
+    """
+    Close the idle connections of every pool and forget the pools.
+    """
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+def normalize_sql(query):
+    """
+    Normalize a query for use as a cache key: comments are dropped, runs of
+    whitespace become one space, keywords are upper-cased and a trailing
+    semicolon is removed. String literals and identifiers are kept exactly
+    as written.
+    """
+    def _replace(match):
+        literal, word = match.group(1), match.group(2)
+        if literal is not None:
+            return literal
+        if word is not None:
+            return word.upper() if word.upper() in _SQL_KEYWORDS else word
+        return " "
+
+    return _SQL_TOKEN_PATTERN.sub(_replace, query).strip().rstrip(";").rstrip()
+
+def _result_bytes(value):
+    """
+    Estimate the memory held by a cached result.
+    """
+    if ARROW_AVAILABLE and isinstance(value, pa.Table):
+        return value.nbytes
+    from utils.reshape import estimate_bytes
+    return estimate_bytes(value) + int(value.index.memory_usage())
+
+class QueryCache:
+    """
+    Results of database queries, reused until their time to live runs out.
+
+    Entries are kept in memory up to memory_bytes; least recently used
+    entries beyond that are written to Parquet files in directory, up to
+    disk_bytes, and the least recently used files beyond that are deleted.
+    Counters of hits, misses, expirations and evictions are kept so time
+    to live settings can be tuned.
+    """
+
+    def __init__(self, memory_bytes=QUERY_CACHE_MEMORY_BYTES, disk_bytes=QUERY_CACHE_DISK_BYTES,
+                 directory=QUERY_CACHE_DIR):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.directory = directory
+
+        # key -> (value, stored_at, ttl, size) and key -> (path, kind, stored_at, ttl, size)
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()
+        # Results being written to disk: key -> (path, value, stored_at, ttl, size)
+        self._spilling = {}
+        self._memory_used = 0
+        self._disk_used = 0
+        # Guards the bookkeeping only; Parquet files are read and written without it
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(["memory_hits", "disk_hits", "misses", "expired", "spilled", "evicted"], 0)
+
+    def _pop_memory(self, key):
+        value, _, _, size = self._memory.pop(key)
+        self._memory_used -= size
+        return value
+
+    def _pop_disk(self, key):
+        entry = self._disk.pop(key)
+        self._disk_used -= entry[4]
+        return entry[0]
+
+    def get(self, key):
+        """
+        Get a cached result, or None if it is missing or expired.
+
+        Pandas results are returned as copies, so callers may modify them.
+        """
+        now = time.time()
+        value = path = None
+        expired_file = None
+
+        with self._lock:
+            entry = self._memory.get(key)
+            spilling = self._spilling.get(key)
+            if entry is not None or spilling is not None:
+                value, stored_at, ttl = entry[:3] if entry is not None else spilling[1:4]
+                if now - stored_at > ttl:
+                    # An expired result being spilled is dropped once written
+                    if entry is not None:
+                        self._pop_memory(key)
+                    else:
+                        del self._spilling[key]
+                    self._counters["expired"] += 1
+                    value = None
+                else:
+                    if entry is not None:
+                        self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+            elif key in self._disk:
+                path, kind, stored_at, ttl, _ = self._disk[key]
+                if now - stored_at <= ttl:
+                    self._disk.move_to_end(key)
+                else:
+                    expired_file = self._pop_disk(key)
+                    self._counters["expired"] += 1
+                    path = None
+            if value is None and path is None:
+                self._counters["misses"] += 1
+
+        if expired_file is not None:
+            _remove_file(expired_file)
+        if value is not None:
+            return value if ARROW_AVAILABLE and isinstance(value, pa.Table) else value.copy()
+        if path is None:
+            return None
+
+        try:
+            table = pq.read_table(path)
+        except (OSError, pa.ArrowException):
+            table = None
+
+        with self._lock:
+            if table is None:
+                # File evicted meanwhile, or removed or damaged outside the cache
+                if key in self._disk and self._disk[key][0] == path:
+                    self._pop_disk(key)
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+        return table if kind == "arrow" else table.to_pandas()
+
+    def put(self, key, value, ttl):
+        """
+        Cache a result for ttl seconds, replacing any earlier result.
+        """
+        size = _result_bytes(value)
+        victims = []
+        removed = []
+
+        with self._lock:
+            if key in self._memory:
+                self._pop_memory(key)
+            if key in self._disk:
+                removed.append(self._pop_disk(key))
+            self._spilling.pop(key, None)
+
+            self._memory[key] = (value, time.time(), ttl, size)
+            self._memory_used += size
+
+            # Spill least recently used results until the memory budget holds
+            while self._memory_used > self.memory_bytes and self._memory:
+                victim = next(iter(self._memory))
+                _, stored_at, victim_ttl, victim_size = self._memory[victim]
+                victim_value = self._pop_memory(victim)
+                if not ARROW_AVAILABLE or victim_size > self.disk_bytes or time.time() - stored_at > victim_ttl:
+                    self._counters["evicted"] += 1
+                    continue
+                path = os.path.join(self.directory, f"{uuid.uuid4().hex}.parquet")
+                self._spilling[victim] = (path, victim_value, stored_at, victim_ttl, victim_size)
+                victims.append(victim)
+
+        for path in removed:
+            _remove_file(path)
+        for victim in victims:
+            self._spill(victim)
+
+    def _spill(self, key):
+        """
+        Write a result evicted from memory to disk, then record it unless it
+        was replaced, invalidated or read as expired in the meantime.
+        """
+        with self._lock:
+            entry = self._spilling.get(key)
+        if entry is None:
+            return
+        path, value, stored_at, ttl, size = entry
+
+        is_arrow = isinstance(value, pa.Table)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            pq.write_table(value if is_arrow else pa.Table.from_pandas(value, preserve_index=False), path)
+            written = True
+        except (OSError, pa.ArrowException):
+            # Columns Arrow cannot store are not spilled
+            written = False
+
+        removed = []
+        with self._lock:
+            current = self._spilling.get(key)
+            if current is not None and current[0] == path:
+                del self._spilling[key]
+                if written:
+                    self._disk[key] = (path, "arrow" if is_arrow else "pandas", stored_at, ttl, size)
+                    self._disk_used += size
+                    self._counters["spilled"] += 1
+                else:
+                    self._counters["evicted"] += 1
+            if key not in self._disk or self._disk[key][0] != path:
+                removed.append(path)
+
+            while self._disk_used > self.disk_bytes and self._disk:
+                removed.append(self._pop_disk(next(iter(self._disk))))
+                self._counters["evicted"] += 1
+
+        for path in removed:
+            _remove_file(path)
+
+    def invalidate(self, connection=None):
+        """
+        Drop the cached results of one connection key, or of all connections.
+
+        Returns the number of results dropped.
+        """
+        removed = []
+        with self._lock:
+            memory_keys = [key for key in self._memory if connection is None or key[0] == connection]
+            disk_keys = [key for key in self._disk if connection is None or key[0] == connection]
+            spilling_keys = [key for key in self._spilling if connection is None or key[0] == connection]
+            for key in memory_keys:
+                self._pop_memory(key)
+            for key in disk_keys:
+                removed.append(self._pop_disk(key))
+            for key in spilling_keys:
+                del self._spilling[key]
+
+        for path in removed:
+            _remove_file(path)
+        return len(memory_keys) + len(disk_keys) + len(spilling_keys)
+
+    def stats(self):
+        """
+        Get the hit and miss counters and the size of the cache.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_used
+            stats["disk_entries"] = len(self._disk)
+            stats["disk_bytes"] = self._disk_used
+            return stats
+
+def _remove_file(path):
+    """
+    Delete a spilled result, ignoring files already gone.
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+# Query results shared by every session of the app process
+QUERY_CACHE = QueryCache()
+
+# Spilled results are only readable by this process
+atexit.register(shutil.rmtree, QUERY_CACHE_DIR, True)
+
+def _query_cache_key(db_type, host, port, user, password, database, query, kind, params=None):
+    """
+    Key of a query result: the connection, the normalized query, its
+    parameters and the form of the result ("pandas" or "arrow").
+    """
+    return (
+        connection_key(db_type, host, port, user, password, database),
+        normalize_sql(query),
+        tuple(params or ()),
+        kind
+    )
+
+def invalidate_query_cache(db_type=None, host=None, port=None, user=None, password=None, database=None):
+    """
+    Drop cached query results of one database connection, or of all
+    connections when no database type is given.
+
+    Returns:
+    --------
+    int
+        Number of results dropped
+    """
+    if db_type is None:
+        return QUERY_CACHE.invalidate()
+    return QUERY_CACHE.invalidate(connection_key(db_type, host, port, user, password, database))
+
+def query_cache_stats():
+    """
+    Get the hit, miss, expiration and eviction counters of the query
+    cache, its hit rate and its size in memory and on disk.
+    """
+    return QUERY_CACHE.stats()
+
 # Function to test database connection
 def test_connection(db_type, host, port, user, password, database):
     """
     Test connection to a database.
+
+    The connection is taken from the shared pool and returned to it, so a
+    following import reuses it instead of connecting again.
     
     Parameters:
     -----------
@@ -31,63 +671,30 @@ def test_connection(db_type, host, port, user, password, database):
     bool
         True if connection is successful, False otherwise
     """
+    if db_type not in DATABASE_TYPES:
+        return False
+
     try:
-        if db_type == "PostgreSQL":
-            import psycopg2
-            
-            conn = psycopg2.connect(
-                host=host,
-                port=port,
-                user=user,
-                password=password,
-                dbname=database
-            )
-            conn.close()
-            return True
-        
-        elif db_type == "MySQL":
-            import mysql.connector
-            
-            conn = mysql.connector.connect(
-                host=host,
-                port=int(port),
-                user=user,
-                password=password,
-                database=database
-            )
-            conn.close()
-            return True
-        
-        elif db_type == "SQL Server":
-            import pyodbc
-            
-            conn_str = (
-                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                f"SERVER={host},{port};"
-                f"DATABASE={database};"
-                f"UID={user};"
-                f"PWD={password}"
-            )
-            conn = pyodbc.connect(conn_str)
-            conn.close()
-            return True
-        
-        elif db_type == "SQLite":
-            conn = sqlite3.connect(database)
-            conn.close()
-            return True
-            
-        else:
-            return False
+        pool = get_connection_pool(db_type, host, port, user, password, database)
+        conn = pool.acquire()
+        healthy = _is_healthy(conn)
+        pool.release(conn, broken=not healthy)
+        return healthy
     
     except Exception as e:
         print(f"Connection error: {str(e)}")
         return False
 
 # Function to connect to database and execute query
-def connect_to_database(db_type, host, port, user, password, database, query):
+def connect_to_database(db_type, host, port, user, password, database, query,
+                        cache_ttl=QUERY_CACHE_TTL, force_refresh=False, params=None):
     """
     Connect to a database and execute a query.
+
+    Connections come from a pool shared by all sessions of the app, keyed
+    by the connection settings, so repeated queries skip connection setup
+    and authentication. Results are cached by connection and normalized
+    query for cache_ttl seconds.
     
     Parameters:
     -----------
@@ -105,6 +712,12 @@ def connect_to_database(db_type, host, port, user, password, database, query):
         Database name
     query : str
         SQL query to execute
+    cache_ttl : float
+        Seconds the result may be reused; 0 or None to skip the cache
+    force_refresh : bool
+        Run the query even if a cached result exists, and cache the new one
+    params : list
+        Values of the query placeholders, in the driver's parameter style
     
     Returns:
     --------
@@ -112,66 +725,169 @@ def connect_to_database(db_type, host, port, user, password, database, query):
         Pandas DataFrame with query results
     """
     try:
-        if db_type == "PostgreSQL":
-            import psycopg2
-            
-            conn = psycopg2.connect(
-                host=host,
-                port=port,
-                user=user,
-                password=password,
-                dbname=database
-            )
-            
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            return df
-        
-        elif db_type == "MySQL":
-            import mysql.connector
-            
-            conn = mysql.connector.connect(
-                host=host,
-                port=int(port),
-                user=user,
-                password=password,
-                database=database
-            )
-            
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            return df
-        
-        elif db_type == "SQL Server":
-            import pyodbc
-            
-            conn_str = (
-                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                f"SERVER={host},{port};"
-                f"DATABASE={database};"
-                f"UID={user};"
-                f"PWD={password}"
-            )
-            conn = pyodbc.connect(conn_str)
-            
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            return df
-        
-        elif db_type == "SQLite":
-            conn = sqlite3.connect(database)
-            
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            return df
-            
-        else:
-            raise ValueError(f"Unsupported database type: {db_type}")
+        key = _query_cache_key(db_type, host, port, user, password, database, query, "pandas", params) if cache_ttl else None
+        if key is not None and not force_refresh:
+            df = QUERY_CACHE.get(key)
+            if df is not None:
+                return df
+
+        pool = get_connection_pool(db_type, host, port, user, password, database)
+        with pool.connection() as conn:
+            df = pd.read_sql_query(query, conn, params=params or None)
+
+        if key is not None:
+            # The caller gets its own copy, so later changes never reach the cache
+            QUERY_CACHE.put(key, df.copy(), cache_ttl)
+        return df
     
     except Exception as e:
         print(f"Database connection/query error: {str(e)}")
         raise
 
+def _streaming_cursor(conn, db_type, fetch_size):
+    """
+    Open a cursor that leaves the result on the server and fetches it in
+    batches, instead of buffering every row in the driver.
+    """
+    if db_type == "PostgreSQL":
+        # Named cursors are server-side cursors in psycopg2
+        cursor = conn.cursor(name=f"pm_stream_{uuid.uuid4().hex}")
+        cursor.itersize = fetch_size
+        return cursor
+    if db_type == "MySQL":
+        return conn.cursor(buffered=False)
+    # pyodbc and sqlite3 cursors already step through the result on fetchmany
+    return conn.cursor()
+
+def _rows_to_record_batch(rows, names):
+    """
+    Convert fetched rows (tuples) to an Arrow record batch, column by column.
+
+    Columns whose values Arrow cannot store in one type are kept as text.
+    """
+    arrays = []
+    for values in zip(*rows):
+        try:
+            arrays.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(pa.array([None if value is None else str(value) for value in values], type=pa.string()))
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+def stream_database_query(db_type, host, port, user, password, database, query,
+                          fetch_size=STREAM_FETCH_SIZE, progress_callback=None, cancel_event=None):
+    """
+    Run a query and yield its result as Arrow record batches.
+
+    Rows are read through a server-side cursor (a psycopg2 named cursor,
+    an unbuffered MySQL cursor) fetch_size rows at a time, so neither the
+    driver nor this process ever holds the whole result as Python rows.
+
+    Parameters:
+    -----------
+    db_type : str
+        Type of database (PostgreSQL, MySQL, SQL Server, SQLite)
+    host : str
+        Database host
+    port : str
+        Database port
+    user : str
+        Database username
+    password : str
+        Database password
+    database : str
+        Database name
+    query : str
+        SQL query to execute
+    fetch_size : int
+        Rows fetched per batch
+    progress_callback : callable
+        Called with the number of rows loaded so far after every batch
+    cancel_event : threading.Event
+        Stops the read before the next batch once set
+
+    Returns:
+    --------
+    generator
+        pyarrow.RecordBatch objects of up to fetch_size rows
+    """
+    if not ARROW_AVAILABLE:
+        raise ImportError("Streaming database reads require pyarrow")
+    fetch_size = max(int(fetch_size), 1)
+
+    pool = get_connection_pool(db_type, host, port, user, password, database)
+    with pool.connection() as conn:
+        cursor = _streaming_cursor(conn, db_type, fetch_size)
+        try:
+            cursor.execute(query)
+            names = None
+            rows_loaded = 0
+            while cancel_event is None or not cancel_event.is_set():
+                rows = cursor.fetchmany(fetch_size)
+                if names is None:
+                    # Named cursors only describe the result after the first fetch
+                    names = [column[0] for column in cursor.description or []]
+                if not rows:
+                    if rows_loaded == 0:
+                        # Keep the column names of an empty result
+                        yield pa.RecordBatch.from_arrays([pa.array([], type=pa.null()) for _ in names], names=names)
+                    break
+
+                rows_loaded += len(rows)
+                yield _rows_to_record_batch(rows, names)
+                if progress_callback is not None:
+                    progress_callback(rows_loaded)
+        finally:
+            # A cancelled unbuffered read may leave rows unread; the pool
+            # then fails to roll the connection back and closes it
+            _close_quietly(cursor)
+
+def read_database_table(db_type, host, port, user, password, database, query,
+                        fetch_size=STREAM_FETCH_SIZE, progress_callback=None, cancel_event=None,
+                        cache_ttl=QUERY_CACHE_TTL, force_refresh=False):
+    """
+    Run a query through a server-side cursor and collect the result as an
+    Arrow table, batch by batch.
+
+    Batches whose inferred column types differ (for example a column that
+    is empty in the first batch) are combined into the common type.
+    Results are cached like those of connect_to_database.
+
+    Parameters:
+    -----------
+    db_type, host, port, user, password, database, query, fetch_size,
+    progress_callback, cancel_event
+        As for stream_database_query
+    cache_ttl, force_refresh
+        As for connect_to_database
+
+    Returns:
+    --------
+    pyarrow.Table or None
+        Query result, or None if the read was cancelled
+    """
+    key = _query_cache_key(db_type, host, port, user, password, database, query, "arrow") if cache_ttl else None
+    if key is not None and not force_refresh:
+        table = QUERY_CACHE.get(key)
+        if table is not None:
+            if progress_callback is not None:
+                progress_callback(table.num_rows)
+            return table
+
+    batches = list(stream_database_query(
+        db_type, host, port, user, password, database, query,
+        fetch_size=fetch_size, progress_callback=progress_callback, cancel_event=cancel_event
+    ))
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+
+    table = pa.concat_tables(
+        [pa.Table.from_batches([batch]) for batch in batches],
+        promote_options="permissive"
+    )
+    if key is not None:
+        QUERY_CACHE.put(key, table, cache_ttl)
+    return table
+
 # Function to connect to API and get data
 def connect_to_api(url, method, params_str, headers_str, auth_required=False, 
                    auth_type=None, auth_username=None, auth_password=None, auth_token=None):
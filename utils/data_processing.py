@@ -3,6 +3,18 @@ import numpy as np
 import streamlit as st
 from datetime import datetime, timedelta
 import re
+from collections import OrderedDict
+from utils.indexing import range_mask
+from utils.sketches import HyperLogLog, approx_distinct
+from utils.dtypes import is_text_dtype, detect_datetime_format
+from utils.text_ops import apply_text_manipulation
+from utils.expressions import evaluate_formula, apply_column_function, requires_python, UnsupportedExpression
+from utils.fingerprint import dataframe_fingerprint
+from utils.aggregation import aggregate_dataframe
+from utils.datetimes import to_datetime_cached
+from utils.joins import join_dataframes
+from utils.windows import apply_window
+from utils.reshape import pivot_dataframe, unpivot_dataframe, deduplicate_dataframe
 
 def preview_dataframe(df, rows=10):
     """
@@ -10,25 +22,74 @@ def preview_dataframe(df, rows=10):
     
     Parameters:
     -----------
-    df : DataFrame
-        Pandas DataFrame to preview
+    df : DataFrame or pyarrow.Table
+        Pandas DataFrame or Arrow table to preview
     rows : int
         Number of rows to display
     """
+    # Arrow tables are previewed from a zero-copy slice
+    is_table = hasattr(df, "num_columns")
+    
     # Display the dataframe
     st.dataframe(
-        df.head(rows), 
+        df.slice(0, rows) if is_table else df.head(rows), 
         use_container_width=True,
         hide_index=False
     )
     
     # Show row and column counts
-    st.caption(f"Showing {min(rows, len(df))} of {len(df)} rows and {len(df.columns)} columns")
+    column_count = df.num_columns if is_table else len(df.columns)
+    st.caption(f"Showing {min(rows, len(df))} of {len(df)} rows and {column_count} columns")
+
+# Rows used to detect column types and estimate sample-based statistics
+SUMMARY_SAMPLE_SIZE = 10000
+
+# Above this many rows, distinct counts, medians and memory usage are approximated
+SUMMARY_APPROXIMATE_ROWS = 200000
+
+# Summaries already computed, keyed by dataframe fingerprint
+_SUMMARY_CACHE = OrderedDict()
+_SUMMARY_CACHE_SIZE = 32
+
+def _sample_positions(row_count, sample_size):
+    """
+    Pick a reproducible, sorted random sample of row positions.
+    
+    Returns None when the dataframe is small enough to use every row.
+    """
+    if row_count <= sample_size:
+        return None
+    rng = np.random.default_rng(0)
+    return np.sort(rng.choice(row_count, size=sample_size, replace=False))
+
+def _estimate_memory_usage(df, positions):
+    """
+    Estimate the deep memory usage of a dataframe in bytes.
+    
+    Fixed-width columns are measured exactly; the size of Python objects is
+    extrapolated from a sample of rows.
+    """
+    if positions is None:
+        return int(df.memory_usage(deep=True).sum())
+    
+    shallow = df.memory_usage(deep=False)
+    sample_deep = df.take(positions).memory_usage(deep=True, index=False)
+    sample_shallow = df.take(positions).memory_usage(deep=False, index=False)
+    
+    scale = len(df) / len(positions)
+    extra = ((sample_deep - sample_shallow) * scale).sum()
+    return int(shallow.sum() + extra)
 
 def get_data_summary(df):
     """
     Generate a summary of a dataframe including data types, missing values, etc.
     
+    Column types are detected from a bounded sample of rows. On large
+    dataframes distinct counts use a HyperLogLog sketch and medians and
+    memory usage are estimated from the sample, which is flagged in the
+    result. Summaries are cached per dataframe fingerprint and must not be
+    modified by callers.
+    
     Parameters:
     -----------
     df : DataFrame
@@ -39,54 +100,85 @@ def get_data_summary(df):
     dict
         Dictionary containing summary information
     """
+    column_hashes = {}
+    fingerprint = dataframe_fingerprint(df, column_hashes=column_hashes)
+    cached = _SUMMARY_CACHE.get(fingerprint)
+    if cached is not None:
+        _SUMMARY_CACHE.move_to_end(fingerprint)
+        return cached
+    
+    approximate = len(df) > SUMMARY_APPROXIMATE_ROWS
+    positions = _sample_positions(len(df), SUMMARY_SAMPLE_SIZE)
+    missing = df.isna()
+    missing_counts = missing.sum()
+    
     # Get basic info
     summary = {
         "rows": len(df),
         "columns": len(df.columns),
-        "missing_values": int(df.isna().sum().sum()),
-        "memory_usage": str(round(df.memory_usage(deep=True).sum() / (1024 * 1024), 2)) + " MB",
+        "missing_values": int(missing_counts.sum()),
+        "memory_usage": str(round(_estimate_memory_usage(df, positions if approximate else None) / (1024 * 1024), 2)) + " MB",
         "column_info": []
     }
     
+    if approximate:
+        summary["approximate"] = True
+        summary["sampled_rows"] = len(positions)
+    
     # Get column information
     for col in df.columns:
-        col_type = str(df[col].dtype)
+        column = df[col]
+        sample = column if positions is None else column.take(positions)
+        col_type = str(column.dtype)
         
-        # Check if date column
+        # Check if date column, using the sample only
         is_date = False
-        if col_type == 'object':
-            try:
-                pd.to_datetime(df[col])
-                is_date = True
+        date_format = None
+        if col_type == 'object' or isinstance(column.dtype, pd.StringDtype):
+            is_date, date_format = detect_datetime_format(sample)
+            if is_date:
                 col_type = "datetime"
-            except:
-                pass
         
         # Get unique values info
-        unique_count = df[col].nunique()
+        if approximate:
+            # Reuse the value hashes computed for the fingerprint when available
+            if col in column_hashes:
+                sketch = HyperLogLog()
+                sketch.add_hashes(column_hashes[col][~missing[col].to_numpy()])
+                unique_count = sketch.count()
+            else:
+                unique_count = approx_distinct(column)
+        else:
+            unique_count = column.nunique()
         
-        # Get min, max, mean for numeric columns
+        # Get min, max, mean for numeric columns, each computed once
         stats = {}
-        if np.issubdtype(df[col].dtype, np.number):
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            col_min = column.min()
+            col_max = column.max()
+            col_mean = column.mean()
+            col_median = sample.median() if approximate else column.median()
             stats = {
-                "min": float(df[col].min()) if not pd.isna(df[col].min()) else None,
-                "max": float(df[col].max()) if not pd.isna(df[col].max()) else None,
-                "mean": float(df[col].mean()) if not pd.isna(df[col].mean()) else None,
-                "median": float(df[col].median()) if not pd.isna(df[col].median()) else None
+                "min": float(col_min) if not pd.isna(col_min) else None,
+                "max": float(col_max) if not pd.isna(col_max) else None,
+                "mean": float(col_mean) if not pd.isna(col_mean) else None,
+                "median": float(col_median) if not pd.isna(col_median) else None
             }
         elif is_date:
             # For date columns, get min and max dates
-            dates = pd.to_datetime(df[col])
+            dates = pd.to_datetime(column, errors='coerce', format=date_format if date_format else "mixed")
+            min_date = dates.min()
+            max_date = dates.max()
             stats = {
-                "min_date": dates.min().strftime("%Y-%m-%d") if not pd.isna(dates.min()) else None,
-                "max_date": dates.max().strftime("%Y-%m-%d") if not pd.isna(dates.max()) else None,
-                "range_days": (dates.max() - dates.min()).days if not pd.isna(dates.min()) and not pd.isna(dates.max()) else None
+                "min_date": min_date.strftime("%Y-%m-%d") if not pd.isna(min_date) else None,
+                "max_date": max_date.strftime("%Y-%m-%d") if not pd.isna(max_date) else None,
+                "range_days": (max_date - min_date).days if not pd.isna(min_date) and not pd.isna(max_date) else None
             }
         
         # Get sample values for categorical columns
         sample_values = []
-        if col_type in ['object', 'category'] and not is_date:
-            sample_values = df[col].dropna().unique()[:5].tolist()
+        if col_type in ['object', 'category', 'string'] and not is_date:
+            sample_values = sample.dropna().unique()[:5].tolist()
             # Convert to strings for JSON serialization
             sample_values = [str(val) for val in sample_values]
         
@@ -94,7 +186,7 @@ def get_data_summary(df):
         col_info = {
             "name": col,
             "type": col_type,
-            "missing": int(df[col].isna().sum()),
+            "missing": int(missing_counts[col]),
             "unique_values": int(unique_count),
             "stats": stats
         }
@@ -104,26 +196,117 @@ def get_data_summary(df):
         
         summary["column_info"].append(col_info)
     
+    _SUMMARY_CACHE[fingerprint] = summary
+    if len(_SUMMARY_CACHE) > _SUMMARY_CACHE_SIZE:
+        _SUMMARY_CACHE.popitem(last=False)
+    
     return summary
 
-def filter_dataframe(df, filters):
+# Compiled filter plans keyed by filter signature (see compile_filters)
+_FILTER_PLAN_CACHE = {}
+_FILTER_PLAN_CACHE_SIZE = 256
+
+def _freeze_filter_value(value):
     """
-    Apply filters to a dataframe.
+    Convert a filter value into a hashable form for use in a cache key.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_filter_value(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze_filter_value(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze_filter_value(v)) for k, v in value.items()))
+    if isinstance(value, np.ndarray):
+        return tuple(value.tolist())
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+def _filter_signature(filters):
+    """
+    Build a hashable signature describing a list of filter dictionaries.
+    """
+    return tuple(
+        (
+            filter_dict.get("column"),
+            filter_dict.get("operation"),
+            type(filter_dict.get("value")).__name__,
+            _freeze_filter_value(filter_dict.get("value"))
+        )
+        for filter_dict in filters
+    )
+
+def _compile_predicate(operation, value):
+    """
+    Compile a single filter operation into a function that maps a Series to
+    a boolean numpy array, or None if the operation does not apply.
+    """
+    if operation == "equals":
+        return lambda series: (series == value).to_numpy(dtype=bool, na_value=False)
+    elif operation == "not_equals":
+        return lambda series: (series != value).to_numpy(dtype=bool, na_value=True)
+    elif operation == "greater_than":
+        return lambda series: (series > value).to_numpy(dtype=bool, na_value=False)
+    elif operation == "less_than":
+        return lambda series: (series < value).to_numpy(dtype=bool, na_value=False)
+    elif operation in ("contains", "starts_with", "ends_with"):
+        def text_predicate(series):
+            # Text operations only apply to string columns
+            if not is_text_dtype(series.dtype):
+                return None
+            if operation == "contains":
+                matches = series.str.contains(value, na=False)
+            elif operation == "starts_with":
+                matches = series.str.startswith(value, na=False)
+            else:
+                matches = series.str.endswith(value, na=False)
+            return matches.to_numpy(dtype=bool, na_value=False)
+        return text_predicate
+    elif operation in ("in_list", "not_in_list"):
+        values = list(value)
+        if operation == "in_list":
+            return lambda series: series.isin(values).to_numpy(dtype=bool)
+        return lambda series: ~series.isin(values).to_numpy(dtype=bool)
+    elif operation == "between":
+        min_val, max_val = value
+        return lambda series: ((series >= min_val) & (series <= max_val)).to_numpy(dtype=bool, na_value=False)
+    elif operation == "date_range":
+        start_date, end_date = pd.Timestamp(value[0]), pd.Timestamp(value[1])
+        def date_predicate(series):
+            # Convert to datetime if needed, parsed once per column
+            if series.dtype != 'datetime64[ns]':
+                series = to_datetime_cached(series)
+            return ((series >= start_date) & (series <= end_date)).to_numpy(dtype=bool, na_value=False)
+        return date_predicate
+    
+    return None
+
+def compile_filters(filters):
+    """
+    Compile a list of filter dictionaries into a reusable query plan.
+    
+    Incomplete filters are dropped and each remaining filter is turned into a
+    predicate producing a boolean mask. Plans are cached by filter signature,
+    so dashboards that re-filter on every rerun only compile once.
     
     Parameters:
     -----------
-    df : DataFrame
-        Pandas DataFrame to filter
     filters : list
         List of filter dictionaries with column, operation, and value
         
     Returns:
     --------
-    DataFrame
-        Filtered DataFrame
+    tuple
+        Tuple of (column, operation, value, predicate) entries
     """
-    filtered_df = df.copy()
+    signature = _filter_signature(filters)
+    plan = _FILTER_PLAN_CACHE.get(signature)
+    if plan is not None:
+        return plan
     
+    compiled = []
     for filter_dict in filters:
         column = filter_dict.get("column")
         operation = filter_dict.get("operation")
@@ -132,41 +315,245 @@ def filter_dataframe(df, filters):
         if column is None or operation is None or value is None:
             continue
         
-        # Apply filter based on operation
-        if operation == "equals":
-            filtered_df = filtered_df[filtered_df[column] == value]
-        elif operation == "not_equals":
-            filtered_df = filtered_df[filtered_df[column] != value]
-        elif operation == "greater_than":
-            filtered_df = filtered_df[filtered_df[column] > value]
-        elif operation == "less_than":
-            filtered_df = filtered_df[filtered_df[column] < value]
-        elif operation == "contains":
-            if filtered_df[column].dtype == 'object':
-                filtered_df = filtered_df[filtered_df[column].str.contains(value, na=False)]
-        elif operation == "starts_with":
-            if filtered_df[column].dtype == 'object':
-                filtered_df = filtered_df[filtered_df[column].str.startswith(value, na=False)]
-        elif operation == "ends_with":
-            if filtered_df[column].dtype == 'object':
-                filtered_df = filtered_df[filtered_df[column].str.endswith(value, na=False)]
-        elif operation == "in_list":
-            filtered_df = filtered_df[filtered_df[column].isin(value)]
-        elif operation == "not_in_list":
-            filtered_df = filtered_df[~filtered_df[column].isin(value)]
-        elif operation == "between":
-            min_val, max_val = value
-            filtered_df = filtered_df[(filtered_df[column] >= min_val) & (filtered_df[column] <= max_val)]
-        elif operation == "date_range":
-            start_date, end_date = value
-            # Convert to datetime if needed
-            if filtered_df[column].dtype != 'datetime64[ns]':
-                filtered_df[column] = pd.to_datetime(filtered_df[column])
-            filtered_df = filtered_df[(filtered_df[column] >= start_date) & (filtered_df[column] <= end_date)]
-    
-    return filtered_df
+        predicate = _compile_predicate(operation, value)
+        if predicate is not None:
+            compiled.append((column, operation, value, predicate))
+    
+    plan = tuple(compiled)
+    
+    # Keep the cache bounded by evicting the oldest plan
+    if len(_FILTER_PLAN_CACHE) >= _FILTER_PLAN_CACHE_SIZE:
+        _FILTER_PLAN_CACHE.pop(next(iter(_FILTER_PLAN_CACHE)))
+    _FILTER_PLAN_CACHE[signature] = plan
+    
+    return plan
+
+def filter_mask(df, filters, index=None):
+    """
+    Evaluate a list of filters against a dataframe as a single boolean mask.
+    
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to filter
+    filters : list
+        List of filter dictionaries with column, operation, and value
+    index : DataSourceIndex
+        Optional index used to answer equality and list filters
+        
+    Returns:
+    --------
+    numpy.ndarray or None
+        Boolean mask of matching rows, or None if no filter applies
+    """
+    mask = None
+    
+    if index is not None and not index.is_valid_for(df):
+        index = None
+    
+    for column, operation, value, predicate in compile_filters(filters):
+        column_mask = None
+        if index is not None:
+            column_mask = index.mask(column, operation, value)
+        if column_mask is None:
+            column_mask = range_mask(df, column, operation, value)
+        if column_mask is None:
+            column_mask = predicate(df[column])
+        if column_mask is None:
+            continue
+        
+        if mask is None:
+            mask = column_mask.copy()
+        else:
+            mask &= column_mask
+        
+        # Nothing left to match, skip the remaining predicates
+        if not mask.any():
+            break
+    
+    return mask
+
+def filter_dataframe(df, filters, index=None):
+    """
+    Apply filters to a dataframe.
+    
+    All filters are combined into one boolean mask and the matching rows are
+    taken in a single pass. When no filter applies the input dataframe is
+    returned as-is, so callers must not modify the result in place.
+    
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to filter
+    filters : list
+        List of filter dictionaries with column, operation, and value
+    index : DataSourceIndex
+        Optional index of the data source (see utils.indexing)
+        
+    Returns:
+    --------
+    DataFrame
+        Filtered DataFrame
+    """
+    mask = filter_mask(df, filters, index=index)
+    
+    if mask is None:
+        return df
+    
+    return df.take(np.flatnonzero(mask))
+
+# Operations that modify columns of the frame they are applied to
+MUTATING_OPERATIONS = ("create_column", "window", "handle_missing", "change_type", "apply_function")
+
+def condition_mask(df, condition_params):
+    """
+    Evaluate a condition of a conditional column as a boolean mask.
+    
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to evaluate the condition on
+    condition_params : dict
+        Condition type, column and comparison values
+    
+    Returns:
+    --------
+    numpy.ndarray or None
+        Boolean array where missing values count as not matching, or None
+        for an unknown condition type
+    """
+    condition_type = condition_params.get("type")
+    column = condition_params.get("column")
+    
+    mask = None
+    
+    if condition_type == "greater_than":
+        threshold = condition_params.get("threshold")
+        mask = df[column] > threshold
+    
+    elif condition_type == "less_than":
+        threshold = condition_params.get("threshold")
+        mask = df[column] < threshold
+    
+    elif condition_type == "equal_to":
+        value = condition_params.get("value")
+        mask = df[column] == value
+    
+    elif condition_type == "between":
+        min_threshold = condition_params.get("min_threshold")
+        max_threshold = condition_params.get("max_threshold")
+        mask = (df[column] >= min_threshold) & (df[column] <= max_threshold)
+    
+    elif condition_type == "in_list":
+        values = condition_params.get("values")
+        mask = df[column].isin(values)
+    
+    elif condition_type == "contains":
+        value = condition_params.get("value")
+        if is_text_dtype(df[column].dtype):
+            mask = df[column].str.contains(value, na=False)
+        else:
+            mask = np.zeros(len(df), dtype=bool)
+    
+    if isinstance(mask, pd.Series):
+        # Missing values in nullable columns count as not matching
+        mask = mask.to_numpy(dtype=bool, na_value=False)
+    
+    return mask
+
+def conditional_to_case_when(params):
+    """
+    Convert the parameters of a single-condition conditional column into a
+    case_when with one branch.
+    
+    Parameters:
+    -----------
+    params : dict
+        create_column parameters with condition_params, true_value and false_value
+    
+    Returns:
+    --------
+    dict
+        Equivalent create_column parameters with the case_when method
+    """
+    return {
+        "new_column": params.get("new_column"),
+        "method": "case_when",
+        "cases": [{
+            "condition_params": params.get("condition_params", {}),
+            "value": params.get("true_value")
+        }],
+        "default": params.get("false_value")
+    }
+
+def evaluate_case_when(df, cases, default=None):
+    """
+    Compute a CASE WHEN column: each row takes the value of the first case
+    whose condition it matches, or the default when it matches none.
+    
+    All conditions are evaluated as vectorized masks and combined in a
+    single np.select pass, instead of one column per chained condition.
+    
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to evaluate the conditions on
+    cases : list
+        Ordered list of dictionaries with condition_params and value
+    default : object
+        Value for rows that match no condition
+    
+    Returns:
+    --------
+    numpy.ndarray
+        Values of the new column
+    """
+    masks = []
+    values = []
+    for case in cases:
+        mask = condition_mask(df, case.get("condition_params", {}))
+        # Branches with an unknown condition never match
+        if mask is not None:
+            masks.append(mask)
+            values.append(case.get("value"))
+    
+    if not masks:
+        return np.full(len(df), default)
+    
+    try:
+        choices = [np.asarray(value) for value in values]
+        default = np.asarray(default)
+        np.result_type(*choices, default)
+    except TypeError:
+        # Values without a common type (text and numbers) are kept as objects
+        choices = [np.array(value, dtype=object) for value in values]
+        default = np.array(default, dtype=object)
+    
+    return np.select(masks, choices, default=default)
+
+def join_source_data(source_name):
+    """
+    Get the data of the source joined by a join_sources step.
+    
+    Parameters:
+    -----------
+    source_name : str
+        Name of an entry in st.session_state.data_sources
+        
+    Returns:
+    --------
+    DataFrame
+        Data of the source
+    """
+    # arrow_store imports this module, so it is imported on first use
+    from utils.arrow_store import get_source_data
+    
+    data_sources = st.session_state.get("data_sources", {})
+    if source_name not in data_sources:
+        raise ValueError(f"Data source to join not found: {source_name}")
+    return get_source_data(data_sources[source_name])
 
-def apply_transformation(df, operation, params):
+def apply_transformation(df, operation, params, copy=True):
     """
     Apply a transformation operation to a dataframe.
     
@@ -178,62 +565,85 @@ def apply_transformation(df, operation, params):
         Transformation operation to apply
     params : dict
         Parameters for the transformation
+    copy : bool
+        Whether to protect the input from modification. Pass False only for
+        intermediate frames the caller owns.
         
     Returns:
     --------
     DataFrame
         Transformed DataFrame
     """
-    # Make a copy of the dataframe to avoid modifying the original
-    result_df = df.copy()
+    # Make a copy of the dataframe to avoid modifying the original; other
+    # operations always build a new frame
+    if copy and operation in MUTATING_OPERATIONS:
+        result_df = df.copy()
+    else:
+        result_df = df
     
     if operation == "filter_rows":
         column = params.get("column")
         filter_type = params.get("type")
+        mask = None
         
         if filter_type == "range":
             min_value = params.get("min_value")
             max_value = params.get("max_value")
-            result_df = result_df[(result_df[column] >= min_value) & (result_df[column] <= max_value)]
+            mask = range_mask(df, column, "between", (min_value, max_value))
+            if mask is None:
+                mask = (result_df[column] >= min_value) & (result_df[column] <= max_value)
         
         elif filter_type == "greater_than":
             value = params.get("value")
-            result_df = result_df[result_df[column] > value]
+            mask = range_mask(df, column, "greater_than", value)
+            if mask is None:
+                mask = result_df[column] > value
         
         elif filter_type == "less_than":
             value = params.get("value")
-            result_df = result_df[result_df[column] < value]
+            mask = range_mask(df, column, "less_than", value)
+            if mask is None:
+                mask = result_df[column] < value
         
         elif filter_type == "equal_to":
             value = params.get("value")
-            result_df = result_df[result_df[column] == value]
+            mask = result_df[column] == value
         
         elif filter_type == "in_list":
             values = params.get("values")
-            result_df = result_df[result_df[column].isin(values)]
+            mask = result_df[column].isin(values)
         
         elif filter_type == "contains":
             value = params.get("value")
-            if result_df[column].dtype == 'object':
-                result_df = result_df[result_df[column].str.contains(value, na=False)]
+            if is_text_dtype(result_df[column].dtype):
+                mask = result_df[column].str.contains(value, na=False)
         
         elif filter_type == "starts_with":
             value = params.get("value")
-            if result_df[column].dtype == 'object':
-                result_df = result_df[result_df[column].str.startswith(value, na=False)]
+            if is_text_dtype(result_df[column].dtype):
+                mask = result_df[column].str.startswith(value, na=False)
         
         elif filter_type == "ends_with":
             value = params.get("value")
-            if result_df[column].dtype == 'object':
-                result_df = result_df[result_df[column].str.endswith(value, na=False)]
+            if is_text_dtype(result_df[column].dtype):
+                mask = result_df[column].str.endswith(value, na=False)
         
         elif filter_type == "date_range":
             start_date = params.get("start_date")
             end_date = params.get("end_date")
-            # Convert to datetime if needed
-            if result_df[column].dtype != 'datetime64[ns]':
-                result_df[column] = pd.to_datetime(result_df[column])
-            result_df = result_df[(result_df[column] >= start_date) & (result_df[column] <= end_date)]
+            mask = range_mask(df, column, "date_range", (start_date, end_date))
+            if mask is None:
+                dates = result_df[column]
+                # Convert to datetime if needed
+                if dates.dtype != 'datetime64[ns]':
+                    dates = to_datetime_cached(dates)
+                mask = (dates >= start_date) & (dates <= end_date)
+        
+        # Take the matching rows in one pass
+        if mask is not None:
+            if isinstance(mask, pd.Series):
+                mask = mask.to_numpy(dtype=bool, na_value=False)
+            result_df = result_df.take(np.flatnonzero(mask))
     
     elif operation == "select_columns":
         columns = params.get("columns")
@@ -242,18 +652,15 @@ def apply_transformation(df, operation, params):
     elif operation == "sort_data":
         column = params.get("column")
         ascending = params.get("ascending", True)
-        result_df = result_df.sort_values(by=column, ascending=ascending)
+        # Stable, so ties keep their order whether or not filters ran first
+        result_df = result_df.sort_values(by=column, ascending=ascending, kind="stable")
     
     elif operation == "aggregate_data":
         group_columns = params.get("group_columns")
         aggregations = params.get("aggregations", {})
         
-        # Convert to expected format for pandas agg
-        agg_dict = {}
-        for col, funcs in aggregations.items():
-            agg_dict[col] = funcs
-        
-        result_df = result_df.groupby(group_columns).agg(agg_dict).reset_index()
+        # Factorized keys and shared segment reductions, see utils/aggregation.py
+        result_df = aggregate_dataframe(result_df, group_columns, aggregations)
     
     elif operation == "create_column":
         new_column = params.get("new_column")
@@ -313,110 +720,40 @@ def apply_transformation(df, operation, params):
             elif formula_type == "custom_formula":
                 formula = formula_params.get("formula")
                 
-                # Replace column names in curly braces with actual references
-                for col in result_df.columns:
-                    formula = formula.replace(f"{{{col}}}", f"result_df['{col}']")
-                
-                # Evaluate the formula (use eval carefully in production!)
-                result_df[new_column] = eval(formula)
+                try:
+                    # Compiled once and evaluated in vectorized chunks
+                    result_df[new_column] = evaluate_formula(result_df, formula)
+                except UnsupportedExpression:
+                    # Only formulas using pandas methods fall back to the legacy path
+                    if not requires_python(formula):
+                        raise
+                    
+                    # Replace column names in curly braces with actual references
+                    for col in result_df.columns:
+                        formula = formula.replace(f"{{{col}}}", f"result_df['{col}']")
+                    
+                    # Evaluate the formula (use eval carefully in production!)
+                    result_df[new_column] = eval(formula)
         
-        elif method == "conditional":
-            condition_params = params.get("condition_params", {})
-            true_value = params.get("true_value")
-            false_value = params.get("false_value")
-            
-            condition_type = condition_params.get("type")
-            column = condition_params.get("column")
-            
-            mask = None
-            
-            if condition_type == "greater_than":
-                threshold = condition_params.get("threshold")
-                mask = result_df[column] > threshold
-            
-            elif condition_type == "less_than":
-                threshold = condition_params.get("threshold")
-                mask = result_df[column] < threshold
+        elif method in ("conditional", "case_when"):
+            if method == "conditional":
+                params = conditional_to_case_when(params)
             
-            elif condition_type == "equal_to":
-                value = condition_params.get("value")
-                mask = result_df[column] == value
-            
-            elif condition_type == "between":
-                min_threshold = condition_params.get("min_threshold")
-                max_threshold = condition_params.get("max_threshold")
-                mask = (result_df[column] >= min_threshold) & (result_df[column] <= max_threshold)
-            
-            elif condition_type == "in_list":
-                values = condition_params.get("values")
-                mask = result_df[column].isin(values)
-            
-            elif condition_type == "contains":
-                value = condition_params.get("value")
-                if result_df[column].dtype == 'object':
-                    mask = result_df[column].str.contains(value, na=False)
-                else:
-                    mask = np.zeros(len(result_df), dtype=bool)
-            
-            if mask is not None:
-                result_df[new_column] = np.where(mask, true_value, false_value)
+            result_df[new_column] = evaluate_case_when(result_df, params.get("cases", []), params.get("default"))
         
         elif method == "text_manipulation":
-            text_params = params.get("text_params", {})
-            manipulation_type = text_params.get("type")
-            
-            if manipulation_type == "extract_substring":
-                column = text_params.get("column")
-                start = text_params.get("start", 0)
-                length = text_params.get("length")
-                
-                result_df[new_column] = result_df[column].astype(str).apply(
-                    lambda x: x[start:start+length] if len(x) > start else ""
-                )
-            
-            elif manipulation_type == "concatenate":
-                if text_params.get("concat_with") == "column":
-                    column1 = text_params.get("column1")
-                    column2 = text_params.get("column2")
-                    separator = text_params.get("separator", "")
-                    
-                    result_df[new_column] = result_df[column1].astype(str) + separator + result_df[column2].astype(str)
-                
-                else:  # concat_with == "text"
-                    column = text_params.get("column")
-                    text = text_params.get("text", "")
-                    position = text_params.get("position", "after")
-                    
-                    if position == "before":
-                        result_df[new_column] = text + result_df[column].astype(str)
-                    else:
-                        result_df[new_column] = result_df[column].astype(str) + text
-            
-            elif manipulation_type == "replace":
-                column = text_params.get("column")
-                find = text_params.get("find", "")
-                replace = text_params.get("replace", "")
-                
-                result_df[new_column] = result_df[column].astype(str).str.replace(find, replace)
-            
-            elif manipulation_type == "change_case":
-                column = text_params.get("column")
-                case = text_params.get("case", "lower")
-                
-                if case == "upper":
-                    result_df[new_column] = result_df[column].astype(str).str.upper()
-                elif case == "lower":
-                    result_df[new_column] = result_df[column].astype(str).str.lower()
-                elif case == "title_case":
-                    result_df[new_column] = result_df[column].astype(str).str.title()
+            # Vectorized over Arrow-backed strings, see utils/text_ops.py
+            values = apply_text_manipulation(result_df, params.get("text_params", {}))
+            if values is not None:
+                result_df[new_column] = values
         
         elif method == "date_extraction":
             date_column = params.get("date_column")
             component = params.get("component")
             
-            # Convert to datetime if needed
+            # Convert to datetime if needed, reusing an earlier parse of the column
             if result_df[date_column].dtype != 'datetime64[ns]':
-                result_df[date_column] = pd.to_datetime(result_df[date_column], errors='coerce')
+                result_df[date_column] = to_datetime_cached(result_df[date_column], errors='coerce')
             
             if component == "year":
                 result_df[new_column] = result_df[date_column].dt.year
@@ -448,6 +785,11 @@ def apply_transformation(df, operation, params):
         
         elif method == "fill_value":
             value = params.get("value")
+            # Categorical columns only accept values that are already categories
+            for col in columns:
+                if (isinstance(result_df[col].dtype, pd.CategoricalDtype) and value is not None
+                        and value not in result_df[col].cat.categories):
+                    result_df[col] = result_df[col].cat.add_categories([value])
             result_df[columns] = result_df[columns].fillna(value)
         
         elif method == "fill_stats":
@@ -494,14 +836,47 @@ def apply_transformation(df, operation, params):
         
         elif new_type == "datetime":
             date_format = params.get("date_format")
-            if date_format:
-                result_df[column] = pd.to_datetime(result_df[column], format=date_format)
-            else:
-                result_df[column] = pd.to_datetime(result_df[column])
+            result_df[column] = to_datetime_cached(result_df[column], date_format=date_format or None)
         
         elif new_type == "category":
             result_df[column] = result_df[column].astype('category')
     
+    elif operation == "window":
+        # Computed over sorted partition blocks, see utils/windows.py
+        result_df[params.get("new_column")] = apply_window(result_df, params)
+    
+    elif operation == "pivot":
+        result_df = pivot_dataframe(
+            result_df,
+            params.get("index", []),
+            params.get("columns"),
+            params.get("values", []),
+            aggfunc=params.get("aggfunc", "mean")
+        )
+    
+    elif operation == "unpivot":
+        result_df = unpivot_dataframe(
+            result_df,
+            params.get("id_columns", []),
+            params.get("value_columns") or None,
+            variable_name=params.get("variable_name", "variable"),
+            value_name=params.get("value_name", "value")
+        )
+    
+    elif operation == "deduplicate":
+        result_df = deduplicate_dataframe(result_df, params.get("subset") or None, keep=params.get("keep", "first"))
+    
+    elif operation == "join_sources":
+        right_df = join_source_data(params.get("source"))
+        result_df, _ = join_dataframes(
+            result_df,
+            right_df,
+            params.get("left_on", []),
+            params.get("right_on"),
+            how=params.get("how", "inner"),
+            strategy=params.get("strategy", "auto")
+        )
+    
     elif operation == "apply_function":
         column = params.get("column")
         function_type = params.get("function_type")
@@ -524,11 +899,10 @@ def apply_transformation(df, operation, params):
                 result_df[column] = np.ceil(result_df[column])
         
         elif function_type == "custom":
-            # Create a lambda function from the expression
-            # 'x' is used as the placeholder for the column value
+            # 'x' is used as the placeholder for the column value; functions
+            # that need Python are applied as a lambda row by row
             try:
-                lambda_func = eval(f"lambda x: {function}")
-                result_df[column] = result_df[column].apply(lambda_func)
+                result_df[column], _ = apply_column_function(result_df[column], function)
             except Exception as e:
                 raise ValueError(f"Error in custom function: {str(e)}")
     
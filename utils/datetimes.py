@@ -0,0 +1,176 @@
+import pandas as pd
+import numpy as np
+import hashlib
+from collections import OrderedDict
+from utils.fingerprint import series_fingerprint
+
+# Number of parsed datetime columns kept at the same time
+DATETIME_CACHE_SIZE = 16
+
+# Leading values checked to decide whether a column repeats its values
+_CARDINALITY_SAMPLE = 10000
+
+# Parsed columns (or the error parsing raised), keyed by (column key, errors, format)
+_DATETIME_CACHE = OrderedDict()
+
+def _is_text(series):
+    return series.dtype == object or isinstance(series.dtype, (pd.StringDtype, pd.CategoricalDtype))
+
+def _repeats_values(series):
+    """
+    Check whether a column holds few distinct values compared to its length,
+    judged from its leading values.
+    """
+    sample = series.iloc[:_CARDINALITY_SAMPLE]
+    return sample.nunique() <= len(sample) // 2
+
+def _factorized_key(codes, uniques):
+    """
+    Identify a column by its distinct values and codes, which is much
+    cheaper than hashing every value of a repetitive text column.
+    """
+    digest = hashlib.sha1()
+    digest.update(repr((len(codes), len(uniques))).encode())
+    weights = np.arange(1, 2 * len(uniques) + 1, 2, dtype=np.uint64)
+    digest.update(np.sum(pd.util.hash_array(np.asarray(uniques, dtype=object), categorize=False) * weights).tobytes())
+    digest.update(np.sum(codes.astype(np.uint64) * np.arange(1, 2 * len(codes) + 1, 2, dtype=np.uint64)).tobytes())
+    return digest.hexdigest()
+
+def _parse_unique(codes, uniques, index, name, errors, date_format):
+    """
+    Parse distinct values and map them back to the rows through their codes.
+    """
+    parsed = pd.to_datetime(pd.Series(np.asarray(uniques, dtype=object)), errors=errors, format=date_format)
+    if len(parsed) == 0:
+        return pd.Series(pd.NaT, index=index, name=name, dtype="datetime64[ns]")
+
+    result = parsed.take(np.maximum(codes, 0))
+    result.index = index
+    result.name = name
+    if (codes < 0).any():
+        result[codes < 0] = pd.NaT
+    return result
+
+def parse_datetimes(series, errors="raise", date_format=None):
+    """
+    Parse a column to datetimes, parsing each distinct value only once.
+
+    Text columns that repeat their values (a date per day over many rows)
+    are factorized and only the distinct values are parsed, then mapped
+    back through their codes. Other columns go to pd.to_datetime as they
+    are. The result is the same as pd.to_datetime, including how the
+    format is inferred from the first value.
+
+    Parameters:
+    -----------
+    series : Series
+        Column to parse
+    errors : str
+        "raise" or "coerce", as in pd.to_datetime
+    date_format : str
+        strftime format of the values, or None to infer it
+
+    Returns:
+    --------
+    Series
+        datetime64 column with the same index and name
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    if _is_text(series) and _repeats_values(series):
+        codes, uniques = pd.factorize(series)
+        return _parse_unique(codes, uniques, series.index, series.name, errors, date_format)
+
+    return pd.to_datetime(series, errors=errors, format=date_format)
+
+def to_datetime_cached(series, errors="raise", date_format=None):
+    """
+    Parse a column to datetimes once and reuse the result.
+
+    Results are cached by the content of the column, so the same column
+    parsed by a date extraction, a type change, a date range filter or a
+    chart is only parsed the first time, until its values change. Columns
+    that fail to parse fail again from the cache without being reparsed.
+
+    Parameters:
+    -----------
+    series : Series
+        Column to parse
+    errors : str
+        "raise" or "coerce", as in pd.to_datetime
+    date_format : str
+        strftime format of the values, or None to infer it
+
+    Returns:
+    --------
+    Series
+        datetime64 column with the same index and name
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    # Keyed by content on every call, so columns changed in place are reparsed
+    factorized = None
+    if _is_text(series) and _repeats_values(series):
+        # The codes needed to parse distinct values also identify the column
+        factorized = pd.factorize(series)
+        column_key = _factorized_key(*factorized)
+    else:
+        column_key = series_fingerprint(series)
+
+    key = (column_key, errors, date_format)
+    cached = _DATETIME_CACHE.get(key)
+
+    if cached is None:
+        try:
+            if factorized is not None:
+                parsed = _parse_unique(*factorized, series.index, series.name, errors, date_format)
+            else:
+                parsed = parse_datetimes(series, errors=errors, date_format=date_format)
+            cached = ("values", parsed.array)
+        except (ValueError, TypeError, OverflowError) as e:
+            cached = ("error", e)
+
+        _DATETIME_CACHE[key] = cached
+        while len(_DATETIME_CACHE) > DATETIME_CACHE_SIZE:
+            _DATETIME_CACHE.popitem(last=False)
+    else:
+        _DATETIME_CACHE.move_to_end(key)
+
+    kind, value = cached
+    if kind == "error":
+        raise value
+
+    # Callers may modify the column they get, so the cached values are copied
+    return pd.Series(value.copy(), index=series.index, name=series.name)
+
+def previous_period(latest_date, period):
+    """
+    Get the period a metric delta compares against: the day, week, month
+    (30 days) or year (365 days) ending one period before the latest date.
+
+    Parameters:
+    -----------
+    latest_date : Timestamp
+        Latest date of the data
+    period : str
+        "day", "week", "month" or "year" (any case)
+
+    Returns:
+    --------
+    tuple
+        (start, end) timestamps, both inclusive
+    """
+    period = period.lower()
+    if period == "day":
+        length = pd.Timedelta(days=1)
+    elif period == "week":
+        length = pd.Timedelta(weeks=1)
+    elif period == "month":
+        length = pd.Timedelta(days=30)
+    else:
+        length = pd.Timedelta(days=365)
+
+    end = latest_date - length
+    return end - length, end
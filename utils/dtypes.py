@@ -0,0 +1,153 @@
+import pandas as pd
+import numpy as np
+from pandas.tseries.api import guess_datetime_format
+
+try:
+    import pyarrow
+    ARROW_STRINGS_AVAILABLE = True
+except ImportError:
+    ARROW_STRINGS_AVAILABLE = False
+
+# Share of distinct values below which text columns may become categories, when requested
+DEFAULT_CATEGORY_RATIO = 0.5
+
+def is_text_dtype(dtype):
+    """
+    Check whether a dtype holds text.
+
+    Covers plain object columns as well as the pandas string and
+    categorical dtypes produced by compact_dataframe, so text operations
+    keep working on compacted data sources.
+
+    Parameters:
+    -----------
+    dtype : dtype
+        Column dtype to check
+
+    Returns:
+    --------
+    bool
+        True for object, string and text categorical dtypes
+    """
+    if isinstance(dtype, pd.CategoricalDtype):
+        return is_text_dtype(dtype.categories.dtype)
+    return dtype == object or isinstance(dtype, pd.StringDtype)
+
+def detect_datetime_format(sample):
+    """
+    Check whether the non-missing values of an object column sample parse as dates.
+
+    Returns a (is_date, format) pair, where format is the strftime format
+    guessed from the first value, or None if it could not be guessed.
+    """
+    values = sample.dropna()
+    if values.empty:
+        return False, None
+
+    first = values.iloc[0]
+    date_format = guess_datetime_format(first) if isinstance(first, str) else None
+    try:
+        pd.to_datetime(values, format=date_format if date_format else "mixed")
+        return True, date_format
+    except (ValueError, TypeError, OverflowError):
+        pass
+
+    # The first value may not be representative of the rest
+    if date_format is None:
+        return False, None
+    try:
+        pd.to_datetime(values, format="mixed")
+        return True, None
+    except (ValueError, TypeError, OverflowError):
+        return False, None
+
+def _compact_column(series, category_ratio, arrow_strings):
+    """
+    Find a smaller dtype for a column.
+
+    Returns the converted column, or None if the column is kept as it is.
+    """
+    dtype = series.dtype
+
+    # Integers keep their width: products and sums of narrow integers
+    # overflow without any warning
+    if (pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype)
+            or isinstance(dtype, pd.api.extensions.ExtensionDtype)):
+        return None
+
+    if pd.api.types.is_float_dtype(dtype):
+        if dtype == np.float32:
+            return None
+        values = series.to_numpy()
+        narrowed = values.astype(np.float32)
+        # Only downcast when every value survives the round trip
+        with np.errstate(invalid="ignore", over="ignore"):
+            exact = (narrowed.astype(dtype) == values) | np.isnan(values)
+        return pd.Series(narrowed, index=series.index, name=series.name) if exact.all() else None
+
+    if dtype == object:
+        values = series.dropna()
+        if values.empty or pd.api.types.infer_dtype(values, skipna=False) != "string":
+            return None
+
+        # Dates stay plain strings so they can still be parsed and compared
+        if (category_ratio is not None and values.nunique() <= len(series) * category_ratio
+                and not detect_datetime_format(values.head(1000))[0]):
+            return series.astype("category")
+        if arrow_strings and ARROW_STRINGS_AVAILABLE:
+            return series.astype(pd.StringDtype("pyarrow"))
+
+    return None
+
+def compact_dataframe(df, category_ratio=None, arrow_strings=True):
+    """
+    Store a dataframe with the smallest dtypes that keep its values.
+
+    Floats are downcast to float32 when no value changes, repetitive text
+    becomes categorical when category_ratio is given and other text is
+    stored as Arrow-backed strings. Integers and columns of mixed Python
+    objects are left untouched.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to compact
+    category_ratio : float
+        Maximum share of distinct values for a text column to become
+        categorical, or None to keep text out of categories
+    arrow_strings : bool
+        Whether to store the remaining text columns as Arrow-backed strings
+
+    Returns:
+    --------
+    tuple
+        (compacted DataFrame, report dict with the memory usage before and
+        after in bytes and the dtype changes per column)
+    """
+    before = int(df.memory_usage(deep=True).sum())
+
+    converted = {}
+    changes = {}
+    # Columns are replaced by name, which is ambiguous with duplicate names
+    if df.columns.is_unique:
+        for column in df.columns:
+            compacted = _compact_column(df[column], category_ratio, arrow_strings)
+            if compacted is not None:
+                converted[column] = compacted
+                changes[column] = f"{df[column].dtype} -> {compacted.dtype}"
+
+    result_df = df
+    after = before
+    if converted:
+        result_df = df.copy(deep=False)
+        for column, values in converted.items():
+            result_df[column] = values
+        after = int(result_df.memory_usage(deep=True).sum())
+
+    report = {
+        "before_bytes": before,
+        "after_bytes": after,
+        "saved_bytes": before - after,
+        "columns": changes
+    }
+    return result_df, report
@@ -7,6 +7,7 @@ import json
 from datetime import datetime
 import re
 import os
+from utils.arrow_store import get_source_data
 
 # Function to generate a PDF report
 def generate_pdf_report(report_structure, data_sources):
@@ -77,7 +78,7 @@ def generate_csv_report(report_structure, data_sources):
                 # Get the data
                 data_source = component["data_source"]
                 if data_source in data_sources:
-                    df = data_sources[data_source]["data"]
+                    df = get_source_data(data_sources[data_source])
                     
                     # Filter columns if specified
                     if "columns" in component:
@@ -95,7 +96,7 @@ def generate_csv_report(report_structure, data_sources):
                 # For charts, we'll include the underlying data
                 data_source = component["data_source"]
                 if data_source in data_sources:
-                    df = data_sources[data_source]["data"]
+                    df = get_source_data(data_sources[data_source])
                     chart_config = component["chart_config"]
                     
                     # Filter to just the columns used in the chart
@@ -195,7 +196,7 @@ def generate_excel_report(report_structure, data_sources):
                     # Get the data
                     data_source = component["data_source"]
                     if data_source in data_sources:
-                        df = data_sources[data_source]["data"]
+                        df = get_source_data(data_sources[data_source])
                         
                         # Filter columns if specified
                         if "columns" in component:
@@ -215,7 +216,7 @@ def generate_excel_report(report_structure, data_sources):
                     # Get the data
                     data_source = component["data_source"]
                     if data_source in data_sources and export_options.get("include_charts", True):
-                        df = data_sources[data_source]["data"]
+                        df = get_source_data(data_sources[data_source])
                         
                         # Write the data to Excel
                         sheet_name = f"Chart_{i+1}_Data"
@@ -374,7 +375,7 @@ def generate_report_html(report_name, report_description, components, data_sourc
             # Include data table for the chart
             data_source = component["data_source"]
             if data_source in data_sources:
-                df = data_sources[data_source]["data"]
+                df = get_source_data(data_sources[data_source])
                 
                 # Limit to a few rows to keep the report manageable
                 html_parts.append("<h3>Chart Data Preview</h3>")
@@ -386,7 +387,7 @@ def generate_report_html(report_name, report_description, components, data_sourc
             
             data_source = component["data_source"]
             if data_source in data_sources:
-                df = data_sources[data_source]["data"]
+                df = get_source_data(data_sources[data_source])
                 
                 # Filter columns if specified
                 if "columns" in component:
@@ -401,7 +402,7 @@ def generate_report_html(report_name, report_description, components, data_sourc
             
             data_source = component["data_source"]
             if data_source in data_sources:
-                df = data_sources[data_source]["data"]
+                df = get_source_data(data_sources[data_source])
                 
                 # Calculate metric value (similar logic to dashboard display)
                 metric_col = component["metric_column"]
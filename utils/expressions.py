@@ -0,0 +1,536 @@
+import pandas as pd
+import numpy as np
+import ast
+import re
+from functools import lru_cache
+
+# Rows evaluated at a time, keeps temporaries small enough to stay in cache
+DEFAULT_CHUNK_SIZE = 65536
+
+# Pattern of {column} references in custom formulas
+COLUMN_REFERENCE = re.compile(r"\{([^{}]+)\}")
+
+# Functions that can be called from expressions
+EXPRESSION_FUNCTIONS = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "log": np.log,
+    "log10": np.log10,
+    "log2": np.log2,
+    "exp": np.exp,
+    "floor": np.floor,
+    "ceil": np.ceil,
+    "round": np.round,
+    "clip": np.clip,
+    "min": np.minimum,
+    "max": np.maximum,
+    "where": np.where
+}
+
+def _text(values):
+    return pd.Series(values, dtype=object if values.dtype.kind not in "OUS" else None).str
+
+def _lower(values):
+    return _text(values).lower().to_numpy()
+
+def _upper(values):
+    return _text(values).upper().to_numpy()
+
+def _title(values):
+    return _text(values).title().to_numpy()
+
+def _strip(values):
+    return _text(values).strip().to_numpy()
+
+def _length(values):
+    return _text(values).len().to_numpy()
+
+def _startswith(values, prefix):
+    return _text(values).startswith(prefix, na=False).to_numpy(dtype=bool)
+
+def _endswith(values, suffix):
+    return _text(values).endswith(suffix, na=False).to_numpy(dtype=bool)
+
+def _contains(values, text):
+    return _text(values).contains(text, regex=False, na=False).to_numpy(dtype=bool)
+
+# String functions, backed by the vectorized pandas .str kernels
+STRING_FUNCTIONS = {
+    "lower": _lower,
+    "upper": _upper,
+    "title": _title,
+    "strip": _strip,
+    "len": _length,
+    "startswith": _startswith,
+    "endswith": _endswith,
+    "contains": _contains
+}
+EXPRESSION_FUNCTIONS.update(STRING_FUNCTIONS)
+
+# String functions that return booleans and can be combined with and/or/not
+PREDICATE_FUNCTIONS = ("startswith", "endswith", "contains")
+
+# String methods that may be called as value.method(...)
+STRING_METHODS = ("lower", "upper", "title", "strip", "startswith", "endswith")
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+                     ast.BitAnd, ast.BitOr, ast.BitXor)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub, ast.Not, ast.Invert)
+_COMPARE_OPERATORS = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+
+# Syntax that only the Python fallback can evaluate (e.g. pandas methods)
+_PYTHON_ONLY_NODES = (ast.Attribute, ast.Subscript, ast.Lambda, ast.ListComp,
+                      ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+def _power(base, exponent):
+    """
+    Raise base to exponent, promoting integers to float for negative
+    exponents as Python does instead of raising like numpy.
+    """
+    base = np.asarray(base)
+    exponent = np.asarray(exponent)
+    if base.dtype.kind in "iu" and exponent.dtype.kind in "iu" and (exponent < 0).any():
+        base = base.astype(np.float64)
+    return np.power(base, exponent)
+
+def _has_zero(values):
+    """
+    Check whether numeric or object values contain a zero.
+    """
+    values = np.asarray(values)
+    return values.dtype.kind in "iufbO" and bool(np.any(values == 0))
+
+def _integer_divisor_zero(dividend, divisor):
+    """
+    Convert an integer dividend to float when an integer divisor contains a
+    zero, so division by zero gives inf or NaN as in pandas rather than 0.
+    """
+    dividend = np.asarray(dividend)
+    divisor = np.asarray(divisor)
+    if dividend.dtype.kind in "iub" and divisor.dtype.kind in "iub" and _has_zero(divisor):
+        dividend = dividend.astype(np.float64)
+    return dividend, divisor
+
+def _floor_divide(dividend, divisor):
+    """
+    Floor division with pandas semantics for integer division by zero.
+    """
+    return np.floor_divide(*_integer_divisor_zero(dividend, divisor))
+
+def _modulo(dividend, divisor):
+    """
+    Modulo with pandas semantics for integer division by zero.
+    """
+    return np.mod(*_integer_divisor_zero(dividend, divisor))
+
+def _checked_divisor(operation):
+    """
+    Wrap a division helper so that a zero divisor raises ZeroDivisionError,
+    as the same operator does on Python values.
+    """
+    def checked(dividend, divisor):
+        if _has_zero(divisor):
+            raise ZeroDivisionError("division by zero")
+        return operation(dividend, divisor)
+    return checked
+
+def _checked_power(base, exponent):
+    """
+    Power that raises ZeroDivisionError for zero to a negative power, as
+    Python does.
+    """
+    base = np.asarray(base)
+    exponent = np.asarray(exponent)
+    if exponent.dtype.kind in "iuf" and np.any((base == 0) & (exponent < 0)):
+        raise ZeroDivisionError("0.0 cannot be raised to a negative power")
+    return _power(base, exponent)
+
+# Helpers the rewritten expressions call, always available during
+# evaluation: pandas semantics give inf or NaN on division by zero
+_INTERNAL_FUNCTIONS = {
+    "_power": _power,
+    "_divide": np.true_divide,
+    "_floor_divide": _floor_divide,
+    "_modulo": _modulo
+}
+
+# Python semantics raise ZeroDivisionError instead
+_PYTHON_DIVISION_FUNCTIONS = {
+    "_power": _checked_power,
+    "_divide": _checked_divisor(np.true_divide),
+    "_floor_divide": _checked_divisor(np.floor_divide),
+    "_modulo": _checked_divisor(np.mod)
+}
+
+# Operators rewritten into calls of the helpers above
+_OPERATOR_HELPERS = {ast.Pow: "_power", ast.Div: "_divide", ast.FloorDiv: "_floor_divide", ast.Mod: "_modulo"}
+
+def _is_boolean(node):
+    """
+    Check whether a rewritten expression node always produces booleans.
+    """
+    if isinstance(node, ast.Compare):
+        return True
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, bool)
+    if isinstance(node, ast.Call):
+        return isinstance(node.func, ast.Name) and node.func.id in PREDICATE_FUNCTIONS
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Invert):
+        return _is_boolean(node.operand)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr, ast.BitXor)):
+        return _is_boolean(node.left) and _is_boolean(node.right)
+    return False
+
+class UnsupportedExpression(ValueError):
+    """
+    Raised when an expression uses syntax the vectorized engine cannot compile.
+    """
+
+class _Vectorizer(ast.NodeTransformer):
+    """
+    Validate an expression AST and rewrite it into numpy operations.
+
+    Boolean operators between comparisons or predicates become element-wise
+    & and |, chained comparisons are split into pairs, conditional
+    expressions become where() calls and only known variables and
+    whitelisted functions may be referenced. and/or/not on other values
+    keep Python's truthiness semantics, so they are left to the Python path.
+    """
+
+    def __init__(self, variables, functions):
+        self.variables = variables
+        self.functions = functions
+
+    def generic_visit(self, node):
+        raise UnsupportedExpression(f"Unsupported syntax: {type(node).__name__}")
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float, str, bool)) and node.value is not None:
+            raise UnsupportedExpression(f"Unsupported constant: {node.value!r}")
+        return node
+
+    def visit_Name(self, node):
+        if node.id not in self.variables:
+            raise UnsupportedExpression(f"Unknown name: {node.id}")
+        return node
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _BINARY_OPERATORS):
+            raise UnsupportedExpression(f"Unsupported operator: {type(node.op).__name__}")
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        helper = _OPERATOR_HELPERS.get(type(node.op))
+        if helper is not None:
+            return ast.Call(func=ast.Name(id=helper, ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+        return node
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, _UNARY_OPERATORS):
+            raise UnsupportedExpression(f"Unsupported operator: {type(node.op).__name__}")
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            if not _is_boolean(operand):
+                raise UnsupportedExpression("not is only vectorized on boolean values")
+            return ast.UnaryOp(op=ast.Invert(), operand=operand)
+        node.operand = operand
+        return node
+
+    def visit_BoolOp(self, node):
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        values = [self.visit(value) for value in node.values]
+        if not all(_is_boolean(value) for value in values):
+            raise UnsupportedExpression("and/or are only vectorized between boolean values")
+        result = values[0]
+        for value in values[1:]:
+            result = ast.BinOp(left=result, op=op, right=value)
+        return result
+
+    def visit_Compare(self, node):
+        operands = [self.visit(node.left)] + [self.visit(c) for c in node.comparators]
+        pairs = []
+        for op, left, right in zip(node.ops, operands, operands[1:]):
+            # "text" in value is a substring test
+            if isinstance(op, (ast.In, ast.NotIn)):
+                test = ast.Call(func=ast.Name(id="contains", ctx=ast.Load()), args=[right, left], keywords=[])
+                pairs.append(ast.UnaryOp(op=ast.Invert(), operand=test) if isinstance(op, ast.NotIn) else test)
+                continue
+            if not isinstance(op, _COMPARE_OPERATORS):
+                raise UnsupportedExpression(f"Unsupported comparison: {type(op).__name__}")
+            pairs.append(ast.Compare(left=left, ops=[op], comparators=[right]))
+        result = pairs[0]
+        for pair in pairs[1:]:
+            result = ast.BinOp(left=result, op=ast.BitAnd(), right=pair)
+        return result
+
+    def visit_IfExp(self, node):
+        return ast.Call(
+            func=ast.Name(id="where", ctx=ast.Load()),
+            args=[self.visit(node.test), self.visit(node.body), self.visit(node.orelse)],
+            keywords=[]
+        )
+
+    def visit_Call(self, node):
+        # value.lower() is rewritten to lower(value)
+        if isinstance(node.func, ast.Attribute) and node.func.attr in STRING_METHODS:
+            node.args = [node.func.value] + node.args
+            node.func = ast.Name(id=node.func.attr, ctx=ast.Load())
+        if not isinstance(node.func, ast.Name) or node.func.id not in self.functions:
+            name = node.func.id if isinstance(node.func, ast.Name) else ast.unparse(node.func)
+            raise UnsupportedExpression(f"Unsupported function: {name}")
+        if node.keywords:
+            raise UnsupportedExpression("Keyword arguments are not supported")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+class CompiledExpression:
+    """
+    Expression compiled once and evaluated over numpy arrays in chunks.
+    """
+
+    def __init__(self, source, variables, code, functions, python_division=False):
+        self.source = source
+        self.variables = variables
+        self.code = code
+        self.functions = functions
+        self.python_division = python_division
+
+    def evaluate(self, arrays, length, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Evaluate the expression over aligned arrays.
+
+        Parameters:
+        -----------
+        arrays : dict
+            Mapping of variable name to numpy array
+        length : int
+            Number of rows
+        chunk_size : int
+            Number of rows evaluated at a time
+
+        Returns:
+        --------
+        numpy.ndarray
+            Result with one value per row
+        """
+        output = None
+        internal = _PYTHON_DIVISION_FUNCTIONS if self.python_division else _INTERNAL_FUNCTIONS
+        namespace = dict(internal, **self.functions)
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for start in range(0, max(length, 1), chunk_size):
+                stop = min(start + chunk_size, length)
+                for name in self.variables:
+                    namespace[name] = arrays[name][start:stop]
+
+                chunk = np.asarray(eval(self.code, {"__builtins__": {}}, namespace))
+                if chunk.ndim == 0:
+                    chunk = np.broadcast_to(chunk, (stop - start,))
+
+                if output is None:
+                    output = np.empty(length, dtype=chunk.dtype)
+                elif output.dtype != chunk.dtype and not np.can_cast(chunk.dtype, output.dtype, casting="same_kind"):
+                    output = output.astype(np.result_type(output.dtype, chunk.dtype))
+                output[start:stop] = chunk
+
+        return output
+
+def compile_expression(expression, variables, functions=None, python_division=False):
+    """
+    Parse and compile an expression over named variables.
+
+    Parameters:
+    -----------
+    expression : str
+        Python-style expression (arithmetic, comparisons, and/or/not,
+        conditional expressions, substring tests, whitelisted function
+        calls and string methods)
+    variables : iterable
+        Names the expression may reference
+    functions : dict
+        Callable functions by name (defaults to EXPRESSION_FUNCTIONS)
+    python_division : bool
+        Raise ZeroDivisionError on division by zero, as Python does,
+        instead of giving inf or NaN as pandas does
+
+    Returns:
+    --------
+    CompiledExpression
+        Compiled expression ready for vectorized evaluation
+    """
+    functions = EXPRESSION_FUNCTIONS if functions is None else functions
+    variables = tuple(variables)
+
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise UnsupportedExpression(f"Invalid expression: {e.msg}")
+
+    tree = _Vectorizer(set(variables), functions).visit(tree)
+    ast.fix_missing_locations(tree)
+    code = compile(tree, "<expression>", "eval")
+
+    return CompiledExpression(expression, variables, code, functions, python_division)
+
+def requires_python(expression):
+    """
+    Check whether an expression uses Python-only syntax such as attribute
+    access or subscripts, which the vectorized engine does not support.
+
+    Parameters:
+    -----------
+    expression : str
+        Expression to inspect
+
+    Returns:
+    --------
+    bool
+        True if the expression can only be evaluated by Python
+    """
+    try:
+        tree = ast.parse(COLUMN_REFERENCE.sub("_col", expression).strip(), mode="eval")
+    except SyntaxError:
+        return False
+    return any(isinstance(node, _PYTHON_ONLY_NODES) for node in ast.walk(tree))
+
+@lru_cache(maxsize=256)
+def compile_formula(formula):
+    """
+    Compile a custom formula that references columns as {column}.
+
+    Parameters:
+    -----------
+    formula : str
+        Formula such as "{revenue} / {units} * 100"
+
+    Returns:
+    --------
+    tuple
+        (CompiledExpression, dict mapping variable name to column name)
+    """
+    columns = {}
+
+    def placeholder(match):
+        column = match.group(1)
+        if column not in columns.values():
+            columns[f"_col{len(columns)}"] = column
+        return next(name for name, col in columns.items() if col == column)
+
+    expression = COLUMN_REFERENCE.sub(placeholder, formula)
+    return compile_expression(expression, columns), columns
+
+def _column_array(series):
+    """
+    Get the values of a column as a numpy array for expression evaluation.
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return series.to_numpy()
+
+def evaluate_formula(df, formula, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluate a custom formula against a dataframe in vectorized chunks.
+
+    The formula is parsed once and cached, column references are validated
+    against the dataframe and the result is computed in a single pass.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame with the referenced columns
+    formula : str
+        Formula referencing columns as {column}
+    chunk_size : int
+        Number of rows evaluated at a time
+
+    Returns:
+    --------
+    numpy.ndarray
+        One value per row of df
+    """
+    missing = [column for column in COLUMN_REFERENCE.findall(formula) if column not in df.columns]
+    if missing:
+        raise ValueError(f"Unknown column(s) in formula: {', '.join(missing)}")
+
+    compiled, columns = compile_formula(formula)
+    arrays = {name: _column_array(df[column]) for name, column in columns.items()}
+
+    return compiled.evaluate(arrays, len(df), chunk_size=chunk_size)
+
+@lru_cache(maxsize=256)
+def compile_column_function(function):
+    """
+    Compile a custom column function written in terms of x.
+
+    Parameters:
+    -----------
+    function : str
+        Expression such as "x * 2", "clip(x, 0, 100)" or "x.lower()"
+
+    Returns:
+    --------
+    CompiledExpression or None
+        Compiled expression, or None if the function needs Python
+    """
+    try:
+        return compile_expression(function, ("x",), python_division=True)
+    except UnsupportedExpression:
+        return None
+
+def function_execution_path(function):
+    """
+    Report how a custom column function will be executed.
+
+    Parameters:
+    -----------
+    function : str
+        Expression written in terms of x
+
+    Returns:
+    --------
+    str
+        "vectorized" if it compiles to numpy operations, "python" if it
+        falls back to applying a Python lambda row by row
+    """
+    return "vectorized" if compile_column_function(function) is not None else "python"
+
+def apply_column_function(series, function, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Apply a custom function written in terms of x to every value of a column.
+
+    Functions made of arithmetic, conditionals, clip/log/abs and friends and
+    string predicates run as vectorized numpy operations. Anything else falls
+    back to Series.apply with a Python lambda, as do vectorized functions
+    that divide by zero somewhere: a conditional may guard the division
+    (both branches are computed when vectorized), and otherwise Python
+    raises ZeroDivisionError as it always did.
+
+    Parameters:
+    -----------
+    series : Series
+        Column to transform
+    function : str
+        Expression written in terms of x
+    chunk_size : int
+        Number of rows evaluated at a time on the vectorized path
+
+    Returns:
+    --------
+    tuple
+        (transformed values, "vectorized" or "python")
+    """
+    compiled = compile_column_function(function)
+
+    if compiled is not None:
+        try:
+            values = compiled.evaluate({"x": _column_array(series)}, len(series), chunk_size=chunk_size)
+            return values, "vectorized"
+        except ZeroDivisionError:
+            pass
+
+    lambda_func = eval(f"lambda x: {function}")
+    return series.apply(lambda_func), "python"
@@ -0,0 +1,83 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import uuid
+
+def dataframe_fingerprint(df, column_hashes=None, columns=None):
+    """
+    Compute a content fingerprint of a dataframe.
+    
+    The fingerprint covers column names, dtypes and values, so equal data
+    gets the same fingerprint. It is computed from the contents on every
+    call, so a dataframe changed in place gets a new fingerprint.
+    
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to fingerprint
+    column_hashes : dict
+        Optional dictionary filled with the uint64 value hashes of each
+        column, for reuse by callers that need them too
+    columns : list
+        Only fingerprint these columns, for callers whose result does not
+        depend on the others
+        
+    Returns:
+    --------
+    str
+        Hex digest identifying the dataframe contents
+    """
+    selected = list(df.columns) if columns is None else list(columns)
+    
+    digest = hashlib.sha1()
+    digest.update(repr((df.shape, selected, [str(df[column].dtype) for column in selected] if columns is not None else [str(t) for t in df.dtypes])).encode())
+    
+    try:
+        # Position-weighted sums keep the digest sensitive to row order
+        weights = np.arange(1, 2 * len(df) + 1, 2, dtype=np.uint64)
+        hashed = pd.util.hash_pandas_object(df.index, categorize=False).to_numpy()
+        digest.update(np.sum(hashed * weights).tobytes())
+        for column in selected:
+            # Factorizing before hashing only pays off for repetitive text
+            hashed = pd.util.hash_pandas_object(df[column], index=False, categorize=False).to_numpy()
+            if column_hashes is not None:
+                column_hashes[column] = hashed
+            digest.update(np.sum(hashed * weights).tobytes())
+        fingerprint = digest.hexdigest()
+    except TypeError:
+        # Unhashable values (e.g. nested JSON) never match a cached entry
+        fingerprint = uuid.uuid4().hex
+    
+    return fingerprint
+
+def series_fingerprint(series):
+    """
+    Compute a content fingerprint of the values of a column.
+    
+    Unlike dataframe_fingerprint the index is left out, so a column keeps
+    its fingerprint when it is copied into another frame with the same
+    values. Like dataframe_fingerprint it is computed from the values on
+    every call.
+    
+    Parameters:
+    -----------
+    series : Series
+        Column to fingerprint
+        
+    Returns:
+    --------
+    str
+        Hex digest identifying the column values
+    """
+    digest = hashlib.sha1()
+    digest.update(repr((len(series), str(series.dtype))).encode())
+    
+    try:
+        weights = np.arange(1, 2 * len(series) + 1, 2, dtype=np.uint64)
+        hashed = pd.util.hash_pandas_object(series, index=False, categorize=False).to_numpy()
+        digest.update(np.sum(hashed * weights).tobytes())
+        fingerprint = digest.hexdigest()
+    except TypeError:
+        fingerprint = uuid.uuid4().hex
+    
+    return fingerprint
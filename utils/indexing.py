@@ -0,0 +1,322 @@
+import pandas as pd
+import numpy as np
+import weakref
+from utils.datetimes import to_datetime_cached
+
+# Columns with more distinct values than this are not indexed
+DEFAULT_MAX_CARDINALITY = 1000
+
+# Filter operations that can be answered from an equality index
+EQUALITY_OPERATIONS = ("equals", "not_equals", "in_list", "not_in_list")
+
+class DataSourceIndex:
+    """
+    Inverted index over the low-cardinality columns of a data source.
+
+    Each indexed column maps its distinct values to the sorted row positions
+    holding them, so equality and list filters become dictionary lookups
+    plus set unions instead of full column scans.
+    """
+
+    def __init__(self, df, columns=None, max_cardinality=DEFAULT_MAX_CARDINALITY):
+        self.row_count = len(df)
+        self._source_ref = weakref.ref(df)
+        self.max_cardinality = max_cardinality
+        self.postings = {}
+
+        position_dtype = np.int32 if len(df) < np.iinfo(np.int32).max else np.int64
+
+        for column in (columns if columns is not None else df.columns):
+            series = df[column]
+
+            # Only index dtypes whose values compare the same as dict keys
+            if not (pd.api.types.is_object_dtype(series)
+                    or pd.api.types.is_string_dtype(series)
+                    or isinstance(series.dtype, pd.CategoricalDtype)
+                    or pd.api.types.is_bool_dtype(series)
+                    or pd.api.types.is_integer_dtype(series)):
+                continue
+
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            if len(uniques) > max_cardinality:
+                continue
+
+            # Group row positions by code with one stable sort
+            order = np.argsort(codes, kind="stable").astype(position_dtype)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            offsets = np.concatenate(([0], np.cumsum(counts))) + int((codes < 0).sum())
+
+            self.postings[column] = {
+                value: order[offsets[i]:offsets[i + 1]]
+                for i, value in enumerate(uniques.tolist())
+            }
+
+    def is_valid_for(self, df):
+        """
+        Check whether the index was built for this exact dataframe.
+        """
+        return self._source_ref() is df and self.row_count == len(df)
+
+    def covers(self, column):
+        """
+        Check whether a column is indexed.
+        """
+        return column in self.postings
+
+    def lookup(self, column, values):
+        """
+        Return the sorted row positions holding any of the given values.
+        """
+        postings = self.postings[column]
+
+        matches = []
+        for value in values:
+            try:
+                positions = postings.get(value)
+            except TypeError:
+                positions = None
+            if positions is not None:
+                matches.append(positions)
+
+        if not matches:
+            return np.empty(0, dtype=np.int64)
+        if len(matches) == 1:
+            return matches[0]
+        return np.sort(np.concatenate(matches))
+
+    def mask(self, column, operation, value):
+        """
+        Answer an equality or list filter as a boolean mask.
+
+        Parameters:
+        -----------
+        column : str
+            Column to filter
+        operation : str
+            One of equals, not_equals, in_list, not_in_list
+        value : object
+            Filter value, or list of values for list operations
+
+        Returns:
+        --------
+        numpy.ndarray or None
+            Boolean mask, or None if the index cannot answer the filter
+        """
+        if not self.covers(column) or operation not in EQUALITY_OPERATIONS:
+            return None
+
+        values = list(value) if operation in ("in_list", "not_in_list") else [value]
+
+        # Missing values are not indexed, leave those filters to a scan
+        if any(pd.isna(v) for v in values if np.ndim(v) == 0):
+            return None
+
+        mask = np.zeros(self.row_count, dtype=bool)
+        mask[self.lookup(column, values)] = True
+
+        if operation in ("not_equals", "not_in_list"):
+            np.logical_not(mask, out=mask)
+
+        return mask
+
+def build_source_index(df, columns=None, max_cardinality=DEFAULT_MAX_CARDINALITY):
+    """
+    Build an inverted index for the low-cardinality columns of a dataframe.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to index
+    columns : list
+        Columns to consider (defaults to all columns)
+    max_cardinality : int
+        Maximum number of distinct values for a column to be indexed
+
+    Returns:
+    --------
+    DataSourceIndex
+        Index over the eligible columns
+    """
+    return DataSourceIndex(df, columns=columns, max_cardinality=max_cardinality)
+
+def get_source_index(source):
+    """
+    Get the index of a data source, rebuilding it if the data was replaced.
+
+    Parameters:
+    -----------
+    source : dict
+        Data source entry from st.session_state.data_sources
+
+    Returns:
+    --------
+    DataSourceIndex or None
+        Index for the source's current data, or None if not indexed
+    """
+    index = source.get("index")
+    if index is None:
+        return None
+
+    df = source["data"]
+    if not index.is_valid_for(df):
+        columns = [column for column in index.postings if column in df.columns]
+        index = build_source_index(df, columns=columns, max_cardinality=index.max_cardinality)
+        source["index"] = index
+
+    return index
+
+# Filter operations that can be answered from a sorted column index
+RANGE_OPERATIONS = ("between", "greater_than", "less_than", "date_range")
+
+# Number of range queries on a column before a sorted index is built for it
+RANGE_INDEX_BUILD_THRESHOLD = 2
+
+# Lazily built sorted indexes, keyed by id() of the dataframe they belong to
+_SORTED_INDEXES = {}
+
+class SortedColumnIndex:
+    """
+    Sorted permutation of a numeric or datetime column.
+
+    Range predicates are answered with two binary searches over the sorted
+    values, so a query costs O(log n + k) instead of a full column scan.
+    Missing values are left out of the index since they never match a range.
+    """
+
+    def __init__(self, values, valid):
+        positions = np.flatnonzero(valid)
+
+        order = np.argsort(values[positions], kind="stable")
+        self.row_count = len(values)
+        self.permutation = positions[order]
+        self.sorted_values = values[self.permutation]
+
+    def positions(self, lower=None, upper=None, include_lower=True, include_upper=True):
+        """
+        Return the row positions whose value lies within the given bounds.
+        """
+        start = 0
+        stop = len(self.sorted_values)
+
+        if lower is not None:
+            start = np.searchsorted(self.sorted_values, lower, side="left" if include_lower else "right")
+        if upper is not None:
+            stop = np.searchsorted(self.sorted_values, upper, side="right" if include_upper else "left")
+
+        return self.permutation[start:max(start, stop)]
+
+def _sortable_values(series, as_datetime):
+    """
+    Convert a column to a numpy array suitable for a sorted index.
+    
+    Datetimes are mapped to int64 nanoseconds. Returns a (values, valid)
+    pair, or None if the column cannot be indexed.
+    """
+    if as_datetime:
+        if not pd.api.types.is_datetime64_any_dtype(series):
+            try:
+                series = to_datetime_cached(series)
+            except (ValueError, TypeError):
+                return None
+        if getattr(series.dtype, "tz", None) is not None:
+            return None
+
+        series = series.astype("datetime64[ns]")
+        return series.to_numpy().view(np.int64), series.notna().to_numpy()
+
+    if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+        return None
+    if pd.api.types.is_integer_dtype(series) and not series.hasnans:
+        return series.to_numpy(dtype=np.int64), np.ones(len(series), dtype=bool)
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return values, ~np.isnan(values)
+
+def _get_sorted_index(df, column, as_datetime):
+    """
+    Get the sorted index of a column, building it once it has been queried
+    often enough to pay for the sort.
+    """
+    key = id(df)
+    entry = _SORTED_INDEXES.get(key)
+
+    if entry is None or entry["ref"]() is not df or entry["rows"] != len(df):
+        entry = {"ref": weakref.ref(df), "rows": len(df), "indexes": {}, "hits": {}}
+        _SORTED_INDEXES[key] = entry
+        # Drop the indexes together with the dataframe
+        weakref.finalize(df, _SORTED_INDEXES.pop, key, None)
+
+    index_key = (column, as_datetime)
+    if index_key in entry["indexes"]:
+        return entry["indexes"][index_key]
+
+    entry["hits"][index_key] = entry["hits"].get(index_key, 0) + 1
+    if entry["hits"][index_key] < RANGE_INDEX_BUILD_THRESHOLD:
+        return None
+
+    sortable = _sortable_values(df[column], as_datetime)
+    index = SortedColumnIndex(*sortable) if sortable is not None else None
+    entry["indexes"][index_key] = index
+    return index
+
+def range_mask(df, column, operation, value):
+    """
+    Answer a range filter from a lazily built sorted column index.
+
+    The first range query on a column is left to a regular scan; repeated
+    queries on the same dataframe build and reuse a sorted index.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to filter
+    column : str
+        Column to filter
+    operation : str
+        One of between, greater_than, less_than, date_range
+    value : object
+        Filter value, or (min, max) pair for between and date_range
+
+    Returns:
+    --------
+    numpy.ndarray or None
+        Boolean mask, or None if the filter must be answered by a scan
+    """
+    if operation not in RANGE_OPERATIONS:
+        return None
+
+    as_datetime = operation == "date_range" or pd.api.types.is_datetime64_any_dtype(df[column])
+    index = _get_sorted_index(df, column, as_datetime)
+    if index is None:
+        return None
+
+    try:
+        if operation in ("between", "date_range"):
+            bounds = [_index_bound(v, as_datetime) for v in value]
+        else:
+            bounds = [_index_bound(value, as_datetime)]
+    except (ValueError, TypeError):
+        return None
+
+    if operation in ("between", "date_range"):
+        positions = index.positions(lower=bounds[0], upper=bounds[1])
+    elif operation == "greater_than":
+        positions = index.positions(lower=bounds[0], include_lower=False)
+    else:
+        positions = index.positions(upper=bounds[0], include_upper=False)
+
+    mask = np.zeros(index.row_count, dtype=bool)
+    mask[positions] = True
+    return mask
+
+def _index_bound(value, as_datetime):
+    """
+    Convert a filter bound to the representation used by a sorted index.
+    """
+    if as_datetime:
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is not None:
+            raise ValueError("Timezone-aware bounds are not indexed")
+        return timestamp.as_unit("ns").value
+    if isinstance(value, (bool, np.bool_)) or not isinstance(value, (int, float, np.number)):
+        raise TypeError("Range bounds must be numeric")
+    return value
@@ -0,0 +1,315 @@
+import pandas as pd
+import numpy as np
+import time
+
+# Join types offered in the interface
+JOIN_TYPES = ["inner", "left", "anti"]
+
+# A side with at most this many rows is used as the hash table of a broadcast join
+BROADCAST_MAX_ROWS = 1000000
+
+# Suffix added to columns of the joined source that clash with existing ones
+DEFAULT_JOIN_SUFFIX = "_right"
+
+def _is_sortable_numeric(left_key, right_key):
+    """
+    Check whether two key columns can be compared as raw numpy values,
+    which lets a sort-merge join skip hashing entirely.
+    """
+    left_dtype, right_dtype = left_key.dtype, right_key.dtype
+    if isinstance(left_dtype, pd.api.extensions.ExtensionDtype) or isinstance(right_dtype, pd.api.extensions.ExtensionDtype):
+        return False
+    if left_dtype.kind in "iu" and right_dtype.kind in "iu":
+        return left_dtype.kind == right_dtype.kind
+    if left_dtype.kind == "f" and right_dtype.kind == "f":
+        return True
+    return left_dtype.kind == "M" and left_dtype == right_dtype
+
+def _combine_codes(codes, sizes):
+    """
+    Combine the per-column codes of a multi-column key into one int64 code,
+    -1 where any column has no code.
+    """
+    combined = codes[0]
+    for column_codes, size in zip(codes[1:], sizes[1:]):
+        missing = (combined < 0) | (column_codes < 0)
+        combined = combined * size + column_codes
+        combined[missing] = -1
+    return combined
+
+def _hash_keys(build, probe, build_on, probe_on):
+    """
+    Encode join keys for a hash join: build rows get dense key numbers and
+    probe rows are looked up among the build keys. Missing keys and probe
+    keys absent from the build side get -1.
+    """
+    build_codes, probe_codes, sizes = [], [], []
+    for build_column, probe_column in zip(build_on, probe_on):
+        codes, uniques = pd.factorize(build[build_column])
+        build_codes.append(codes.astype(np.int64))
+        probe_codes.append(pd.Index(uniques).get_indexer(probe[probe_column]).astype(np.int64))
+        sizes.append(len(uniques))
+
+    if len(build_on) == 1:
+        return build_codes[0], probe_codes[0], sizes[0]
+
+    # Renumber the combined keys densely and look the probe keys up among them
+    build_combined = _combine_codes(build_codes, sizes)
+    probe_combined = _combine_codes(probe_codes, sizes)
+    codes, uniques = pd.factorize(build_combined, use_na_sentinel=False)
+    present = uniques >= 0
+    renumbered = np.cumsum(present) - 1
+    build_dense = np.where(build_combined >= 0, renumbered[codes], -1)
+
+    lookup = pd.Index(uniques[present])
+    probe_dense = np.where(probe_combined >= 0, lookup.get_indexer(probe_combined), -1)
+    return build_dense, probe_dense.astype(np.int64), int(present.sum())
+
+def _merge_keys(left, right, left_on, right_on):
+    """
+    Get mutually comparable, sortable join keys for a sort-merge join,
+    with a mask of the rows whose key is missing.
+
+    A single numeric key is used as it is; other keys are factorized over
+    both sides together.
+    """
+    if len(left_on) == 1 and _is_sortable_numeric(left[left_on[0]], right[right_on[0]]):
+        left_values = left[left_on[0]].to_numpy()
+        right_values = right[right_on[0]].to_numpy()
+        return left_values, right_values, pd.isna(left_values), pd.isna(right_values)
+
+    left_codes, right_codes, sizes = [], [], []
+    for left_column, right_column in zip(left_on, right_on):
+        codes, uniques = pd.factorize(pd.concat([left[left_column], right[right_column]], ignore_index=True))
+        codes = codes.astype(np.int64)
+        left_codes.append(codes[:len(left)])
+        right_codes.append(codes[len(left):])
+        sizes.append(len(uniques))
+
+    left_keys = _combine_codes(left_codes, sizes)
+    right_keys = _combine_codes(right_codes, sizes)
+    return left_keys, right_keys, left_keys < 0, right_keys < 0
+
+def _expand(starts, counts, order):
+    """
+    List the matching rows of each probe row: for probe row i, the rows
+    order[starts[i]:starts[i] + counts[i]].
+
+    Returns the probe row and matching row of every output pair.
+    """
+    probe_rows = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.cumsum(counts) - counts
+    positions = np.repeat(starts - offsets, counts) + np.arange(int(counts.sum()))
+    return probe_rows, order[positions]
+
+def _broadcast_hash_join(build, probe, build_on, probe_on):
+    """
+    Join by building a hash table of the build side keys and probing it
+    with every row of the other side.
+
+    Returns the probe row, build row pairs and the time of each phase.
+    """
+    start = time.perf_counter()
+    build_codes, probe_codes, key_count = _hash_keys(build, probe, build_on, probe_on)
+    keyed = time.perf_counter()
+
+    # Group the build rows by key so each key's rows are contiguous
+    order = np.argsort(build_codes, kind="stable")
+    counts = np.bincount(build_codes[build_codes >= 0], minlength=key_count)
+    starts = np.cumsum(counts) - counts + int((build_codes < 0).sum())
+    built = time.perf_counter()
+
+    matched = probe_codes >= 0
+    probe_codes = np.where(matched, probe_codes, 0)
+    probe_counts = np.where(matched, counts[probe_codes] if key_count else 0, 0)
+    probe_rows, build_rows = _expand(starts[probe_codes] if key_count else probe_codes, probe_counts, order)
+    probed = time.perf_counter()
+
+    timings = {"keys": keyed - start, "build": built - keyed, "probe": probed - built}
+    return probe_rows, build_rows, probe_counts, timings
+
+def _is_sorted(values):
+    """
+    Check whether an array is in ascending order.
+    """
+    return len(values) < 2 or bool(np.all(values[1:] >= values[:-1]))
+
+def _sort_merge_join(left, right, left_on, right_on):
+    """
+    Join by sorting both sides on their keys and merging the sorted runs.
+
+    Returns the left row, right row pairs and the time of each phase.
+    """
+    start = time.perf_counter()
+    left_keys, right_keys, left_missing, right_missing = _merge_keys(left, right, left_on, right_on)
+    keyed = time.perf_counter()
+
+    # Sides that are already in key order are not sorted again
+    right_order = np.flatnonzero(~right_missing) if right_missing.any() else np.arange(len(right_keys))
+    if not _is_sorted(right_keys if len(right_order) == len(right_keys) else right_keys[right_order]):
+        right_order = right_order[np.argsort(right_keys[right_order], kind="stable")]
+    left_order = np.arange(len(left_keys))
+    if not _is_sorted(left_keys):
+        left_order = np.argsort(left_keys, kind="stable")
+    sorted_right = right_keys[right_order]
+    sorted_left = left_keys[left_order]
+    built = time.perf_counter()
+
+    # Merge: the run of equal right keys for every (sorted) left key
+    lower = np.empty(len(left_keys), dtype=np.int64)
+    upper = np.empty(len(left_keys), dtype=np.int64)
+    lower[left_order] = np.searchsorted(sorted_right, sorted_left, side="left")
+    upper[left_order] = np.searchsorted(sorted_right, sorted_left, side="right")
+    counts = np.where(left_missing, 0, upper - lower)
+    left_rows, right_rows = _expand(lower, counts, right_order)
+    merged = time.perf_counter()
+
+    timings = {"keys": keyed - start, "build": built - keyed, "probe": merged - built}
+    return left_rows, right_rows, counts, timings
+
+def _choose_strategy(left, right, left_on, right_on):
+    """
+    Pick a join strategy: a broadcast hash join when one side is small, a
+    sort-merge join when both sides are large and already sorted on their
+    key. Large unsorted sides are hash joined as well, since sorting them
+    costs more than hashing.
+    """
+    if min(len(left), len(right)) <= BROADCAST_MAX_ROWS:
+        return "broadcast_hash"
+
+    if len(left_on) == 1 and _is_sortable_numeric(left[left_on[0]], right[right_on[0]]):
+        left_key, right_key = left[left_on[0]], right[right_on[0]]
+        if left_key.is_monotonic_increasing and right_key.is_monotonic_increasing:
+            return "sort_merge"
+
+    return "broadcast_hash"
+
+def _take_column(series, positions):
+    """
+    Take rows of a column by position, filling -1 positions with missing
+    values.
+    """
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        values = series.array
+    else:
+        values = series.to_numpy()
+
+    if len(positions) == 0 or positions.min() >= 0:
+        return values.take(positions)
+    return pd.api.extensions.take(values, positions, allow_fill=True)
+
+def join_dataframes(left, right, left_on, right_on=None, how="inner", strategy="auto", suffix=DEFAULT_JOIN_SUFFIX):
+    """
+    Join two dataframes on key columns.
+
+    By default a side with at most BROADCAST_MAX_ROWS rows becomes the hash
+    table of a broadcast hash join that the other side probes, and large
+    sides already sorted on a numeric key are merged without hashing (see
+    _choose_strategy). Output rows follow the order of the left dataframe.
+    As in SQL, missing keys never match.
+
+    Parameters:
+    -----------
+    left : DataFrame
+        Pandas DataFrame whose rows are kept
+    right : DataFrame
+        Pandas DataFrame to join
+    left_on : list
+        Key columns of the left dataframe
+    right_on : list
+        Key columns of the right dataframe, or None for the left key names
+    how : str
+        "inner" for matching rows only, "left" to also keep unmatched left
+        rows, "anti" for the left rows without a match
+    strategy : str
+        "auto", "broadcast_hash" or "sort_merge"
+    suffix : str
+        Suffix added to right columns whose name is already used
+
+    Returns:
+    --------
+    tuple
+        (joined DataFrame, dict with the strategy used, row counts and the
+        seconds spent in each phase)
+    """
+    left_on = [left_on] if isinstance(left_on, str) else list(left_on)
+    right_on = left_on if right_on is None else ([right_on] if isinstance(right_on, str) else list(right_on))
+
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Unsupported join type: {how}")
+    if not left_on or len(left_on) != len(right_on):
+        raise ValueError("Join needs the same number of key columns on both sides")
+    missing = [column for column in left_on if column not in left.columns]
+    missing += [column for column in right_on if column not in right.columns]
+    if missing:
+        raise ValueError(f"Join key columns not found: {', '.join(map(str, missing))}")
+
+    start = time.perf_counter()
+
+    if strategy == "auto":
+        strategy = _choose_strategy(left, right, left_on, right_on)
+
+    build_side = None
+    if strategy == "broadcast_hash":
+        # Only inner joins can build on the left: unmatched left rows must be kept otherwise
+        build_side = "left" if how == "inner" and len(left) < len(right) else "right"
+        if build_side == "right":
+            left_rows, right_rows, counts, timings = _broadcast_hash_join(right, left, right_on, left_on)
+        else:
+            right_rows, left_rows, _, timings = _broadcast_hash_join(left, right, left_on, right_on)
+            # Back to the order of the left rows
+            order = np.argsort(left_rows, kind="stable")
+            left_rows, right_rows = left_rows[order], right_rows[order]
+    elif strategy == "sort_merge":
+        left_rows, right_rows, counts, timings = _sort_merge_join(left, right, left_on, right_on)
+    else:
+        raise ValueError(f"Unknown join strategy: {strategy}")
+
+    output_start = time.perf_counter()
+
+    if how == "anti":
+        matched = np.zeros(len(left), dtype=bool)
+        matched[left_rows] = True
+        result_df = left.take(np.flatnonzero(~matched)).reset_index(drop=True)
+    else:
+        if how == "left" and build_side != "left":
+            # Unmatched left rows get a single row with missing right values
+            if (counts == 0).any():
+                filled = np.maximum(counts, 1)
+                all_left = np.repeat(np.arange(len(counts)), filled)
+                all_right = np.full(len(all_left), -1, dtype=np.int64)
+                all_right[counts[all_left] > 0] = right_rows
+                left_rows, right_rows = all_left, all_right
+
+        result_df = left.take(left_rows).reset_index(drop=True)
+
+        # Keys shared by name are not repeated; clashing right columns get the suffix
+        shared_keys = {right_column for left_column, right_column in zip(left_on, right_on) if left_column == right_column}
+        used = set(result_df.columns)
+        right_columns = {}
+        for column in right.columns:
+            if column in shared_keys:
+                continue
+            name = column
+            while name in used:
+                name = f"{name}{suffix}"
+            used.add(name)
+            right_columns[name] = _take_column(right[column], right_rows)
+
+        if right_columns:
+            result_df = pd.concat([result_df, pd.DataFrame(right_columns, index=result_df.index)], axis=1)
+
+    end = time.perf_counter()
+    timings["output"] = end - output_start
+
+    stats = {
+        "strategy": strategy,
+        "build_side": build_side,
+        "how": how,
+        "left_rows": len(left),
+        "right_rows": len(right),
+        "output_rows": len(result_df),
+        "seconds": timings,
+        "total_seconds": end - start
+    }
+    return result_df, stats
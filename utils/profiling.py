@@ -0,0 +1,353 @@
+import os
+import pandas as pd
+import numpy as np
+from utils.data_processing import SUMMARY_SAMPLE_SIZE
+from utils.dtypes import detect_datetime_format
+from utils.sketches import HyperLogLog
+
+# Rows read per chunk when profiling a file
+DEFAULT_PROFILE_CHUNK_ROWS = 100000
+
+# File types that can be read in chunks
+CHUNKED_FILE_TYPES = ("csv", "json")
+
+# Directory whose files may be profiled by path; profiling server files is off when unset
+SERVER_DATA_DIR = os.environ.get("PM_DATA_TOOL_DATA_DIR")
+
+def resolve_server_path(path, data_dir=SERVER_DATA_DIR):
+    """
+    Resolve a path entered by a user to a file inside the server data directory.
+
+    Parameters:
+    -----------
+    path : str
+        Path relative to the data directory
+    data_dir : str
+        Directory files may be read from
+
+    Returns:
+    --------
+    str
+        Normalized absolute path of the file, with symbolic links resolved
+
+    Raises:
+    -------
+    ValueError
+        If no data directory is configured, or the path leaves it or is not a file
+    """
+    if not data_dir:
+        raise ValueError("Profiling files on the server is not enabled")
+
+    root = os.path.realpath(data_dir)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError("The path must be inside the server data directory")
+    if not os.path.isfile(resolved):
+        raise ValueError(f"File not found in the server data directory: {path}")
+    return resolved
+
+def _merged_type(kinds):
+    """
+    Combine the dtypes a column had across chunks into a single type name.
+
+    Integer chunks with missing values are read as floats, so mixed integer
+    and float chunks give a float column; any other mix gives object.
+    """
+    names = set(kinds.values())
+    if len(names) == 1:
+        return names.pop()
+    if set(kinds) <= {"i", "u", "f"}:
+        return "float64" if "f" in kinds else "int64"
+    return "object"
+
+class ColumnProfile:
+    """
+    Mergeable partial statistics of one column.
+
+    Profiles of separate chunks are combined with merge(): counts add up,
+    means and variances use Chan's parallel form of Welford's algorithm,
+    distinct counts merge HyperLogLog registers and the median comes from
+    a bottom-k random sample, so memory stays constant however many rows
+    are profiled.
+    """
+
+    def __init__(self, name, sample_size=SUMMARY_SAMPLE_SIZE):
+        self.name = name
+        self.sample_size = sample_size
+        self.rows = 0
+        self.missing = 0
+        self.kinds = {}
+        self.is_date = False
+        self.date_format = None
+
+        # Numeric moments
+        self.numeric = True
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+        # Bottom-k sample: keep the values with the smallest random keys
+        self.sample = np.empty(0, dtype=np.float64)
+        self.sample_keys = np.empty(0, dtype=np.float64)
+
+        self.min_date = None
+        self.max_date = None
+        self.sketch = HyperLogLog()
+        self.sample_values = []
+
+    @classmethod
+    def from_series(cls, series, is_date=False, date_format=None, sample_size=SUMMARY_SAMPLE_SIZE, rng=None):
+        """
+        Profile one chunk of a column.
+
+        Parameters:
+        -----------
+        series : Series
+            Values of the column in the chunk
+        is_date : bool
+            Whether the column holds dates stored as text
+        date_format : str
+            strftime format of the dates, or None to infer it
+        sample_size : int
+            Number of values kept for the median estimate
+        rng : numpy.random.Generator
+            Random generator used for the sample keys
+
+        Returns:
+        --------
+        ColumnProfile
+            Partial profile of the chunk
+        """
+        profile = cls(series.name, sample_size=sample_size)
+        profile.rows = len(series)
+        profile.missing = int(series.isna().sum())
+        profile.kinds[series.dtype.kind] = str(series.dtype)
+        profile.is_date = is_date
+        profile.date_format = date_format
+
+        numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        profile.numeric = numeric
+
+        if numeric:
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+
+            # Hash numbers as floats so integer and float chunks agree
+            profile.sketch.add_hashes(pd.util.hash_array(values))
+
+            if len(values):
+                profile.count = len(values)
+                profile.mean = float(values.mean())
+                profile.m2 = float(np.square(values - profile.mean).sum())
+                profile.min = float(values.min())
+                profile.max = float(values.max())
+
+                rng = rng if rng is not None else np.random.default_rng()
+                keys = rng.random(len(values))
+                if len(values) > sample_size:
+                    keep = np.argpartition(keys, sample_size)[:sample_size]
+                    values, keys = values[keep], keys[keep]
+                profile.sample, profile.sample_keys = values, keys
+        else:
+            profile.sketch.add(series)
+
+        if is_date:
+            dates = pd.to_datetime(series, errors='coerce', format=date_format if date_format else "mixed")
+            profile.min_date = dates.min()
+            profile.max_date = dates.max()
+        elif series.dtype.kind == "O" or isinstance(series.dtype, pd.CategoricalDtype):
+            profile.sample_values = [str(val) for val in series.dropna().unique()[:5].tolist()]
+
+        return profile
+
+    def merge(self, other):
+        """
+        Merge the partial statistics of another chunk of the same column.
+        """
+        self.rows += other.rows
+        self.missing += other.missing
+        for kind, name in other.kinds.items():
+            self.kinds.setdefault(kind, name)
+        self.numeric = self.numeric and other.numeric
+
+        if other.count:
+            if self.count:
+                # Chan et al. pairwise update of the mean and sum of squares
+                total = self.count + other.count
+                delta = other.mean - self.mean
+                self.mean += delta * other.count / total
+                self.m2 += other.m2 + delta * delta * self.count * other.count / total
+                self.count = total
+                self.min = min(self.min, other.min)
+                self.max = max(self.max, other.max)
+            else:
+                self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+                self.min, self.max = other.min, other.max
+
+            values = np.concatenate((self.sample, other.sample))
+            keys = np.concatenate((self.sample_keys, other.sample_keys))
+            if len(values) > self.sample_size:
+                keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+                values, keys = values[keep], keys[keep]
+            self.sample, self.sample_keys = values, keys
+
+        for attribute, pick in (("min_date", min), ("max_date", max)):
+            mine, theirs = getattr(self, attribute), getattr(other, attribute)
+            if theirs is not None and not pd.isna(theirs):
+                setattr(self, attribute, theirs if mine is None or pd.isna(mine) else pick(mine, theirs))
+
+        self.sketch.merge(other.sketch)
+
+        for value in other.sample_values:
+            if len(self.sample_values) >= 5:
+                break
+            if value not in self.sample_values:
+                self.sample_values.append(value)
+
+        return self
+
+    def column_info(self):
+        """
+        Build the column entry of a data summary from the merged statistics.
+        """
+        col_type = _merged_type(self.kinds) if self.kinds else "object"
+
+        stats = {}
+        if self.is_date:
+            col_type = "datetime"
+            has_range = self.min_date is not None and not pd.isna(self.min_date) and not pd.isna(self.max_date)
+            stats = {
+                "min_date": self.min_date.strftime("%Y-%m-%d") if has_range else None,
+                "max_date": self.max_date.strftime("%Y-%m-%d") if has_range else None,
+                "range_days": (self.max_date - self.min_date).days if has_range else None
+            }
+        elif self.numeric:
+            stats = {
+                "min": self.min,
+                "max": self.max,
+                "mean": self.mean if self.count else None,
+                "median": float(np.median(self.sample)) if self.count else None,
+                "std": float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else None
+            }
+
+        col_info = {
+            "name": self.name,
+            "type": col_type,
+            "missing": self.missing,
+            "unique_values": self.sketch.count(),
+            "stats": stats
+        }
+
+        if self.sample_values and not self.is_date and col_type in ['object', 'category']:
+            col_info["sample_values"] = self.sample_values
+
+        return col_info
+
+def profile_chunks(chunks, sample_size=SUMMARY_SAMPLE_SIZE, seed=0):
+    """
+    Profile a dataframe delivered as a sequence of chunks.
+
+    Only one chunk is held in memory at a time. Date columns are detected
+    from the first chunk in which a text column has values.
+
+    Parameters:
+    -----------
+    chunks : iterable
+        Iterable of pandas DataFrames with the same columns
+    sample_size : int
+        Number of values kept per column for median estimates
+    seed : int
+        Seed for the random sample, for reproducible summaries
+
+    Returns:
+    --------
+    dict
+        Summary with the same layout as get_data_summary
+    """
+    rng = np.random.default_rng(seed)
+    profiles = {}
+    date_formats = {}
+    rows = 0
+    memory = 0
+    chunk_count = 0
+
+    for chunk in chunks:
+        chunk_count += 1
+        memory += int(chunk.memory_usage(deep=True).sum())
+
+        for col in chunk.columns:
+            series = chunk[col]
+
+            if col not in date_formats and series.dtype.kind == "O" and series.notna().any():
+                date_formats[col] = detect_datetime_format(series.dropna().head(sample_size))
+            is_date, date_format = date_formats.get(col, (False, None))
+
+            partial = ColumnProfile.from_series(
+                series,
+                is_date=is_date,
+                date_format=date_format,
+                sample_size=sample_size,
+                rng=rng
+            )
+
+            if col not in profiles:
+                # Columns first seen in a later chunk were missing before
+                profiles[col] = ColumnProfile(col, sample_size=sample_size)
+                profiles[col].rows = profiles[col].missing = rows
+            profiles[col].merge(partial)
+
+        for col, profile in profiles.items():
+            if col not in chunk.columns:
+                profile.rows += len(chunk)
+                profile.missing += len(chunk)
+
+        rows += len(chunk)
+
+    column_info = []
+    for profile in profiles.values():
+        profile.is_date = date_formats.get(profile.name, (False, None))[0]
+        column_info.append(profile.column_info())
+
+    return {
+        "rows": rows,
+        "columns": len(profiles),
+        "missing_values": sum(info["missing"] for info in column_info),
+        "memory_usage": str(round(memory / (1024 * 1024), 2)) + " MB",
+        "column_info": column_info,
+        "approximate": True,
+        "chunks": chunk_count
+    }
+
+def profile_file(source, file_type="csv", chunksize=DEFAULT_PROFILE_CHUNK_ROWS, sample_size=SUMMARY_SAMPLE_SIZE, **read_options):
+    """
+    Profile a CSV or JSON Lines file without loading it into memory.
+
+    Parameters:
+    -----------
+    source : str or file-like
+        Path or buffer of the file
+    file_type : str
+        Type of file (csv or json, where json means one record per line)
+    chunksize : int
+        Number of rows read per chunk
+    sample_size : int
+        Number of values kept per column for median estimates
+    **read_options
+        Additional options passed to the pandas reader
+
+    Returns:
+    --------
+    dict
+        Summary with the same layout as get_data_summary
+    """
+    if file_type == "csv":
+        reader = pd.read_csv(source, chunksize=chunksize, **read_options)
+    elif file_type == "json":
+        reader = pd.read_json(source, lines=True, chunksize=chunksize, **read_options)
+    else:
+        raise ValueError(f"Unsupported file type for chunked profiling: {file_type}")
+
+    with reader:
+        return profile_chunks(reader, sample_size=sample_size)
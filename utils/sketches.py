@@ -0,0 +1,187 @@
+import pandas as pd
+import numpy as np
+
+def hash_values(values):
+    """
+    Hash the non-missing values of a column to 64-bit integers.
+
+    Parameters:
+    -----------
+    values : Series or array-like
+        Values to hash
+
+    Returns:
+    --------
+    numpy.ndarray
+        uint64 hash per non-missing value
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    series = series.dropna()
+
+    # Hash Python objects directly; factorizing first is slow on high-cardinality text
+    if series.dtype == object:
+        return pd.util.hash_array(series.to_numpy(), categorize=False)
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+# Register count up to which grouped sketches are stored densely (16 MB)
+DENSE_GROUPED_REGISTERS = 1 << 24
+
+def _leading_zeros(words):
+    """
+    Count the leading zero bits of each uint64 value.
+
+    The top 53 bits (and, when those are all zero, the low 11 bits) convert
+    to float64 exactly, so frexp gives the position of the highest set bit.
+    """
+    _, exponent = np.frexp((words >> np.uint64(11)).astype(np.float64))
+    count = 53 - exponent
+
+    high_empty = exponent == 0
+    if high_empty.any():
+        _, low_exponent = np.frexp((words[high_empty] & np.uint64(0x7FF)).astype(np.float64))
+        count[high_empty] = 64 - low_exponent
+
+    return count.astype(np.uint8)
+
+def _register_updates(hashes, precision):
+    """
+    Split uint64 hashes into HyperLogLog register indexes and ranks.
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    buckets = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    remainder = hashes << np.uint64(precision)
+    ranks = np.minimum(_leading_zeros(remainder) + 1, 64 - precision + 1).astype(np.uint8)
+    return buckets, ranks
+
+def _estimate(harmonic_sum, empty, m):
+    """
+    HyperLogLog estimate from the sum of 2**-register and the number of
+    empty registers, with the small range correction.
+    """
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / harmonic_sum
+
+    # Small range correction (linear counting)
+    with np.errstate(divide="ignore"):
+        linear = m * np.log(m / np.maximum(empty, 1))
+    return np.where((estimate <= 2.5 * m) & (empty > 0), linear, estimate)
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch for approximate distinct counts.
+
+    Uses 2**precision registers (16 KB at the default precision of 14) and
+    has a standard error of about 1.04 / sqrt(2**precision), roughly 0.8%.
+    Sketches built on separate chunks can be merged.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        """
+        Add pre-computed uint64 hashes to the sketch.
+        """
+        if len(hashes) == 0:
+            return
+
+        buckets, ranks = _register_updates(hashes, self.precision)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def add(self, values):
+        """
+        Add the non-missing values of a column to the sketch.
+        """
+        self.add_hashes(hash_values(values))
+
+    def merge(self, other):
+        """
+        Merge another sketch with the same precision into this one.
+        """
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """
+        Estimate the number of distinct values added.
+        """
+        m = len(self.registers)
+        harmonic_sum = np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        return int(round(float(_estimate(harmonic_sum, empty, m))))
+
+def approx_distinct(values, precision=14):
+    """
+    Approximate the number of distinct non-missing values of a column.
+
+    Parameters:
+    -----------
+    values : Series or array-like
+        Values to count
+    precision : int
+        HyperLogLog precision (number of register index bits)
+
+    Returns:
+    --------
+    int
+        Estimated distinct count
+    """
+    sketch = HyperLogLog(precision)
+    sketch.add(values)
+    return sketch.count()
+
+def grouped_approx_distinct(group_codes, hashes, group_count, precision=12):
+    """
+    Approximate the number of distinct values in each group.
+
+    Every group gets its own HyperLogLog sketch. With many groups the
+    sketches are stored sparsely: only the (group, register) pairs that
+    occur are kept, so memory grows with the number of rows rather than
+    with groups times registers.
+
+    Parameters:
+    -----------
+    group_codes : numpy.ndarray
+        Group number (0 to group_count - 1) of each hashed value
+    hashes : numpy.ndarray
+        uint64 hash of each non-missing value
+    group_count : int
+        Number of groups
+    precision : int
+        HyperLogLog precision (number of register index bits)
+
+    Returns:
+    --------
+    numpy.ndarray
+        int64 estimated distinct count per group
+    """
+    m = 1 << precision
+    if len(hashes) == 0:
+        return np.zeros(group_count, dtype=np.int64)
+
+    buckets, ranks = _register_updates(hashes, precision)
+    keys = (np.asarray(group_codes, dtype=np.int64) << precision) | buckets
+
+    if group_count * m <= DENSE_GROUPED_REGISTERS:
+        # Few groups: one dense register array per group
+        registers = np.zeros(group_count * m, dtype=np.uint8)
+        np.maximum.at(registers, keys, ranks)
+        registers = registers.reshape(group_count, m)
+        harmonic_sum = np.power(2.0, -registers.astype(np.float64)).sum(axis=1)
+        empty = np.count_nonzero(registers == 0, axis=1)
+        return np.rint(_estimate(harmonic_sum, empty, m)).astype(np.int64)
+
+    # Maximum rank per occupied (group, register) pair
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    registers = np.maximum.reduceat(ranks[order], starts)
+    groups = keys[starts] >> precision
+
+    # Empty registers each add 2**0 to the harmonic sum
+    occupied = np.bincount(groups, minlength=group_count)
+    harmonic_sum = np.bincount(groups, weights=np.power(2.0, -registers.astype(np.float64)), minlength=group_count)
+    harmonic_sum += m - occupied
+
+    return np.rint(_estimate(harmonic_sum, m - occupied, m)).astype(np.int64)
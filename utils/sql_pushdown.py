@@ -0,0 +1,497 @@
+import pandas as pd
+import numpy as np
+import re
+from decimal import Decimal
+from utils.data_connectors import connect_to_database, normalize_sql, QUERY_CACHE_TTL
+from utils.data_processing import compile_filters
+from utils.arrow_store import get_source_data
+from utils.datetimes import previous_period
+
+# Rows of a live source's query result stored locally, for column pickers
+# and previews; dashboard components query the database instead
+LIVE_SAMPLE_ROWS = 1000
+
+# Metric types the database computes, with their SQL aggregate
+PUSHDOWN_AGGREGATES = {
+    "Sum": "SUM",
+    "Average": "AVG",
+    "Minimum": "MIN",
+    "Maximum": "MAX",
+    "Count": "COUNT",
+    "Median": "MEDIAN"
+}
+
+# Databases with an aggregate median (an ordered-set aggregate); SQL
+# Server only has PERCENTILE_CONT as a window function
+MEDIAN_DIALECTS = ("PostgreSQL",)
+
+# Identifier quotes and parameter placeholder of each database's driver
+SQL_DIALECTS = {
+    "PostgreSQL": {"quotes": ('"', '"'), "placeholder": "%s"},
+    "MySQL": {"quotes": ("`", "`"), "placeholder": "%s"},
+    "SQL Server": {"quotes": ("[", "]"), "placeholder": "?"},
+    "SQLite": {"quotes": ('"', '"'), "placeholder": "?"}
+}
+
+# Charts whose rows can be aggregated by the database without changing
+# the figure: (group-by keys, value key, SQL aggregate)
+CHART_PUSHDOWN = {
+    # Bars of repeated categories are stacked, so summing them draws the same bars
+    "bar": (("x_axis", "color"), "y_axis", "SUM"),
+    "pie": (("names",), "values", "SUM"),
+    "heatmap": (("y_axis", "x_axis"), "values", "AVG")
+}
+
+# Alias of the source query inside pushed-down queries
+_SOURCE_ALIAS = "pm_source"
+
+# Characters that make pandas treat a "contains" filter as a pattern
+_REGEX_SPECIAL = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+# Alias of the row count queried alongside metrics
+_ROWS_ALIAS = "pm_rows"
+
+# Fields of st.session_state.db_credentials passed to connect_to_database
+_CONNECTION_FIELDS = ("db_type", "host", "port", "user", "password", "database")
+
+class UnsupportedPushdown(ValueError):
+    """
+    Raised when a filter or aggregate cannot be compiled into SQL for a database.
+    """
+
+def quote_identifier(db_type, name):
+    """
+    Quote a column name for a database, escaping its closing quote.
+    """
+    opening, closing = SQL_DIALECTS[db_type]["quotes"]
+    return opening + str(name).replace(closing, closing * 2) + closing
+
+def _parameter(value):
+    """
+    Convert a filter value to a plain Python value the drivers accept.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        value = pd.Timestamp(value).to_pydatetime()
+    return value
+
+def _is_missing(value):
+    """
+    Check whether a filter value stands for a missing value.
+    """
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+def _text_condition(db_type, column, operation, value, placeholder):
+    """
+    Compile a case-sensitive contains, starts_with or ends_with filter.
+    """
+    value = str(value)
+    if operation == "contains" and _REGEX_SPECIAL.search(value):
+        raise UnsupportedPushdown(f"Pattern filter on {column} is evaluated in pandas")
+
+    if db_type == "PostgreSQL":
+        # LIKE is case-sensitive in PostgreSQL
+        escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        wildcard, condition = "%", f"{column} LIKE {placeholder} ESCAPE '\\'"
+    elif db_type == "SQLite":
+        # LIKE ignores case in SQLite, GLOB does not
+        escaped = re.sub(r"([*?\[])", r"[\1]", value)
+        wildcard, condition = "*", f"{column} GLOB {placeholder}"
+    else:
+        # LIKE follows the column collation, usually case-insensitive
+        raise UnsupportedPushdown(f"Case-sensitive text filters are evaluated in pandas for {db_type}")
+
+    if operation == "contains":
+        pattern = wildcard + escaped + wildcard
+    elif operation == "starts_with":
+        pattern = escaped + wildcard
+    else:
+        pattern = wildcard + escaped
+    return condition, [pattern]
+
+def compile_conditions(db_type, filters):
+    """
+    Compile dashboard filters into SQL conditions with the same meaning as
+    filter_dataframe.
+
+    Missing values follow pandas: they never match equals, comparisons,
+    ranges or text filters, and always match not_equals and not_in_list.
+
+    Parameters:
+    -----------
+    db_type : str
+        Type of database (PostgreSQL, MySQL, SQL Server, SQLite)
+    filters : list
+        List of filter dictionaries with column, operation, and value
+
+    Returns:
+    --------
+    tuple
+        (list of SQL conditions, list of parameters)
+    """
+    placeholder = SQL_DIALECTS[db_type]["placeholder"]
+    conditions, params = [], []
+
+    for column, operation, value, _ in compile_filters(filters):
+        quoted = quote_identifier(db_type, column)
+
+        if operation == "equals":
+            conditions.append(f"{quoted} = {placeholder}")
+            params.append(_parameter(value))
+        elif operation == "not_equals":
+            conditions.append(f"({quoted} <> {placeholder} OR {quoted} IS NULL)")
+            params.append(_parameter(value))
+        elif operation == "greater_than":
+            conditions.append(f"{quoted} > {placeholder}")
+            params.append(_parameter(value))
+        elif operation == "less_than":
+            conditions.append(f"{quoted} < {placeholder}")
+            params.append(_parameter(value))
+        elif operation in ("contains", "starts_with", "ends_with"):
+            condition, pattern = _text_condition(db_type, quoted, operation, value, placeholder)
+            conditions.append(condition)
+            params.extend(pattern)
+        elif operation in ("in_list", "not_in_list"):
+            values = [_parameter(item) for item in value if not _is_missing(item)]
+            has_missing = len(values) < len(list(value))
+            listed = f"{quoted} IN ({', '.join([placeholder] * len(values))})" if values else "1 = 0"
+            if operation == "in_list":
+                conditions.append(f"({listed} OR {quoted} IS NULL)" if has_missing else listed)
+            elif has_missing:
+                conditions.append(f"(NOT {listed} AND {quoted} IS NOT NULL)")
+            else:
+                conditions.append(f"(NOT {listed} OR {quoted} IS NULL)")
+            params.extend(values)
+        elif operation == "between":
+            conditions.append(f"{quoted} BETWEEN {placeholder} AND {placeholder}")
+            params.extend([_parameter(value[0]), _parameter(value[1])])
+        elif operation == "date_range":
+            start, end = pd.Timestamp(value[0]), pd.Timestamp(value[1])
+            if db_type == "SQLite":
+                # SQLite keeps dates as text; datetime() normalizes ISO formats
+                conditions.append(f"datetime({quoted}) BETWEEN {placeholder} AND {placeholder}")
+                params.extend([start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")])
+            else:
+                conditions.append(f"{quoted} BETWEEN {placeholder} AND {placeholder}")
+                params.extend([start.to_pydatetime(), end.to_pydatetime()])
+        else:
+            raise UnsupportedPushdown(f"Filter operation {operation} is evaluated in pandas")
+
+    return conditions, params
+
+def _aggregate_expression(db_type, function, column):
+    """
+    SQL expression of an aggregate over a column (COUNT(*) without one).
+    """
+    if column is None:
+        return "COUNT(*)"
+    quoted = quote_identifier(db_type, column)
+    if function == "MEDIAN":
+        if db_type not in MEDIAN_DIALECTS:
+            raise UnsupportedPushdown(f"Median is not computed by {db_type}")
+        return f"PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY {quoted})"
+    if function == "AVG" and db_type == "SQL Server":
+        # SQL Server averages integer columns with integer division
+        return f"AVG(CAST({quoted} AS FLOAT))"
+    return f"{function}({quoted})"
+
+def compile_query(db_type, base_query, columns=None, filters=None, group_by=None, aggregates=None, limit=None):
+    """
+    Compile a query that selects, filters and aggregates the result of a
+    data source's query inside the database.
+
+    The source query is wrapped as a derived table, so it can be any
+    SELECT the database accepts there (SQL Server rejects ORDER BY without
+    TOP in derived tables).
+
+    Parameters:
+    -----------
+    db_type : str
+        Type of database (PostgreSQL, MySQL, SQL Server, SQLite)
+    base_query : str
+        SQL query of the data source
+    columns : list
+        Columns to return, or None for all columns (or only the groups
+        and aggregates when there are any)
+    filters : list
+        List of filter dictionaries with column, operation, and value
+    group_by : list
+        Columns to group by
+    aggregates : list
+        (SQL aggregate, column, alias) entries; a column of None counts rows
+    limit : int
+        Maximum number of rows to return
+
+    Returns:
+    --------
+    tuple
+        (SQL text, list of parameters in the driver's placeholder style)
+    """
+    if db_type not in SQL_DIALECTS:
+        raise UnsupportedPushdown(f"Unsupported database type: {db_type}")
+
+    group_by = list(group_by or [])
+    aggregates = list(aggregates or [])
+    conditions, params = compile_conditions(db_type, filters or [])
+
+    select_columns = list(dict.fromkeys(group_by + list(columns or [])))
+    select_list = [quote_identifier(db_type, column) for column in select_columns]
+    select_list += [
+        f"{_aggregate_expression(db_type, function, column)} AS {quote_identifier(db_type, alias)}"
+        for function, column, alias in aggregates
+    ]
+
+    base_query = normalize_sql(base_query)
+    if params and SQL_DIALECTS[db_type]["placeholder"] == "%s":
+        # Literal percent signs must be doubled once the driver formats parameters
+        base_query = base_query.replace("%", "%%")
+
+    top = f"TOP {int(limit)} " if limit is not None and db_type == "SQL Server" else ""
+    sql = f"SELECT {top}{', '.join(select_list) or '*'} FROM ({base_query}) AS {_SOURCE_ALIAS}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if group_by:
+        sql += " GROUP BY " + ", ".join(quote_identifier(db_type, column) for column in group_by)
+    if limit is not None and db_type != "SQL Server":
+        sql += f" LIMIT {int(limit)}"
+
+    return sql, params
+
+def is_live_source(source, credentials):
+    """
+    Check whether a data source is queried live and its connection
+    settings are available in this session.
+    """
+    return bool(source.get("live")) and source.get("query") is not None and credentials is not None
+
+def run_live_query(source, credentials, sql, params):
+    """
+    Run a pushed-down query against a live source's database, through the
+    connection pool and the query cache (with the source's time to live).
+    """
+    connection = [credentials[field] for field in _CONNECTION_FIELDS]
+    df = connect_to_database(*connection, sql, cache_ttl=source.get("cache_ttl", QUERY_CACHE_TTL), params=params)
+
+    # Drivers return DECIMAL and NUMERIC aggregates as Decimal objects
+    for column in df.columns:
+        if df[column].dtype == object and df[column].map(lambda value: isinstance(value, Decimal)).any():
+            df[column] = pd.to_numeric(df[column])
+    return df
+
+def live_metric_types(source, credentials, metric_types):
+    """
+    Narrow the metric types offered for a source to those its database
+    computes; metric types of sources that are not live are all kept.
+    """
+    if not is_live_source(source, credentials):
+        return list(metric_types)
+    db_type = credentials["db_type"]
+    return [
+        metric_type for metric_type in metric_types
+        if PUSHDOWN_AGGREGATES.get(metric_type) is not None
+        and (PUSHDOWN_AGGREGATES[metric_type] != "MEDIAN" or db_type in MEDIAN_DIALECTS)
+    ]
+
+def _is_numeric_column(source, column):
+    """
+    Check the type of a column on the locally stored sample of a source.
+    """
+    return get_source_data(source, columns=[column])[column].dtype.kind in "iuf"
+
+def _metric_filters(component):
+    """
+    Filters of a metric component, as filter dictionaries.
+    """
+    metric_filter = component.get("filter")
+    if metric_filter and metric_filter.get("column") and metric_filter.get("value") is not None:
+        return [{"column": metric_filter["column"], "operation": "equals", "value": metric_filter["value"]}]
+    return []
+
+def _live_metric(source, component, credentials, filters):
+    """
+    Compute a metric in the database over the rows matching filters.
+
+    Returns the metric value and the number of matching rows.
+    """
+    function = PUSHDOWN_AGGREGATES.get(component.get("metric_type"))
+    if function is None:
+        raise UnsupportedPushdown(f"Metric type {component.get('metric_type')} is not computed in SQL")
+
+    metric_column = component["metric_column"]
+    sql, params = compile_query(
+        credentials["db_type"], source["query"],
+        filters=filters,
+        aggregates=[(function, metric_column, metric_column), ("COUNT", None, _ROWS_ALIAS)]
+    )
+    result = run_live_query(source, credentials, sql, params)
+
+    value, rows = result.iloc[0, 0], int(result.iloc[0, 1])
+    if _is_missing(value):
+        # pandas sums and counts of no values are 0, other metrics are missing
+        value = 0 if function in ("SUM", "COUNT") else np.nan
+    return value, rows
+
+def live_metric_value(source, component, credentials):
+    """
+    Compute a metric component's value in the database.
+
+    Parameters:
+    -----------
+    source : dict
+        Data source entry from st.session_state.data_sources
+    component : dict
+        Metric component with metric_column, metric_type and filter
+    credentials : dict
+        Connection settings of the source, or None
+
+    Returns:
+    --------
+    scalar or None
+        Metric value, or None if the source is not live (the caller then
+        computes it in pandas)
+
+    Raises:
+    -------
+    UnsupportedPushdown
+        If the source is live but the database cannot compute the metric;
+        the local sample does not stand for the whole table
+    """
+    if not is_live_source(source, credentials):
+        return None
+
+    value, _ = _live_metric(source, component, credentials, _metric_filters(component))
+    return value
+
+def live_previous_metric_value(source, component, credentials):
+    """
+    Compute a metric component's value over the period its delta compares
+    against, in the database.
+
+    The latest date of the delta's date column is queried first, then the
+    metric is computed over the previous period (see previous_period),
+    both with the component's filter.
+
+    Parameters:
+    -----------
+    source : dict
+        Data source entry from st.session_state.data_sources
+    component : dict
+        Metric component with a delta holding date_column and period
+    credentials : dict
+        Connection settings of the source
+
+    Returns:
+    --------
+    scalar or None
+        Metric value of the previous period, or None if no row falls in it
+    """
+    date_column = component["delta"]["date_column"]
+    filters = _metric_filters(component)
+
+    sql, params = compile_query(
+        credentials["db_type"], source["query"],
+        filters=filters, aggregates=[("MAX", date_column, date_column)]
+    )
+    latest_date = run_live_query(source, credentials, sql, params).iloc[0, 0]
+    if _is_missing(latest_date):
+        return None
+
+    start, end = previous_period(pd.Timestamp(latest_date), component["delta"]["period"])
+    period_filter = {"column": date_column, "operation": "date_range", "value": (start, end)}
+    value, rows = _live_metric(source, component, credentials, filters + [period_filter])
+    return value if rows else None
+
+def live_chart_data(source, chart_config, columns, credentials):
+    """
+    Get the rows a chart needs from the database.
+
+    Bar, pie and heatmap charts are aggregated by their categories in the
+    database, which returns one row per bar, slice or cell. Other charts
+    plot every row and only have their columns selected.
+
+    Parameters:
+    -----------
+    source : dict
+        Data source entry from st.session_state.data_sources
+    chart_config : dict
+        Chart configuration as passed to create_chart
+    columns : list
+        Columns the chart uses (see chart_columns)
+    credentials : dict
+        Connection settings of the source, or None
+
+    Returns:
+    --------
+    DataFrame or None
+        Chart data, or None if the source is not live
+    """
+    if not is_live_source(source, credentials):
+        return None
+
+    db_type = credentials["db_type"]
+    group_by, aggregates = None, None
+
+    pushdown = CHART_PUSHDOWN.get(chart_config.get("type"))
+    if pushdown is not None:
+        keys, value_key, function = pushdown
+        value_column = chart_config.get(value_key)
+        key_columns = [chart_config.get(key) for key in keys if chart_config.get(key)]
+        if value_column and key_columns and value_column not in key_columns and _is_numeric_column(source, value_column):
+            group_by = key_columns
+            aggregates = [(function, value_column, value_column)]
+
+    sql, params = compile_query(db_type, source["query"], columns=None if group_by else columns, group_by=group_by, aggregates=aggregates)
+    return run_live_query(source, credentials, sql, params)
+
+def live_table_data(source, columns, credentials):
+    """
+    Get the selected columns of every row from the database, or None if
+    the source is not live.
+    """
+    if not is_live_source(source, credentials):
+        return None
+
+    sql, params = compile_query(credentials["db_type"], source["query"], columns=columns or None)
+    return run_live_query(source, credentials, sql, params)
+
+def live_filter_data(source, component, credentials):
+    """
+    Get what a filter component needs to show its options from the database.
+
+    Select boxes get the distinct values of the column; sliders and date
+    ranges get its minimum and maximum, as two rows of the column.
+
+    Returns:
+    --------
+    DataFrame or None
+        Frame with the filter column, or None if the source is not live
+    """
+    if not is_live_source(source, credentials):
+        return None
+
+    db_type = credentials["db_type"]
+    column = component["filter_column"]
+
+    if component.get("filter_type") in ("Select Box", "Multi-Select"):
+        sql, params = compile_query(db_type, source["query"], group_by=[column])
+        return run_live_query(source, credentials, sql, params).dropna()
+
+    sql, params = compile_query(
+        db_type, source["query"],
+        aggregates=[("MIN", column, "minimum"), ("MAX", column, "maximum")]
+    )
+    bounds = run_live_query(source, credentials, sql, params)
+    return pd.DataFrame({column: [bounds["minimum"].iloc[0], bounds["maximum"].iloc[0]]})
+
+def import_live_sample(db_type, host, port, user, password, database, query,
+                       cache_ttl=QUERY_CACHE_TTL, force_refresh=False):
+    """
+    Fetch the first LIVE_SAMPLE_ROWS rows of a query, stored locally for a
+    live source instead of its full result.
+    """
+    sql, params = compile_query(db_type, query, limit=LIVE_SAMPLE_ROWS)
+    return connect_to_database(
+        db_type, host, port, user, password, database, sql,
+        cache_ttl=cache_ttl, force_refresh=force_refresh, params=params
+    )
@@ -0,0 +1,267 @@
+import pandas as pd
+import numpy as np
+import re
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Text manipulation types supported by create_column
+TEXT_MANIPULATIONS = (
+    "extract_substring", "concatenate", "replace", "change_case",
+    "trim", "pad", "split_part", "regex_extract"
+)
+
+def as_text(series):
+    """
+    Convert a column to an Arrow string array the way astype(str) formats it.
+
+    Strings are handed to Arrow directly and integers are formatted by
+    Arrow's cast kernel; only missing values (rendered as "nan", "None",
+    "<NA>", like astype(str) does) and other types are formatted in Python.
+
+    Parameters:
+    -----------
+    series : Series
+        Column to convert
+
+    Returns:
+    --------
+    pyarrow.ChunkedArray or pyarrow.Array
+        large_string values without nulls
+    """
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Format each category once and expand through the codes
+        labels = pa.array(np.append(dtype.categories.astype(str).to_numpy(dtype=object), "nan"), type=pa.large_string())
+        codes = series.cat.codes.to_numpy().astype(np.int64)
+        return labels.take(pa.array(np.where(codes >= 0, codes, len(labels) - 1)))
+
+    if pd.api.types.is_integer_dtype(dtype) and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        return pc.cast(pa.array(series.to_numpy()), pa.large_string())
+
+    if dtype == object or isinstance(dtype, pd.StringDtype):
+        try:
+            values = pa.array(series, type=pa.large_string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed Python objects
+            return pa.array(series.astype(str), type=pa.large_string())
+
+        if values.null_count == 0:
+            return values
+
+        # Only the missing values need Python formatting
+        missing = values.is_null().to_numpy(zero_copy_only=False)
+        missing_values = series.iloc[np.flatnonzero(missing)].to_numpy(dtype=object)
+        labels = pa.array([str(value) for value in missing_values], type=pa.large_string())
+        return pc.replace_with_mask(values, pa.array(missing), labels)
+
+    return pa.array(series.astype(str), type=pa.large_string())
+
+def _to_series(values, index):
+    """
+    Wrap Arrow string values as an Arrow-backed pandas column.
+    """
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks() if values.num_chunks != 1 else values.chunk(0)
+    return pd.Series(pd.arrays.ArrowStringArray(pc.cast(values, pa.large_string())), index=index)
+
+def _is_ascii(values):
+    """
+    Check whether text values only hold ASCII, where Arrow's case mapping
+    and regular expressions agree with Python's Unicode rules.
+    """
+    return pc.all(pc.string_is_ascii(values)).as_py() is not False
+
+def _python_str(values, method, *args, **kwargs):
+    """
+    Apply a pandas .str method on Python strings, for inputs where Arrow's
+    kernels would not match Python's behaviour.
+    """
+    result = getattr(pd.Series(values.to_pylist(), dtype=object).str, method)(*args, **kwargs)
+    return pa.array(result, type=pa.large_string(), from_pandas=True)
+
+def _split_part(values, delimiter, part):
+    """
+    Get the 1-based part of each value split on a delimiter, or "" when
+    there are fewer parts.
+    """
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+
+    parts = pc.split_pattern(values, pattern=delimiter)
+    lengths = pc.list_value_length(parts).to_numpy(zero_copy_only=False)
+    flat = pc.list_flatten(parts)
+
+    # Index into the flattened parts through the list offsets
+    has_part = lengths >= part
+    if not has_part.any():
+        return pa.array([""] * len(values), type=pa.large_string())
+
+    positions = np.where(has_part, parts.offsets.to_numpy()[:-1] + part - 1, 0)
+    return pc.if_else(pa.array(has_part), flat.take(pa.array(positions)), "")
+
+def _name_groups(pattern):
+    """
+    Give every unnamed capture group of a regular expression a name, as
+    Arrow's regex kernel only returns named groups. Groups keep their order.
+    """
+    named = []
+    in_class = False
+    position = 0
+    count = 0
+
+    while position < len(pattern):
+        character = pattern[position]
+        if character == "\\":
+            named.append(pattern[position:position + 2])
+            position += 2
+            continue
+        if in_class:
+            in_class = character != "]"
+        elif character == "[":
+            in_class = True
+            # A closing bracket right after the opening one is a literal
+            if pattern.startswith("]", position + 1) or pattern.startswith("^]", position + 1):
+                closing = pattern.index("]", position + 1)
+                named.append(pattern[position:closing + 1])
+                position = closing + 1
+                continue
+        elif character == "(" and not pattern.startswith("?", position + 1):
+            count += 1
+            named.append(f"(?P<group_{count}>")
+            position += 1
+            continue
+        named.append(character)
+        position += 1
+
+    return "".join(named)
+
+def _regex_extract(values, pattern, group):
+    """
+    Extract a capture group (0 for the whole match) of the first match of a
+    regular expression, or null where the value does not match.
+    """
+    compiled = re.compile(pattern)
+    if group > compiled.groups:
+        raise ValueError(f"Pattern has no capture group {group}")
+
+    if _is_ascii(values):
+        arrow_pattern = _name_groups(pattern)
+        if group == 0:
+            arrow_pattern = f"(?P<match>{arrow_pattern})"
+        try:
+            matches = pc.extract_regex(values, pattern=arrow_pattern)
+            return pc.struct_field(matches, [max(group - 1, 0)])
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Constructs RE2 does not support (lookarounds, backreferences)
+            pass
+
+    if group == 0:
+        # Wrap the whole pattern so extract returns the full match
+        pattern = f"({pattern})"
+        group = 1
+
+    extracted = pd.Series(values.to_pylist(), dtype=object).str.extract(pattern, expand=True)
+    return pa.array(extracted.iloc[:, group - 1], type=pa.large_string(), from_pandas=True)
+
+def apply_text_manipulation(df, text_params):
+    """
+    Compute a text manipulation as a new column.
+
+    Every manipulation runs as Arrow compute kernels over the whole column
+    instead of formatting and slicing each value in Python, and the result
+    is stored as Arrow-backed strings. Results match the original
+    astype(str) based implementation, including how missing values render.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame with the source columns
+    text_params : dict
+        Manipulation type and its parameters
+
+    Returns:
+    --------
+    Series or None
+        Values of the new column, or None for an unknown manipulation type
+    """
+    manipulation_type = text_params.get("type")
+    if manipulation_type not in TEXT_MANIPULATIONS:
+        return None
+
+    if manipulation_type == "concatenate" and text_params.get("concat_with") == "column":
+        separator = text_params.get("separator", "")
+        result = pc.binary_join_element_wise(
+            as_text(df[text_params.get("column1")]),
+            as_text(df[text_params.get("column2")]),
+            pa.scalar(separator, type=pa.large_string())
+        )
+        return _to_series(result, df.index)
+
+    values = as_text(df[text_params.get("column")])
+
+    if manipulation_type == "extract_substring":
+        start = text_params.get("start", 0)
+        length = text_params.get("length")
+        if length is None:
+            result = pc.utf8_slice_codeunits(values, start)
+        else:
+            result = pc.utf8_slice_codeunits(values, start, stop=start + length)
+
+    elif manipulation_type == "concatenate":
+        text = pa.scalar(text_params.get("text", ""), type=pa.large_string())
+        empty = pa.scalar("", type=pa.large_string())
+        if text_params.get("position", "after") == "before":
+            result = pc.binary_join_element_wise(text, values, empty)
+        else:
+            result = pc.binary_join_element_wise(values, text, empty)
+
+    elif manipulation_type == "replace":
+        find = text_params.get("find", "")
+        replace = text_params.get("replace", "")
+        if find:
+            result = pc.replace_substring(values, pattern=find, replacement=replace)
+        else:
+            # Inserting between every character is left to Python's str.replace
+            result = _python_str(values, "replace", find, replace, regex=False)
+
+    elif manipulation_type == "change_case":
+        case = text_params.get("case", "lower")
+        methods = {"upper": "upper", "lower": "lower", "title_case": "title"}
+        if case not in methods:
+            return None
+        if _is_ascii(values):
+            result = getattr(pc, f"utf8_{methods[case]}")(values)
+        else:
+            # Python applies special casings such as "ß" -> "SS"
+            result = _python_str(values, methods[case])
+
+    elif manipulation_type == "trim":
+        characters = text_params.get("characters")
+        side = text_params.get("side", "both")
+        kernel = {"left": "ltrim", "right": "rtrim"}.get(side, "trim")
+        if characters:
+            result = getattr(pc, f"utf8_{kernel}")(values, characters=characters)
+        else:
+            result = getattr(pc, f"utf8_{kernel}_whitespace")(values)
+
+    elif manipulation_type == "pad":
+        width = int(text_params.get("width", 0))
+        side = text_params.get("side", "left")
+        fill_character = text_params.get("fill_character") or " "
+        kernel = {"right": "utf8_rpad", "both": "utf8_center"}.get(side, "utf8_lpad")
+        result = getattr(pc, kernel)(values, width=width, padding=fill_character)
+
+    elif manipulation_type == "split_part":
+        delimiter = text_params.get("delimiter", ",")
+        part = int(text_params.get("part", 1))
+        if not delimiter or part < 1:
+            raise ValueError("Split part needs a delimiter and a part number of at least 1")
+        result = _split_part(values, delimiter, part)
+
+    else:
+        pattern = text_params.get("pattern", "")
+        group = int(text_params.get("group", 1))
+        result = _regex_extract(values, pattern, group)
+
+    return _to_series(result, df.index)
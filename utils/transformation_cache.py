@@ -0,0 +1,181 @@
+import hashlib
+import json
+from collections import OrderedDict
+from utils.data_processing import apply_transformation, dataframe_fingerprint, join_source_data
+
+# Default memory budget for cached intermediate frames
+DEFAULT_STEP_CACHE_BYTES = 512 * 1024 * 1024
+
+def _frame_size(df):
+    """
+    Estimate the memory held by a cached frame.
+
+    Sizes are deep, since steps such as text manipulation create new
+    Python strings; strings shared with the source are counted again,
+    which keeps the cache within its budget.
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+class StepResultCache:
+    """
+    LRU cache of intermediate transformation results.
+
+    Frames are keyed by (source fingerprint, hash of steps[0..k]) so that
+    editing step N of a recipe only reruns the steps from N onward. The
+    least recently used frames are evicted once the memory budget is used.
+    Cached frames are shared and must not be modified in place.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_STEP_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Get a cached frame, or None if it is not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def get_longest(self, keys):
+        """
+        Find the longest cached prefix among a list of prefix keys.
+
+        Returns a (position, frame) pair where position is the number of
+        steps covered, or (0, None) if no prefix is cached.
+        """
+        for position in range(len(keys), 0, -1):
+            entry = self._entries.get(keys[position - 1])
+            if entry is not None:
+                self._entries.move_to_end(keys[position - 1])
+                self.hits += 1
+                return position, entry[0]
+
+        self.misses += 1
+        return 0, None
+
+    def put(self, key, df):
+        """
+        Cache a frame, evicting the least recently used ones if needed.
+        """
+        size = _frame_size(df)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+
+        self._entries[key] = (df, size)
+        self.current_bytes += size
+        self.evict()
+
+    def evict(self):
+        """
+        Evict frames until the cache fits its memory budget.
+        """
+        while self._entries and self.current_bytes > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+
+    def clear(self):
+        """
+        Remove all cached frames.
+        """
+        self._entries.clear()
+        self.current_bytes = 0
+
+def step_prefix_keys(source_fingerprint, steps):
+    """
+    Compute the cache key of every prefix of a list of steps.
+
+    Parameters:
+    -----------
+    source_fingerprint : str
+        Fingerprint of the source dataframe
+    steps : list
+        List of transformation steps with operation and params
+
+    Returns:
+    --------
+    list
+        Cache key for steps[0..k] at position k
+    """
+    digest = hashlib.sha1(source_fingerprint.encode())
+    keys = []
+
+    for step in steps:
+        digest.update(json.dumps(step, sort_keys=True, default=str).encode())
+        if step.get("operation") == "join_sources":
+            # The joined source may be replaced under the same name
+            digest.update(dataframe_fingerprint(join_source_data(step["params"].get("source"))).encode())
+        keys.append((source_fingerprint, digest.copy().hexdigest()))
+
+    return keys
+
+def run_steps_cached(df, steps, cache):
+    """
+    Apply transformation steps, reusing the longest cached prefix.
+
+    Every intermediate result is cached, so rerunning a recipe after
+    editing one step only applies the steps from the edited one onward.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Source DataFrame
+    steps : list
+        List of transformation steps with operation and params
+    cache : StepResultCache
+        Cache of intermediate results
+
+    Returns:
+    --------
+    tuple
+        (result DataFrame, number of steps that were actually applied)
+    """
+    keys = step_prefix_keys(dataframe_fingerprint(df), steps)
+
+    # Start from the longest prefix that is already cached
+    start, result_df = cache.get_longest(keys)
+    if result_df is None:
+        result_df = df
+
+    for position in range(start, len(steps)):
+        step = steps[position]
+        result_df = apply_transformation(result_df, step["operation"], step["params"])
+        cache.put(keys[position], result_df)
+
+    return result_df, len(steps) - start
+
+def cache_step_result(cache, df, steps, result_df):
+    """
+    Cache the result of applying steps to a source dataframe.
+
+    Used when steps are applied one at a time, so that later edits can
+    start from these intermediate results.
+
+    Parameters:
+    -----------
+    cache : StepResultCache
+        Cache of intermediate results
+    df : DataFrame
+        Source DataFrame
+    steps : list
+        Steps applied so far, including the one that produced result_df
+    result_df : DataFrame
+        Result of applying all the steps to the source
+    """
+    if steps:
+        cache.put(step_prefix_keys(dataframe_fingerprint(df), steps)[-1], result_df)
@@ -0,0 +1,745 @@
+import pandas as pd
+import numpy as np
+import re
+import os
+import json
+import time
+import tracemalloc
+import threading
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.data_processing import apply_transformation, MUTATING_OPERATIONS
+from utils.expressions import requires_python
+
+# Step kinds that a row filter can safely be moved ahead of
+_ROW_LOCAL_KINDS = ("column", "reorder", "projection")
+
+# Step kinds that compute each output row from the same input row only
+_PARTITIONABLE_KINDS = ("filter", "column", "projection")
+
+# Worker processes used by default for partitioned execution (cores this process may use)
+DEFAULT_WORKERS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+# Frames smaller than this run in-process; starting workers costs more than it saves
+PARALLEL_MIN_ROWS = 200000
+
+# Smallest number of rows handed to one worker task
+PARTITION_MIN_ROWS = 50000
+
+# Start method for worker processes; forking a multi-threaded server can deadlock
+PARTITION_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Process pool shared by every partitioned run of this process, started on first use
+_POOL = {"executor": None}
+_POOL_LOCK = threading.Lock()
+
+# Profiles running in this process, and whether they started tracemalloc
+_TRACING = {"profiles": 0, "started": False}
+_TRACING_LOCK = threading.Lock()
+
+def _formula_columns(formula):
+    """
+    Get the column names referenced as {column} in a custom formula.
+
+    Returns None if the formula may reference columns in other ways.
+    """
+    if formula is None or "result_df" in formula:
+        return None
+    return set(re.findall(r"\{([^{}]+)\}", formula))
+
+def describe_step(step):
+    """
+    Describe how a transformation step interacts with rows and columns.
+
+    Parameters:
+    -----------
+    step : dict
+        Transformation step with operation and params
+
+    Returns:
+    --------
+    dict
+        Dictionary with the step kind, the columns it reads (None if it may
+        read any column) and the columns it writes
+    """
+    operation = step.get("operation")
+    params = step.get("params", {})
+
+    kind = "barrier"
+    reads = None
+    writes = set()
+
+    if operation == "filter_rows":
+        kind = "filter"
+        reads = {params.get("column")}
+
+    elif operation == "select_columns":
+        kind = "projection"
+        reads = set(params.get("columns", []))
+
+    elif operation == "sort_data":
+        kind = "reorder"
+        reads = {params.get("column")}
+
+    elif operation == "aggregate_data":
+        reads = set(params.get("group_columns", [])) | set(params.get("aggregations", {}))
+
+    elif operation == "pivot":
+        values = params.get("values", [])
+        values = [values] if isinstance(values, str) else list(values)
+        reads = set(params.get("index", [])) | {params.get("columns")} | set(values)
+
+    elif operation == "unpivot":
+        if params.get("value_columns"):
+            reads = set(params.get("id_columns", [])) | set(params.get("value_columns"))
+
+    elif operation == "deduplicate":
+        # Which rows are kept depends on the other rows
+        if params.get("subset"):
+            reads = set(params.get("subset"))
+
+    elif operation == "window":
+        # Each value depends on the other rows of its partition
+        reads = set(params.get("partition_by") or []) | set(params.get("order_by") or [])
+        if params.get("column") is not None:
+            reads.add(params.get("column"))
+        writes = {params.get("new_column")}
+
+    elif operation == "join_sources":
+        # Joined column names get a suffix when they clash with any column,
+        # so every column is kept ahead of a join
+        reads = None
+
+    elif operation == "rename_columns":
+        rename_map = params.get("rename_map", {})
+        reads = set(rename_map)
+        writes = set(rename_map) | set(rename_map.values())
+
+    elif operation == "create_column":
+        kind = "column"
+        method = params.get("method")
+        writes = {params.get("new_column")}
+
+        if method == "formula":
+            formula_params = params.get("formula_params", {})
+            if formula_params.get("type") == "basic_arithmetic":
+                reads = {formula_params.get("col1")}
+                if formula_params.get("operand_type") == "column":
+                    reads.add(formula_params.get("col2"))
+            else:
+                reads = _formula_columns(formula_params.get("formula"))
+
+        elif method == "conditional":
+            reads = {params.get("condition_params", {}).get("column")}
+
+        elif method == "case_when":
+            reads = {case.get("condition_params", {}).get("column") for case in params.get("cases", [])}
+
+        elif method == "text_manipulation":
+            text_params = params.get("text_params", {})
+            reads = {
+                text_params.get(key) for key in ("column", "column1", "column2")
+                if text_params.get(key) is not None
+            }
+
+        elif method == "date_extraction":
+            # The date column itself is converted to datetime in place
+            reads = {params.get("date_column")}
+            writes.add(params.get("date_column"))
+
+    elif operation == "handle_missing":
+        reads = set(params.get("columns", []))
+        if params.get("method") == "drop_rows":
+            kind = "filter"
+        else:
+            writes = set(reads)
+            # Statistics and interpolation depend on the other rows
+            kind = "column" if params.get("method") == "fill_value" else "barrier"
+
+    elif operation in ("change_type", "apply_function"):
+        kind = "column"
+        reads = {params.get("column")}
+        writes = {params.get("column")}
+
+    return {"kind": kind, "reads": reads, "writes": writes}
+
+def _runs_python(step):
+    """
+    Check whether a step runs user Python code, which may look at the whole
+    frame (e.g. {Sales} / {Sales}.sum()) or fail on rows a filter removes.
+    """
+    params = step.get("params", {})
+    if step.get("operation") == "apply_function":
+        return True
+    if step.get("operation") == "create_column" and params.get("method") == "formula":
+        formula_params = params.get("formula_params", {})
+        return formula_params.get("type") == "custom_formula" and requires_python(formula_params.get("formula") or "")
+    return False
+
+def _can_move_ahead(filter_info, step):
+    """
+    Check whether a row filter can be evaluated before another step.
+    """
+    step_info = describe_step(step)
+    if step_info["kind"] not in _ROW_LOCAL_KINDS or filter_info["reads"] is None or _runs_python(step):
+        return False
+    return not (filter_info["reads"] & step_info["writes"])
+
+def _push_down_filters(steps, notes):
+    """
+    Move row filters ahead of the row-local steps that precede them, keeping
+    the relative order of filters.
+    """
+    ordered = []
+
+    for position, step in enumerate(steps):
+        info = describe_step(step)
+        target = len(ordered)
+
+        if info["kind"] == "filter":
+            while target > 0 and _can_move_ahead(info, ordered[target - 1]):
+                target -= 1
+
+        if target < len(ordered):
+            notes.append(
+                f"Moved step {position + 1} ({step['operation']}) ahead of "
+                f"{len(ordered) - target} step(s)"
+            )
+        ordered.insert(target, step)
+
+    return ordered
+
+def _prune_columns(steps, notes):
+    """
+    Walk the steps backwards to find the columns each one needs, dropping
+    column-creating steps whose output is never used.
+
+    Returns the remaining steps and the source columns required, or None if
+    every source column may be needed.
+    """
+    required = None
+    kept = []
+
+    for step in reversed(steps):
+        info = describe_step(step)
+        operation = step.get("operation")
+        params = step.get("params", {})
+
+        if operation == "select_columns":
+            required = set(params.get("columns", []))
+
+        elif operation in ("aggregate_data", "pivot", "unpivot"):
+            # The output only holds columns computed from the ones read
+            required = None if info["reads"] is None else set(info["reads"])
+
+        elif operation == "rename_columns":
+            if required is not None:
+                rename_map = params.get("rename_map", {})
+                inverse = {new: old for old, new in rename_map.items()}
+                required = {
+                    inverse.get(column, column) for column in required
+                    if column in inverse or column not in rename_map
+                }
+
+        elif info["kind"] == "column" and required is not None and not (info["writes"] & required):
+            notes.append(f"Dropped unused {operation} step writing {', '.join(sorted(map(str, info['writes'])))}")
+            continue
+
+        elif required is not None:
+            if info["reads"] is None:
+                required = None
+            else:
+                required = (required - info["writes"]) | info["reads"]
+
+        kept.append(step)
+
+    kept.reverse()
+    return kept, required
+
+def optimize_steps(steps, columns=None):
+    """
+    Build an optimized execution plan for a list of transformation steps.
+
+    Row filters are moved ahead of the row-local steps before them (new
+    columns, sorting, type changes), steps whose output no later step or
+    column selection needs are dropped, and the source is narrowed to the
+    columns the remaining steps use.
+
+    Parameters:
+    -----------
+    steps : list
+        List of transformation steps with operation and params
+    columns : list
+        Columns of the source dataframe, used to compute the projection
+
+    Returns:
+    --------
+    dict
+        Dictionary with the optimized steps, the source columns to load
+        (None for all columns) and notes describing the changes
+    """
+    notes = []
+
+    optimized = _push_down_filters(list(steps), notes)
+    optimized, required = _prune_columns(optimized, notes)
+
+    projection = None
+    if required is not None and columns is not None:
+        projection = [column for column in columns if column in required]
+        if len(projection) < len(columns):
+            notes.append(f"Loading {len(projection)} of {len(columns)} source columns")
+        else:
+            projection = None
+
+    return {
+        "steps": optimized,
+        "columns": projection,
+        "notes": notes
+    }
+
+def is_partitionable(step):
+    """
+    Check whether a step computes each output row from the same input row
+    only, so it can run on separate row ranges and the results be stitched
+    back together.
+
+    Parameters:
+    -----------
+    step : dict
+        Transformation step with operation and params
+
+    Returns:
+    --------
+    bool
+        True for row filters, column selections and new or changed columns
+        that do not look at other rows
+    """
+    if describe_step(step)["kind"] not in _PARTITIONABLE_KINDS:
+        return False
+
+    params = step.get("params", {})
+    if step.get("operation") == "create_column" and params.get("method") == "formula":
+        formula_params = params.get("formula_params", {})
+        # Python formulas see the whole frame (e.g. result_df['x'].mean())
+        if formula_params.get("type") == "custom_formula" and requires_python(formula_params.get("formula") or ""):
+            return False
+
+    return True
+
+def _run_steps(df, steps):
+    """
+    Apply steps one after another to a frame owned by the caller.
+    """
+    for step in steps:
+        df = apply_transformation(df, step["operation"], step["params"], copy=False)
+    return df
+
+def _get_pool():
+    """
+    Return the process pool shared by partitioned runs, starting it on
+    first use. It holds up to DEFAULT_WORKERS processes, started as tasks
+    arrive, so concurrent runs from every session share the same workers.
+    """
+    with _POOL_LOCK:
+        if _POOL["executor"] is None:
+            context = multiprocessing.get_context(PARTITION_START_METHOD)
+            _POOL["executor"] = ProcessPoolExecutor(max_workers=DEFAULT_WORKERS, mp_context=context)
+        return _POOL["executor"]
+
+def _discard_pool(executor):
+    """
+    Drop a pool whose workers died, so the next run starts a new one.
+    """
+    with _POOL_LOCK:
+        if _POOL["executor"] is executor:
+            _POOL["executor"] = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def _share_columns(df):
+    """
+    Copy the numpy-backed numeric, boolean and datetime columns of a frame
+    into one shared memory block, so workers read their rows from it
+    instead of receiving them pickled.
+
+    Returns the block (None when no column qualifies) and its layout as
+    (column position, dtype, byte offset) tuples.
+    """
+    layout = []
+    size = 0
+    for position in range(df.shape[1]):
+        dtype = df.dtypes.iloc[position]
+        if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+            layout.append((position, dtype, size))
+            size += dtype.itemsize * len(df)
+
+    if not layout or size == 0:
+        return None, []
+
+    block = SharedMemory(create=True, size=size)
+    for position, dtype, offset in layout:
+        target = np.ndarray(len(df), dtype=dtype, buffer=block.buf, offset=offset)
+        target[:] = df.iloc[:, position].to_numpy()
+        del target
+    return block, layout
+
+def _run_partition(block_name, layout, rows, start, stop, rest, columns, steps):
+    """
+    Worker task: rebuild one row range of the partitioned frame from the
+    shared memory block and the other (pickled) columns, then apply steps.
+    """
+    arrays = {}
+    if block_name is not None:
+        block = SharedMemory(name=block_name)
+        try:
+            for position, dtype, offset in layout:
+                arrays[position] = np.ndarray(rows, dtype=dtype, buffer=block.buf, offset=offset)[start:stop].copy()
+        finally:
+            block.close()
+
+    shared = {position for position, _, _ in layout}
+    others = [position for position in range(len(columns)) if position not in shared]
+    for column, position in enumerate(others):
+        arrays[position] = rest.iloc[:, column].array
+
+    chunk = pd.DataFrame({position: arrays[position] for position in range(len(columns))}, index=rest.index, copy=False)
+    chunk.columns = columns
+    return _run_steps(chunk, steps)
+
+def _stitch(parts):
+    """
+    Concatenate partition results in order, merging the categories of
+    columns that became categorical in every partition.
+    """
+    result_df = pd.concat(parts)
+
+    for column in result_df.columns:
+        dtypes = [part[column].dtype for part in parts if column in part.columns]
+        if (not isinstance(result_df[column].dtype, pd.CategoricalDtype)
+                and dtypes and all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes)):
+            merged = pd.api.types.union_categoricals([part[column] for part in parts if column in part.columns])
+            result_df[column] = pd.Categorical(result_df[column], categories=merged.categories)
+
+    return result_df
+
+def run_partitioned(df, steps, workers=DEFAULT_WORKERS):
+    """
+    Run row-local steps on row ranges of a frame across a process pool.
+
+    The frame is split into one contiguous row range per worker, each
+    worker applies all the steps to its range and the results are
+    concatenated in the original row order. Numeric, boolean and datetime
+    columns are handed over through a shared memory block private to the
+    run; only the other columns are pickled. Workers come from the pool
+    shared by the whole process (see _get_pool), started with
+    PARTITION_START_METHOD rather than forked from the server.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to transform; it is not modified
+    steps : list
+        Steps for which is_partitionable() is True
+    workers : int
+        Number of row ranges processed at the same time
+
+    Returns:
+    --------
+    DataFrame
+        Same result as applying the steps to the whole frame
+    """
+    partitions = min(workers, max(len(df) // PARTITION_MIN_ROWS, 1))
+    if partitions <= 1:
+        return _run_steps(df.copy(), steps)
+
+    edges = np.linspace(0, len(df), partitions + 1).astype(np.int64)
+    executor = _get_pool()
+    block, layout = _share_columns(df)
+    block_name = block.name if block is not None else None
+    shared = {position for position, _, _ in layout}
+    others = [position for position in range(df.shape[1]) if position not in shared]
+
+    try:
+        futures = [
+            executor.submit(
+                _run_partition, block_name, layout, len(df), start, stop,
+                df.iloc[start:stop, others], df.columns, steps
+            )
+            for start, stop in zip(edges[:-1], edges[1:])
+        ]
+        parts = [future.result() for future in futures]
+    except BrokenProcessPool:
+        _discard_pool(executor)
+        raise
+    finally:
+        if block is not None:
+            block.close()
+            block.unlink()
+
+    return _stitch(parts)
+
+def execute_transformation(df, steps, optimize=True, workers=1):
+    """
+    Execute a transformation recipe as a single plan.
+
+    The source dataframe is never modified. At most one copy of it is made
+    (narrowed to the required columns when possible) and later steps work
+    on frames owned by the plan instead of copying them again.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to transform
+    steps : list
+        List of transformation steps with operation and params
+    optimize : bool
+        Whether to reorder and prune the steps before executing them
+    workers : int
+        Number of processes; with more than one, consecutive row-local
+        steps on frames of at least PARALLEL_MIN_ROWS rows run partitioned
+        across a process pool
+
+    Returns:
+    --------
+    DataFrame
+        Transformed DataFrame
+    """
+    if optimize:
+        plan = optimize_steps(steps, list(df.columns))
+    else:
+        plan = {"steps": list(steps), "columns": None, "notes": []}
+
+    result_df = df
+    owned = False
+
+    if plan["columns"] is not None:
+        result_df = df[plan["columns"]]
+        owned = True
+
+    steps = plan["steps"]
+    position = 0
+
+    while position < len(steps):
+        # Runs of row-local steps on large frames are spread over processes
+        if workers > 1 and len(result_df) >= PARALLEL_MIN_ROWS:
+            end = position
+            while end < len(steps) and is_partitionable(steps[end]):
+                end += 1
+            if end - position > 0:
+                result_df = run_partitioned(result_df, steps[position:end], workers)
+                owned = True
+                position = end
+                continue
+
+        step = steps[position]
+        step_input = result_df
+        result_df = apply_transformation(step_input, step["operation"], step["params"], copy=not owned)
+
+        # Frames built by a step belong to the plan and can be modified in place
+        if result_df is not step_input or step["operation"] in MUTATING_OPERATIONS:
+            owned = True
+
+        position += 1
+
+    return result_df
+
+def explain_transformation(steps, columns=None):
+    """
+    Describe the plan the optimizer would run for a recipe, without running it.
+
+    Parameters:
+    -----------
+    steps : list
+        List of transformation steps with operation and params
+    columns : list
+        Columns of the source dataframe, used to compute the projection
+
+    Returns:
+    --------
+    dict
+        Dictionary with one entry per planned step (its position in the
+        recipe, kind and the columns it reads and writes), the recipe
+        steps that were dropped, the source columns to load and the
+        optimizer notes
+    """
+    plan = optimize_steps(steps, columns)
+    positions = {id(step): position for position, step in enumerate(steps)}
+
+    planned = []
+    for step in plan["steps"]:
+        info = describe_step(step)
+        planned.append({
+            "recipe_step": positions[id(step)] + 1,
+            "operation": step["operation"],
+            "kind": info["kind"],
+            "reads": sorted(map(str, info["reads"])) if info["reads"] is not None else None,
+            "writes": sorted(map(str, info["writes"])),
+            "parallel": is_partitionable(step)
+        })
+
+    kept = {id(step) for step in plan["steps"]}
+    dropped = [position + 1 for position, step in enumerate(steps) if id(step) not in kept]
+
+    return {
+        "steps": planned,
+        "dropped_steps": dropped,
+        "columns": plan["columns"],
+        "notes": plan["notes"]
+    }
+
+def _start_tracing():
+    """
+    Register a running profile, starting tracemalloc for the first one
+    unless something else is already tracing.
+    """
+    with _TRACING_LOCK:
+        if _TRACING["profiles"] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _TRACING["started"] = True
+        _TRACING["profiles"] += 1
+
+def _stop_tracing():
+    """
+    Unregister a profile, stopping tracemalloc once the last running
+    profile is done if a profile started it.
+    """
+    with _TRACING_LOCK:
+        _TRACING["profiles"] -= 1
+        if _TRACING["profiles"] == 0 and _TRACING["started"]:
+            tracemalloc.stop()
+            _TRACING["started"] = False
+
+def _measure(function, *args, **kwargs):
+    """
+    Call a function and measure its wall time and the memory it allocated
+    (peak and retained, in bytes, as seen by tracemalloc).
+    """
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+
+    result = function(*args, **kwargs)
+
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    return result, {
+        "seconds": seconds,
+        "peak_memory_bytes": peak - before,
+        "memory_delta_bytes": current - before
+    }
+
+def profile_transformation(df, steps, optimize=True):
+    """
+    Run a recipe step by step and measure every step.
+
+    The recipe runs exactly like execute_transformation (in one process),
+    with tracemalloc tracing allocations, so every step reports its wall
+    time, its peak memory above what was allocated before it and the row
+    and column counts going in and out. Tracing slows execution down, so
+    timings are best compared between profiles. Profiles running at the
+    same time share one trace, so their memory figures overlap.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame to transform
+    steps : list
+        List of transformation steps with operation and params
+    optimize : bool
+        Whether to reorder and prune the steps before executing them
+
+    Returns:
+    --------
+    dict
+        Dictionary with the transformed DataFrame (result), the
+        measurements per step (steps), the plan from
+        explain_transformation (plan) and the total wall time
+    """
+    if optimize:
+        plan = explain_transformation(steps, list(df.columns))
+        optimized = optimize_steps(steps, list(df.columns))
+        planned_steps, projection = optimized["steps"], optimized["columns"]
+    else:
+        plan = {"steps": [], "dropped_steps": [], "columns": None, "notes": []}
+        planned_steps, projection = list(steps), None
+
+    _start_tracing()
+
+    records = []
+    total_start = time.perf_counter()
+
+    try:
+        result_df = df
+        owned = False
+
+        if projection is not None:
+            result_df, measurement = _measure(lambda: df[projection])
+            owned = True
+            records.append({
+                "step": 0,
+                "operation": "load_columns",
+                "rows_in": len(df),
+                "columns_in": len(df.columns),
+                "rows_out": len(result_df),
+                "columns_out": len(result_df.columns),
+                **measurement
+            })
+
+        for position, step in enumerate(planned_steps):
+            step_input = result_df
+            # Steps on owned frames work in place, so count before running
+            rows_in, columns_in = step_input.shape
+            result_df, measurement = _measure(
+                apply_transformation, step_input, step["operation"], step["params"], copy=not owned
+            )
+
+            if result_df is not step_input or step["operation"] in MUTATING_OPERATIONS:
+                owned = True
+
+            records.append({
+                "step": position + 1,
+                "operation": step["operation"],
+                "recipe_step": plan["steps"][position]["recipe_step"] if optimize else position + 1,
+                "rows_in": rows_in,
+                "columns_in": columns_in,
+                "rows_out": len(result_df),
+                "columns_out": len(result_df.columns),
+                **measurement
+            })
+    finally:
+        _stop_tracing()
+
+    return {
+        "result": result_df,
+        "steps": records,
+        "plan": plan,
+        "total_seconds": time.perf_counter() - total_start
+    }
+
+def profile_to_json(profile, recipe=None):
+    """
+    Serialize a profile (without the transformed data) as JSON, for
+    tracking step timings and memory across runs.
+
+    Parameters:
+    -----------
+    profile : dict
+        Result of profile_transformation
+    recipe : list
+        Optional recipe steps to include alongside the measurements
+
+    Returns:
+    --------
+    str
+        JSON document
+    """
+    document = {
+        "profiled_at": pd.Timestamp.now().isoformat(),
+        "total_seconds": profile["total_seconds"],
+        "steps": profile["steps"],
+        "plan": profile["plan"]
+    }
+    if recipe is not None:
+        document["recipe"] = recipe
+    return json.dumps(document, indent=2, default=str)
@@ -3,6 +3,9 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from utils.dtypes import is_text_dtype
+from utils.datetimes import to_datetime_cached
+from utils.reshape import pivot_dataframe
 
 # Dictionary of chart descriptions for the dashboard builder
 CHART_DESCRIPTIONS = {
@@ -27,6 +30,52 @@ def get_chart_types():
     """
     return ["bar", "line", "pie", "scatter", "heatmap", "area", "histogram", "box"]
 
+# Chart settings that name a column of the data
+CHART_COLUMN_KEYS = ("x_axis", "y_axis", "color", "size", "names", "values")
+
+def chart_columns(chart_config):
+    """
+    Get the columns a chart configuration uses.
+    
+    Parameters:
+    -----------
+    chart_config : dict
+        Chart configuration as passed to create_chart
+    
+    Returns:
+    --------
+    list
+        Column names referenced by the chart
+    """
+    columns = []
+    for key in CHART_COLUMN_KEYS:
+        value = chart_config.get(key)
+        if isinstance(value, (list, tuple)):
+            columns.extend(value)
+        elif value:
+            columns.append(value)
+    return columns
+
+def metric_columns(component):
+    """
+    Get the columns a metric component uses.
+    
+    Parameters:
+    -----------
+    component : dict
+        Metric component with metric_column and optional filter and delta
+    
+    Returns:
+    --------
+    list
+        The metric column, then the filter and delta date columns if set
+    """
+    columns = [component["metric_column"]]
+    for config, key in ((component.get("filter"), "column"), (component.get("delta"), "date_column")):
+        if config and config.get(key) and config[key] not in columns:
+            columns.append(config[key])
+    return columns
+
 def create_chart(df, chart_config):
     """
     Create a chart based on the configuration.
@@ -78,9 +127,11 @@ def create_chart(df, chart_config):
             color = chart_config.get("color")
             
             # Convert datetime-like columns to datetime
-            if x_axis in df.columns and df[x_axis].dtype == 'object':
+            if x_axis in df.columns and is_text_dtype(df[x_axis].dtype):
                 try:
-                    df[x_axis] = pd.to_datetime(df[x_axis])
+                    # Replace the column on a shallow copy; the caller's frame stays as it is
+                    df = df.copy(deep=False)
+                    df[x_axis] = to_datetime_cached(df[x_axis])
                 except:
                     pass
             
@@ -125,13 +176,8 @@ def create_chart(df, chart_config):
             y_axis = chart_config.get("y_axis")
             values = chart_config.get("values")
             
-            # Pivot the dataframe for heatmap
-            pivot_table = df.pivot_table(
-                values=values,
-                index=y_axis,
-                columns=x_axis,
-                aggfunc='mean'
-            )
+            # Pivot the dataframe for heatmap over factorized keys
+            pivot_table = pivot_dataframe(df, [y_axis], x_axis, values, aggfunc="mean").set_index(y_axis)
             
             fig = px.imshow(
                 pivot_table,
@@ -147,9 +193,11 @@ def create_chart(df, chart_config):
             color = chart_config.get("color")
             
             # Convert datetime-like columns to datetime
-            if x_axis in df.columns and df[x_axis].dtype == 'object':
+            if x_axis in df.columns and is_text_dtype(df[x_axis].dtype):
                 try:
-                    df[x_axis] = pd.to_datetime(df[x_axis])
+                    # Replace the column on a shallow copy; the caller's frame stays as it is
+                    df = df.copy(deep=False)
+                    df[x_axis] = to_datetime_cached(df[x_axis])
                 except:
                     pass
             
@@ -242,7 +290,8 @@ def create_time_series_chart(df, date_column, value_column, group_column=None, c
     """
     # Convert date column to datetime if needed
     if df[date_column].dtype != 'datetime64[ns]':
-        df[date_column] = pd.to_datetime(df[date_column])
+        df = df.copy(deep=False)
+        df[date_column] = to_datetime_cached(df[date_column])
     
     # Create title if not provided
     if title is None:
@@ -0,0 +1,239 @@
+import pandas as pd
+import numpy as np
+
+# Window functions offered in the interface
+AGGREGATE_WINDOW_FUNCTIONS = ["sum", "mean", "min", "max", "count"]
+OFFSET_WINDOW_FUNCTIONS = ["lag", "lead"]
+RANKING_WINDOW_FUNCTIONS = ["row_number", "rank", "dense_rank"]
+WINDOW_FUNCTIONS = AGGREGATE_WINDOW_FUNCTIONS + OFFSET_WINDOW_FUNCTIONS + RANKING_WINDOW_FUNCTIONS
+
+def _sort_codes(series, ascending=True):
+    """
+    Number the values of an order-by column so that sorting the numbers
+    sorts the values, with missing values last in either direction.
+
+    Returns the numbers and how many different numbers there can be.
+    """
+    codes, uniques = pd.factorize(series, sort=True)
+    codes = codes.astype(np.int64)
+    if not ascending:
+        codes = np.where(codes >= 0, len(uniques) - 1 - codes, codes)
+    codes[codes < 0] = len(uniques)
+    return codes, len(uniques) + 1
+
+def _window_order(df, partition_by, order_by, ascending):
+    """
+    Sort the rows into contiguous partition blocks, ordered within each
+    block by the order-by columns and then by row position.
+
+    Returns the row order, the block number of every sorted row, the
+    block start and end (exclusive) of every sorted row, and the
+    order-by codes in sorted order.
+    """
+    if isinstance(ascending, bool):
+        ascending = [ascending] * len(order_by)
+
+    # Missing keys form a partition of their own, as in SQL
+    partition_codes, sizes = [], []
+    for column in partition_by:
+        codes, uniques = pd.factorize(df[column], use_na_sentinel=False)
+        partition_codes.append(codes.astype(np.int64))
+        sizes.append(len(uniques))
+    order_codes = []
+    for column, direction in zip(order_by, ascending):
+        codes, size = _sort_codes(df[column], direction)
+        order_codes.append(codes)
+        sizes.append(size)
+
+    keys = partition_codes + order_codes
+    if not keys:
+        order = np.arange(len(df))
+    elif np.prod(np.array(sizes, dtype=np.float64)) < 2.0 ** 62:
+        # All keys fit in one integer, which sorts faster than a lexsort
+        combined = keys[0]
+        for codes, size in zip(keys[1:], sizes[1:]):
+            combined = combined * size + codes
+        order = np.argsort(combined, kind="stable")
+    else:
+        # lexsort sorts by the last key first
+        order = np.lexsort(keys[::-1])
+
+    row_count = len(order)
+    new_block = np.zeros(row_count, dtype=bool)
+    if row_count:
+        new_block[0] = True
+    for codes in partition_codes:
+        ordered = codes[order]
+        new_block[1:] |= ordered[1:] != ordered[:-1]
+
+    blocks = np.cumsum(new_block) - 1
+    block_starts = np.flatnonzero(new_block)
+    block_ends = np.append(block_starts[1:], row_count)
+
+    sorted_order_codes = [codes[order] for codes in order_codes]
+    return order, blocks, block_starts[blocks], block_ends[blocks], sorted_order_codes
+
+def _frame_bounds(positions, starts, ends, preceding, following):
+    """
+    Get the first and last (inclusive) sorted position of every row's
+    frame; None for preceding or following means unbounded.
+    """
+    lower = starts if preceding is None else np.maximum(positions - preceding, starts)
+    upper = ends - 1 if following is None else np.minimum(positions + following, ends - 1)
+    return lower, upper
+
+def _prefix_sum(values, lower, upper):
+    """
+    Sum values over [lower, upper] ranges with one cumulative sum.
+    """
+    totals = np.concatenate(([0], np.cumsum(values)))
+    return totals[upper + 1] - totals[lower]
+
+def _grouped_extreme(values, blocks, lower, upper, preceding, following, function):
+    """
+    Minimum or maximum over each frame, ignoring missing values.
+
+    Cumulative frames use grouped running extremes, which are read at the
+    frame end (or, running backwards, at the frame start). Bounded frames
+    pad every block with missing values so one rolling pass over all rows
+    never crosses a block boundary.
+    """
+    series = pd.Series(values)
+
+    if preceding is None and following is None:
+        return getattr(series.groupby(blocks), function)().to_numpy()[blocks]
+
+    if preceding is None or following is None:
+        # Running extremes stop at missing values, so those are filled with
+        # a value that never wins; frames with only missing values are
+        # cleared by the caller
+        filler = np.inf if function == "min" else -np.inf
+        series = pd.Series(np.where(np.isnan(values), filler, values))
+
+    if preceding is None:
+        running = getattr(series.groupby(blocks), f"cum{function}")().to_numpy()
+        return running[upper]
+
+    if following is None:
+        reversed_running = getattr(series[::-1].groupby(blocks[::-1]), f"cum{function}")().to_numpy()[::-1]
+        return reversed_running[lower]
+
+    # Pad each block with `preceding` missing values before and `following` after
+    row_count = len(values)
+    block_count = int(blocks[-1]) + 1 if row_count else 0
+    padded_positions = np.arange(row_count) + preceding * (blocks + 1) + following * blocks
+    padded = np.full(row_count + block_count * (preceding + following), np.nan)
+    padded[padded_positions] = values
+
+    rolling = getattr(pd.Series(padded).rolling(preceding + following + 1, min_periods=1), function)().to_numpy()
+    return rolling[padded_positions + following]
+
+def apply_window(df, window_params):
+    """
+    Compute a window function as a new column.
+
+    Rows are sorted once into contiguous partition blocks; sums, means and
+    counts over any frame then come from a single cumulative sum, running
+    and rolling extremes from grouped cumulative and rolling kernels, and
+    offsets and ranks from position arithmetic within the blocks. Results
+    are returned in the original row order.
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Pandas DataFrame with the source columns
+    window_params : dict
+        Window specification with function, column, partition_by,
+        order_by, ascending, frame ({"preceding": n, "following": n},
+        None for unbounded) and offset for lag and lead
+
+    Returns:
+    --------
+    Series
+        Values of the new column
+    """
+    function = window_params.get("function")
+    if function not in WINDOW_FUNCTIONS:
+        raise ValueError(f"Unsupported window function: {function}")
+
+    column = window_params.get("column")
+    partition_by = list(window_params.get("partition_by") or [])
+    order_by = list(window_params.get("order_by") or [])
+    if function in ("rank", "dense_rank") and not order_by:
+        raise ValueError(f"{function} needs at least one order-by column")
+
+    missing = [name for name in partition_by + order_by if name not in df.columns]
+    if function not in RANKING_WINDOW_FUNCTIONS and column not in df.columns:
+        missing.append(column)
+    if missing:
+        raise ValueError(f"Window columns not found: {', '.join(map(str, missing))}")
+
+    order, blocks, starts, ends, order_codes = _window_order(
+        df, partition_by, order_by, window_params.get("ascending", True)
+    )
+    positions = np.arange(len(order))
+
+    if function in AGGREGATE_WINDOW_FUNCTIONS:
+        # Default frame: from the start of the partition to the current row
+        frame = window_params.get("frame") or {}
+        preceding = frame.get("preceding")
+        following = frame.get("following", 0)
+        if (preceding is not None and preceding < 0) or (following is not None and following < 0):
+            raise ValueError("Window frame bounds must not be negative")
+        lower, upper = _frame_bounds(positions, starts, ends, preceding, following)
+
+        series = df[column]
+        present = series.notna().to_numpy()[order]
+        counts = _prefix_sum(present.astype(np.int64), lower, upper)
+
+        if function == "count":
+            result = counts
+        elif function in ("sum", "mean"):
+            values = series.to_numpy()
+            if values.dtype.kind in "iub":
+                totals = _prefix_sum(values[order].astype(np.int64), lower, upper)
+            else:
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)[order]
+                totals = _prefix_sum(np.where(present, values, 0.0), lower, upper)
+
+            # Frames without values give a missing sum or mean, as in SQL
+            if function == "sum" and values.dtype.kind in "iub":
+                result = totals
+            elif function == "sum":
+                result = np.where(counts > 0, totals, np.nan)
+            else:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    result = np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+        else:
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)[order]
+            result = _grouped_extreme(values, blocks, lower, upper, preceding, following, function)
+            result = np.where(counts > 0, result, np.nan)
+
+    elif function in OFFSET_WINDOW_FUNCTIONS:
+        offset = int(window_params.get("offset", 1))
+        source = positions - offset if function == "lag" else positions + offset
+        valid = (source >= starts) & (source < ends)
+        values = df[column].array.take(order)
+        result = values.take(np.where(valid, source, -1), allow_fill=True)
+        default = window_params.get("default")
+        if default is not None:
+            result = pd.Series(result).mask(~valid, default).array
+
+    else:
+        if function == "row_number":
+            result = positions - starts + 1
+        else:
+            # A new rank starts at every change of the order-by values
+            new_value = positions == starts
+            for codes in order_codes:
+                new_value[1:] |= codes[1:] != codes[:-1]
+            if function == "rank":
+                result = np.maximum.accumulate(np.where(new_value, positions, 0)) - starts + 1
+            else:
+                running = np.cumsum(new_value)
+                result = running - running[starts] + 1
+
+    # Back to the original row order
+    inverse = np.empty_like(order)
+    inverse[order] = positions
+    return pd.Series(result.take(inverse), index=df.index)